@@ -1,74 +1,43 @@
-import glob
-import itertools
-import os
+import sys
+from pathlib import Path
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-# ================================================================
-# 0. Utility Functions
-# ================================================================
-def elo_update(elo_a, elo_b, result, k=32):
-    """Update ELO rating between two universes."""
-    expected_a = 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
-    new_a = elo_a + k * (result - expected_a)
-    return new_a
+from multiverse.benchmark import benchmark_details, benchmark_scores  # noqa: E402
+from multiverse.lifetime import LifetimeBenchmark  # noqa: E402
+from multiverse.store import UniverseLoader  # noqa: E402
+from multiverse.tournament import EloTournament  # noqa: E402
+from multiverse.universe import stack_tables  # noqa: E402
 
+CATALOG = "QLF_Universes.qlfc"
 
 # ================================================================
-# 1. Load QLF Universe files (4x4 truth tables)
+# 1. Load QLF Universes (catalog จาก QLF_MULTIVERSE.py)
 # ================================================================
-universes = {}
-file_list = glob.glob("QLF_Universe_*.csv")
-
-if not file_list:
-    print("[ERROR] ไม่พบไฟล์ QLF_Universe_*.csv")
+if not Path(CATALOG).exists():
+    print(f"[ERROR] ไม่พบไฟล์ {CATALOG} — รัน QLF_MULTIVERSE.py ก่อน")
     exit()
 
-for file in file_list:
-    df = pd.read_csv(file, index_col=0)
-    df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-    if df.shape != (4, 4):
-        print(f"[WARNING] ข้ามไฟล์ {file} เพราะมีขนาดไม่ถูกต้อง: {df.shape}")
-        continue
-
-    universes[os.path.basename(file)] = df
+loader = UniverseLoader(CATALOG)
+universes = {name: loader.load(id=name) for name in sorted(loader.catalog.names, key=lambda n: loader.catalog.names[n])}
 
 print(f"[INFO] Loaded {len(universes)} universes")
 
-states = ["T", "F", "N", "C"]
-
-# ================================================================
-# 2. Stress Test Scenarios
-# ================================================================
-test_cases = [("C", "C"), ("N", "T"), ("F", "T"), ("F", "C")]
+names = list(universes.keys())
+tables = stack_tables(universes.values())
 
 # ================================================================
-# 3. Benchmark Simulation (A)
+# 3. Benchmark Simulation (A) — scenarios อยู่ใน multiverse/benchmark.py
 # ================================================================
-results = []
-
-for name, logic in universes.items():
-    score = 0
-    details = []
-
-    for a, b in test_cases:
-        res = logic.loc[a, b]
-        details.append(f"{a}+{b}={res}")
-
-        if res == "T":
-            score += 10
-        elif res == "N":
-            score += 7
-        elif res == "C":
-            score += 3
-        elif res == "F" or res == "ERR":
-            score -= 5
-
-    results.append({"Universe": name, "Score": score, "Detail": " | ".join(details)})
+scores = benchmark_scores(tables)
+results = [
+    {"Universe": name, "Score": int(score), "Detail": benchmark_details(universes[name])}
+    for name, score in zip(names, scores)
+]
 
 benchmark_report = pd.DataFrame(results).sort_values(by="Score", ascending=False)
 
@@ -78,6 +47,22 @@ print(benchmark_report[["Universe", "Score", "Detail"]].to_string(index=False))
 winner = benchmark_report.iloc[0]["Universe"]
 print(f"\n[VERDICT]: Benchmark Winner → {winner}")
 
+# ================================================================
+# 3.1 Consistency Lifetime (preprint §5.2) — random input streams
+# ================================================================
+lifetime = LifetimeBenchmark(length=128).run(tables, n_sequences=200_000, seed=0)
+lifetime_report = pd.DataFrame(
+    {
+        "Universe": names,
+        "MeanLifetime": lifetime.mean().round(1),
+        "MedianLifetime": lifetime.quantile(0.5),
+        "Survival%": (100 * lifetime.survival_rate()).round(1),
+    }
+).sort_values(by="MeanLifetime", ascending=False)
+
+print(f"\n========== CONSISTENCY LIFETIME ({lifetime.n_sequences:,} streams) ==========")
+print(lifetime_report.to_string(index=False))
+
 # ================================================================
 # 4. Visualization (C)
 # ================================================================
@@ -94,39 +79,11 @@ print("[INFO] Saved visualization → QLF_Benchmark_Visualization.png")
 # ================================================================
 # 5. Tournament Mode (ELO Ranking) (D)
 # ================================================================
-elo = {name: 1000 for name in universes.keys()}  # init ELO
-
-match_pairs = list(itertools.permutations(universes.keys(), 2))
-
-
-def eval_duel(u1, u2):
-    """Universe u1 vs u2 — นับแต้มจากตาราง 4x4 แบบไร้น้ำหนัก"""
-    df1 = universes[u1]
-    df2 = universes[u2]
-
-    u1_pts = 0
-    u2_pts = 0
-
-    for a in states:
-        for b in states:
-            r1 = df1.loc[a, b]
-            r2 = df2.loc[a, b]
-
-            if r1 == "T":
-                u1_pts += 1
-            if r2 == "T":
-                u2_pts += 1
-
-    if u1_pts > u2_pts:
-        return 1
-    if u1_pts < u2_pts:
-        return 0
-    return 0.5
-
-
-for u1, u2 in match_pairs:
-    result = eval_duel(u1, u2)
-    elo[u1] = elo_update(elo[u1], elo[u2], result)
+# duel = เทียบจำนวนช่อง T (คำนวณครั้งเดียวต่อจักรวาล) — logic อยู่ใน multiverse/tournament.py
+# cycles=2 → ทุกคู่เจอกันสองครั้ง แต่แต่ละแมตช์อัปเดต ELO ทั้งสองฝั่ง (ลูป permutations เดิมอัปเดตเฉพาะ u1)
+# และเล่นเป็นรอบตาม seed — ค่า ELO จึงต่างจากสคริปต์เดิม ไม่ใช่ค่าเดียวกัน
+tournament = EloTournament(k=32, initial_rating=1000, seed=0)
+elo = dict(zip(names, tournament.play(tables, cycles=2).ratings))
 
 elo_report = pd.DataFrame([{"Universe": u, "ELO": round(score)} for u, score in elo.items()]).sort_values(
     by="ELO", ascending=False
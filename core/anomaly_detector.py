@@ -0,0 +1,260 @@
+# core/anomaly_detector.py
+"""
+Streaming Spread / Slippage Anomaly Detectors — Risk Veto Inputs
+
+One detector tracks one quantity (quoted spread, fill slippage) for every
+symbol ID at once; all state lives in (symbols,) and (symbols, window)
+arrays. Each observation is scored against the state *before* it is
+folded in, by two estimators:
+
+    EWMA     z = (x − μ) / σ                μ, σ² exponentially weighted, O(1)
+    Robust   r = (x − median) / (1.4826 · MAD)   over the last `window` values
+
+The robust window is kept sorted per symbol next to its ring buffer: an
+observation replaces the oldest value by binary search (O(log w)) and one
+in-row shift (memmove). The median is read directly; the MAD is the k-th
+smallest of two sorted distance sequences (below and above the median),
+found by binary search in O(log w) without materialising the distances.
+
+Both scales are floored at max(min_scale_frac × |centre|, min_scale[i]) so
+instruments with near-constant spreads do not flag every tick. The
+absolute per-symbol floor (min_scale_ticks × tick_size in the market
+monitor) matters when the centre is 0: limit fills carry no slippage, so
+a mostly-limit stream would otherwise flag every ordinary stop fill. Only the upper tail is
+anomalous: wide spreads and large (absolute) slippage.
+
+Doctrine constraints:
+- Detectors only flag; the Risk Engine decides (SPREAD_ANOMALY / SLIPPAGE_ANOMALY)
+- A flag blocks new exposure, never a close or flatten
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.instrument_registry import InstrumentTable
+from core.types import ExecutedOrder, ExecutionReport, MarketSnapshot
+
+_MAD_TO_SIGMA = 1.4826
+
+# ============================================================
+# POLICY
+# ============================================================
+
+
+@dataclass(frozen=True)
+class AnomalyPolicy:
+    """Detector settings for one monitored quantity.
+
+    Attributes:
+        halflife: EWMA half-life in observations
+        z_threshold: EWMA z-score above which an observation is anomalous
+        window: Observations in the robust median/MAD window
+        robust_threshold: Robust z-score above which an observation is anomalous
+        min_periods: Observations per symbol before anything is flagged
+        min_scale_frac: Floor of either scale as a fraction of |centre|
+        min_scale_ticks: Absolute floor of either scale in ticks (MarketAnomalyMonitor)
+    """
+
+    halflife: float = 50.0
+    z_threshold: float = 4.0
+    window: int = 64
+    robust_threshold: float = 6.0
+    min_periods: int = 20
+    min_scale_frac: float = 0.05
+    min_scale_ticks: float = 2.0
+
+    def __post_init__(self) -> None:
+        if self.halflife <= 0:
+            raise ValueError(f"halflife must be > 0, got {self.halflife}")
+        if self.window < 3:
+            raise ValueError(f"window must be >= 3, got {self.window}")
+        if self.z_threshold <= 0 or self.robust_threshold <= 0:
+            raise ValueError("z_threshold and robust_threshold must be > 0")
+        if self.min_periods < 2:
+            raise ValueError(f"min_periods must be >= 2, got {self.min_periods}")
+        if self.min_scale_frac < 0 or self.min_scale_ticks < 0:
+            raise ValueError("min_scale_frac and min_scale_ticks must be >= 0")
+
+
+# ============================================================
+# DETECTOR
+# ============================================================
+
+
+def _kth_of_two(below: np.ndarray, m: int, centre: float, above: np.ndarray, k: int) -> float:
+    """k-th smallest (0-based) distance to centre over the sorted halves of a window.
+
+    Distances ascend as below[m − 1 − j] walks left and above[j] walks right,
+    so this is the k-th element of two sorted sequences: O(log w).
+    """
+    p, q = m, len(above)
+
+    def left(j: int) -> float:
+        return centre - float(below[m - 1 - j])
+
+    def right(j: int) -> float:
+        return float(above[j]) - centre
+
+    lo, hi = max(0, k + 1 - q), min(k + 1, p)
+    while lo < hi:
+        i = (lo + hi) // 2  # i distances from the left, k + 1 − i from the right
+        if left(i) < right(k - i):
+            lo = i + 1
+        else:
+            hi = i
+    i = lo
+    return max(left(i - 1) if i > 0 else -math.inf, right(k - i) if k - i >= 0 else -math.inf)
+
+
+class StreamingAnomalyDetector:
+    """EWMA and robust median/MAD scores of one quantity across symbol IDs."""
+
+    def __init__(
+        self, n_symbols: int, policy: Optional[AnomalyPolicy] = None, min_scale: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Args:
+            n_symbols: Symbol IDs tracked
+            policy: Detector settings
+            min_scale: Optional (n_symbols,) absolute scale floor per symbol, in the quantity's units
+        """
+        self.policy = policy or AnomalyPolicy()
+        self.min_scale = np.zeros(n_symbols) if min_scale is None else np.asarray(min_scale, dtype=np.float64)
+        if self.min_scale.shape != (n_symbols,):
+            raise ValueError(f"expected {n_symbols} scale floors, got shape {self.min_scale.shape}")
+        w = self.policy.window
+        self.alpha = 1.0 - 0.5 ** (1.0 / self.policy.halflife)
+        self.count = np.zeros(n_symbols, dtype=np.int64)
+        self.mean = np.zeros(n_symbols)
+        self.var = np.zeros(n_symbols)
+        self.ring = np.zeros((n_symbols, w))
+        self.sorted = np.zeros((n_symbols, w))
+        self.flagged = np.zeros(n_symbols, dtype=bool)
+        self.last_score = np.zeros(n_symbols)
+
+    # ------------------------------------------------------------
+    # Scores
+    # ------------------------------------------------------------
+
+    def _floor(self, i: int, centre: float) -> float:
+        return max(self.policy.min_scale_frac * abs(centre), float(self.min_scale[i]), 1e-12)
+
+    def robust_stats(self, i: int) -> Tuple[float, float]:
+        """(median, MAD) of symbol i's window; O(log w)."""
+        n = int(min(self.count[i], self.policy.window))
+        row = self.sorted[i, :n]
+        m = n // 2
+        median = float(row[m]) if n % 2 else 0.5 * float(row[m - 1] + row[m])
+        below, above = row[:m], row[m:]
+        mad = _kth_of_two(below, m, median, above, m)
+        if n % 2 == 0:
+            mad = 0.5 * (_kth_of_two(below, m, median, above, m - 1) + mad)
+        return median, mad
+
+    def score(self, i: int, x: float) -> Tuple[float, float]:
+        """(EWMA z, robust z) of x against symbol i's state; (0, 0) before min_periods."""
+        if self.count[i] < self.policy.min_periods:
+            return 0.0, 0.0
+        mean = float(self.mean[i])
+        z = (x - mean) / max(math.sqrt(float(self.var[i])), self._floor(i, mean))
+        median, mad = self.robust_stats(i)
+        robust = (x - median) / max(_MAD_TO_SIGMA * mad, self._floor(i, median))
+        return z, robust
+
+    # ------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------
+
+    def observe(self, i: int, x: float) -> bool:
+        """Score x, fold it into symbol i's state and return (and store) its anomaly flag."""
+        z, robust = self.score(i, x)
+        policy = self.policy
+        anomalous = z > policy.z_threshold or robust > policy.robust_threshold
+        self.flagged[i] = anomalous
+        self.last_score[i] = max(z / policy.z_threshold, robust / policy.robust_threshold)
+        self._update(i, x)
+        return anomalous
+
+    def _update(self, i: int, x: float) -> None:
+        a, w, n = self.alpha, self.policy.window, int(self.count[i])
+        if n == 0:
+            self.mean[i] = x
+        else:
+            delta = x - self.mean[i]
+            self.mean[i] += a * delta
+            self.var[i] = (1.0 - a) * (self.var[i] + a * delta * delta)
+
+        row = self.sorted[i]
+        size = min(n, w)
+        slot = n % w
+        if n >= w:  # evict the oldest value from the sorted window
+            old = self.ring[i, slot]
+            j = int(np.searchsorted(row[:size], old))
+            row[j : size - 1] = row[j + 1 : size]
+            size -= 1
+        j = int(np.searchsorted(row[:size], x))
+        row[j + 1 : size + 1] = row[j:size].copy()
+        row[j] = x
+        self.ring[i, slot] = x
+        self.count[i] = n + 1
+
+
+# ============================================================
+# MARKET MONITOR
+# ============================================================
+
+
+class MarketAnomalyMonitor:
+    """
+    Spread and slippage detectors over one instrument table.
+
+    Example:
+        >>> monitor = MarketAnomalyMonitor(registry.table)
+        >>> monitor.on_snapshot(snapshot)            # every quote / bar
+        >>> monitor.on_report(report)                # every execution report
+        >>> monitor.reason("XAUUSD")                 # "SPREAD_ANOMALY" / "SLIPPAGE_ANOMALY" / None
+    """
+
+    def __init__(
+        self,
+        table: InstrumentTable,
+        spread_policy: Optional[AnomalyPolicy] = None,
+        slippage_policy: Optional[AnomalyPolicy] = None,
+    ) -> None:
+        self.table = table
+        spread_policy, slippage_policy = spread_policy or AnomalyPolicy(), slippage_policy or AnomalyPolicy()
+        self.spread = StreamingAnomalyDetector(
+            len(table), spread_policy, spread_policy.min_scale_ticks * table.tick_size
+        )
+        self.slippage = StreamingAnomalyDetector(
+            len(table), slippage_policy, slippage_policy.min_scale_ticks * table.tick_size
+        )
+
+    def on_snapshot(self, snapshot: MarketSnapshot) -> bool:
+        """Feed the quoted spread (spread, else ask − bid); returns the spread flag."""
+        spread = snapshot.spread
+        if spread is None and snapshot.ask is not None and snapshot.bid is not None:
+            spread = snapshot.ask - snapshot.bid
+        if spread is None or not math.isfinite(spread):
+            return False
+        return self.spread.observe(self.table.ids_of([snapshot.symbol])[0], spread)
+
+    def on_fill(self, order: ExecutedOrder) -> bool:
+        """Feed one fill's absolute slippage; returns the slippage flag."""
+        return self.slippage.observe(self.table.ids_of([order.symbol])[0], abs(order.slippage))
+
+    def on_report(self, report: ExecutionReport) -> None:
+        for order in report.executed_orders:
+            self.on_fill(order)
+
+    def reason(self, symbol: str) -> Optional[str]:
+        """Veto reason for new exposure on symbol, if its latest spread or fill was anomalous."""
+        i = self.table.ids_of([symbol])[0]
+        if self.spread.flagged[i]:
+            return "SPREAD_ANOMALY"
+        if self.slippage.flagged[i]:
+            return "SLIPPAGE_ANOMALY"
+        return None
@@ -0,0 +1,308 @@
+# core/capital_guard.py
+"""
+Capital Guard — Out-of-Band Kill Switch (PRX-01)
+
+Runs in its own process so a stalled main loop cannot stop it. The
+orchestrator publishes equity, balance, bar time and positions into a
+shared-memory segment; the guard polls it on its own timer and latches a
+kill flag the broker reads on every execute call.
+
+Segment layout (SharedCapitalState):
+
+    int64   [seq, kill_code, n_symbols, reserved]
+    float64 [heartbeat, equity, balance, bar_time, positions[0..n)]
+
+The payload is written under a seqlock: the single writer bumps seq to
+odd, writes, then bumps it back to even; a reader copies the payload and
+retries when seq was odd or changed meanwhile. Nothing blocks and the
+writer never waits for the guard. CPython cannot issue memory fences, so
+this relies on the writer's stores becoming visible in program order
+(x86-TSO). The heartbeat (time.monotonic(), shared system-wide on Linux)
+sits outside the seqlock and is stored last, so a writer that hangs even
+mid-write is still detected as stale.
+
+Doctrine constraints (ORG_DOCTRINE §I, PRX-01):
+- Capital Guard supersedes all in-loop controls
+- A trip is latched: only a manual clear_kill() re-enables trading
+- The guard never trades; it only raises the flag the broker honors
+"""
+
+import math
+import multiprocessing
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.synchronize import Event
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Kill codes stored in the segment (index = code; 0 = trading allowed)
+KILL_REASONS: Tuple[str, ...] = (
+    "",
+    "DAILY_LOSS_CAP",
+    "WEEKLY_LOSS_CAP",
+    "HEARTBEAT_STALE",
+    "EQUITY_ANOMALY",
+    "POSITION_ANOMALY",
+    "MANUAL",
+)
+
+_INTS = 4
+_SEQ, _KILL, _N = 0, 1, 2
+_HEARTBEAT, _EQUITY, _BALANCE, _BAR_TIME, _POSITIONS = 0, 1, 2, 3, 4
+_DAY_SECONDS = 86_400
+
+# ============================================================
+# SHARED STATE
+# ============================================================
+
+
+@dataclass(frozen=True)
+class CapitalSnapshot:
+    """One consistent read of the published capital state."""
+
+    seq: int
+    equity: float
+    balance: float
+    bar_time: float
+    positions: np.ndarray
+    heartbeat: float
+
+
+class SharedCapitalState:
+    """
+    Seqlock-protected capital state in a shared-memory segment.
+
+    One process creates it (the orchestrator) and is its only publisher;
+    the guard and the broker attach by name.
+
+    Example:
+        >>> state = SharedCapitalState(n_symbols=len(registry.table))
+        >>> state.publish(equity, balance, bar.timestamp(), ledger.position)
+        >>> guard = start_guard(state.name, CapitalGuardPolicy())
+    """
+
+    def __init__(self, n_symbols: int = 0, name: Optional[str] = None) -> None:
+        """
+        Args:
+            n_symbols: Position slots (used when creating)
+            name: Attach to an existing segment instead of creating one
+        """
+        self.owner = name is None
+        if self.owner:
+            size = 8 * (_INTS + _POSITIONS + n_symbols)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Python < 3.13 tracks attached segments too and would unlink them on exit
+            resource_tracker.unregister(self.shm._name, "shared_memory")  # type: ignore[attr-defined]
+        self._ints = np.ndarray((_INTS,), dtype=np.int64, buffer=self.shm.buf)
+        if self.owner:
+            self._ints[:] = (0, 0, n_symbols, 0)
+        self.n_symbols = int(self._ints[_N])
+        self._floats = np.ndarray(
+            (_POSITIONS + self.n_symbols,), dtype=np.float64, buffer=self.shm.buf, offset=8 * _INTS
+        )
+        if self.owner:
+            self._floats[:] = 0.0
+            self._floats[_HEARTBEAT] = time.monotonic()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # ------------------------------------------------------------
+    # Writer (orchestrator)
+    # ------------------------------------------------------------
+
+    def publish(self, equity: float, balance: float, bar_time: float, positions: Sequence[float] | np.ndarray) -> None:
+        """Seqlock-write one capital update and refresh the heartbeat."""
+        seq = int(self._ints[_SEQ])
+        self._ints[_SEQ] = seq + 1
+        self._floats[_EQUITY] = equity
+        self._floats[_BALANCE] = balance
+        self._floats[_BAR_TIME] = bar_time
+        self._floats[_POSITIONS:] = positions
+        self._ints[_SEQ] = seq + 2
+        self._floats[_HEARTBEAT] = time.monotonic()
+
+    def beat(self) -> None:
+        """Refresh the heartbeat without publishing (loop alive, nothing changed)."""
+        self._floats[_HEARTBEAT] = time.monotonic()
+
+    # ------------------------------------------------------------
+    # Readers (guard, broker)
+    # ------------------------------------------------------------
+
+    def read(self, retries: int = 64) -> Optional[CapitalSnapshot]:
+        """Consistent snapshot of the payload, or None if every attempt raced a write."""
+        for _ in range(retries):
+            seq = int(self._ints[_SEQ])
+            if seq & 1:
+                continue
+            payload = self._floats.copy()
+            if int(self._ints[_SEQ]) == seq:
+                return CapitalSnapshot(
+                    seq=seq,
+                    equity=float(payload[_EQUITY]),
+                    balance=float(payload[_BALANCE]),
+                    bar_time=float(payload[_BAR_TIME]),
+                    positions=payload[_POSITIONS:],
+                    heartbeat=float(payload[_HEARTBEAT]),
+                )
+        return None
+
+    @property
+    def heartbeat(self) -> float:
+        return float(self._floats[_HEARTBEAT])
+
+    @property
+    def killed(self) -> bool:
+        """O(1) check the broker makes on every execute call."""
+        return bool(self._ints[_KILL])
+
+    @property
+    def kill_reason(self) -> str:
+        return KILL_REASONS[int(self._ints[_KILL])]
+
+    def kill(self, reason: str) -> None:
+        """Latch the kill flag; the first reason wins."""
+        if not self._ints[_KILL]:
+            self._ints[_KILL] = KILL_REASONS.index(reason)
+
+    def clear_kill(self) -> None:
+        """Manual review only: re-enable trading after a trip."""
+        self._ints[_KILL] = 0
+
+    def close(self) -> None:
+        """Detach; the creating process also removes the segment."""
+        del self._ints, self._floats
+        self.shm.close()
+        if self.owner:
+            # An attacher sharing our resource tracker (forked guard) has unregistered the name
+            resource_tracker.register(self.shm._name, "shared_memory")  # type: ignore[attr-defined]
+            self.shm.unlink()
+
+
+# ============================================================
+# GUARD
+# ============================================================
+
+
+@dataclass(frozen=True)
+class CapitalGuardPolicy:
+    """Out-of-band hard limits.
+
+    Attributes:
+        daily_loss_cap_pct: Max equity loss from the UTC day's opening equity
+        weekly_loss_cap_pct: Max equity loss from the week's (Monday UTC) opening equity
+        heartbeat_timeout_s: Publisher silence that counts as a hung orchestrator
+        max_equity_jump_pct: Largest equity change between two publishes before it is a broker anomaly
+        poll_interval_s: Guard timer period
+    """
+
+    daily_loss_cap_pct: float = 3.0
+    weekly_loss_cap_pct: float = 6.0
+    heartbeat_timeout_s: float = 5.0
+    max_equity_jump_pct: float = 20.0
+    poll_interval_s: float = 0.05
+
+    def __post_init__(self) -> None:
+        for name in ("daily_loss_cap_pct", "weekly_loss_cap_pct", "heartbeat_timeout_s", "max_equity_jump_pct"):
+            if not getattr(self, name) > 0:
+                raise ValueError(f"{name} must be > 0, got {getattr(self, name)}")
+        if self.poll_interval_s <= 0 or self.poll_interval_s >= self.heartbeat_timeout_s:
+            raise ValueError(f"poll_interval_s must be in (0, heartbeat_timeout_s), got {self.poll_interval_s}")
+
+
+class CapitalGuard:
+    """Loss-cap, heartbeat and anomaly checks over a SharedCapitalState."""
+
+    def __init__(self, state: SharedCapitalState, policy: Optional[CapitalGuardPolicy] = None) -> None:
+        self.state = state
+        self.policy = policy or CapitalGuardPolicy()
+        self._seq = -1
+        self._equity = math.nan
+        self._day: Tuple[int, float] = (-1, math.nan)  # (period index, opening equity)
+        self._week: Tuple[int, float] = (-1, math.nan)
+
+    def check(self, now: Optional[float] = None) -> Optional[str]:
+        """Run every check once; trips and returns the kill reason on a breach.
+
+        Args:
+            now: time.monotonic() reading to judge the heartbeat against (default: now)
+        """
+        if self.state.killed:
+            return self.state.kill_reason
+        now = time.monotonic() if now is None else now
+        reason = self._stale(now) or self._evaluate(self.state.read())
+        if reason:
+            self.state.kill(reason)
+        return reason
+
+    def run(self, stop: Optional[Event] = None, max_checks: Optional[int] = None) -> str:
+        """Poll until a trip, stop is set or max_checks ran; returns the kill reason ("" if none)."""
+        checks = 0
+        while not (stop is not None and stop.is_set()) and (max_checks is None or checks < max_checks):
+            reason = self.check()
+            if reason:
+                return reason
+            checks += 1
+            time.sleep(self.policy.poll_interval_s)
+        return ""
+
+    def _stale(self, now: float) -> Optional[str]:
+        if now - self.state.heartbeat > self.policy.heartbeat_timeout_s:
+            return "HEARTBEAT_STALE"
+        return None
+
+    def _evaluate(self, snapshot: Optional[CapitalSnapshot]) -> Optional[str]:
+        if snapshot is None or snapshot.seq == self._seq or snapshot.seq == 0:
+            return None  # racing the writer, nothing new, or nothing published yet
+        self._seq = snapshot.seq
+        equity = snapshot.equity
+        if not math.isfinite(equity) or equity <= 0:
+            return "EQUITY_ANOMALY"
+        if not np.all(np.isfinite(snapshot.positions)):
+            return "POSITION_ANOMALY"
+        previous, self._equity = self._equity, equity
+        if abs(equity - previous) > previous * self.policy.max_equity_jump_pct / 100.0:
+            return "EQUITY_ANOMALY"
+
+        day = int(snapshot.bar_time // _DAY_SECONDS)
+        week = (day + 3) // 7  # epoch day 0 is a Thursday: weeks start on Monday
+        if day != self._day[0]:
+            self._day = (day, equity)
+        if week != self._week[0]:
+            self._week = (week, equity)
+        if equity < self._day[1] * (1.0 - self.policy.daily_loss_cap_pct / 100.0):
+            return "DAILY_LOSS_CAP"
+        if equity < self._week[1] * (1.0 - self.policy.weekly_loss_cap_pct / 100.0):
+            return "WEEKLY_LOSS_CAP"
+        return None
+
+
+# ============================================================
+# PROCESS ENTRY
+# ============================================================
+
+
+def run_guard(name: str, policy: CapitalGuardPolicy, stop: Optional[Event] = None) -> str:
+    """Guard process body: attach to the segment by name and poll until a trip or stop."""
+    state = SharedCapitalState(name=name)
+    try:
+        return CapitalGuard(state, policy).run(stop=stop)
+    finally:
+        state.close()
+
+
+def start_guard(
+    name: str, policy: Optional[CapitalGuardPolicy] = None, stop: Optional[Event] = None
+) -> multiprocessing.Process:
+    """Start the guard in a separate daemon process attached to segment name."""
+    process = multiprocessing.Process(
+        target=run_guard, args=(name, policy or CapitalGuardPolicy(), stop), name="capital-guard", daemon=True
+    )
+    process.start()
+    return process
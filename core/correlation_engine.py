@@ -0,0 +1,280 @@
+# core/correlation_engine.py
+"""
+Streaming Correlation Engine — Allocator Correlation Governance
+
+Maintains an exponentially weighted covariance over named return streams
+(agent signal returns, symbol returns) with one O(n²) update per bar:
+
+    d      = x − mean
+    mean  += α·d
+    cov    = (1 − α)·(cov + α·d·dᵀ)
+
+Correlation is read from the covariance on demand, so no rolling window is
+stored and nothing is recomputed from history. Streams missing on a bar
+(NaN) keep their moments untouched.
+
+Doctrine constraints (ORG_DOCTRINE §IV):
+- Correlation is a portfolio property: only the Allocator consumes it
+- Hard Cluster Cap: high-corr members share one exposure ceiling
+- Soft Penalty: weight_i ← weight_i × (1 − avg_corr_i)
+- Correlation never modifies rating memory
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ============================================================
+# POLICY
+# ============================================================
+
+
+@dataclass(frozen=True)
+class CorrelationPolicy:
+    """Allocator correlation governance settings.
+
+    Attributes:
+        halflife: EW half-life in bars for both correlation engines
+        min_periods: Joint observations required before a pair counts
+        cluster_threshold: Correlation at or above which streams share a cluster
+        agent_cluster_cap: Max share of a symbol's signal weight one agent cluster may hold
+        symbol_cluster_cap: Max net exposure (in full positions) of one symbol cluster
+        soft_penalty: Apply weight_i × (1 − avg_corr_i) before the cluster caps
+    """
+
+    halflife: float = 20.0
+    min_periods: int = 10
+    cluster_threshold: float = 0.7
+    agent_cluster_cap: float = 0.5
+    symbol_cluster_cap: float = 1.0
+    soft_penalty: bool = True
+
+    def __post_init__(self) -> None:
+        if self.halflife <= 0:
+            raise ValueError(f"halflife must be > 0, got {self.halflife}")
+        if not 0.0 < self.agent_cluster_cap <= 1.0:
+            raise ValueError(f"agent_cluster_cap must be in (0, 1], got {self.agent_cluster_cap}")
+        if self.symbol_cluster_cap <= 0:
+            raise ValueError(f"symbol_cluster_cap must be > 0, got {self.symbol_cluster_cap}")
+
+
+# ============================================================
+# EW COVARIANCE ENGINE
+# ============================================================
+
+
+class EWCorrelation:
+    """Exponentially weighted covariance/correlation over named streams.
+
+    Streams are added on first sight; storage grows by doubling so the
+    per-bar cost stays O(n²) in the number of streams observed that bar.
+    """
+
+    def __init__(self, halflife: float = 20.0, min_periods: int = 10, names: Sequence[str] = ()) -> None:
+        if halflife <= 0:
+            raise ValueError(f"halflife must be > 0, got {halflife}")
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.min_periods = min_periods
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._mean = np.zeros(0)
+        self._cov = np.zeros((0, 0))
+        self._count = np.zeros((0, 0), dtype=np.int64)
+        self._ensure(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def _ensure(self, names: Sequence[str]) -> np.ndarray:
+        """Return stream indices for names, registering unseen ones."""
+        for name in names:
+            if name not in self._index:
+                self._index[name] = len(self.names)
+                self.names.append(name)
+        n = len(self.names)
+        if n > len(self._mean):
+            capacity = max(8, 2 * len(self._mean), n)
+            mean, cov, count = (
+                np.zeros(capacity),
+                np.zeros((capacity, capacity)),
+                np.zeros_like(self._count, shape=(capacity, capacity)),
+            )
+            m = len(self._mean)
+            mean[:m], cov[:m, :m], count[:m, :m] = self._mean, self._cov, self._count
+            self._mean, self._cov, self._count = mean, cov, count
+        return np.array([self._index[name] for name in names], dtype=np.intp)
+
+    def update(self, values: Mapping[str, float]) -> None:
+        """Fold one bar of returns into the moments.
+
+        Args:
+            values: Return per stream for this bar; NaN or absent streams are skipped
+        """
+        names = [name for name, v in values.items() if np.isfinite(v)]
+        if not names:
+            return
+        idx = self._ensure(names)
+        x = np.array([values[name] for name in names], dtype=np.float64)
+        self._update(idx, x)
+
+    def update_array(self, x: np.ndarray) -> None:
+        """Fold one bar aligned with self.names (NaN = missing)."""
+        x = np.asarray(x, dtype=np.float64)
+        if x.shape != (len(self.names),):
+            raise ValueError(f"expected {len(self.names)} values, got shape {x.shape}")
+        idx = np.flatnonzero(np.isfinite(x))
+        if idx.size:
+            self._update(idx, x[idx])
+
+    def _update(self, idx: np.ndarray, x: np.ndarray) -> None:
+        a = self.alpha
+        block = np.ix_(idx, idx)
+        fresh = np.diagonal(self._count)[idx] == 0
+        mean = np.where(fresh, x, self._mean[idx])  # first observation seeds the mean
+        delta = x - mean
+        self._mean[idx] = mean + a * delta
+        self._cov[block] = (1.0 - a) * (self._cov[block] + a * np.outer(delta, delta))
+        self._count[block] += 1
+
+    def covariance(self, names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """EW covariance for names (default all); unknown names get zero rows."""
+        if names is None:
+            n = len(self.names)
+            return self._cov[:n, :n].copy()
+        idx, known = self._lookup(names)
+        cov = np.zeros((len(names), len(names)))
+        cov[np.ix_(known, known)] = self._cov[np.ix_(idx[known], idx[known])]
+        return cov
+
+    def correlation(self, names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """EW correlation for names (default all).
+
+        Pairs with fewer than min_periods joint observations, zero-variance
+        streams and unknown names read as uncorrelated (0) off the diagonal.
+        """
+        if names is None:
+            names = self.names
+        idx, known = self._lookup(names)
+        n = len(names)
+        corr = np.zeros((n, n))
+        if known.any():
+            k = np.flatnonzero(known)
+            block = np.ix_(idx[k], idx[k])
+            cov = self._cov[block]
+            std = np.sqrt(np.clip(np.diagonal(cov), 0.0, None))
+            denom = np.outer(std, std)
+            sub = np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0)
+            sub[self._count[block] < self.min_periods] = 0.0
+            corr[np.ix_(k, k)] = np.clip(sub, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def _lookup(self, names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.array([self._index.get(name, -1) for name in names], dtype=np.intp)
+        return idx, idx >= 0
+
+
+# ============================================================
+# PENALTIES & CLUSTER CAPS
+# ============================================================
+
+
+def average_correlation(corr: np.ndarray) -> np.ndarray:
+    """Mean off-diagonal correlation per row, floored at 0 (hedges earn no bonus)."""
+    n = corr.shape[0]
+    if n < 2:
+        return np.zeros(n)
+    avg = (corr.sum(axis=1) - np.diagonal(corr)) / (n - 1)
+    return np.clip(avg, 0.0, 1.0)
+
+
+def soft_penalty(corr: np.ndarray) -> np.ndarray:
+    """Per-stream weight factor 1 − avg_corr_i."""
+    return 1.0 - average_correlation(corr)
+
+
+def correlation_clusters(corr: np.ndarray, threshold: float) -> np.ndarray:
+    """Dense cluster labels: connected components of the corr ≥ threshold graph."""
+    n = corr.shape[0]
+    adjacent = (corr >= threshold) | np.eye(n, dtype=bool)
+    labels = np.arange(n)
+    while True:
+        spread = np.where(adjacent, labels[None, :], n).min(axis=1)
+        if np.array_equal(spread, labels):
+            break
+        labels = spread
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def cluster_weight_scale(weights: np.ndarray, labels: np.ndarray, cap: float) -> np.ndarray:
+    """Scale factors capping each cluster's share of per-column weight.
+
+    Clusters above the cap are pinned to it and the excess is handed to the
+    remaining clusters pro rata (water-filling), so column totals are kept.
+    When the cap cannot be met (too few clusters), active clusters share equally.
+
+    Args:
+        weights: (n, S) non-negative weights, rows labelled by cluster
+        labels: (n,) dense cluster label per row
+        cap: Maximum share of a column one cluster may hold, in (0, 1]
+
+    Returns:
+        (n, S) multiplicative factors for weights
+    """
+    k = int(labels.max()) + 1 if labels.size else 0
+    members = np.zeros((k, labels.size))
+    members[labels, np.arange(labels.size)] = 1.0
+    cluster = members @ weights  # (K, S)
+    total = cluster.sum(axis=0)
+    share = np.divide(cluster, total, out=np.zeros_like(cluster), where=total > 0)
+    active = share > 0
+
+    pinned = np.zeros_like(active)
+    target = share
+    for _ in range(k):
+        remaining = 1.0 - cap * pinned.sum(axis=0)
+        free = np.where(pinned, 0.0, share).sum(axis=0)
+        grow = np.divide(remaining, free, out=np.zeros_like(free), where=free > 0)
+        target = np.where(pinned, cap, share * grow)
+        over = (target > cap * (1.0 + 1e-12)) & ~pinned
+        if not over.any():
+            break
+        pinned |= over
+
+    feasible = cap * active.sum(axis=0) >= 1.0 - 1e-12
+    equal = np.divide(active, active.sum(axis=0), out=np.zeros_like(share), where=active.any(axis=0))
+    target = np.where(feasible, target, equal)
+    scale = np.divide(target, share, out=np.ones_like(share), where=active)
+    return scale[labels]
+
+
+def cluster_exposure_scale(net: np.ndarray, labels: np.ndarray, cap: float) -> np.ndarray:
+    """Scale factors so each cluster's combined |Σ net| stays within cap."""
+    k = int(labels.max()) + 1 if labels.size else 0
+    exposure = np.abs(np.bincount(labels, weights=net, minlength=k))
+    scale = np.minimum(1.0, np.divide(cap, exposure, out=np.ones(k), where=exposure > 0))
+    return scale[labels]
+
+
+def govern_weights(weights: np.ndarray, corr: np.ndarray, policy: CorrelationPolicy) -> np.ndarray:
+    """Apply the soft penalty and hard cluster cap to (agents × symbols) weights.
+
+    Args:
+        weights: (A, S) non-negative signal weights
+        corr: (A, A) correlation between the agents' signal returns
+        policy: Correlation governance settings
+
+    Returns:
+        (A, S) governed weights
+    """
+    if weights.shape[0] < 2:
+        return weights
+    if policy.soft_penalty:
+        # Floored so a fully correlated set still votes (net exposure is scale-free)
+        weights = weights * np.maximum(soft_penalty(corr), 1e-6)[:, None]
+    labels = correlation_clusters(corr, policy.cluster_threshold)
+    return weights * cluster_weight_scale(weights, labels, policy.agent_cluster_cap)
@@ -0,0 +1,75 @@
+# core/currency_rates.py
+"""
+Currency Rates — quote-currency notional to account currency.
+
+Ledger, VaR and stress exposures are notionals in each instrument's quote
+currency. The risk caps are in the account currency, so every engine
+converts through one shared rate vector over the table's currencies:
+
+    rate[c]         account units per unit of currency c
+    account[i]      notional[i] × rate[quote_i]
+
+Rates are read off the prices of pairs quoted against the account
+currency (EURUSD gives EUR, USDJPY gives JPY); a currency not yet quoted
+converts at 1.0. version counts updates so engines caching converted
+values know when to rebuild.
+
+Doctrine constraints:
+- Rates come from market prices only; nothing here sizes or vetoes
+"""
+
+from typing import Mapping
+
+import numpy as np
+
+from core.instrument_registry import InstrumentTable
+
+
+class CurrencyRates:
+    """
+    Account-currency rate per currency of one instrument table.
+
+    Example:
+        >>> rates = CurrencyRates(registry.table)           # USD account
+        >>> rates.update({"USDJPY": 151.2, "EURUSD": 1.085})
+        >>> rates.to_account(ledger.notional)               # (N,) USD notional
+    """
+
+    def __init__(self, table: InstrumentTable, account_currency: str = "USD") -> None:
+        """
+        Raises:
+            ValueError: If the account currency is not a currency of the table
+        """
+        if account_currency not in table.currencies:
+            raise ValueError(f"unknown account currency '{account_currency}', expected one of {table.currencies}")
+        self.table = table
+        self.account_currency = account_currency
+        self.account = table.currencies.index(account_currency)
+        self.rates = np.ones(len(table.currencies))
+        self.version = 0
+
+    def update(self, prices: Mapping[str, float]) -> None:
+        """Refresh rates from symbol prices; only pairs against the account currency count."""
+        for symbol, price in prices.items():
+            i = self.table.ids.get(symbol)
+            if i is None or not price > 0:
+                continue
+            base, quote = int(self.table.base_ccy[i]), int(self.table.quote_ccy[i])
+            if quote == self.account:
+                self.rates[base] = price
+            elif base == self.account:
+                self.rates[quote] = 1.0 / price
+        self.version += 1
+
+    def of(self, currency: str) -> float:
+        """Account units per unit of currency."""
+        return float(self.rates[self.table.currencies.index(currency)])
+
+    def quote(self, ids: np.ndarray | None = None) -> np.ndarray:
+        """Rate of the quote currency per symbol ID (of ids, default every symbol)."""
+        quote_ccy = self.table.quote_ccy if ids is None else self.table.quote_ccy[ids]
+        return self.rates[quote_ccy]
+
+    def to_account(self, notional: np.ndarray) -> np.ndarray:
+        """(N,) quote-currency notional per symbol ID in account currency."""
+        return np.asarray(notional, dtype=np.float64) * self.quote()
@@ -0,0 +1,185 @@
+# core/exploration.py
+"""
+Controlled Stochastic Exploration — Allocator Layer
+
+Doctrine §VI lets the allocator perturb near-tie agent weights when system
+uncertainty is high, to avoid crowding lock-in and give marginal agents
+exposure. Rules enforced here:
+
+- Only near-tie weights move (same symbol, same direction, within tolerance)
+- Max perturbation ±amplitude (default 10 %) per weight
+- Total exposure unchanged: each tie group keeps its weight sum, so the
+  net exposure of every symbol is exactly preserved
+- No direction reversal: only same-direction weights trade mass
+- Seeded, and disabled entirely with enabled=False (strict production)
+
+Randomness is counter-based: every draw is Philox4x64-10 of the counter
+(bar index, symbol id, agent id, 0) under a key derived from the run seed
+with SeedSequence. A draw depends on nothing but those coordinates, so a
+run gives identical perturbations serially, sharded across processes, or
+resumed from a checkpoint. All draws of a bar are one vectorized batch.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.types import AgentName, Symbol
+
+# Philox4x64 round multipliers and Weyl key increments (Random123)
+_PHILOX_M = (np.uint64(0xD2E7470EE14C6C93), np.uint64(0xCA5A826395121157))
+_PHILOX_W = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBB67AE8584CAA73B))
+_LO32 = np.uint64(0xFFFFFFFF)
+_32 = np.uint64(32)
+
+# ============================================================
+# COUNTER-BASED RNG
+# ============================================================
+
+
+def _mulhilo(a: np.uint64, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """High and low 64-bit words of a × b (128-bit product) on uint64 arrays."""
+    a_lo, a_hi = a & _LO32, a >> _32
+    b_lo, b_hi = b & _LO32, b >> _32
+    lo_lo, lo_hi, hi_lo, hi_hi = a_lo * b_lo, a_lo * b_hi, a_hi * b_lo, a_hi * b_hi
+    carry = ((lo_lo >> _32) + (lo_hi & _LO32) + (hi_lo & _LO32)) >> _32
+    return hi_hi + (lo_hi >> _32) + (hi_lo >> _32) + carry, a * b
+
+
+def philox4x64(counter: np.ndarray, key: np.ndarray, rounds: int = 10) -> np.ndarray:
+    """Philox4x64 bijection of many counters under one key.
+
+    Args:
+        counter: (4, N) uint64 counters
+        key: (2,) uint64 key
+
+    Returns:
+        (4, N) uint64 random words (same as NumPy's Philox for that counter)
+    """
+    c0, c1, c2, c3 = (np.asarray(c, dtype=np.uint64) for c in counter)
+    k0, k1 = np.uint64(key[0]), np.uint64(key[1])
+    with np.errstate(over="ignore"):
+        for r in range(rounds):
+            if r:
+                k0, k1 = k0 + _PHILOX_W[0], k1 + _PHILOX_W[1]
+            hi0, lo0 = _mulhilo(_PHILOX_M[0], c0)
+            hi1, lo1 = _mulhilo(_PHILOX_M[1], c2)
+            c0, c1, c2, c3 = hi1 ^ c1 ^ k0, lo1, hi0 ^ c3 ^ k1, lo0
+    return np.stack([c0, c1, c2, c3])
+
+
+def stable_id(name: str) -> int:
+    """Process-independent 64-bit id of a name (Python's hash() is salted)."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+# ============================================================
+# EXPLORATION POLICY
+# ============================================================
+
+
+@dataclass(frozen=True)
+class ExplorationPolicy:
+    """Stochastic allocator settings.
+
+    Attributes:
+        seed: Run seed keying every draw
+        uncertainty_threshold: Exploration runs only when uncertainty exceeds this
+        amplitude: Max relative change of a weight (0.10 = ±10 %)
+        tie_tolerance: Weights within this fraction of each other count as near-tie
+        enabled: False disables exploration (strict production mode)
+    """
+
+    seed: int = 0
+    uncertainty_threshold: float = 0.6
+    amplitude: float = 0.10
+    tie_tolerance: float = 0.05
+    enabled: bool = True
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.amplitude <= 0.10:
+            raise ValueError(f"amplitude must be in [0, 0.10] (doctrine cap), got {self.amplitude}")
+        if self.tie_tolerance < 0:
+            raise ValueError(f"tie_tolerance must be >= 0, got {self.tie_tolerance}")
+
+
+class StochasticExplorer:
+    """Counter-based near-tie weight perturbation for the allocator."""
+
+    def __init__(self, policy: Optional[ExplorationPolicy] = None) -> None:
+        self.policy = policy or ExplorationPolicy()
+        self._key = np.random.SeedSequence(self.policy.seed).generate_state(2, dtype=np.uint64)
+        self._ids: Dict[str, np.uint64] = {}
+
+    def active(self, uncertainty: float) -> bool:
+        return self.policy.enabled and uncertainty > self.policy.uncertainty_threshold
+
+    def _id_array(self, names: Sequence[str]) -> np.ndarray:
+        for name in names:
+            if name not in self._ids:
+                self._ids[name] = np.uint64(stable_id(name))
+        return np.array([self._ids[name] for name in names], dtype=np.uint64)
+
+    def uniforms(self, agents: Sequence[AgentName], symbols: Sequence[Symbol], bar_index: int) -> np.ndarray:
+        """(A, S) uniforms in [0, 1), each a pure function of (seed, bar, symbol, agent)."""
+        agent_ids, symbol_ids = self._id_array(agents), self._id_array(symbols)
+        shape = (len(agents), len(symbols))
+        counter = np.zeros((4, shape[0] * shape[1]), dtype=np.uint64)
+        counter[0] = np.uint64(bar_index)
+        counter[1] = np.broadcast_to(symbol_ids[None, :], shape).ravel()
+        counter[2] = np.broadcast_to(agent_ids[:, None], shape).ravel()
+        words = philox4x64(counter, self._key)[0]
+        return ((words >> np.uint64(11)).astype(np.float64) * 2.0**-53).reshape(shape)
+
+    def perturb(
+        self,
+        agents: List[AgentName],
+        symbols: List[Symbol],
+        weights: np.ndarray,
+        direction: np.ndarray,
+        bar_index: int,
+    ) -> np.ndarray:
+        """Perturb near-tie weights by at most ±amplitude, preserving each tie group's sum.
+
+        Args:
+            agents: Agent order of the weight rows
+            symbols: Symbol order of the weight columns
+            weights: (A, S) non-negative agent weights
+            direction: (A, S) +1 / -1 / 0 agent directions
+            bar_index: Bar counter keying the draws
+
+        Returns:
+            (A, S) perturbed weights (unchanged where no near-tie exists)
+        """
+        policy = self.policy
+        live = (weights > 0) & (direction != 0)
+        gap = np.abs(weights[:, None, :] - weights[None, :, :])
+        close = gap <= policy.tie_tolerance * np.maximum(weights[:, None, :], weights[None, :, :])
+        tied = close & (direction[:, None, :] == direction[None, :, :]) & live[:, None, :] & live[None, :, :]
+        tied &= ~np.eye(len(agents), dtype=bool)[:, :, None]
+        member = tied.any(axis=1)  # (A, S)
+        if not member.any():
+            return weights
+
+        # Tie groups are the connected components of tied per symbol: label each by its lowest agent row
+        n_agents, n_symbols = weights.shape
+        root = np.where(member, np.arange(n_agents)[:, None], n_agents)
+        while True:
+            linked = np.minimum(root, np.where(tied, root[None, :, :], n_agents).min(axis=1))
+            if np.array_equal(linked, root):
+                break
+            root = linked
+        group = (root * n_symbols + np.arange(n_symbols)[None, :])[member]
+
+        noise = (2.0 * self.uniforms(agents, symbols, bar_index) - 1.0)[member]
+        mass = weights[member]
+        total = np.bincount(group, mass, minlength=(n_agents + 1) * n_symbols)
+        centre = np.bincount(group, mass * noise, minlength=len(total))[group] / total[group]
+        shift = noise - centre
+        spread = np.ones(len(total))
+        np.maximum.at(spread, group, np.abs(shift))
+        out = weights.copy()
+        out[member] = mass * (1.0 + policy.amplitude * shift / spread[group])
+        return out
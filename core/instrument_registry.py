@@ -5,15 +5,51 @@ Instrument Registry — domain object and registry.
 InstrumentSpec is the authoritative descriptor for a tradeable instrument.
 InstrumentRegistry loads specs from a YAML file and provides lookup,
 sizing logic, and validation helpers.
+
+At load time symbols are interned to dense integer IDs (load order) and
+every spec field is laid out as a read-only NumPy column in an
+InstrumentTable, so vectorized risk, sizing and execution code indexes
+table.contract_size[ids] instead of hitting the string-keyed dict per order.
+
+The validated table can be compiled to a binary cache keyed by the YAML's
+SHA-256, so processes after the first skip YAML parsing. A registry can
+also hot-reload: the new version is swapped in atomically and snapshot()
+pins one version for the duration of an allocation cycle.
+
+Session templates (config session_templates) are compiled per version into
+minute-of-week arrays (core/session_calendar.py), so session_state() is an
+O(1) index per bar.
+
+Lot sizes are quantized on an integer grid: every spec gets a decimal
+scale (10^decimals of lot_step) and lots are counted in 1/scale units, so
+floor(0.29 / 0.01) is 29 steps rather than 28 and the returned lot is
+units / scale, the closest float to the decimal lot.
 """
 
+import hashlib
+import json
 import math
+import os
+import struct
+import threading
 from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import yaml
 
+from core.session_calendar import SessionSchedule, SessionState
+
+CACHE_MAGIC = b"QINSTR01"
+
+PathLike = Union[str, Path]
+
+# Absorbs float drift in raw_lot / lot_step (e.g. 0.29 / 0.01 = 28.999999999999996)
+_STEP_EPSILON = 1e-9
+
 # ============================================================
 # Domain Object
 # ============================================================
@@ -35,6 +71,223 @@ class InstrumentSpec:
     min_lot: float
     max_lot: float
     lot_step: float
+    margin_rate: Optional[float] = None  # initial margin / notional; None = broker leverage
+    base_currency: Optional[str] = None  # default: first 3 letters of a 6-letter pair, else the symbol
+    quote_currency: Optional[str] = None  # default: last 3 letters of a 6-letter pair
+
+
+def _decimals(value: float) -> int:
+    """Decimal places in the shortest repr of value (0.01 -> 2, 100.0 -> 0)."""
+    exponent = Decimal(repr(value)).normalize().as_tuple().exponent
+    return max(-int(exponent), 0)
+
+
+def _currency_pair(spec: InstrumentSpec) -> Tuple[str, str]:
+    """(base, quote) currency of a spec; 6-letter pairs like EURUSD split 3/3.
+
+    Raises:
+        ValueError: If the quote currency cannot be derived from the symbol
+    """
+    pair = len(spec.symbol) == 6 and spec.symbol.isalpha()
+    base = spec.base_currency or (spec.symbol[:3] if pair else spec.symbol)
+    quote = spec.quote_currency or (spec.symbol[3:] if pair else None)
+    if quote is None:
+        raise ValueError(f"Instrument '{spec.symbol}' needs an explicit quote_currency")
+    return base, quote
+
+
+def _lot_grid(spec: InstrumentSpec) -> Tuple[int, int, int, int]:
+    """Integer lot grid of a spec: (scale, step, min, max) in 1/scale lot units."""
+    decimals = max(_decimals(v) for v in (spec.lot_step, spec.min_lot, spec.max_lot))
+    scale = 10**decimals
+    return scale, round(spec.lot_step * scale), round(spec.min_lot * scale), round(spec.max_lot * scale)
+
+
+# ============================================================
+# Struct-of-Arrays Table
+# ============================================================
+
+
+class InstrumentTable:
+    """
+    Read-only struct-of-arrays view of the specs, indexed by symbol ID.
+
+    Columns are float64 (spec fields; margin_rate is NaN where unset) and
+    int64 (the integer lot grid: lot_scale, step_units, min_units, max_units;
+    base_ccy / quote_ccy: indices into currencies).
+    """
+
+    FIELDS = ("tick_size", "point_value", "contract_size", "min_lot", "max_lot", "lot_step", "margin_rate")
+    GRID = ("lot_scale", "step_units", "min_units", "max_units")
+
+    tick_size: np.ndarray
+    point_value: np.ndarray
+    contract_size: np.ndarray
+    min_lot: np.ndarray
+    max_lot: np.ndarray
+    lot_step: np.ndarray
+    margin_rate: np.ndarray
+    lot_scale: np.ndarray
+    step_units: np.ndarray
+    min_units: np.ndarray
+    max_units: np.ndarray
+    base_ccy: np.ndarray
+    quote_ccy: np.ndarray
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        fields: np.ndarray,
+        grid: np.ndarray,
+        currencies: Sequence[str],
+        currency: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            symbols: Symbol per ID
+            fields: (len(FIELDS), N) float64 spec columns
+            grid: (len(GRID), N) int64 lot grid columns
+            currencies: Currency code per currency ID
+            currency: (2, N) int64 base / quote currency IDs
+        """
+        self.symbols: Tuple[str, ...] = tuple(symbols)
+        self.ids: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.currencies: Tuple[str, ...] = tuple(currencies)
+        n = len(self.symbols)
+        self.fields = np.array(fields, dtype=np.float64).reshape(len(self.FIELDS), n)
+        self.grid = np.array(grid, dtype=np.int64).reshape(len(self.GRID), n)
+        self.currency = np.array(currency, dtype=np.int64).reshape(2, n)
+        self.fields.flags.writeable = self.grid.flags.writeable = self.currency.flags.writeable = False
+        for name, column in zip(self.FIELDS + self.GRID, (*self.fields, *self.grid)):
+            setattr(self, name, column)
+        self.base_ccy, self.quote_ccy = self.currency
+
+    @classmethod
+    def from_specs(cls, specs: Sequence[InstrumentSpec]) -> "InstrumentTable":
+        fields = [[np.nan if getattr(spec, f) is None else getattr(spec, f) for spec in specs] for f in cls.FIELDS]
+        grid = np.array([_lot_grid(spec) for spec in specs], dtype=np.int64).reshape(-1, len(cls.GRID)).T
+        pairs = [_currency_pair(spec) for spec in specs]
+        currencies = list(dict.fromkeys(code for pair in pairs for code in pair))
+        currency = np.array([[currencies.index(code) for code in pair] for pair in pairs], dtype=np.int64)
+        symbols = [spec.symbol for spec in specs]
+        return cls(symbols, np.array(fields, dtype=np.float64), grid, currencies, currency.reshape(-1, 2).T)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def spec(self, i: int) -> InstrumentSpec:
+        """Materialize the InstrumentSpec of symbol ID i."""
+        values = {field: float(column[i]) for field, column in zip(self.FIELDS, self.fields)}
+        margin_rate = values.pop("margin_rate")
+        return InstrumentSpec(
+            symbol=self.symbols[i],
+            margin_rate=None if math.isnan(margin_rate) else margin_rate,
+            base_currency=self.currencies[self.base_ccy[i]],
+            quote_currency=self.currencies[self.quote_ccy[i]],
+            **values,
+        )
+
+    def ids_of(self, symbols: Sequence[str]) -> np.ndarray:
+        """Dense integer IDs for symbols (raises KeyError on unknown ones)."""
+        try:
+            return np.fromiter((self.ids[s] for s in symbols), dtype=np.int64, count=len(symbols))
+        except KeyError as exc:
+            raise KeyError(f"Instrument '{exc.args[0]}' not found in registry") from None
+
+    def check_ids(self, ids: np.ndarray) -> np.ndarray:
+        """Validate an ID array against the table size.
+
+        Raises:
+            KeyError: If any ID is out of range
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self)):
+            raise KeyError(f"symbol IDs must be in [0, {len(self)}), got {ids.min()}..{ids.max()}")
+        return ids
+
+
+# ============================================================
+# Compiled Cache
+# ============================================================
+
+
+def write_registry_cache(
+    path: PathLike,
+    table: InstrumentTable,
+    source_hash: str,
+    sessions: Optional[Mapping[str, Any]] = None,
+    schedules: Optional[Mapping[str, SessionSchedule]] = None,
+) -> Path:
+    """Write the compiled registry keyed by the source YAML hash (atomic replace).
+
+    Layout: CACHE_MAGIC, uint64 JSON header length, JSON header
+    {source_sha256, symbols, currencies, sessions, blocks}, then the raw
+    little-endian arrays listed in blocks as [name, dtype, shape]: the
+    float64 field block, the int64 lot grid and currency IDs, and every
+    compiled session array.
+    """
+    arrays: Dict[str, np.ndarray] = {"fields": table.fields, "grid": table.grid, "currency": table.currency}
+    for name, schedule in (schedules or {}).items():
+        arrays.update({f"session/{name}/{key}": value for key, value in schedule.arrays().items()})
+    blocks: List[Tuple[str, str, List[int]]] = [
+        (name, array.dtype.newbyteorder("<").str, list(array.shape)) for name, array in arrays.items()
+    ]
+    header = json.dumps(
+        {
+            "source_sha256": source_hash,
+            "symbols": list(table.symbols),
+            "currencies": list(table.currencies),
+            "sessions": sessions or {},
+            "blocks": blocks,
+        }
+    ).encode()
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(CACHE_MAGIC + struct.pack("<Q", len(header)) + header)
+        for (_, dtype, _), array in zip(blocks, arrays.values()):
+            fh.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    os.replace(tmp, target)
+    return target
+
+
+def read_registry_cache(path: PathLike, source_hash: str) -> Optional[Tuple[InstrumentTable, Dict[str, Any]]]:
+    """(table, session config) from a compiled cache, or None when missing, stale or corrupt.
+
+    The session config carries the compiled schedule arrays under
+    "arrays" ({template: {array name: array}}).
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except OSError:
+        return None
+    if raw[: len(CACHE_MAGIC)] != CACHE_MAGIC:
+        return None
+    try:
+        start = len(CACHE_MAGIC) + 8
+        (header_len,) = struct.unpack("<Q", raw[len(CACHE_MAGIC) : start])
+        header = json.loads(raw[start : start + header_len])
+        if header["source_sha256"] != source_hash:
+            return None
+        offset = start + header_len
+        arrays: Dict[str, np.ndarray] = {}
+        for name, dtype, shape in header["blocks"]:
+            count = math.prod(shape)
+            arrays[name] = np.frombuffer(raw, dtype=dtype, count=count, offset=offset).reshape(shape)
+            offset += arrays[name].nbytes
+        if offset != len(raw):
+            return None
+        table = InstrumentTable(
+            header["symbols"], arrays.pop("fields"), arrays.pop("grid"), header["currencies"], arrays.pop("currency")
+        )
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+    compiled: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, array in arrays.items():
+        _, template, key = name.split("/", 2)
+        compiled.setdefault(template, {})[key] = array
+    return table, {**header["sessions"], "arrays": compiled}
 
 
 # ============================================================
@@ -42,17 +295,43 @@ class InstrumentSpec:
 # ============================================================
 
 
+@dataclass(frozen=True)
+class _RegistryState:
+    """One immutable registry version; swapped as a whole on reload."""
+
+    specs: Mapping[str, InstrumentSpec]
+    table: InstrumentTable
+    sessions: Mapping[str, SessionSchedule]
+    source_hash: str
+    version: int
+
+
 class InstrumentRegistry:
     """
     Loads InstrumentSpec objects from a YAML file and exposes
     symbol-keyed lookup and position sizing logic.
+
+    All state lives in one immutable version object. reload() builds a new
+    version and swaps it in with a single reference assignment, and
+    snapshot() pins the current version, so a caller that snapshots once
+    per allocation sees one consistent instrument set even if the YAML is
+    reloaded mid-cycle.
     """
 
-    def __init__(self, config_path: str = "config/instruments.yaml") -> None:
+    def __init__(
+        self,
+        config_path: str = "config/instruments.yaml",
+        cache_path: Optional[PathLike] = None,
+        hot_reload: bool = False,
+    ) -> None:
         """Initialize registry and load instrument specs from YAML.
 
         Args:
             config_path: Path to YAML config file (default: config/instruments.yaml)
+            cache_path: Optional compiled cache file; reused while the YAML hash
+                        matches, rewritten otherwise
+            hot_reload: Check the YAML for changes on every snapshot() and
+                        swap in the new version when it changed
 
         Raises:
             FileNotFoundError: If config file does not exist
@@ -60,27 +339,161 @@ class InstrumentRegistry:
             KeyError: If required fields are missing in YAML
         """
         self._config_path = config_path
-        self._specs: Dict[str, InstrumentSpec] = {}
-        self._load_yaml(config_path)
-
-    def _load_yaml(self, config_path: str) -> None:
-        """Load instrument specifications from YAML file.
+        self._cache_path = cache_path
+        self.hot_reload = hot_reload
+        self._reload_lock = threading.Lock()
+        self._stat = self._stat_key()
+        self._state = self._load(version=0)
+
+    @classmethod
+    def _pinned(cls, state: _RegistryState, config_path: str) -> "InstrumentRegistry":
+        pinned = cls.__new__(cls)
+        pinned._config_path, pinned._cache_path, pinned.hot_reload = config_path, None, False
+        pinned._reload_lock = threading.Lock()
+        pinned._stat, pinned._state = None, state
+        return pinned
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self._config_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, version: int, raw: Optional[bytes] = None) -> _RegistryState:
+        """Build a registry version from the compiled cache or, on a miss, the YAML."""
+        raw = Path(self._config_path).read_bytes() if raw is None else raw
+        source_hash = hashlib.sha256(raw).hexdigest()
+        cached = read_registry_cache(self._cache_path, source_hash) if self._cache_path else None
+        if cached is None:
+            specs, session_config = self._parse_yaml(raw)
+            table = InstrumentTable.from_specs(specs)
+            schedules = self._compile_sessions(session_config)
+            if self._cache_path:
+                try:
+                    write_registry_cache(self._cache_path, table, source_hash, session_config, schedules)
+                except OSError:
+                    pass  # cache is an optimization; a read-only location must not block startup
+        else:
+            table, session_config = cached
+            schedules = self._compile_sessions(session_config)
+        sessions = {}
+        for symbol, name in session_config.get("instruments", {}).items():
+            if name not in schedules:
+                raise ValueError(f"Instrument '{symbol}' references undefined session template '{name}'")
+            sessions[symbol] = schedules[name]
+        return _RegistryState(
+            specs={symbol: table.spec(i) for i, symbol in enumerate(table.symbols)},
+            table=table,
+            sessions=sessions,
+            source_hash=source_hash,
+            version=version,
+        )
+
+    @staticmethod
+    def _parse_yaml(raw: bytes) -> Tuple[List[InstrumentSpec], Dict[str, Any]]:
+        """Load instrument specifications and session config from YAML source.
 
-        Args:
-            config_path: Path to YAML config file
+        Returns:
+            (specs, session config as JSON-safe {"templates": ..., "instruments": {symbol: template}})
 
         Raises:
-            FileNotFoundError: If config file does not exist
             yaml.YAMLError: If config file is invalid YAML
-            KeyError: If required fields are missing
+            TypeError: If fields are missing or unknown
         """
-        path = Path(config_path)
-        with path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-
+        data = yaml.safe_load(raw)
         instruments = data.get("instruments", {})
+        specs, assigned = [], {}
         for symbol, spec_data in instruments.items():
-            self._specs[symbol] = InstrumentSpec(**spec_data)
+            fields = dict(spec_data)
+            if "sessions" in fields:
+                assigned[symbol] = fields.pop("sessions")
+            specs.append(InstrumentSpec(**fields))
+        templates = data.get("session_templates") or {}
+        # Dates become ISO strings so the config round-trips through the JSON cache header
+        return specs, json.loads(json.dumps({"templates": templates, "instruments": assigned}, default=str))
+
+    @staticmethod
+    def _compile_sessions(config: Mapping[str, Any]) -> Dict[str, SessionSchedule]:
+        """Session schedule per template, reusing cached arrays when present.
+
+        Raises:
+            ValueError: If a template is invalid
+        """
+        arrays = config.get("arrays", {})
+        return {
+            name: SessionSchedule.from_config(name, template, arrays.get(name))
+            for name, template in config.get("templates", {}).items()
+        }
+
+    # ------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------
+
+    @property
+    def table(self) -> InstrumentTable:
+        """Struct-of-arrays columns of the current version."""
+        return self._state.table
+
+    @property
+    def version(self) -> int:
+        """Reload counter: 0 at construction, +1 per swapped-in YAML change."""
+        return self._state.version
+
+    @property
+    def source_hash(self) -> str:
+        """SHA-256 of the YAML the current version was built from."""
+        return self._state.source_hash
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild from the YAML and atomically swap the new version in.
+
+        The YAML is hashed first; an unchanged file keeps the current version.
+        If loading fails the exception propagates and the current version stays.
+
+        Args:
+            force: Rebuild even when the YAML hash is unchanged
+
+        Returns:
+            True if a new version was swapped in
+        """
+        with self._reload_lock:
+            self._stat = self._stat_key()
+            raw = Path(self._config_path).read_bytes()
+            current = self._state
+            if not force and hashlib.sha256(raw).hexdigest() == current.source_hash:
+                return False
+            self._state = self._load(version=current.version + 1, raw=raw)
+            return True
+
+    def snapshot(self) -> "InstrumentRegistry":
+        """Registry pinned to the current version (never reloads).
+
+        With hot_reload on, the YAML's mtime/size is checked first and a
+        changed file is reloaded before pinning.
+        """
+        if self.hot_reload and self._stat_key() != self._stat:
+            self.reload()
+        return self._pinned(self._state, self._config_path)
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def symbol_id(self, symbol: str) -> int:
+        """Dense integer ID of symbol (position in load order, index into table columns).
+
+        Raises:
+            KeyError: If symbol is not found in registry
+        """
+        ids = self._state.table.ids
+        if symbol not in ids:
+            raise KeyError(f"Instrument '{symbol}' not found in registry")
+        return ids[symbol]
+
+    def symbol_ids(self, symbols: Sequence[str]) -> np.ndarray:
+        """Dense integer IDs for many symbols (raises KeyError on unknown ones)."""
+        return self._state.table.ids_of(symbols)
 
     def get(self, symbol: str) -> InstrumentSpec:
         """Return the InstrumentSpec for symbol.
@@ -94,17 +507,42 @@ class InstrumentRegistry:
         Raises:
             KeyError: If symbol is not found in registry
         """
-        if symbol not in self._specs:
+        specs = self._state.specs
+        if symbol not in specs:
             raise KeyError(f"Instrument '{symbol}' not found in registry")
-        return self._specs[symbol]
+        return specs[symbol]
 
-    def list_symbols(self) -> list[str]:
-        """Return list of all loaded instrument symbols.
+    def list_symbols(self) -> List[str]:
+        """Return list of all loaded instrument symbols (in symbol ID order).
 
         Returns:
             List of symbol names
         """
-        return list(self._specs.keys())
+        return list(self._state.table.symbols)
+
+    # ------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------
+
+    def session_schedule(self, symbol: str) -> SessionSchedule:
+        """Compiled session schedule of symbol.
+
+        Raises:
+            KeyError: If symbol is unknown or has no session schedule
+        """
+        sessions = self._state.sessions
+        if symbol not in sessions:
+            self.get(symbol)
+            raise KeyError(f"Instrument '{symbol}' has no session schedule")
+        return sessions[symbol]
+
+    def session_state(self, symbol: str, timestamp: datetime) -> SessionState:
+        """Session label, open/close proximity and flags of symbol at timestamp (O(1))."""
+        return self.session_schedule(symbol).state_at(timestamp)
+
+    def session_labels(self, symbol: str, timestamps: Any) -> np.ndarray:
+        """Session label column over a whole timeline (datetime64-like, naive UTC)."""
+        return self.session_schedule(symbol).labels(timestamps)
 
     def calc_lot_from_risk(
         self,
@@ -142,8 +580,11 @@ class InstrumentRegistry:
         if sl_distance_points <= 0:
             raise ValueError(f"sl_distance_points must be > 0, got {sl_distance_points}")
 
-        # Get instrument spec (raises KeyError if not found)
-        spec = self.get(symbol)
+        # Get instrument spec (raises KeyError if not found), all from one version
+        state = self._state
+        if symbol not in state.specs:
+            raise KeyError(f"Instrument '{symbol}' not found in registry")
+        spec, t, i = state.specs[symbol], state.table, state.table.ids[symbol]
 
         # Calculate risk per 1 lot
         risk_per_1_lot = sl_distance_points * spec.point_value
@@ -151,10 +592,46 @@ class InstrumentRegistry:
         # Calculate raw lot size
         raw_lot = risk_amount_usd / risk_per_1_lot
 
-        # Quantize to lot_step (floor for conservative sizing)
-        quantized_lot = math.floor(raw_lot / spec.lot_step) * spec.lot_step
+        # Quantize to lot_step using floor (conservative), in integer lot units
+        steps = math.floor(raw_lot / spec.lot_step + _STEP_EPSILON)
+        units = steps * int(t.step_units[i])
 
         # Clamp to [min_lot, max_lot]
-        final_lot = max(spec.min_lot, min(quantized_lot, spec.max_lot))
+        units = max(int(t.min_units[i]), min(units, int(t.max_units[i])))
+
+        return units / int(t.lot_scale[i])
 
-        return final_lot
+    def calc_lots(self, risk_usd: np.ndarray, sl_points: np.ndarray, symbol_ids: np.ndarray) -> np.ndarray:
+        """Vectorized calc_lot_from_risk over arrays of orders.
+
+        Same algorithm and float operations as the scalar path, so each
+        element equals calc_lot_from_risk for that order.
+
+        Args:
+            risk_usd: (N,) risk amounts in USD (all must be > 0)
+            sl_points: (N,) stop loss distances in points (all must be > 0)
+            symbol_ids: (N,) dense symbol IDs (see symbol_ids())
+
+        Returns:
+            (N,) lot sizes (quantized to lot_step, clamped to min/max)
+
+        Raises:
+            ValueError: If any risk or stop distance is <= 0
+            KeyError: If any symbol ID is out of range
+        """
+        risk = np.asarray(risk_usd, dtype=np.float64)
+        sl = np.asarray(sl_points, dtype=np.float64)
+        t = self._state.table
+        ids = t.check_ids(symbol_ids)
+        if np.any(~(risk > 0)):
+            bad = int(np.flatnonzero(~(risk > 0))[0])
+            raise ValueError(f"risk_amount_usd must be > 0, got {risk[bad]} at index {bad}")
+        if np.any(~(sl > 0)):
+            bad = int(np.flatnonzero(~(sl > 0))[0])
+            raise ValueError(f"sl_distance_points must be > 0, got {sl[bad]} at index {bad}")
+
+        raw_lot = risk / (sl * t.point_value[ids])
+        steps = np.floor(raw_lot / t.lot_step[ids] + _STEP_EPSILON)
+        units = np.clip(steps, 0, t.max_units[ids]).astype(np.int64) * t.step_units[ids]
+        units = np.clip(units, t.min_units[ids], t.max_units[ids])
+        return units / t.lot_scale[ids]
@@ -0,0 +1,174 @@
+# core/margin_ledger.py
+"""
+Margin Ledger — live per-symbol and per-currency exposure for the Risk Engine.
+
+The broker books every fill and close into the ledger; each booking is
+O(1) and touches one symbol row, its two currency rows and the running
+totals:
+
+    position[i]   signed lots
+    notional[i]   signed cost-basis notional (lots × contract × avg price, quote ccy)
+    margin[i]     |notional[i]| / leverage[i]
+    exposure[c]   signed currency units: +base, −quote notional
+    used_margin   Σ margin,  gross_notional  Σ |notional|
+
+Reducing a position releases notional at its average price, so the
+quote-currency exposure tracks cost basis (realized PnL belongs to the
+portfolio, not the ledger). Pre-trade checks (preview, stage) evaluate
+the margin change of candidate orders against these rows without
+mutating them, in O(orders); stage chains over orders already admitted
+in the same batch.
+
+Doctrine constraints:
+- The ledger is bookkeeping: it never approves or rejects anything
+- Only the broker books fills; the Risk Engine only reads and previews
+"""
+
+from typing import Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+
+from core.instrument_registry import InstrumentTable
+
+# Positions within this many lots of zero are treated as flat
+_FLAT = 1e-12
+
+
+def _book(position: float, notional: float, quantity: float, price: float, contract: float) -> Tuple[float, float]:
+    """(position, notional) after a signed fill of quantity lots at price."""
+    new_position = position + quantity
+    if abs(new_position) < _FLAT:
+        return 0.0, 0.0
+    if position == 0.0 or (position > 0) == (quantity > 0):
+        return new_position, notional + quantity * contract * price  # open / add
+    if (position > 0) == (new_position > 0):
+        return new_position, notional * (new_position / position)  # reduce at average price
+    return new_position, new_position * contract * price  # flip: close out, open the remainder
+
+
+class MarginLedger:
+    """
+    Incrementally maintained exposure and margin over one instrument table.
+
+    Example:
+        >>> ledger = risk_engine.new_ledger(registry)
+        >>> ledger.apply_fill("EURUSD", +0.5, 1.0850)
+        >>> ledger.preview([("XAUUSD", +0.1, 2400.0)])  # margin the order would add
+    """
+
+    def __init__(self, table: InstrumentTable, leverage: np.ndarray) -> None:
+        """
+        Args:
+            table: Instrument columns (symbol IDs index every ledger row)
+            leverage: (N,) leverage per symbol ID (> 0)
+
+        Raises:
+            ValueError: If leverage does not match the table or is not positive
+        """
+        leverage = np.array(leverage, dtype=np.float64)
+        if leverage.shape != (len(table),) or np.any(~(leverage > 0)):
+            raise ValueError(f"leverage must be {len(table)} positive values, got shape {leverage.shape}")
+        self.table = table
+        self.leverage = leverage
+        self.leverage.flags.writeable = False
+        n = len(table)
+        self.position = np.zeros(n)
+        self.notional = np.zeros(n)
+        self.margin = np.zeros(n)
+        self.exposure = np.zeros(len(table.currencies))
+        self.used_margin = 0.0
+        self.gross_notional = 0.0
+        self.open_positions = 0
+
+    def _id(self, symbol: str) -> int:
+        if symbol not in self.table.ids:
+            raise KeyError(f"Instrument '{symbol}' not found in registry")
+        return self.table.ids[symbol]
+
+    # ------------------------------------------------------------
+    # Booking (broker side)
+    # ------------------------------------------------------------
+
+    def apply_fill(self, symbol: str, quantity: float, price: float) -> float:
+        """Book a signed fill (+ buy, − sell) of quantity lots at price.
+
+        Returns:
+            Change in used margin (negative when the fill reduces exposure)
+        """
+        i = self._id(symbol)
+        contract = float(self.table.contract_size[i])
+        old_position, old_notional, old_margin = float(self.position[i]), float(self.notional[i]), self.margin[i]
+        position, notional = _book(old_position, old_notional, quantity, price, contract)
+        margin = abs(notional) / self.leverage[i]
+
+        self.position[i], self.notional[i], self.margin[i] = position, notional, margin
+        self.exposure[self.table.base_ccy[i]] += (position - old_position) * contract
+        self.exposure[self.table.quote_ccy[i]] -= notional - old_notional
+        self.used_margin += margin - old_margin
+        self.gross_notional += abs(notional) - abs(old_notional)
+        self.open_positions += (position != 0.0) - (old_position != 0.0)
+        if not self.open_positions:
+            self.used_margin = self.gross_notional = 0.0  # flat book: drop accumulated rounding
+        return float(margin - old_margin)
+
+    def close(self, symbol: str, price: float) -> float:
+        """Book a full close of symbol at price; returns the lots closed (signed)."""
+        quantity = -float(self.position[self._id(symbol)])
+        if quantity:
+            self.apply_fill(symbol, quantity, price)
+        return -quantity
+
+    # ------------------------------------------------------------
+    # Queries (risk side)
+    # ------------------------------------------------------------
+
+    def preview(self, fills: Iterable[Tuple[str, float, float]]) -> float:
+        """Change in used margin if the signed (symbol, quantity, price) fills were booked in order.
+
+        O(1) per fill; the ledger itself is not modified.
+        """
+        return self.stage(fills, {})[0]
+
+    def stage(
+        self, fills: Iterable[Tuple[str, float, float]], pending: Mapping[int, Tuple[float, float]]
+    ) -> Tuple[float, float, Dict[int, Tuple[float, float]]]:
+        """Preview fills on top of pending (not yet booked) rows.
+
+        Args:
+            fills: Signed (symbol, quantity, price) fills, booked in order
+            pending: {symbol ID: (position, notional)} overriding the live rows
+
+        Returns:
+            (used margin change, gross notional change, {symbol ID: (position, notional)}
+            of the rows the fills touched); merge the rows into pending to chain stages
+        """
+        touched: Dict[int, Tuple[float, float]] = {}
+        margin_delta = gross_delta = 0.0
+        for symbol, quantity, price in fills:
+            i = self._id(symbol)
+            position, notional = touched.get(i) or pending.get(i) or (float(self.position[i]), float(self.notional[i]))
+            new_position, new_notional = _book(position, notional, quantity, price, float(self.table.contract_size[i]))
+            margin_delta += (abs(new_notional) - abs(notional)) / self.leverage[i]
+            gross_delta += abs(new_notional) - abs(notional)
+            touched[i] = (new_position, new_notional)
+        return float(margin_delta), gross_delta, touched
+
+    def free_margin(self, equity: float) -> float:
+        """Equity not tied up as margin (floored at 0)."""
+        return max(0.0, equity - self.used_margin)
+
+    def symbol_exposure(self, symbol: str) -> Tuple[float, float, float]:
+        """(signed lots, signed notional, margin) of one symbol."""
+        i = self._id(symbol)
+        return float(self.position[i]), float(self.notional[i]), float(self.margin[i])
+
+    def currency_exposure(self) -> Dict[str, float]:
+        """Signed units per currency with a non-zero exposure."""
+        return {code: float(v) for code, v in zip(self.table.currencies, self.exposure) if v != 0.0}
+
+    def reconcile(self) -> float:
+        """Recompute the running totals from the rows (O(n)); returns the drift corrected."""
+        used = float(self.margin.sum())
+        drift = self.used_margin - used
+        self.used_margin, self.gross_notional = used, float(np.abs(self.notional).sum())
+        return drift
@@ -16,9 +16,10 @@ QEFC-010: Sprint 2 Implementation
 
 from dataclasses import dataclass
 from datetime import UTC, datetime
-from typing import List
+from typing import Container, List, Optional
 
 from core.types import (
+    AgentName,
     AgentSignal,
     PortfolioState,
     QEFCDecision,
@@ -128,10 +129,14 @@ class QEFCEngine:
         signals: List[AgentSignal],
         regime: RegimeInfo,
         portfolio: PortfolioState,
+        active: Optional[Container[AgentName]] = None,
     ) -> QEFCDecision:
         """
         Core method — returns QEFC decision.
 
+        Signals from agents outside `active` (Dynamic Max Active Agents
+        mask, e.g. an ActiveAgentSet) are ignored for this bar.
+
         Algorithm:
         1. Dimensional compression (< 10 features)
         2. Check W override (supervisory authority)
@@ -140,6 +145,9 @@ class QEFCEngine:
         5. Apply cooldown barriers
         6. Emit decision and update supervisor
         """
+        if active is not None:
+            signals = [sig for sig in signals if sig.agent_name in active]
+
         # 1. Dimensional Compression
         meta = self._compress_inputs(signals, regime, portfolio)
 
@@ -0,0 +1,454 @@
+# core/rating_engine.py
+"""
+Dual Rating Engine — Epistemic Fitness Score
+
+Rates every agent from its own (shadow) trade stream on five normalized
+metrics in [0, 1]:
+
+    E = Expectancy Quality   WR·RR / (WR·RR + (1 − WR))      (0.5 at breakeven)
+    F = Fragility Index      f / (1 + f),  f = MDD / AvgRunup
+    T = Tail Penalty         t / (1 + t),  t = CVaR / MeanReturn  (1 if mean ≤ 0)
+    R = Regime Robustness    1 / (1 + Sharpe spread across regimes)
+    S = Survival Flag        0 once shadow drawdown reaches 100 %
+
+    R_mul   = E × (1 − F) × (1 − T) × R × S
+    R_add   = w1·E + w2·(1 − F) + w3·(1 − T) + w4·R + w5·S
+    D       = |R_mul − R_add|
+    R_final = mean(R_mul, R_add) × exp(−k·D)
+
+Every metric is maintained incrementally per closed trade (or bar):
+running win/loss moments, a running peak/drawdown/up-leg tracker, a
+log-bucketed quantile sketch for CVaR and one Welford accumulator per
+regime. The rating is recomputed on update and cached, so R_final is an
+O(1) read at any bar.
+
+ActiveAgentSelector bounds how many agents trade each bar (Dynamic Max
+Active Agents, §V): high certainty concentrates on the top-rated few, high
+uncertainty diversifies up to the ceiling.
+
+Doctrine constraints (ORG_DOCTRINE §II–III, §V):
+- Ratings are absolute: correlation never touches rating memory
+- Mortal Shadow: a dead agent stays dead, its statistics frozen
+- QEFC consumes R_final, not raw R_mul or R_add
+- Active agents bounded (min 2, max 8); a structural guard, not an optimizer
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from core.types import AgentName, AgentSignal, MarketSnapshot
+
+DEFAULT_REGIME = "default"
+
+# ============================================================
+# CONFIGURATION & SNAPSHOT
+# ============================================================
+
+
+@dataclass(frozen=True)
+class RatingConfig:
+    """Dual rating parameters (frozen for a Phase-1 run).
+
+    Attributes:
+        weights: Additive weights (w1..w5) for E, 1−F, 1−T, R, S
+        divergence_k: Divergence damping k in exp(−k·D)
+        cvar_alpha: Tail probability for CVaR
+        min_regime_samples: Trades a regime needs before its Sharpe counts
+        initial_capital: Shadow capital each agent starts with
+        sketch_accuracy: Relative accuracy of the CVaR quantile sketch
+        unknown_robustness: R used until two regimes have enough samples
+    """
+
+    weights: Tuple[float, float, float, float, float] = (0.2, 0.2, 0.2, 0.2, 0.2)
+    divergence_k: float = 1.0
+    cvar_alpha: float = 0.05
+    min_regime_samples: int = 20
+    initial_capital: float = 10_000.0
+    sketch_accuracy: float = 0.01
+    unknown_robustness: float = 0.5
+
+    def __post_init__(self) -> None:
+        if len(self.weights) != 5 or min(self.weights) < 0 or not math.isclose(sum(self.weights), 1.0):
+            raise ValueError(f"weights must be 5 non-negative values summing to 1, got {self.weights}")
+        if not 0.0 < self.cvar_alpha < 1.0:
+            raise ValueError(f"cvar_alpha must be in (0, 1), got {self.cvar_alpha}")
+        if self.initial_capital <= 0:
+            raise ValueError(f"initial_capital must be > 0, got {self.initial_capital}")
+        if not 0.0 < self.sketch_accuracy < 1.0:
+            raise ValueError(f"sketch_accuracy must be in (0, 1), got {self.sketch_accuracy}")
+
+
+@dataclass(frozen=True)
+class RatingSnapshot:
+    """Metric vector and ratings of one agent after its latest update."""
+
+    E: float = 0.0
+    F: float = 0.0
+    T: float = 1.0
+    R: float = 0.5
+    S: float = 1.0
+    r_mul: float = 0.0
+    r_add: float = 0.0
+    divergence: float = 0.0
+    r_final: float = 0.0
+    n_trades: int = 0
+
+
+# ============================================================
+# STREAMING ACCUMULATORS
+# ============================================================
+
+
+@dataclass
+class Welford:
+    """Running mean and variance (Welford), O(1) per sample."""
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with relative accuracy (DDSketch layout).
+
+    A value x ≠ 0 lands in bucket ceil(log_γ |x|) on its sign's side, so any
+    quantile is returned within ±accuracy relative error while memory grows
+    only with the log of the value range. Each side keeps at most
+    max_buckets buckets (the smallest magnitudes collapse first, leaving the
+    tails exact), so adds and tail queries cost O(1) in the sample count.
+    """
+
+    def __init__(self, accuracy: float = 0.01, max_buckets: int = 512) -> None:
+        self.max_buckets = max_buckets
+        self.gamma = (1.0 + accuracy) / (1.0 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        if x == 0.0:
+            self._zero += 1
+            return
+        side = self._positive if x > 0 else self._negative
+        key = math.ceil(math.log(abs(x)) / self._log_gamma)
+        side[key] = side.get(key, 0) + 1
+        if len(side) > self.max_buckets:
+            smallest = min(side)
+            moved = side.pop(smallest)
+            nearest = min(side)
+            side[nearest] += moved
+
+    def _value(self, key: int) -> float:
+        """Representative magnitude of a bucket (relative error ≤ accuracy)."""
+        return 2.0 * self.gamma**key / (self.gamma + 1.0)
+
+    def _ascending(self) -> List[Tuple[float, int]]:
+        negative = [(-self._value(k), c) for k, c in sorted(self._negative.items(), reverse=True)]
+        positive = [(self._value(k), c) for k, c in sorted(self._positive.items())]
+        return negative + ([(0.0, self._zero)] if self._zero else []) + positive
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q in [0, 1] (NaN when empty)."""
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._ascending():
+            seen += count
+            if seen > rank:
+                return value
+        return self._ascending()[-1][0]
+
+    def lower_tail_mean(self, alpha: float) -> float:
+        """Mean of the lowest alpha fraction of samples, i.e. CVaR (NaN when empty)."""
+        if self.count == 0:
+            return math.nan
+        tail = max(alpha * self.count, 1.0)
+        taken, total = 0.0, 0.0
+        for value, count in self._ascending():
+            use = min(count, tail - taken)
+            total += use * value
+            taken += use
+            if taken >= tail:
+                break
+        return total / taken
+
+
+@dataclass
+class _AgentState:
+    """Streaming statistics of one agent's shadow trade stream."""
+
+    equity: float
+    peak: float
+    max_drawdown: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    win_sum: float = 0.0
+    loss_sum: float = 0.0
+    returns: Welford = field(default_factory=Welford)
+    runup_sum: float = 0.0  # closed up-legs of the equity curve
+    runup_legs: int = 0
+    leg_start: float = 0.0
+    rising: bool = False
+    regimes: Dict[str, Welford] = field(default_factory=dict)
+    alive: bool = True
+
+
+# ============================================================
+# DUAL RATING ENGINE
+# ============================================================
+
+
+class DualRatingEngine:
+    """Streaming dual rating for every agent with O(1) R_final reads."""
+
+    def __init__(self, config: Optional[RatingConfig] = None) -> None:
+        self.config = config or RatingConfig()
+        self._states: Dict[AgentName, _AgentState] = {}
+        self._sketches: Dict[AgentName, QuantileSketch] = {}
+        self._snapshots: Dict[AgentName, RatingSnapshot] = {}
+
+    def __contains__(self, agent: object) -> bool:
+        return agent in self._states
+
+    @property
+    def agents(self) -> List[AgentName]:
+        return list(self._states)
+
+    def record(self, agent: AgentName, pnl: float, regime: str = DEFAULT_REGIME) -> RatingSnapshot:
+        """Fold one closed trade (or bar PnL) into an agent's rating.
+
+        Args:
+            agent: Agent the shadow trade belongs to
+            pnl: Realized PnL in account currency on the agent's shadow capital
+            regime: Regime label the trade was taken in
+
+        Returns:
+            Updated RatingSnapshot (unchanged once the agent is dead)
+        """
+        state = self._states.get(agent)
+        if state is None:
+            capital = self.config.initial_capital
+            state = self._states[agent] = _AgentState(equity=capital, peak=capital, leg_start=capital)
+            self._sketches[agent] = QuantileSketch(self.config.sketch_accuracy)
+        if not state.alive:
+            return self._snapshots[agent]  # Mortal Shadow: statistics frozen
+
+        ret = pnl / state.equity
+        state.returns.add(ret)
+        self._sketches[agent].add(ret)
+        state.regimes.setdefault(regime, Welford()).add(ret)
+        if pnl > 0:
+            state.wins += 1
+            state.win_sum += pnl
+        elif pnl < 0:
+            state.losses += 1
+            state.loss_sum -= pnl
+
+        previous = state.equity
+        state.equity += pnl
+        if pnl >= 0 and not state.rising:
+            state.leg_start, state.rising = previous, True
+        elif pnl < 0 and state.rising:
+            state.runup_sum += previous - state.leg_start
+            state.runup_legs += 1
+            state.rising = False
+        state.peak = max(state.peak, state.equity)
+        state.max_drawdown = max(state.max_drawdown, 1.0 - state.equity / state.peak)
+        state.alive = state.equity > 0.0
+
+        snapshot = self._rate(state, self._sketches[agent])
+        self._snapshots[agent] = snapshot
+        return snapshot
+
+    def snapshot(self, agent: AgentName) -> RatingSnapshot:
+        """Latest metric vector of an agent (neutral prior if never rated)."""
+        return self._snapshots.get(agent, RatingSnapshot(R=self.config.unknown_robustness))
+
+    def r_final(self, agent: AgentName) -> float:
+        """Cached R_final of an agent, O(1)."""
+        return self.snapshot(agent).r_final
+
+    def ratings(self) -> Dict[AgentName, float]:
+        """R_final of every rated agent (allocator rating input)."""
+        return {agent: snap.r_final for agent, snap in self._snapshots.items()}
+
+    def is_alive(self, agent: AgentName) -> bool:
+        state = self._states.get(agent)
+        return state is None or state.alive
+
+    def _rate(self, state: _AgentState, sketch: QuantileSketch) -> RatingSnapshot:
+        cfg = self.config
+        n = state.returns.n
+
+        # E: WR·RR normalised to the profit-factor scale PF / (1 + PF)
+        win_rate = state.wins / n
+        avg_win = state.win_sum / state.wins if state.wins else 0.0
+        avg_loss = state.loss_sum / state.losses if state.losses else 0.0
+        quality = win_rate * avg_win
+        expectancy = quality / (quality + (1.0 - win_rate) * avg_loss) if quality > 0 else 0.0
+
+        # F: max drawdown relative to the average up-leg (open leg included)
+        runup, legs = state.runup_sum, state.runup_legs
+        if state.rising:
+            runup, legs = runup + state.equity - state.leg_start, legs + 1
+        avg_runup = (runup / legs) / state.peak if legs else 0.0
+        fragility = _ratio(state.max_drawdown, avg_runup)
+
+        # T: CVaR loss against mean return
+        mean = state.returns.mean
+        cvar = sketch.lower_tail_mean(cfg.cvar_alpha)
+        tail = 1.0 if mean <= 0 else _ratio(max(-cvar, 0.0), mean)
+
+        # R: inverted Sharpe spread over regimes with enough samples
+        sharpes = [w.mean / w.std for w in state.regimes.values() if w.n >= cfg.min_regime_samples and w.std > 0]
+        robustness = 1.0 / (1.0 + max(sharpes) - min(sharpes)) if len(sharpes) >= 2 else cfg.unknown_robustness
+
+        survival = 1.0 if state.alive else 0.0
+        factors = (expectancy, 1.0 - fragility, 1.0 - tail, robustness, survival)
+        r_mul = math.prod(factors)
+        r_add = sum(w * f for w, f in zip(cfg.weights, factors))
+        divergence = abs(r_mul - r_add)
+        r_final = 0.5 * (r_mul + r_add) * math.exp(-cfg.divergence_k * divergence)
+        return RatingSnapshot(expectancy, fragility, tail, robustness, survival, r_mul, r_add, divergence, r_final, n)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """Squash numerator / denominator ≥ 0 into [0, 1] as r / (1 + r)."""
+    if numerator <= 0:
+        return 0.0
+    if denominator <= 0:
+        return 1.0
+    return numerator / (numerator + denominator)
+
+
+# ============================================================
+# DYNAMIC MAX ACTIVE AGENTS
+# ============================================================
+
+
+class SignalSource(Protocol):
+    """Anything that turns a market snapshot into agent signals."""
+
+    def analyze(self, snapshot: MarketSnapshot) -> List[AgentSignal]: ...
+
+
+@dataclass(frozen=True)
+class ActiveAgentSet:
+    """Agents allowed to trade on one bar, as a mask over a fixed agent order."""
+
+    agents: List[AgentName]
+    mask: np.ndarray  # (A,) bool
+    uncertainty: float
+    dispersion: float
+
+    @property
+    def k(self) -> int:
+        return int(self.mask.sum())
+
+    @property
+    def active(self) -> List[AgentName]:
+        return [self.agents[i] for i in np.flatnonzero(self.mask)]
+
+    def __contains__(self, agent: object) -> bool:
+        return agent in self.agents and bool(self.mask[self.agents.index(agent)])  # type: ignore[arg-type]
+
+    def filter(self, signals: List[AgentSignal]) -> List[AgentSignal]:
+        """Signals from active agents only."""
+        active = set(self.active)
+        return [sig for sig in signals if sig.agent_name in active]
+
+    def analyze(self, sources: Mapping[AgentName, SignalSource], snapshot: MarketSnapshot) -> List[AgentSignal]:
+        """Collect signals, calling analyze() on active agents only."""
+        return [sig for name in self.active if name in sources for sig in sources[name].analyze(snapshot)]
+
+
+class ActiveAgentSelector:
+    """Dynamic Max Active Agents: top-k by R_final with k set by uncertainty.
+
+        dispersion  = clip(std(R_final) / mean(R_final), 0, 1)
+        uncertainty = mean(1 − regime_confidence, mean(D), 1 − dispersion)
+        k           = min_active + round(uncertainty × (max_active − min_active))
+
+    Clear rating leaders in a confident regime concentrate capital on few
+    agents; flat ratings, divergent ratings or an unclear regime spread it.
+    The top k come from a partial sort (argpartition), O(A) per bar. Dead
+    agents (Mortal Shadow, S = 0) are never candidates, whatever their R_final.
+    """
+
+    def __init__(self, min_active: int = 2, max_active: int = 8) -> None:
+        if not 1 <= min_active <= max_active:
+            raise ValueError(f"need 1 <= min_active <= max_active, got {min_active}, {max_active}")
+        self.min_active = min_active
+        self.max_active = max_active
+
+    def select(
+        self,
+        agents: Sequence[AgentName],
+        ratings: np.ndarray,
+        divergence: np.ndarray,
+        regime_confidence: float,
+        alive: Optional[np.ndarray] = None,
+    ) -> ActiveAgentSet:
+        """Choose the active agents for one bar.
+
+        Args:
+            agents: Agent names, aligned with the arrays
+            ratings: (A,) R_final per agent
+            divergence: (A,) rating divergence D per agent
+            regime_confidence: Regime confidence in [0, 1]
+            alive: Optional (A,) bool mask; dead agents are archived and never selected
+
+        Returns:
+            ActiveAgentSet masking the top-k live agents by rating
+        """
+        mask = np.zeros(len(agents), dtype=bool)
+        candidates = np.arange(len(agents)) if alive is None else np.flatnonzero(np.asarray(alive, dtype=bool))
+        ratings = np.asarray(ratings, dtype=np.float64)[candidates]
+        divergence = np.asarray(divergence, dtype=np.float64)[candidates]
+        n = len(candidates)
+        if n == 0:
+            return ActiveAgentSet(list(agents), mask, 1.0, 0.0)
+
+        mean = ratings.mean()
+        dispersion = float(np.clip(ratings.std() / mean, 0.0, 1.0)) if mean > 0 else 0.0
+        components = (
+            1.0 - np.clip(regime_confidence, 0.0, 1.0),
+            np.clip(divergence, 0.0, 1.0).mean(),
+            1.0 - dispersion,
+        )
+        uncertainty = float(np.mean(components))
+
+        k = self.min_active + int(round(uncertainty * (self.max_active - self.min_active)))
+        k = min(max(k, self.min_active), self.max_active, n)
+        if k >= n:
+            mask[candidates] = True
+        else:
+            mask[candidates[np.argpartition(-ratings, k - 1)[:k]]] = True
+        return ActiveAgentSet(list(agents), mask, uncertainty, dispersion)
+
+    def select_from(
+        self, engine: DualRatingEngine, agents: Sequence[AgentName], regime_confidence: float
+    ) -> ActiveAgentSet:
+        """Select from the engine's cached snapshots (unrated agents rate 0, dead agents are masked)."""
+        snaps = [engine.snapshot(name) for name in agents]
+        ratings = np.fromiter((snap.r_final for snap in snaps), dtype=np.float64, count=len(snaps))
+        divergence = np.fromiter((snap.divergence for snap in snaps), dtype=np.float64, count=len(snaps))
+        alive = np.fromiter((engine.is_alive(name) for name in agents), dtype=bool, count=len(agents))
+        return self.select(agents, ratings, divergence, regime_confidence, alive)
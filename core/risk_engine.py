@@ -1,10 +1,20 @@
 """Risk Engine implementation for veto authority in the Sovereign-Quant stack."""
 
 from dataclasses import replace
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from core.instrument_registry import InstrumentRegistry
-from core.types import AllocationDecision, PortfolioState, RiskVerdict
+import numpy as np
+
+from core.anomaly_detector import MarketAnomalyMonitor
+from core.instrument_registry import InstrumentRegistry, InstrumentTable
+from core.margin_ledger import MarginLedger
+from core.scalper_budget import ScalperBudgetEngine, epoch_ms
+from core.stress_engine import StressGrid
+from core.types import AllocationDecision, OrderIntent, PortfolioState, RiskVerdict
+from core.var_engine import VaREngine
+
+# Batch admission order: risk-reducing actions first, new exposure last
+ACTION_PRIORITY: Dict[str, int] = {"FLATTEN": 0, "CLOSE": 1, "HOLD": 2, "REJECT": 2, "OPEN": 3}
 
 
 class RiskEngine:
@@ -15,46 +25,306 @@ class RiskEngine:
         max_drawdown_pct: float = 10.0,
         default_leverage: float = 50.0,
         instrument_leverage: Dict[str, float] | None = None,
+        max_gross_leverage: float | None = None,
+        max_cvar_pct: float | None = None,
+        max_stress_loss_pct: float | None = None,
     ) -> None:
+        """
+        Args:
+            max_drawdown_pct: Drawdown that triggers the kill switch
+            default_leverage: Leverage for instruments without an override or margin rate
+            instrument_leverage: Per-symbol leverage overrides
+            max_gross_leverage: Optional cap on gross notional as a multiple of equity
+            max_cvar_pct: Optional cap on portfolio CVaR as a percentage of equity
+            max_stress_loss_pct: Optional cap on the worst stress-scenario loss, % of equity
+        """
         self.max_drawdown_pct = max_drawdown_pct
         self.default_leverage = default_leverage
         self.instrument_leverage = instrument_leverage or {}
+        self.max_gross_leverage = max_gross_leverage
+        self.max_cvar_pct = max_cvar_pct
+        self.max_stress_loss_pct = max_stress_loss_pct
+        self._leverage_cache: Tuple[Optional[InstrumentTable], np.ndarray] = (None, np.zeros(0))
 
     def veto(
         self,
         decision: AllocationDecision,
         portfolio: PortfolioState,
         registry: InstrumentRegistry,
+        ledger: Optional[MarginLedger] = None,
+        var: Optional[VaREngine] = None,
+        stress: Optional[StressGrid] = None,
+        anomalies: Optional[MarketAnomalyMonitor] = None,
+        budget: Optional[ScalperBudgetEngine] = None,
     ) -> RiskVerdict:
-        """Apply drawdown and margin guards to an allocation decision."""
+        """Apply drawdown, scalper budget, market anomaly, margin and tail-risk guards to an allocation decision.
+
+        With a live ledger, free margin is equity minus the ledger's used margin
+        and each order costs only the margin it adds to the open positions
+        (orders that reduce exposure add none).
+        """
+        return self.veto_batch(
+            [decision],
+            portfolio=portfolio,
+            registry=registry,
+            ledger=ledger,
+            var=var,
+            stress=stress,
+            anomalies=anomalies,
+            budget=budget,
+        )[0]
+
+    def veto_batch(
+        self,
+        decisions: Sequence[AllocationDecision],
+        portfolio: PortfolioState,
+        registry: InstrumentRegistry,
+        ledger: Optional[MarginLedger] = None,
+        var: Optional[VaREngine] = None,
+        stress: Optional[StressGrid] = None,
+        anomalies: Optional[MarketAnomalyMonitor] = None,
+        budget: Optional[ScalperBudgetEngine] = None,
+    ) -> List[RiskVerdict]:
+        """Apply the guards to every allocation decision of one timestamp in one pass.
+
+        Margins of all orders are computed together; decisions are then admitted
+        in priority order (ACTION_PRIORITY, then larger final_risk_pct, then
+        symbol), each against the free margin and gross notional cap left by
+        the decisions admitted before it. A decision that does not fit is vetoed
+        and the next one is still tried. The order depends only on decision
+        contents, so verdicts do not change with the order of the input.
+
+        With a VaR engine and max_cvar_pct set, a decision is also vetoed when
+        it raises portfolio CVaR (open exposure plus admitted orders) above the
+        cap; orders that lower CVaR always pass this check. Likewise with a
+        stress grid and max_stress_loss_pct set (PRX-01), a decision is vetoed
+        when it deepens the worst scenario loss beyond the cap. Both engines
+        value exposure in the account currency, at rates read off the batch's
+        order prices, and are synced from the ledger first, when one is given.
+
+        With an anomaly monitor, OPEN decisions on a symbol whose latest spread
+        or fill was anomalous are vetoed (SPREAD_ANOMALY / SLIPPAGE_ANOMALY)
+        before any limit is charged; closes and flattens are never blocked.
+        With a scalper budget, an OPEN decision a registered scalper
+        contributes to (order metadata contributing_agents) is vetoed first
+        with the budget's reason at the decision timestamp, i.e. its bar time
+        (README §VIII: the budget binds before risk sizing). Every admitted
+        scalper order is booked as a placement (ScalperBudgetEngine.try_place),
+        so later decisions of the batch are checked against the spent budget.
+
+        Returns:
+            One verdict per decision, in input order
+        """
         if portfolio.drawdown_pct > self.max_drawdown_pct:
             reason = f"VETO: Drawdown {portfolio.drawdown_pct:.2f}% exceeds max {self.max_drawdown_pct:.2f}%"
-            return self._veto(decision=decision, reason=reason, kill_switch=True)
+            return [self._veto(decision=decision, reason=reason, kill_switch=True) for decision in decisions]
+
+        if ledger is not None:
+            free_margin = ledger.free_margin(portfolio.equity)
+            gross_notional = ledger.gross_notional
+        else:
+            margins, notionals = self._decision_costs(decisions=decisions, registry=registry)
+            free_margin = self._free_margin(portfolio=portfolio)
+            gross_notional = 0.0  # open positions unknown: the cap covers this batch only
+        gross_cap = np.inf if self.max_gross_leverage is None else portfolio.equity * self.max_gross_leverage
+        tail_engine = var if self.max_cvar_pct is not None else None
+        cvar_cap = portfolio.equity * (self.max_cvar_pct or 0.0) / 100.0
+        stress_grid = stress if self.max_stress_loss_pct is not None else None
+        stress_cap = portfolio.equity * (self.max_stress_loss_pct or 0.0) / 100.0
+        prices = {o.symbol: o.entry_price for d in decisions for o in d.orders if o.entry_price}
+        if tail_engine is not None:
+            tail_engine.rates.update(prices)
+        if stress_grid is not None and (tail_engine is None or stress_grid.rates is not tail_engine.rates):
+            stress_grid.rates.update(prices)
+        if ledger is not None:
+            if tail_engine is not None:
+                tail_engine.set_exposure(tail_engine.rates.to_account(ledger.notional))
+            if stress_grid is not None:
+                stress_grid.set_exposure(ledger.notional)
+        admitted_exposure: Dict[int, float] = {}
+        admitted_stress: Dict[int, float] = {}
+        exposure, stressed = admitted_exposure, admitted_stress
+
+        verdicts: List[Optional[RiskVerdict]] = [None] * len(decisions)
+        pending: Dict[int, Tuple[float, float]] = {}
+        for k in self._priority(decisions):
+            decision = decisions[k]
+            if ledger is not None:
+                margin_delta, notional_delta, rows = ledger.stage(self._fills(decision), pending)
+                required_margin, added_notional = max(0.0, margin_delta), max(0.0, notional_delta)
+            else:
+                required_margin, added_notional = float(margins[k]), float(notionals[k])
+            if tail_engine is not None:
+                exposure = self._merge(admitted_exposure, tail_engine.exposure_delta(self._fills(decision)))
+            if stress_grid is not None:
+                stressed = self._merge(admitted_stress, stress_grid.exposure_delta(self._fills(decision)))
+
+            over_budget = self._scalper_budget(budget, decision) if budget is not None else None
+            anomaly = self._anomaly(anomalies, decision) if anomalies is not None else None
+
+            if over_budget is not None:
+                reason = f"VETO: {over_budget}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            elif anomaly is not None:
+                reason = f"VETO: {anomaly}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            elif required_margin > free_margin:
+                reason = f"VETO: Required margin {required_margin:.2f} exceeds free margin {free_margin:.2f}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            elif gross_notional + added_notional > gross_cap:
+                reason = f"VETO: Gross notional {gross_notional + added_notional:.2f} exceeds cap {gross_cap:.2f}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            elif tail_engine is not None and self._breaches_cvar(tail_engine, admitted_exposure, exposure, cvar_cap):
+                reason = f"VETO: CVaR {tail_engine.tail(exposure)[1]:.2f} exceeds cap {cvar_cap:.2f}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            elif stress_grid is not None and self._breaches_stress(stress_grid, admitted_stress, stressed, stress_cap):
+                loss, scenario = stress_grid.worst(stressed)
+                reason = f"VETO: Stress scenario {scenario} loss {loss:.2f} exceeds cap {stress_cap:.2f}"
+                verdicts[k] = self._veto(decision=decision, reason=reason, kill_switch=False)
+            else:
+                free_margin -= required_margin
+                gross_notional += added_notional
+                admitted_exposure, admitted_stress = exposure, stressed
+                if ledger is not None:
+                    pending.update(rows)
+                if budget is not None and decision.action == "OPEN":
+                    self._book_placements(budget, decision)
+                verdicts[k] = RiskVerdict(approved=True, reason="APPROVED")
+        return [verdict for verdict in verdicts if verdict is not None]
 
-        required_margin = self._required_margin(decision=decision, registry=registry)
-        free_margin = self._free_margin(portfolio=portfolio)
+    def new_ledger(self, registry: InstrumentRegistry) -> MarginLedger:
+        """Empty margin ledger over registry's current version, using this engine's leverage."""
+        table = registry.table
+        return MarginLedger(table, self._leverage_column(table))
 
-        if required_margin > free_margin:
-            reason = f"VETO: Required margin {required_margin:.2f} exceeds free margin {free_margin:.2f}"
-            return self._veto(decision=decision, reason=reason, kill_switch=False)
+    @staticmethod
+    def _merge(base: Dict[int, float], delta: Dict[int, float]) -> Dict[int, float]:
+        """Sum of two sparse exposure vectors (new dict)."""
+        merged = dict(base)
+        for i, value in delta.items():
+            merged[i] = merged.get(i, 0.0) + value
+        return merged
 
-        return RiskVerdict(approved=True, reason="APPROVED")
+    @staticmethod
+    def _breaches_cvar(var: VaREngine, before: Dict[int, float], after: Dict[int, float], cap: float) -> bool:
+        """True when the orders lift CVaR above cap; NaN estimates never breach."""
+        cvar_after = var.tail(after)[1]
+        return cvar_after > cap and cvar_after > var.tail(before)[1]
+
+    @staticmethod
+    def _anomaly(monitor: MarketAnomalyMonitor, decision: AllocationDecision) -> Optional[str]:
+        """Anomaly reason blocking a decision that opens exposure, if any of its symbols is flagged."""
+        if decision.action != "OPEN":
+            return None
+        for symbol in dict.fromkeys([decision.symbol, *(order.symbol for order in decision.orders)]):
+            reason = monitor.reason(symbol)
+            if reason is not None:
+                return f"{reason} on {symbol}"
+        return None
+
+    @staticmethod
+    def _scalper_budget(budget: ScalperBudgetEngine, decision: AllocationDecision) -> Optional[str]:
+        """Budget reason blocking an OPEN decision of a registered scalper, if any."""
+        if decision.action != "OPEN":
+            return None
+        now_ms = epoch_ms(decision.timestamp)
+        for order in decision.orders:
+            for slot in budget.order_slots(order):
+                reason = budget.check(slot, now_ms)
+                if reason is not None:
+                    agent, symbol = budget.keys[slot]
+                    return f"{reason} for {agent} on {symbol}"
+        return None
+
+    @staticmethod
+    def _book_placements(budget: ScalperBudgetEngine, decision: AllocationDecision) -> None:
+        """Charge every scalper order of an admitted decision to its budget slot."""
+        now_ms = epoch_ms(decision.timestamp)
+        for order in decision.orders:
+            for slot in budget.order_slots(order):
+                budget.try_place(slot, now_ms)
+
+    @staticmethod
+    def _breaches_stress(grid: StressGrid, before: Dict[int, float], after: Dict[int, float], cap: float) -> bool:
+        """True when the orders push the worst scenario loss beyond cap and deepen it."""
+        loss_after = grid.worst(after)[0]
+        return loss_after > cap and loss_after > grid.worst(before)[0]
+
+    @staticmethod
+    def _fills(decision: AllocationDecision) -> List[Tuple[str, float, float]]:
+        """Signed (symbol, lots, price) per order; a missing entry price costs no margin."""
+        return [
+            (o.symbol, o.quantity if o.side == "BUY" else -o.quantity, o.entry_price or 0.0) for o in decision.orders
+        ]
+
+    @staticmethod
+    def _priority(decisions: Sequence[AllocationDecision]) -> np.ndarray:
+        """Admission order of decisions; input position only breaks exact ties."""
+        if not decisions:
+            return np.zeros(0, dtype=np.int64)
+        rank = np.array([ACTION_PRIORITY.get(d.action, len(ACTION_PRIORITY)) for d in decisions])
+        risk = np.array([-d.final_risk_pct for d in decisions], dtype=np.float64)
+        symbols = np.array([d.symbol for d in decisions])
+        return np.lexsort((np.arange(len(decisions)), symbols, risk, rank))
 
     def _free_margin(self, portfolio: PortfolioState) -> float:
         free_margin = portfolio.equity * (1.0 - portfolio.margin_used_pct / 100.0)
         return max(0.0, free_margin)
 
+    def _leverage(self, symbol: str, margin_rate: float | None = None) -> float:
+        """Engine override, else the instrument's margin rate, else the default leverage."""
+        if symbol in self.instrument_leverage:
+            leverage = self.instrument_leverage[symbol]
+        elif margin_rate is not None and margin_rate > 0:
+            leverage = 1.0 / margin_rate
+        else:
+            leverage = self.default_leverage
+        if leverage <= 0:
+            leverage = self.default_leverage if self.default_leverage > 0 else 1.0
+        return leverage
+
     def _required_margin(self, decision: AllocationDecision, registry: InstrumentRegistry) -> float:
-        total_required_margin = 0.0
-        for order in decision.orders:
-            spec = registry.get(order.symbol)
-            entry_price = order.entry_price if order.entry_price is not None else 0.0
-            leverage = self.instrument_leverage.get(order.symbol, self.default_leverage)
-            if leverage <= 0:
-                leverage = self.default_leverage if self.default_leverage > 0 else 1.0
-            required_margin = abs(order.quantity) * spec.contract_size * entry_price / leverage
-            total_required_margin += required_margin
-        return total_required_margin
+        return float(self._order_costs(orders=decision.orders, registry=registry)[0].sum())
+
+    def _decision_costs(
+        self, decisions: Sequence[AllocationDecision], registry: InstrumentRegistry
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(required margin, notional) per decision from one pass over all orders."""
+        orders = [order for decision in decisions for order in decision.orders]
+        owner = np.repeat(np.arange(len(decisions)), [len(decision.orders) for decision in decisions])
+        margin, notional = self._order_costs(orders=orders, registry=registry)
+        n = len(decisions)
+        return np.bincount(owner, weights=margin, minlength=n), np.bincount(owner, weights=notional, minlength=n)
+
+    def _order_costs(
+        self, orders: Sequence[OrderIntent], registry: InstrumentRegistry
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(required margin, notional) per order; a missing entry price costs nothing.
+
+        Registries are read through their struct-of-arrays columns; duck-typed
+        registries fall back to one get() per order.
+        """
+        quantity = np.abs(np.array([order.quantity for order in orders], dtype=np.float64))
+        price = np.array([0.0 if o.entry_price is None else o.entry_price for o in orders], dtype=np.float64)
+        if isinstance(registry, InstrumentRegistry):
+            table = registry.table
+            ids = table.ids_of([order.symbol for order in orders])
+            contract, leverage = table.contract_size[ids], self._leverage_column(table)[ids]
+        else:
+            specs = [registry.get(order.symbol) for order in orders]
+            contract = np.array([spec.contract_size for spec in specs], dtype=np.float64)
+            leverage = np.array([self._leverage(o.symbol, s.margin_rate) for o, s in zip(orders, specs)])
+        notional = quantity * contract * price
+        return notional / leverage, notional
+
+    def _leverage_column(self, table: InstrumentTable) -> np.ndarray:
+        """Per-ID leverage for table, resolved once per table instance."""
+        cached_table, column = self._leverage_cache
+        if cached_table is not table:
+            rates = [None if np.isnan(r) else float(r) for r in table.margin_rate]
+            column = np.array([self._leverage(s, r) for s, r in zip(table.symbols, rates)], dtype=np.float64)
+            self._leverage_cache = (table, column)
+        return column
 
     def _veto(self, decision: AllocationDecision, reason: str, kill_switch: bool) -> RiskVerdict:
         modified_decision = replace(
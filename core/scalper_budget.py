@@ -0,0 +1,236 @@
+# core/scalper_budget.py
+"""
+Scalper Budget Engine — Scalping Governance Pack (README §VIII)
+
+A scalper is a specialist under a sovereign budget. Every (agent, symbol)
+pair gets a dense slot in preallocated arrays holding its budget state:
+
+    daily loss     realized PnL of the current UTC day vs daily_loss_cap
+    hourly trades  ring of the last hourly_trade_cap placement times: the
+                   cap is hit exactly when the oldest of them is < 1 h old
+    pending        open orders vs pending_cap
+    cooldown       no placements until cooldown_ms after a losing trade
+    throttle       token bucket (burst tokens, refill_per_sec)
+    kill           risk can kill one scalper without the global kill switch
+
+Every check and update touches one slot in O(1); the only growth is the
+slot table (capacity doubling) when a new pair appears. Time is the
+caller's bar or tick time in integer milliseconds, never the wall clock,
+so a replay takes exactly the same decisions.
+
+In the pipeline a scalper's orders are those whose contributing_agents
+(OrderIntent metadata) include a registered agent. RiskEngine.veto checks
+their slots ahead of its margin and tail-risk guards at the decision's
+bar time and books each approved order with try_place, so later decisions
+of the same batch see the spent budget; VirtualBroker releases the pending
+count once an order fills, is refused or is cancelled.
+
+Doctrine constraints (§VIII):
+- Scalper is not an independent strategy: the budget binds before risk sizing
+- Risk can kill a scalper independently of the global kill switch
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.types import AgentName, OrderIntent, Symbol
+
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+_NEVER = -(2**62)  # placement time of an empty hourly ring slot
+
+
+def epoch_ms(timestamp: datetime) -> int:
+    """Milliseconds since the epoch of a bar or tick time (naive = UTC)."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+
+# ============================================================
+# POLICY
+# ============================================================
+
+
+@dataclass(frozen=True)
+class ScalperBudgetPolicy:
+    """Per-scalper budget (one (agent, symbol) pair).
+
+    Attributes:
+        daily_loss_cap: Max realized loss per UTC day (account currency)
+        hourly_trade_cap: Max order placements in any rolling hour
+        pending_cap: Max simultaneously open orders
+        cooldown_ms: Placement pause after a losing trade
+        burst: Token bucket size (placements allowed back to back)
+        refill_per_sec: Token bucket refill rate
+    """
+
+    daily_loss_cap: float = 100.0
+    hourly_trade_cap: int = 30
+    pending_cap: int = 2
+    cooldown_ms: int = 300_000
+    burst: float = 3.0
+    refill_per_sec: float = 0.5
+
+    def __post_init__(self) -> None:
+        if self.daily_loss_cap <= 0:
+            raise ValueError(f"daily_loss_cap must be > 0, got {self.daily_loss_cap}")
+        if self.hourly_trade_cap < 1 or self.pending_cap < 1:
+            raise ValueError("hourly_trade_cap and pending_cap must be >= 1")
+        if self.cooldown_ms < 0:
+            raise ValueError(f"cooldown_ms must be >= 0, got {self.cooldown_ms}")
+        if self.burst < 1 or self.refill_per_sec <= 0:
+            raise ValueError("burst must be >= 1 and refill_per_sec > 0")
+
+
+# ============================================================
+# BUDGET ENGINE
+# ============================================================
+
+
+class ScalperBudgetEngine:
+    """
+    O(1) budget checks for every scalper (agent, symbol) pair.
+
+    Example:
+        >>> budget = ScalperBudgetEngine(ScalperBudgetPolicy(daily_loss_cap=150.0))
+        >>> slot = budget.slot("scalper_xau", "XAUUSD")
+        >>> budget.try_place(slot, tick_ms)          # None = placed, else the veto reason
+        >>> budget.on_order_done(slot)               # filled / cancelled / expired
+        >>> budget.on_trade_closed(slot, pnl=-12.5, now_ms=tick_ms)
+    """
+
+    # Per-slot state (see _allocate)
+    day: np.ndarray
+    day_pnl: np.ndarray
+    pending: np.ndarray
+    cooldown_until: np.ndarray
+    tokens: np.ndarray
+    refilled_at: np.ndarray
+    killed: np.ndarray
+    ring: np.ndarray
+    head: np.ndarray
+
+    def __init__(self, policy: Optional[ScalperBudgetPolicy] = None, capacity: int = 16) -> None:
+        self.policy = policy or ScalperBudgetPolicy()
+        self.keys: List[Tuple[AgentName, Symbol]] = []
+        self._slots: Dict[Tuple[AgentName, Symbol], int] = {}
+        self._agent_slots: Dict[AgentName, List[int]] = {}
+        self._killed_agents: set[AgentName] = set()
+        self._refill_per_ms = self.policy.refill_per_sec / 1000.0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        """(Re)allocate every state array at capacity, keeping existing slots."""
+        n = len(self.keys)
+        fresh = {
+            "day": np.full(capacity, -1, dtype=np.int64),
+            "day_pnl": np.zeros(capacity),
+            "pending": np.zeros(capacity, dtype=np.int64),
+            "cooldown_until": np.full(capacity, _NEVER, dtype=np.int64),
+            "tokens": np.full(capacity, self.policy.burst),
+            "refilled_at": np.full(capacity, _NEVER, dtype=np.int64),
+            "killed": np.zeros(capacity, dtype=bool),
+            "ring": np.full((capacity, self.policy.hourly_trade_cap), _NEVER, dtype=np.int64),
+            "head": np.zeros(capacity, dtype=np.int64),
+        }
+        for name, array in fresh.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def is_scalper(self, agent: AgentName) -> bool:
+        """True if agent has a slot or a standing kill."""
+        return agent in self._agent_slots or agent in self._killed_agents
+
+    def order_slots(self, order: OrderIntent) -> List[int]:
+        """Slots of the registered scalpers among the order's contributing_agents."""
+        agents = order.metadata.get("contributing_agents", ())
+        return [self.slot(agent, order.symbol) for agent in agents if self.is_scalper(agent)]
+
+    def slot(self, agent: AgentName, symbol: Symbol) -> int:
+        """Dense slot of (agent, symbol), registering the pair on first use."""
+        key = (agent, symbol)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self.keys)
+            if slot == len(self.day):
+                self._allocate(2 * slot)
+            self._slots[key] = slot
+            self.keys.append(key)
+            self._agent_slots.setdefault(agent, []).append(slot)
+            self.killed[slot] = agent in self._killed_agents
+        return slot
+
+    # ------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------
+
+    def check(self, slot: int, now_ms: int) -> Optional[str]:
+        """Veto reason for a new placement on slot at now_ms, or None; does not consume budget."""
+        if self.killed[slot]:
+            return "SCALPER_KILLED"
+        if self.day[slot] == now_ms // DAY_MS and self.day_pnl[slot] <= -self.policy.daily_loss_cap:
+            return "DAILY_LOSS_CAP"
+        if now_ms < self.cooldown_until[slot]:
+            return "LOSS_COOLDOWN"
+        if self.pending[slot] >= self.policy.pending_cap:
+            return "PENDING_CAP"
+        if self.ring[slot, self.head[slot]] > now_ms - HOUR_MS:
+            return "HOURLY_TRADE_CAP"
+        if self._tokens(slot, now_ms) < 1.0:
+            return "THROTTLED"
+        return None
+
+    def _tokens(self, slot: int, now_ms: int) -> float:
+        elapsed = max(0, now_ms - int(self.refilled_at[slot]))
+        return min(self.policy.burst, float(self.tokens[slot]) + elapsed * self._refill_per_ms)
+
+    # ------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------
+
+    def try_place(self, slot: int, now_ms: int) -> Optional[str]:
+        """Check, and when allowed book a placement (token, hourly ring, pending); returns the veto reason."""
+        reason = self.check(slot, now_ms)
+        if reason is None:
+            self.tokens[slot] = self._tokens(slot, now_ms) - 1.0
+            self.refilled_at[slot] = now_ms
+            head = self.head[slot]
+            self.ring[slot, head] = now_ms
+            self.head[slot] = (head + 1) % self.policy.hourly_trade_cap
+            self.pending[slot] += 1
+        return reason
+
+    def on_order_done(self, slot: int) -> None:
+        """An order left the book (filled, cancelled, expired or rejected)."""
+        if self.pending[slot] > 0:
+            self.pending[slot] -= 1
+
+    def on_trade_closed(self, slot: int, pnl: float, now_ms: int) -> None:
+        """Book a closed trade's realized PnL; a loss starts the cooldown."""
+        day = now_ms // DAY_MS
+        if self.day[slot] != day:
+            self.day[slot], self.day_pnl[slot] = day, 0.0
+        self.day_pnl[slot] += pnl
+        if pnl < 0:
+            self.cooldown_until[slot] = now_ms + self.policy.cooldown_ms
+
+    def kill(self, agent: AgentName, symbol: Optional[Symbol] = None) -> None:
+        """Risk kill of one scalper pair, or of every pair of agent (also future ones)."""
+        if symbol is not None:
+            self.killed[self.slot(agent, symbol)] = True
+            return
+        self._killed_agents.add(agent)
+        self.killed[self._agent_slots.get(agent, [])] = True
+
+    def revive(self, agent: AgentName) -> None:
+        """Manual review only: lift every kill on agent."""
+        self._killed_agents.discard(agent)
+        self.killed[self._agent_slots.get(agent, [])] = False
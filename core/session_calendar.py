@@ -0,0 +1,371 @@
+# core/session_calendar.py
+"""
+Session Calendar — compiled trading-session schedules per instrument.
+
+Session templates in config/instruments.yaml are compiled once into
+minute-of-week arrays over the 10 080 minutes of a Monday-based week:
+
+    code[m]        session label index (SESSION_LABELS, 0 = CLOSED)
+    since_open[m]  minutes since the current session began
+    to_close[m]    minutes until the current session ends
+    flags[m]       bitmask of FLAG_NAMES
+
+Holidays (full closures or early closes) are compiled the same way into
+per-date 1 440-minute overrides, for the holiday and every surrounding
+day whose proximity it changes. session_state() is then an O(1) array index per
+bar and labels() labels a whole backtest timeline in one vectorized
+gather.
+
+Templates are written in UTC unless they name a timezone (IANA, e.g.
+America/New_York). Windows and holiday dates are then local wall-clock
+times and lookups shift each UTC minute by the zone's offset at that
+instant, so a 09:30 New York open tracks DST. Offsets are resolved once
+per distinct hour of a timeline. Minute counts that span a DST switch
+are wall-clock, i.e. off by the hour the clock jumped.
+
+Doctrine constraints (ORG_DOCTRINE §5, §8):
+- Sessions are instrument data: defined in the registry config only
+- MRD reports session_state / volatility_flags; it does not act on them
+- Flags: OPEN_SPIKE_RISK (first minutes of a spike session),
+  GAP_RISK (first minutes after a closure), CLOSE_PROXIMITY (last
+  minutes before a closure)
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+SESSION_LABELS: Tuple[str, ...] = ("CLOSED", "ASIA", "LONDON", "NY_OPEN", "NY_MID", "CLOSE")
+FLAG_NAMES: Tuple[str, ...] = ("OPEN_SPIKE_RISK", "GAP_RISK", "CLOSE_PROXIMITY")
+OPEN_SPIKE_RISK, GAP_RISK, CLOSE_PROXIMITY = 1, 2, 4
+
+DAY_MINUTES = 1440
+WEEK_MINUTES = 7 * DAY_MINUTES
+WEEKDAYS: Tuple[str, ...] = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+_EPOCH = date(1970, 1, 1)
+_CONTEXT_DAYS = 7  # days of surrounding schedule used to resolve proximity around a holiday
+_NO_OFFSET = timedelta(0)
+
+# ============================================================
+# Session State
+# ============================================================
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """Session context of one instrument at one minute.
+
+    Attributes:
+        session: Session label (CLOSED when the market is shut)
+        minutes_since_open: Minutes since this session began (capped at one week)
+        minutes_to_close: Minutes until this session ends (capped at one week)
+        flags: Active volatility flags (subset of FLAG_NAMES)
+    """
+
+    session: str
+    minutes_since_open: int
+    minutes_to_close: int
+    flags: Tuple[str, ...] = ()
+
+    @property
+    def is_open(self) -> bool:
+        return self.session != "CLOSED"
+
+
+def _flag_names(mask: int) -> Tuple[str, ...]:
+    return tuple(name for bit, name in enumerate(FLAG_NAMES) if mask & (1 << bit))
+
+
+def _minute(text: Any) -> int:
+    """'HH:MM' (24:00 allowed as end of day) to minute of day."""
+    if not isinstance(text, str) or ":" not in text:
+        raise ValueError(f"session times must be quoted 'HH:MM' strings, got {text!r}")
+    hours, minutes = (int(part) for part in text.split(":"))
+    minute = 60 * hours + minutes
+    if not 0 <= minute <= DAY_MINUTES or not 0 <= minutes < 60:
+        raise ValueError(f"session time out of range: {text!r}")
+    return minute
+
+
+def _week_index(minutes: Any) -> Any:
+    """Monday-based minute of week of epoch minutes (scalar or array)."""
+    return ((minutes // DAY_MINUTES + _EPOCH_WEEKDAY) % 7) * DAY_MINUTES + minutes % DAY_MINUTES
+
+
+def epoch_minutes(timestamps: Any) -> np.ndarray:
+    """Minutes since 1970-01-01 UTC for datetime64-like input (naive values are UTC)."""
+    return np.asarray(timestamps, dtype="datetime64[m]").astype(np.int64)
+
+
+# ============================================================
+# Compiled Schedule
+# ============================================================
+
+
+class SessionSchedule:
+    """
+    One session template compiled to minute-of-week arrays plus holiday overrides.
+
+    Example:
+        >>> schedule = SessionSchedule.from_config("FX", {"sessions": [...], "holidays": [...]})
+        >>> schedule.state_at(datetime(2026, 10, 19, 12, 5)).flags
+        ('OPEN_SPIKE_RISK',)
+    """
+
+    ARRAYS = (
+        "codes",
+        "since_open",
+        "to_close",
+        "flags",
+        "override_days",
+        "override_codes",
+        "override_since",
+        "override_to",
+        "override_flags",
+    )
+
+    codes: np.ndarray
+    since_open: np.ndarray
+    to_close: np.ndarray
+    flags: np.ndarray
+    override_days: np.ndarray
+    override_codes: np.ndarray
+    override_since: np.ndarray
+    override_to: np.ndarray
+    override_flags: np.ndarray
+
+    def __init__(
+        self,
+        name: str,
+        windows: Sequence[Tuple[str, Sequence[int], int, int]],
+        holidays: Optional[Mapping[date, Optional[int]]] = None,
+        spike_sessions: Sequence[str] = (),
+        open_spike_minutes: int = 15,
+        close_proximity_minutes: int = 15,
+        arrays: Optional[Mapping[str, np.ndarray]] = None,
+        tz: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            name: Template name
+            windows: (session, weekdays 0=Mon, start minute, end minute) per window;
+                     later windows overwrite earlier ones where they overlap
+            holidays: date -> early-close minute of day, or None for a full closure
+            spike_sessions: Sessions whose opening minutes carry OPEN_SPIKE_RISK
+            open_spike_minutes: Length of the OPEN_SPIKE_RISK / GAP_RISK window
+            close_proximity_minutes: Length of the CLOSE_PROXIMITY window
+            arrays: Previously compiled arrays (see arrays()); skips compilation
+            tz: IANA timezone the windows and holidays are written in (default UTC)
+
+        Raises:
+            ValueError: If a session label, weekday, window or timezone is invalid
+        """
+        self.name = name
+        self.tz = tz
+        try:
+            self._zone = ZoneInfo(tz) if tz else None
+        except (KeyError, ValueError) as exc:
+            raise ValueError(f"unknown timezone '{tz}' in session template {name}") from exc
+        self.open_spike_minutes = open_spike_minutes
+        self.close_proximity_minutes = close_proximity_minutes
+        self._spike = np.zeros(len(SESSION_LABELS), dtype=bool)
+        for session in spike_sessions:
+            self._spike[self._label_code(session)] = True
+
+        week = np.zeros(WEEK_MINUTES, dtype=np.uint8)
+        for session, days, start, end in windows:
+            code = self._label_code(session)
+            if not 0 <= start < end <= DAY_MINUTES:
+                raise ValueError(f"session window {session} must satisfy 0 <= start < end <= 24:00")
+            for day in days:
+                if not 0 <= day < 7:
+                    raise ValueError(f"weekday must be in [0, 7), got {day}")
+                week[day * DAY_MINUTES + start : day * DAY_MINUTES + end] = code
+        self._week = week
+        self._holidays = {(d - _EPOCH).days: close for d, close in (holidays or {}).items()}
+        self.holidays: Dict[date, Optional[int]] = dict(holidays or {})
+
+        for key, array in (arrays or self._compile_all()).items():
+            column = np.asarray(array)
+            column.flags.writeable = False
+            setattr(self, key, column)
+        self._override_row = {int(day): i for i, day in enumerate(self.override_days)}
+
+    @staticmethod
+    def _label_code(session: str) -> int:
+        if session not in SESSION_LABELS:
+            raise ValueError(f"unknown session label '{session}', expected one of {SESSION_LABELS}")
+        return SESSION_LABELS.index(session)
+
+    def _override_arrays(self) -> Tuple[np.ndarray, ...]:
+        return self.override_codes, self.override_since, self.override_to, self.override_flags
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Compiled arrays by name, for caching (pass back via arrays=)."""
+        return {key: getattr(self, key) for key in self.ARRAYS}
+
+    @classmethod
+    def from_config(
+        cls, name: str, config: Mapping[str, Any], arrays: Optional[Mapping[str, np.ndarray]] = None
+    ) -> "SessionSchedule":
+        """Compile a session template from its YAML mapping.
+
+        Expected keys: sessions (list of {session, days, start, end}), optional
+        holidays (list of {date, close}), spike_sessions, open_spike_minutes,
+        close_proximity_minutes, timezone. days defaults to Mon-Fri; a holiday
+        without close is a full closure.
+        """
+        windows: List[Tuple[str, Sequence[int], int, int]] = []
+        for window in config.get("sessions", []):
+            days = [WEEKDAYS.index(day) for day in window.get("days", WEEKDAYS[:5])]
+            windows.append((window["session"], days, _minute(window["start"]), _minute(window["end"])))
+        holidays: Dict[date, Optional[int]] = {}
+        for holiday in config.get("holidays", []):
+            day = holiday["date"]
+            day = day if isinstance(day, date) else date.fromisoformat(str(day))
+            holidays[day] = _minute(holiday["close"]) if holiday.get("close") is not None else None
+        return cls(
+            name,
+            windows,
+            holidays,
+            spike_sessions=config.get("spike_sessions", ()),
+            open_spike_minutes=int(config.get("open_spike_minutes", 15)),
+            close_proximity_minutes=int(config.get("close_proximity_minutes", 15)),
+            arrays=arrays,
+            tz=config.get("timezone"),
+        )
+
+    # ------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------
+
+    def _compile_all(self) -> Dict[str, np.ndarray]:
+        # Base week: proximity resolved over three tiled weeks, middle week kept
+        base = [a[WEEK_MINUTES : 2 * WEEK_MINUTES] for a in self._compile(np.tile(self._week, 3))]
+
+        # Holiday overrides: every day within a week of a holiday whose compiled minutes differ from
+        # the base week (a closure stretches since_open / to_close). Nearby days compile as one span.
+        candidates = sorted({day + k for day in self._holidays for k in range(-_CONTEXT_DAYS, _CONTEXT_DAYS + 1)})
+        spans: List[List[int]] = []
+        for day in candidates:
+            if spans and day - spans[-1][-1] <= 2 * _CONTEXT_DAYS:
+                spans[-1].append(day)
+            else:
+                spans.append([day])
+        days: List[int] = []
+        rows: List[List[np.ndarray]] = [[], [], [], []]
+        for span in spans:
+            first = span[0] - _CONTEXT_DAYS
+            compiled = self._compile(self._timeline(first, span[-1] + _CONTEXT_DAYS + 1))
+            for day in span:
+                offset, weekday = (day - first) * DAY_MINUTES, _week_index(day * DAY_MINUTES)
+                row = [array[offset : offset + DAY_MINUTES] for array in compiled]
+                if any(not np.array_equal(r, b[weekday : weekday + DAY_MINUTES]) for r, b in zip(row, base)):
+                    days.append(day)
+                    for k, r in enumerate(row):
+                        rows[k].append(r)
+
+        shape = (len(days), DAY_MINUTES)
+        dtypes = (np.uint8, np.int32, np.int32, np.uint8)
+        override = [np.array(r, dtype=dtype).reshape(shape) for r, dtype in zip(rows, dtypes)]
+        columns = (*base, np.array(days, dtype=np.int64), *override)
+        return dict(zip(self.ARRAYS, columns))
+
+    def _timeline(self, first_day: int, stop_day: int) -> np.ndarray:
+        """Session codes for days [first_day, stop_day) since epoch, holidays applied."""
+        minutes = np.arange(first_day * DAY_MINUTES, stop_day * DAY_MINUTES)
+        codes = self._week[_week_index(minutes)]
+        for day, close in self._holidays.items():
+            if first_day <= day < stop_day:
+                offset = (day - first_day) * DAY_MINUTES
+                codes[offset + (0 if close is None else close) : offset + DAY_MINUTES] = 0
+        return codes
+
+    def _compile(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Proximity and flags of a minute sequence (edges treated as session boundaries)."""
+        n = len(codes)
+        idx = np.arange(n)
+        start = np.r_[True, codes[1:] != codes[:-1]]
+        end = np.r_[codes[1:] != codes[:-1], True]
+        began = np.maximum.accumulate(np.where(start, idx, 0))
+        ends = np.minimum.accumulate(np.where(end, idx, n - 1)[::-1])[::-1]
+        since_open = np.minimum(idx - began, WEEK_MINUTES).astype(np.int32)
+        to_close = np.minimum(ends - idx + 1, WEEK_MINUTES).astype(np.int32)
+
+        before = codes[np.maximum(began - 1, 0)]  # label preceding this session
+        after = codes[np.minimum(ends + 1, n - 1)]  # label following this session
+        is_open = codes > 0
+        opening = is_open & (since_open < self.open_spike_minutes)
+        flags = np.zeros(n, dtype=np.uint8)
+        flags |= np.where(opening & self._spike[codes], OPEN_SPIKE_RISK, 0).astype(np.uint8)
+        flags |= np.where(opening & (before == 0) & (began > 0), GAP_RISK, 0).astype(np.uint8)
+        closing = is_open & (after == 0) & (ends < n - 1) & (to_close <= self.close_proximity_minutes)
+        flags |= np.where(closing, CLOSE_PROXIMITY, 0).astype(np.uint8)
+        return codes.astype(np.uint8), since_open, to_close, flags
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def _local(self, minutes: np.ndarray) -> np.ndarray:
+        """Epoch minutes shifted to the template's wall clock (unchanged for UTC templates)."""
+        if self._zone is None or not minutes.size:
+            return minutes
+        hours, inverse = np.unique(minutes // 60, return_inverse=True)
+        offsets = np.array(
+            [
+                (datetime.fromtimestamp(int(h) * 3600, self._zone).utcoffset() or _NO_OFFSET).total_seconds() // 60
+                for h in hours
+            ],
+            dtype=np.int64,
+        )
+        return minutes + offsets[inverse.ravel()]
+
+    def _index(self, minute: int) -> Tuple[Optional[int], int]:
+        """(override row or None, minute index into the row / week) of an epoch minute."""
+        row = self._override_row.get(minute // DAY_MINUTES)
+        if row is not None:
+            return row, minute % DAY_MINUTES
+        return None, int(_week_index(minute))
+
+    def state_at(self, timestamp: datetime) -> SessionState:
+        """Session state at timestamp (naive = UTC), O(1)."""
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        minute = int(self._local(epoch_minutes([np.datetime64(timestamp, "m")]))[0])
+        row, i = self._index(minute)
+        if row is None:
+            code, since, to, mask = self.codes[i], self.since_open[i], self.to_close[i], self.flags[i]
+        else:
+            code, since, to, mask = (a[row, i] for a in self._override_arrays())
+        return SessionState(SESSION_LABELS[int(code)], int(since), int(to), _flag_names(int(mask)))
+
+    def columns(self, timestamps: Any) -> Dict[str, np.ndarray]:
+        """Vectorized code / since_open / to_close / flags columns over a timeline.
+
+        Args:
+            timestamps: datetime64-like array (naive UTC), e.g. a bar index
+
+        Returns:
+            Dict of (N,) arrays keyed code, since_open, to_close, flags
+        """
+        minutes = self._local(epoch_minutes(timestamps).ravel())
+        day = minutes // DAY_MINUTES
+        week_index = _week_index(minutes)
+        base = (self.codes, self.since_open, self.to_close, self.flags)
+        out = {name: column[week_index] for name, column in zip(("code", "since_open", "to_close", "flags"), base)}
+        if len(self.override_days):
+            row = np.searchsorted(self.override_days, day).clip(max=len(self.override_days) - 1)
+            hit = self.override_days[row] == day
+            if hit.any():
+                for name, override in zip(out, self._override_arrays()):
+                    out[name][hit] = override[row[hit], minutes[hit] % DAY_MINUTES]
+        return out
+
+    def labels(self, timestamps: Any) -> np.ndarray:
+        """Session label per timestamp as a string array (e.g. a backtest column)."""
+        return np.asarray(SESSION_LABELS)[self.columns(timestamps)["code"]]
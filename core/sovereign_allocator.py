@@ -1,23 +1,377 @@
-"""Sovereign Allocator implementation for HCAP-01 capital governance."""
+"""Sovereign Allocator implementation for HCAP-01 capital governance.
 
-from typing import List, Literal
+All agent signals of a bar are aggregated per symbol before sizing:
 
+    W[a, s]   = confidence[a, s] × rating[a]           (0 where agent a is silent on s)
+    net[s]    = Σ_a W·direction / Σ_a W                ∈ [-1, 1]
+    proposed  = W-weighted proposed_risk_pct of agents agreeing with sign(net)
+    multiplier[s] = default_portfolio_multiplier × |net[s]|
+
+NEUTRAL signals dilute net exposure; opposing agents cancel. The weight
+math runs over an agents × symbols matrix, so the per-bar cost stays flat
+as the active agent count grows. Each symbol is sized independently and
+all resulting OrderIntents are returned in one AllocationDecision.
+
+Correlation governance (ORG_DOCTRINE §IV) is optional: with a
+CorrelationPolicy the allocator keeps streaming EW correlations of agent
+signal returns and symbol returns (fed by observe_returns), penalises and
+cluster-caps agent weights, and caps the net exposure of correlated symbols.
+A DiversificationOptimizer additionally re-weights agents per symbol by
+capped, long-only minimum variance in signal space. Under high uncertainty a
+StochasticExplorer may perturb near-tie weights (§VI), never changing net
+exposure or direction.
+"""
+
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Callable, Container, Dict, List, Literal, Mapping, Optional, Tuple
+
+import numpy as np
+
+from core.correlation_engine import (
+    CorrelationPolicy,
+    EWCorrelation,
+    cluster_exposure_scale,
+    correlation_clusters,
+    govern_weights,
+)
+from core.exploration import StochasticExplorer
 from core.instrument_registry import InstrumentRegistry
 from core.types import (
+    AgentName,
     AgentSignal,
     AllocationDecision,
     MarketSnapshot,
     OrderIntent,
     PortfolioState,
     QEFCDecision,
+    Symbol,
 )
 
+# Symbol reported on a decision that batches orders for several symbols
+PORTFOLIO_SYMBOL = "PORTFOLIO"
+
+_DIRECTION = {"LONG": 1.0, "SHORT": -1.0, "NEUTRAL": 0.0}
+
+# (agents, symbols, weights, direction) -> weights, applied after all deterministic weighting
+WeightHook = Callable[[List[AgentName], List[Symbol], np.ndarray, np.ndarray], np.ndarray]
+
+# ============================================================
+# Signal Aggregation (agents × symbols)
+# ============================================================
+
+
+@dataclass(frozen=True)
+class ExposurePlan:
+    """Per-symbol aggregation of all agent signals of one bar."""
+
+    agents: List[AgentName]
+    symbols: List[Symbol]
+    weights: np.ndarray  # (A, S) confidence × rating, 0 where no signal
+    direction: np.ndarray  # (A, S) +1 LONG, -1 SHORT, 0 NEUTRAL / silent
+    net_exposure: np.ndarray  # (S,) in [-1, 1]
+    proposed_risk_pct: np.ndarray  # (S,) weighted proposal of agreeing agents
+    stop_price: np.ndarray  # (S,) widest agreeing invalidation, NaN if none
+
+    def contributors(self, s: int) -> List[AgentName]:
+        """Agents whose direction agrees with the net exposure of symbol s."""
+        agree = (self.direction[:, s] == np.sign(self.net_exposure[s])) & (self.weights[:, s] > 0)
+        return [self.agents[a] for a in np.flatnonzero(agree)]
+
+
+def aggregate_signals(
+    signals: List[AgentSignal],
+    ratings: Optional[Mapping[AgentName, float]] = None,
+    default_risk_pct: float = 2.0,
+    correlation: Optional[EWCorrelation] = None,
+    policy: Optional[CorrelationPolicy] = None,
+    diversifier: Optional["DiversificationOptimizer"] = None,
+    explore: Optional[WeightHook] = None,
+) -> ExposurePlan:
+    """Aggregate signals into net exposure per symbol.
+
+    Args:
+        signals: Signals of the current bar (a later signal from the same
+                 agent on the same symbol replaces the earlier one)
+        ratings: Agent rating multipliers (default 1.0, negatives clip to 0)
+        default_risk_pct: Proposal used when a signal carries none
+        correlation: Optional agent signal-return correlations; when given,
+                     weights get the soft penalty and hard cluster cap
+        policy: Correlation governance settings (default CorrelationPolicy())
+        diversifier: Optional minimum-variance re-weighting of agents per symbol,
+                     using the agent signal-return covariance of correlation
+        explore: Optional final weight hook (stochastic exploration)
+
+    Returns:
+        ExposurePlan with (agents × symbols) matrices and per-symbol results
+    """
+    agents = list(dict.fromkeys(sig.agent_name for sig in signals))
+    symbols = list(dict.fromkeys(sig.symbol for sig in signals))
+    agent_idx = {name: i for i, name in enumerate(agents)}
+    symbol_idx = {sym: i for i, sym in enumerate(symbols)}
+    shape = (len(agents), len(symbols))
+
+    confidence = np.zeros(shape)
+    direction = np.zeros(shape)
+    proposed = np.full(shape, default_risk_pct)
+    stops = np.full(shape, np.nan)
+    for sig in signals:
+        cell = agent_idx[sig.agent_name], symbol_idx[sig.symbol]
+        confidence[cell] = sig.confidence
+        direction[cell] = _DIRECTION[sig.intent]
+        if sig.proposed_risk_pct is not None:
+            proposed[cell] = sig.proposed_risk_pct
+        stops[cell] = np.nan if sig.invalidation_price is None else sig.invalidation_price
+
+    rating = np.array([(ratings or {}).get(name, 1.0) for name in agents], dtype=np.float64)
+    weights = np.clip(confidence, 0.0, 1.0) * np.clip(rating, 0.0, None)[:, None]
+    if correlation is not None:
+        weights = govern_weights(weights, correlation.correlation(agents), policy or CorrelationPolicy())
+    if diversifier is not None:
+        covariance = correlation.covariance(agents) if correlation is not None else np.zeros((len(agents),) * 2)
+        weights = diversifier.reweight(agents, symbols, covariance, weights)
+    if explore is not None:
+        weights = explore(agents, symbols, weights, direction)
+
+    total = weights.sum(axis=0)
+    net = np.divide((weights * direction).sum(axis=0), total, out=np.zeros(len(symbols)), where=total > 0)
+
+    # Risk proposal and stop come from agents agreeing with the net direction;
+    # without a net direction the proposal falls back to all signals (trace only)
+    agree = (direction == np.sign(net)) & (weights > 0) & (net != 0)
+    basis = np.where(agree.any(axis=0), agree, weights > 0)
+    basis_w = np.where(basis, np.maximum(weights, 1e-12), 0.0)
+    proposed_risk = (basis_w * proposed).sum(axis=0) / np.maximum(basis_w.sum(axis=0), 1e-12)
+    proposed_risk = np.where(basis.any(axis=0), proposed_risk, default_risk_pct)
+
+    # Widest stop: the position lives until every agreeing thesis is invalidated
+    has_stop = agree & ~np.isnan(stops)
+    long_stop = np.where(has_stop, stops, np.inf).min(axis=0)
+    short_stop = np.where(has_stop, stops, -np.inf).max(axis=0)
+    stop = np.where(net > 0, long_stop, short_stop)
+    stop = np.where(has_stop.any(axis=0), stop, np.nan)
+
+    return ExposurePlan(agents, symbols, weights, direction, net, proposed_risk, stop)
+
+
+# ============================================================
+# Diversification Optimizer (signal-space minimum variance)
+# ============================================================
+
+
+def project_capped_simplex(v: np.ndarray, active: np.ndarray, cap: np.ndarray) -> np.ndarray:
+    """Euclidean projection of each column onto {0 ≤ x ≤ cap, Σx = 1} over active rows.
+
+    Σ clip(v − τ, 0, cap) is piecewise linear and non-increasing in τ with
+    breakpoints v and v − cap, so τ is found exactly by evaluating every
+    breakpoint and interpolating — no bisection loop.
+
+    Args:
+        v: (A, S) points to project
+        active: (A, S) rows allowed to carry weight; inactive rows end at 0
+        cap: (S,) per-column upper bound, with cap × active count ≥ 1
+
+    Returns:
+        (A, S) projected weights (all-zero columns where nothing is active)
+    """
+    v = np.where(active, v, 0.0)
+    breaks = np.sort(np.concatenate([v, v - cap]), axis=0)  # (2A, S)
+    mass = (np.clip(v[None] - breaks[:, None], 0.0, cap) * active).sum(axis=1)  # non-increasing in τ
+    k = np.maximum(np.argmax(mass <= 1.0, axis=0), 1)
+    cols = np.arange(v.shape[1])
+    lo, hi = breaks[k - 1, cols], breaks[k, cols]
+    m_lo, m_hi = mass[k - 1, cols], mass[k, cols]
+    step = np.divide(m_lo - 1.0, m_lo - m_hi, out=np.zeros_like(lo), where=m_lo > m_hi)
+    tau = np.where(mass[0] <= 1.0, breaks[0], lo + step * (hi - lo))
+    return np.clip(v - tau, 0.0, cap) * active
+
+
+class DiversificationOptimizer:
+    """Long-only, capped minimum-variance agent weights per symbol.
+
+    For every symbol column solves
+
+        min_x  xᵀΣ̂x + tracking·‖x − p‖²   s.t.  Σx = 1, 0 ≤ x ≤ cap
+
+    where Σ̂ is the agent signal-return covariance scaled to unit mean
+    variance and p the incoming weight shares. The tracking term keeps
+    conviction in play and makes the solution unique without history
+    (Σ̂ = 0 returns the capped projection of p).
+
+    All columns are solved together by an active-set method: each pass
+    solves the batched KKT systems for the current free/at-0/at-cap split
+    with one np.linalg.solve, then moves violators. The split is
+    warm-started from the previous bar's weights, so a bar usually settles
+    in one or two passes. Projected gradient is the fallback if the
+    active set fails to settle within max_iter passes.
+    """
+
+    def __init__(self, cap: float = 0.5, tracking: float = 0.1, tol: float = 1e-9, max_iter: int = 20) -> None:
+        if not 0.0 < cap <= 1.0:
+            raise ValueError(f"cap must be in (0, 1], got {cap}")
+        if tracking <= 0:
+            raise ValueError(f"tracking must be > 0, got {tracking}")
+        self.cap = cap
+        self.tracking = tracking
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0  # active-set passes taken by the last solve
+        self._previous: Dict[Tuple[AgentName, Symbol], float] = {}
+
+    def solve(
+        self,
+        covariance: np.ndarray,
+        prior: np.ndarray,
+        active: np.ndarray,
+        x0: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Minimum-variance shares for every column of prior.
+
+        Args:
+            covariance: (A, A) agent signal-return covariance
+            prior: (A, S) target shares p (each active column sums to 1)
+            active: (A, S) agents eligible per column
+            x0: Optional (A, S) warm start
+
+        Returns:
+            (A, S) shares, columns summing to 1 over active agents
+        """
+        n_agents, n_symbols = prior.shape
+        cap = np.maximum(self.cap, 1.0 / np.maximum(active.sum(axis=0), 1))
+        variance = np.diagonal(covariance)
+        scale = variance[variance > 0].mean() if (variance > 0).any() else 1.0
+        hessian = 2.0 * (covariance / scale + self.tracking * np.eye(n_agents))
+        linear = 2.0 * self.tracking * prior
+
+        # KKT template per column: [2H 1; 1ᵀ 0] [x; ν] = [2ρp; 1]
+        template = np.zeros((n_agents + 1, n_agents + 1))
+        template[:n_agents, :n_agents] = hessian
+        template[:n_agents, n_agents] = template[n_agents, :n_agents] = 1.0
+        diag = np.arange(n_agents)
+
+        start = prior if x0 is None else x0
+        at_low = ~active | (start <= self.tol)
+        at_cap = active & (start >= cap - self.tol) & ~at_low
+        self.iterations = 0
+        while self.iterations < self.max_iter:
+            self.iterations += 1
+            bound = (at_low | at_cap).T  # (S, A)
+            kkt = np.broadcast_to(template, (n_symbols,) + template.shape).copy()
+            kkt[:, :n_agents][bound] = 0.0
+            kkt[:, diag, diag] = np.where(bound, 1.0, hessian[diag, diag])
+            no_free = bound.all(axis=1)
+            kkt[no_free, n_agents] = 0.0
+            kkt[no_free, n_agents, n_agents] = 1.0  # ν undetermined: pin it, sum holds via bounds
+            rhs = np.where(bound, np.where(at_cap.T, cap[:, None], 0.0), linear.T)
+            rhs = np.concatenate([rhs, np.where(no_free, 0.0, 1.0)[:, None]], axis=1)
+            solution = np.linalg.solve(kkt, rhs[..., None])[..., 0]
+            x, nu = solution[:, :n_agents].T, solution[:, n_agents]
+
+            grad = hessian @ x - linear
+            if no_free.any():  # pick ν inside the KKT interval left open by the bounds, if any
+                lo = np.where(at_low & active, -grad, -np.inf).max(axis=0)
+                hi = np.where(at_cap, -grad, np.inf).min(axis=0)
+                lo = np.where(np.isfinite(lo), lo, hi)
+                hi = np.where(np.isfinite(hi), hi, lo)
+                nu = np.where(no_free, np.nan_to_num(0.5 * (lo + hi), posinf=0.0, neginf=0.0), nu)
+            grad = grad + nu
+            free = active & ~at_low & ~at_cap
+            to_low = free & (x < -self.tol)
+            to_cap = free & (x > cap + self.tol)
+            release = active & ((at_low & (grad < -self.tol)) | (at_cap & (grad > self.tol)))
+            release |= active & (no_free & (np.abs(x.sum(axis=0) - 1.0) > self.tol) & active.any(axis=0))
+            if not (to_low.any() or to_cap.any() or release.any()):
+                return np.clip(x, 0.0, cap) * active
+            at_low = (at_low & ~release) | to_low
+            at_cap = (at_cap & ~release) | to_cap
+        return self._projected_gradient(hessian, linear, active, cap, project_capped_simplex(x, active, cap))
+
+    def _projected_gradient(
+        self,
+        hessian: np.ndarray,
+        linear: np.ndarray,
+        active: np.ndarray,
+        cap: np.ndarray,
+        x: np.ndarray,
+        max_iter: int = 10_000,
+    ) -> np.ndarray:
+        step = 1.0 / np.abs(hessian).sum(axis=1).max()
+        for _ in range(max_iter):
+            nxt = project_capped_simplex(x - step * (hessian @ x - linear), active, cap)
+            if np.abs(nxt - x).max(initial=0.0) < self.tol:
+                return nxt
+            x = nxt
+        return x
+
+    def reweight(
+        self,
+        agents: List[AgentName],
+        symbols: List[Symbol],
+        covariance: np.ndarray,
+        weights: np.ndarray,
+    ) -> np.ndarray:
+        """Replace each column's weight shares by minimum-variance shares, keeping totals."""
+        active = weights > 0
+        total = weights.sum(axis=0)
+        prior = np.divide(weights, total, out=np.zeros_like(weights), where=total > 0)
+        x0 = np.array([[self._previous.get((a, s), np.nan) for s in symbols] for a in agents]).reshape(weights.shape)
+        x0 = np.where(np.isnan(x0), prior, x0)
+        shares = self.solve(covariance, prior, active, x0)
+        rows, cols = np.nonzero(active)
+        self._previous = {(agents[a], symbols[s]): float(shares[a, s]) for a, s in zip(rows, cols)}
+        return shares * total
+
+
+# ============================================================
+# Allocator
+# ============================================================
+
 
 class SovereignAllocator:
     """Portfolio constructor layer with deterministic risk-to-lot conversion."""
 
-    def __init__(self, default_portfolio_multiplier: float = 1.0) -> None:
+    def __init__(
+        self,
+        default_portfolio_multiplier: float = 1.0,
+        default_risk_pct: float = 2.0,
+        correlation: Optional[CorrelationPolicy] = None,
+        diversifier: Optional[DiversificationOptimizer] = None,
+        explorer: Optional[StochasticExplorer] = None,
+    ) -> None:
         self.default_portfolio_multiplier = default_portfolio_multiplier
+        self.default_risk_pct = default_risk_pct
+        self.correlation = correlation
+        self.diversifier = diversifier
+        self.explorer = explorer
+        self._bar = 0  # allocate() calls so far; default bar index for exploration draws
+        self.agent_correlation: Optional[EWCorrelation] = None
+        self.symbol_correlation: Optional[EWCorrelation] = None
+        if correlation is not None:
+            self.agent_correlation = EWCorrelation(correlation.halflife, correlation.min_periods)
+            self.symbol_correlation = EWCorrelation(correlation.halflife, correlation.min_periods)
+        self._last_plan: Optional[ExposurePlan] = None
+
+    def observe_returns(self, symbol_returns: Mapping[Symbol, float]) -> None:
+        """Fold the returns of the bar just closed into the correlation engines.
+
+        Agent signal returns are the previous allocation's directions applied
+        to these returns, so correlations only ever use realised data.
+
+        Args:
+            symbol_returns: Return of each symbol over the bar
+        """
+        if self.agent_correlation is None or self.symbol_correlation is None:
+            return
+        self.symbol_correlation.update(symbol_returns)
+        plan = self._last_plan
+        if plan is None:
+            return
+        returns = np.array([symbol_returns.get(sym, np.nan) for sym in plan.symbols], dtype=np.float64)
+        exposed = (plan.direction != 0) & (plan.weights > 0) & np.isfinite(returns)
+        agent_returns = np.where(exposed, plan.direction * np.nan_to_num(returns), 0.0).sum(axis=1)
+        self.agent_correlation.update(
+            {name: float(r) for name, r, live in zip(plan.agents, agent_returns, exposed.any(axis=1)) if live}
+        )
 
     def allocate(
         self,
@@ -26,8 +380,40 @@ class SovereignAllocator:
         snapshot: MarketSnapshot,
         portfolio: PortfolioState,
         registry: InstrumentRegistry,
+        ratings: Optional[Mapping[AgentName, float]] = None,
+        snapshots: Optional[Mapping[Symbol, MarketSnapshot]] = None,
+        active: Optional[Container[AgentName]] = None,
+        uncertainty: float = 0.0,
+        bar_index: Optional[int] = None,
     ) -> AllocationDecision:
-        """Build an AllocationDecision from QEFC risk modulation and signal intent."""
+        """Build an AllocationDecision from QEFC risk modulation and all signal intents.
+
+        Args:
+            qefc_decision: QEFC risk modulation for this bar
+            signals: Signals from every active agent (any number of symbols)
+            snapshot: Market snapshot of the primary symbol
+            portfolio: Current portfolio state
+            registry: Instrument registry for lot sizing
+            ratings: Optional agent ratings (e.g. R_final) weighting each agent
+            snapshots: Optional snapshots for the other symbols in signals
+            active: Optional active-agent mask (e.g. ActiveAgentSet); signals
+                    from other agents are dropped before aggregation
+            uncertainty: System uncertainty; exploration runs only above the
+                         explorer's threshold
+            bar_index: Bar counter keying exploration draws (default: number of
+                       previous allocate calls)
+
+        Returns:
+            One decision per symbol when a single symbol is traded, otherwise a
+            PORTFOLIO batch whose orders hold one OrderIntent per symbol; stamped
+            with snapshot.timestamp (bar time, not the wall clock)
+        """
+        bar = self._bar if bar_index is None else bar_index
+        self._bar += 1
+        if isinstance(registry, InstrumentRegistry):
+            registry = registry.snapshot()  # every leg sized against one registry version
+        if active is not None:
+            signals = [sig for sig in signals if sig.agent_name in active]
         if not signals:
             return AllocationDecision(
                 symbol="",
@@ -38,114 +424,141 @@ class SovereignAllocator:
                 final_risk_pct=0.0,
                 orders=[],
                 notes="HOLD: No signals provided",
+                timestamp=snapshot.timestamp,
             )
 
-        signal = signals[0]
-        proposed_risk_pct = signal.proposed_risk_pct if signal.proposed_risk_pct is not None else 2.0
+        explore: Optional[WeightHook] = None
+        if self.explorer is not None and self.explorer.active(uncertainty):
+            explore = partial(self.explorer.perturb, bar_index=bar)
+        plan = aggregate_signals(
+            signals, ratings, self.default_risk_pct, self.agent_correlation, self.correlation, self.diversifier, explore
+        )
+        self._last_plan = plan
+        exposure_scale = self._symbol_cluster_scale(plan)
+        markets: Dict[Symbol, MarketSnapshot] = {**(snapshots or {}), snapshot.symbol: snapshot}
+        if len(plan.symbols) == 1:
+            markets.setdefault(plan.symbols[0], snapshot)  # single-symbol bar: snapshot is the signal's market
+        legs = [
+            self._allocate_symbol(s, plan, markets.get(symbol), qefc_decision, portfolio, registry, exposure_scale[s])
+            for s, symbol in enumerate(plan.symbols)
+        ]
+        decision = legs[0] if len(legs) == 1 else self._batch(legs)
+        return replace(decision, timestamp=snapshot.timestamp)
+
+    def _symbol_cluster_scale(self, plan: ExposurePlan) -> np.ndarray:
+        """Hard cluster cap: correlated symbols share one net exposure ceiling."""
+        if self.symbol_correlation is None or self.correlation is None or len(plan.symbols) < 2:
+            return np.ones(len(plan.symbols))
+        corr = self.symbol_correlation.correlation(plan.symbols)
+        labels = correlation_clusters(corr, self.correlation.cluster_threshold)
+        return cluster_exposure_scale(plan.net_exposure, labels, self.correlation.symbol_cluster_cap)
+
+    def _allocate_symbol(
+        self,
+        s: int,
+        plan: ExposurePlan,
+        market: Optional[MarketSnapshot],
+        qefc_decision: QEFCDecision,
+        portfolio: PortfolioState,
+        registry: InstrumentRegistry,
+        exposure_scale: float = 1.0,
+    ) -> AllocationDecision:
+        symbol = plan.symbols[s]
+        net = float(plan.net_exposure[s])
+        proposed_risk_pct = float(plan.proposed_risk_pct[s])
 
         risk_after_qefc = proposed_risk_pct * qefc_decision.risk_factor
-        portfolio_multiplier = self.default_portfolio_multiplier
+        portfolio_multiplier = self.default_portfolio_multiplier * abs(net) * exposure_scale
         final_risk_pct = risk_after_qefc * portfolio_multiplier
 
-        if signal.intent == "NEUTRAL":
+        def skip(action: Literal["HOLD", "REJECT"], notes: str) -> AllocationDecision:
             return AllocationDecision(
-                symbol=signal.symbol,
-                action="HOLD",
+                symbol=symbol,
+                action=action,
                 proposed_risk_pct=proposed_risk_pct,
                 risk_after_QEFC=risk_after_qefc,
                 portfolio_multiplier=portfolio_multiplier,
                 final_risk_pct=0.0,
                 orders=[],
-                notes="HOLD: signal intent is NEUTRAL",
+                notes=notes,
             )
 
+        if net == 0.0:
+            if not plan.direction[:, s].any():
+                return skip("HOLD", "HOLD: signal intent is NEUTRAL")
+            return skip("HOLD", "HOLD: net exposure is 0 (signals cancel or carry no weight)")
+
         if final_risk_pct <= 0.0:
-            return AllocationDecision(
-                symbol=signal.symbol,
-                action="HOLD",
-                proposed_risk_pct=proposed_risk_pct,
-                risk_after_QEFC=risk_after_qefc,
-                portfolio_multiplier=portfolio_multiplier,
-                final_risk_pct=0.0,
-                orders=[],
-                notes="HOLD: final_risk_pct <= 0.0",
-            )
+            return skip("HOLD", "HOLD: final_risk_pct <= 0.0")
 
-        if signal.invalidation_price is None:
-            return AllocationDecision(
-                symbol=signal.symbol,
-                action="REJECT",
-                proposed_risk_pct=proposed_risk_pct,
-                risk_after_QEFC=risk_after_qefc,
-                portfolio_multiplier=portfolio_multiplier,
-                final_risk_pct=0.0,
-                orders=[],
-                notes="REJECT: invalidation_price missing (Safety Guard)",
-            )
+        stop_loss = float(plan.stop_price[s])
+        if np.isnan(stop_loss):
+            return skip("REJECT", "REJECT: invalidation_price missing (Safety Guard)")
 
-        current_price = snapshot.price
-        sl_distance_points = abs(current_price - signal.invalidation_price)
+        if market is None:
+            return skip("REJECT", f"REJECT: no market snapshot for {symbol}")
+
+        current_price = market.price
+        sl_distance_points = abs(current_price - stop_loss)
         if sl_distance_points <= 0.0:
-            return AllocationDecision(
-                symbol=signal.symbol,
-                action="REJECT",
-                proposed_risk_pct=proposed_risk_pct,
-                risk_after_QEFC=risk_after_qefc,
-                portfolio_multiplier=portfolio_multiplier,
-                final_risk_pct=0.0,
-                orders=[],
-                notes="REJECT: stop distance must be > 0",
-            )
+            return skip("REJECT", "REJECT: stop distance must be > 0")
 
         risk_amount_usd = portfolio.equity * (final_risk_pct / 100.0)
         if risk_amount_usd <= 0.0:
-            return AllocationDecision(
-                symbol=signal.symbol,
-                action="REJECT",
-                proposed_risk_pct=proposed_risk_pct,
-                risk_after_QEFC=risk_after_qefc,
-                portfolio_multiplier=portfolio_multiplier,
-                final_risk_pct=0.0,
-                orders=[],
-                notes="REJECT: risk_amount_usd <= 0.0",
-            )
+            return skip("REJECT", "REJECT: risk_amount_usd <= 0.0")
 
         lot_size = registry.calc_lot_from_risk(
             risk_amount_usd=risk_amount_usd,
             sl_distance_points=sl_distance_points,
-            symbol=signal.symbol,
+            symbol=symbol,
         )
         if lot_size <= 0.0:
-            return AllocationDecision(
-                symbol=signal.symbol,
-                action="REJECT",
-                proposed_risk_pct=proposed_risk_pct,
-                risk_after_QEFC=risk_after_qefc,
-                portfolio_multiplier=portfolio_multiplier,
-                final_risk_pct=0.0,
-                orders=[],
-                notes="REJECT: lot_size calculated as 0.0",
-            )
+            return skip("REJECT", "REJECT: lot_size calculated as 0.0")
 
-        side: Literal["BUY", "SELL"] = "BUY" if signal.intent == "LONG" else "SELL"
+        intent = "LONG" if net > 0 else "SHORT"
+        side: Literal["BUY", "SELL"] = "BUY" if net > 0 else "SELL"
         order = OrderIntent(
-            symbol=signal.symbol,
+            symbol=symbol,
             side=side,
             quantity=lot_size,
             entry_price=current_price,
-            stop_loss=signal.invalidation_price,
+            stop_loss=stop_loss,
             risk_pct_used=final_risk_pct,
             risk_source="HCAP-01",
-            metadata={"allocated_lot_size": lot_size},
+            metadata={
+                "allocated_lot_size": lot_size,
+                "net_exposure": net,
+                "contributing_agents": plan.contributors(s),
+            },
         )
 
         return AllocationDecision(
-            symbol=signal.symbol,
+            symbol=symbol,
             action="OPEN",
             proposed_risk_pct=proposed_risk_pct,
             risk_after_QEFC=risk_after_qefc,
             portfolio_multiplier=portfolio_multiplier,
             final_risk_pct=final_risk_pct,
             orders=[order],
-            notes=(f"OPEN: {signal.intent} {lot_size} lots @ {current_price} SL={signal.invalidation_price}"),
+            notes=(f"OPEN: {intent} {lot_size} lots @ {current_price} SL={stop_loss}"),
+        )
+
+    def _batch(self, legs: List[AllocationDecision]) -> AllocationDecision:
+        """Merge per-symbol decisions into one PORTFOLIO decision."""
+        orders = [order for leg in legs for order in leg.orders]
+        actions = {leg.action for leg in legs}
+        action: Literal["OPEN", "HOLD", "REJECT"] = "OPEN" if orders else "REJECT" if actions == {"REJECT"} else "HOLD"
+        proposed = sum(leg.proposed_risk_pct for leg in legs)
+        after_qefc = sum(leg.risk_after_QEFC for leg in legs)
+        final = sum(leg.final_risk_pct for leg in legs)
+        multiplier = final / after_qefc if after_qefc > 0 else self.default_portfolio_multiplier
+        return AllocationDecision(
+            symbol=PORTFOLIO_SYMBOL,
+            action=action,
+            proposed_risk_pct=proposed,
+            risk_after_QEFC=after_qefc,
+            portfolio_multiplier=multiplier,
+            final_risk_pct=final,
+            orders=orders,
+            notes=" | ".join(f"{leg.symbol} {leg.notes}" for leg in legs),
         )
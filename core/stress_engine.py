@@ -0,0 +1,193 @@
+# core/stress_engine.py
+"""
+Stress Scenario Grid — Regime Stress Protocol (PRX-01)
+
+Holds a scenario matrix M (scenarios × symbol IDs) of relative price
+moves and prices a portfolio under every scenario with one matrix
+multiply:
+
+    v[i]    = lots[i] × contract_size[i] × price[i] × rate[quote_i]     value of a 100 % move
+    pnl     = M @ v                                                     (S,) PnL per scenario
+
+Exposure is signed notional in the quote currency, the convention of
+MarginLedger.notional, converted to the account currency by rate[c]
+(account units per unit of currency c) from a CurrencyRates table that
+the VaR engine can share. Scenario shocks target symbols ("XAUUSD": -0.03) or currency
+codes ("USD": 0.02); a currency shock moves every instrument priced in it,
+price = base / quote:
+
+    M[s, i] = (1 + shock[symbol_i]) · (1 + shock[base_i]) / (1 + shock[quote_i]) − 1
+
+The PnL of the open book is cached per exposure or rate change, so pricing a
+proposed order is an O(S) column update per touched symbol.
+
+Doctrine constraints (PRX-01):
+- Alpha cannot override tail survivability: stress only vetoes, never sizes
+- Scenarios are static inputs; the grid never learns from the book
+"""
+
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from core.currency_rates import CurrencyRates
+from core.instrument_registry import InstrumentTable
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+
+
+@dataclass(frozen=True)
+class StressScenario:
+    """One named set of relative shocks.
+
+    Attributes:
+        name: Scenario label reported on a breach
+        shocks: {symbol or currency code: relative move} (-0.05 = −5 %)
+    """
+
+    name: str
+    shocks: Mapping[str, float]
+
+    def __post_init__(self) -> None:
+        for target, shock in self.shocks.items():
+            if not shock > -1.0:
+                raise ValueError(f"Scenario '{self.name}': shock for {target} must be > -1, got {shock}")
+
+
+def load_scenarios(path: str | Path) -> List[StressScenario]:
+    """Scenarios from YAML: named ``scenarios`` plus the cartesian product of ``grid`` axes.
+
+    Example:
+        scenarios:
+          US100_GAP_DOWN: {US100: -0.05}
+        grid:                       # 3 × 3 = 9 combined scenarios
+          XAUUSD: [-0.03, 0.0, 0.03]
+          USD: [-0.02, 0.0, 0.02]
+    """
+    with open(path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    scenarios = [StressScenario(name, dict(shocks)) for name, shocks in (config.get("scenarios") or {}).items()]
+    axes: Dict[str, Sequence[float]] = config.get("grid") or {}
+    for combo in itertools.product(*axes.values()):
+        shocks = {target: float(shock) for target, shock in zip(axes, combo) if shock}
+        if shocks:
+            name = "GRID[" + ",".join(f"{target}{shock:+g}" for target, shock in shocks.items()) + "]"
+            scenarios.append(StressScenario(name, shocks))
+    return scenarios
+
+
+# ============================================================
+# SCENARIO GRID
+# ============================================================
+
+
+class StressGrid:
+    """
+    Compiled scenario matrix over one instrument table.
+
+    Example:
+        >>> grid = StressGrid.from_yaml("config/stress_scenarios.yaml", registry.table)
+        >>> grid.update_rates({"USDJPY": 151.2})
+        >>> grid.set_exposure(ledger.notional)
+        >>> grid.worst(grid.exposure_delta([("XAUUSD", 0.5, 2400.0)]))  # (loss, scenario)
+    """
+
+    def __init__(
+        self,
+        table: InstrumentTable,
+        scenarios: Sequence[StressScenario],
+        account_currency: str = "USD",
+        rates: CurrencyRates | None = None,
+    ) -> None:
+        """
+        Args:
+            table: Instrument table the symbol IDs index
+            scenarios: Scenarios, one matrix row each
+            account_currency: Currency stress losses are reported in
+            rates: Shared rate table (e.g. the VaR engine's); overrides account_currency
+
+        Raises:
+            ValueError: If no scenarios are given, a shock targets an unknown symbol or currency,
+                        or the account currency is not a currency of the table
+        """
+        if not scenarios:
+            raise ValueError("StressGrid needs at least one scenario")
+        n, codes = len(table), {code: c for c, code in enumerate(table.currencies)}
+        self.rates = rates or CurrencyRates(table, account_currency)
+        symbol_shock = np.zeros((len(scenarios), n))
+        currency_shock = np.zeros((len(scenarios), len(codes)))
+        for s, scenario in enumerate(scenarios):
+            for target, shock in scenario.shocks.items():
+                if target in table.ids:
+                    symbol_shock[s, table.ids[target]] = shock
+                elif target in codes:
+                    currency_shock[s, codes[target]] = shock
+                else:
+                    raise ValueError(f"Scenario '{scenario.name}': unknown symbol or currency '{target}'")
+        moves = (
+            (1.0 + symbol_shock)
+            * (1.0 + currency_shock[:, table.base_ccy])
+            / (1.0 + currency_shock[:, table.quote_ccy])
+        )
+        self.table = table
+        self.names: Tuple[str, ...] = tuple(scenario.name for scenario in scenarios)
+        self.moves = moves - 1.0
+        self.moves.flags.writeable = False
+        self.exposure = np.zeros(n)
+        self._pnl = np.zeros(len(scenarios))
+        self._rates_version = self.rates.version
+
+    @classmethod
+    def from_yaml(
+        cls, path: str | Path, table: InstrumentTable, account_currency: str = "USD", rates: CurrencyRates | None = None
+    ) -> "StressGrid":
+        return cls(table, load_scenarios(path), account_currency, rates)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def update_rates(self, prices: Mapping[str, float]) -> None:
+        """Refresh currency rates from symbol prices (CurrencyRates.update)."""
+        self.rates.update(prices)
+
+    def set_exposure(self, exposure: np.ndarray) -> None:
+        """Replace the open book's exposure (signed quote-currency notional per symbol ID)."""
+        exposure = np.asarray(exposure, dtype=np.float64)
+        if exposure.shape != self.exposure.shape:
+            raise ValueError(f"expected {len(self.exposure)} exposures, got shape {exposure.shape}")
+        self.exposure = exposure.copy()
+        self._pnl, self._rates_version = self.pnl(self.exposure), self.rates.version
+
+    def exposure_delta(self, fills: Iterable[Tuple[str, float, float]]) -> Dict[int, float]:
+        """Signed notional per symbol ID of (symbol, signed lots, price) fills."""
+        delta: Dict[int, float] = {}
+        for symbol, quantity, price in fills:
+            i = int(self.table.ids_of([symbol])[0])
+            delta[i] = delta.get(i, 0.0) + quantity * self.table.contract_size[i] * price
+        return delta
+
+    def pnl(self, exposure: np.ndarray) -> np.ndarray:
+        """(S,) scenario PnL in account currency of a full notional vector: one matrix multiply."""
+        return self.moves @ self.rates.to_account(exposure)
+
+    def stressed(self, delta: Mapping[int, float] | None = None) -> np.ndarray:
+        """(S,) scenario PnL of the open book plus delta."""
+        if self._rates_version != self.rates.version:
+            self._pnl, self._rates_version = self.pnl(self.exposure), self.rates.version
+        if not delta:
+            return self._pnl.copy()
+        ids = np.fromiter(delta.keys(), dtype=np.intp, count=len(delta))
+        values = np.fromiter(delta.values(), dtype=np.float64) * self.rates.quote(ids)
+        return self._pnl + self.moves[:, ids] @ values
+
+    def worst(self, delta: Mapping[int, float] | None = None) -> Tuple[float, str]:
+        """(loss, scenario name) of the worst scenario for the open book plus delta (loss ≥ 0)."""
+        pnl = self.stressed(delta)
+        s = int(np.argmin(pnl))
+        return max(0.0, -float(pnl[s])), self.names[s]
@@ -0,0 +1,200 @@
+# core/var_engine.py
+"""
+Streaming VaR Engine — Risk Layer Tail Constraint
+
+Keeps the last `window` bars of per-symbol returns in a ring buffer R
+(window × symbols) and, alongside it, the scenario PnL of the current
+exposure vector w (signed notional per symbol ID in account currency,
+converted from quote currency by a CurrencyRates table, which the stress
+grid can share):
+
+    pnl[t] = R[t] · w                      one entry per buffered bar
+
+Both are maintained incrementally:
+
+    new bar          overwrite the oldest row of R and pnl[t]       O(n)
+    exposure change  pnl += R[:, i] · Δw_i per touched symbol        O(window)
+
+so historical VaR/CVaR is a linear-time selection over pnl and the
+marginal tail of a proposed order is one O(window) column update, with
+nothing recomputed over the window. Each pnl slot is rebuilt from scratch
+when its row is overwritten, so incremental rounding never outlives the
+window.
+
+Parametric VaR uses the streaming EW covariance Σ (EWCorrelation) with a
+zero-mean normal: σ² = wᵀΣw. Σw is cached per bar, so the parametric
+tail after an order on symbol i costs O(1) per touched symbol:
+
+    σ'² = σ² + 2·Δ·(Σw)_i + Δ²·Σ_ii
+
+VaR and CVaR are reported as positive losses in the account currency.
+
+Doctrine constraints:
+- VaR is read by the Risk Engine only; it never sizes or re-weights orders
+- Too little history yields NaN, which never vetoes (no estimate, no tail claim)
+"""
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Iterable, Literal, Mapping, Tuple
+
+import numpy as np
+
+from core.correlation_engine import EWCorrelation
+from core.currency_rates import CurrencyRates
+from core.instrument_registry import InstrumentTable
+
+# ============================================================
+# POLICY
+# ============================================================
+
+
+@dataclass(frozen=True)
+class VaRPolicy:
+    """Tail-risk estimation settings.
+
+    Attributes:
+        window: Bars of returns held for historical simulation
+        alpha: Tail probability (0.01 = 99 % VaR)
+        halflife: EW half-life in bars of the parametric covariance
+        min_periods: Bars required before any estimate is reported
+        method: Estimator the pre-trade veto uses ("historical" or "parametric")
+    """
+
+    window: int = 250
+    alpha: float = 0.01
+    halflife: float = 60.0
+    min_periods: int = 50
+    method: Literal["historical", "parametric"] = "historical"
+
+    def __post_init__(self) -> None:
+        if self.window < 1:
+            raise ValueError(f"window must be >= 1, got {self.window}")
+        if not 0.0 < self.alpha < 1.0:
+            raise ValueError(f"alpha must be in (0, 1), got {self.alpha}")
+        if not 1 <= self.min_periods <= self.window:
+            raise ValueError(f"min_periods must be in [1, window], got {self.min_periods}")
+        if self.method not in ("historical", "parametric"):
+            raise ValueError(f"method must be 'historical' or 'parametric', got {self.method!r}")
+
+
+# ============================================================
+# VAR ENGINE
+# ============================================================
+
+
+class VaREngine:
+    """
+    Historical and parametric portfolio VaR/CVaR over one instrument table.
+
+    Example:
+        >>> var = VaREngine(registry.table)
+        >>> var.update(bar_returns)                  # (N,) per symbol ID, NaN = no quote
+        >>> var.rates.update({"USDJPY": 151.2})
+        >>> var.set_exposure(var.rates.to_account(ledger.notional))
+        >>> var.tail(var.exposure_delta([("XAUUSD", 0.1, 2400.0)]))  # (VaR, CVaR) with the order
+    """
+
+    def __init__(
+        self, table: InstrumentTable, policy: VaRPolicy | None = None, rates: CurrencyRates | None = None
+    ) -> None:
+        """
+        Args:
+            table: Instrument table the symbol IDs index
+            policy: Estimation settings
+            rates: Quote-to-account conversion (default: USD account, shared with a StressGrid)
+        """
+        self.table = table
+        self.policy = policy or VaRPolicy()
+        self.rates = rates or CurrencyRates(table)
+        n = len(table)
+        self.returns = np.zeros((self.policy.window, n))
+        self.pnl = np.zeros(self.policy.window)
+        self.exposure = np.zeros(n)
+        self.count = 0
+        self._head = 0
+        self._cov = EWCorrelation(halflife=self.policy.halflife, min_periods=1, names=table.symbols)
+        self._sigma_w: np.ndarray | None = None
+        self._z = NormalDist().inv_cdf(1.0 - self.policy.alpha)
+        self._tail_density = NormalDist().pdf(self._z) / self.policy.alpha
+
+    # ------------------------------------------------------------
+    # Streaming updates
+    # ------------------------------------------------------------
+
+    def update(self, returns: np.ndarray) -> None:
+        """Fold one bar of per-symbol returns (NaN = unquoted, a zero move for history)."""
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.shape != self.exposure.shape:
+            raise ValueError(f"expected {len(self.exposure)} returns, got shape {returns.shape}")
+        self._cov.update_array(returns)
+        row = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        self.returns[self._head] = row
+        self.pnl[self._head] = row @ self.exposure
+        self._head = (self._head + 1) % self.policy.window
+        self.count = min(self.count + 1, self.policy.window)
+        self._sigma_w = None
+
+    def set_exposure(self, exposure: np.ndarray) -> None:
+        """Replace the account-currency exposure vector; only symbols whose exposure changed are re-priced."""
+        exposure = np.asarray(exposure, dtype=np.float64)
+        if exposure.shape != self.exposure.shape:
+            raise ValueError(f"expected {len(self.exposure)} exposures, got shape {exposure.shape}")
+        changed = np.flatnonzero(exposure != self.exposure)
+        if changed.size:
+            self.pnl += self.returns[:, changed] @ (exposure[changed] - self.exposure[changed])
+            self.exposure = exposure.copy()
+            self._sigma_w = None
+
+    def exposure_delta(self, fills: Iterable[Tuple[str, float, float]]) -> Dict[int, float]:
+        """Signed account-currency notional per symbol ID of (symbol, signed lots, price) fills."""
+        delta: Dict[int, float] = {}
+        for symbol, quantity, price in fills:
+            i = int(self.table.ids_of([symbol])[0])
+            rate = float(self.rates.rates[self.table.quote_ccy[i]])
+            delta[i] = delta.get(i, 0.0) + quantity * float(self.table.contract_size[i]) * price * rate
+        return delta
+
+    # ------------------------------------------------------------
+    # Tail estimates
+    # ------------------------------------------------------------
+
+    def historical(self, delta: Mapping[int, float] | None = None) -> Tuple[float, float]:
+        """(VaR, CVaR) by historical simulation of exposure + delta; O(window) per touched symbol."""
+        if self.count < self.policy.min_periods:
+            return math.nan, math.nan
+        pnl = self.pnl[: self.count]
+        if delta:
+            ids = np.fromiter(delta.keys(), dtype=np.intp, count=len(delta))
+            pnl = pnl + self.returns[: self.count, ids] @ np.fromiter(delta.values(), dtype=np.float64)
+        k = max(1, math.ceil(self.policy.alpha * self.count))
+        tail = np.partition(pnl, k - 1)[:k]
+        return float(-tail.max()), float(-tail.mean())
+
+    def parametric(self, delta: Mapping[int, float] | None = None) -> Tuple[float, float]:
+        """(VaR, CVaR) of a zero-mean normal with the EW covariance; O(1) per touched symbol."""
+        if self.count < self.policy.min_periods:
+            return math.nan, math.nan
+        if self._sigma_w is None:
+            self._sigma_w = self._cov.covariance() @ self.exposure
+        variance = float(self.exposure @ self._sigma_w)
+        if delta:
+            ids = np.fromiter(delta.keys(), dtype=np.intp, count=len(delta))
+            d = np.fromiter(delta.values(), dtype=np.float64)
+            block = self._cov.covariance([self.table.symbols[i] for i in ids])
+            variance += 2.0 * float(d @ self._sigma_w[ids]) + float(d @ block @ d)
+        sigma = math.sqrt(max(variance, 0.0))
+        return self._z * sigma, self._tail_density * sigma
+
+    def tail(self, delta: Mapping[int, float] | None = None) -> Tuple[float, float]:
+        """(VaR, CVaR) of exposure + delta under the policy's method."""
+        if self.policy.method == "parametric":
+            return self.parametric(delta)
+        return self.historical(delta)
+
+    def marginal(self, delta: Mapping[int, float]) -> Tuple[float, float]:
+        """Change in (VaR, CVaR) if delta were added to the exposure."""
+        var_before, cvar_before = self.tail()
+        var_after, cvar_after = self.tail(delta)
+        return var_after - var_before, cvar_after - cvar_before
@@ -14,6 +14,7 @@ from typing import Dict, Iterator, Optional, Union
 import pandas as pd
 
 from data.feature_engineer import FeatureEngineer
+from simulation.intrabar import IntrabarIndex
 
 
 @dataclass(frozen=True)
@@ -172,6 +173,30 @@ class MultiTimeframeFeeder:
                 timeframe=self.primary_timeframe,
             )
 
+    def intrabar_index(self, child_timeframe: str, parent_timeframe: Optional[str] = None) -> IntrabarIndex:
+        """
+        Precompute the child-bar range of every parent bar (e.g. M1 bars inside each H1 bar).
+
+        Used by the broker to order fills inside a bar from the lower-timeframe path.
+
+        Args:
+            child_timeframe: Lower timeframe label (e.g. "M1")
+            parent_timeframe: Bar timeframe being matched (default: primary timeframe)
+
+        Raises:
+            ValueError: If either timeframe is not loaded
+        """
+        parent_timeframe = parent_timeframe or self.primary_timeframe
+        for tf_label in (child_timeframe, parent_timeframe):
+            if tf_label not in self.data:
+                raise ValueError(f"Timeframe '{tf_label}' not found in data sources")
+        parent, child = self.data[parent_timeframe], self.data[child_timeframe]
+        return IntrabarIndex(
+            parent["timestamp"].to_numpy(),
+            child["timestamp"].to_numpy(),
+            child[["open", "high", "low", "close"]].to_numpy(dtype=float),
+        )
+
     def reset(self) -> None:
         """Reset the feeder to the beginning."""
         self._positions = {tf: 0 for tf in self.data.keys()}
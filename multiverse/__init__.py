@@ -0,0 +1 @@
+# multiverse package
@@ -0,0 +1,74 @@
+# multiverse/benchmark.py
+"""
+Scenario benchmark for QLF universes.
+
+Scores each universe on the fixed stress-test pairs of the legacy
+benchmark (C⊕C, N⊕T, F⊕T, F⊕C). All universes are scored at once with a
+single gather over the (U, 4, 4) table stack.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from multiverse.universe import STATE_INDEX, STATES, QLFUniverse, cell_values
+
+# Stress-test scenarios (a, b) → evaluated as a ⊕ b
+BENCHMARK_CASES: Tuple[Tuple[str, str], ...] = (("C", "C"), ("N", "T"), ("F", "T"), ("F", "C"))
+
+# Points awarded per outcome state
+OUTCOME_POINTS: Dict[str, int] = {"T": 10, "N": 7, "C": 3, "F": -5}
+
+
+def points_vector(points: Dict[str, int] = OUTCOME_POINTS) -> np.ndarray:
+    """Return outcome points as an array indexed by state code."""
+    return np.array([points[s] for s in STATES], dtype=np.int64)
+
+
+def benchmark_scores(
+    tables: np.ndarray,
+    cases: Sequence[Tuple[str, str]] = BENCHMARK_CASES,
+    points: Dict[str, int] = OUTCOME_POINTS,
+) -> np.ndarray:
+    """Score a stack of universes on the benchmark scenarios.
+
+    Args:
+        tables: Stack of operator tables (U, 4, 4)
+        cases: Scenario pairs (a, b)
+        points: Points per outcome state
+
+    Returns:
+        int64 array of shape (U,) with the total score per universe
+    """
+    stack = np.asarray(tables, dtype=np.int8).reshape(-1, 4, 4)
+    left = np.array([STATE_INDEX[a] for a, _ in cases], dtype=np.intp)
+    right = np.array([STATE_INDEX[b] for _, b in cases], dtype=np.intp)
+    outcomes = stack[:, left, right]
+    return points_vector(points)[outcomes].sum(axis=1)
+
+
+def packed_benchmark_scores(
+    codes: np.ndarray,
+    cases: Sequence[Tuple[str, str]] = BENCHMARK_CASES,
+    points: Dict[str, int] = OUTCOME_POINTS,
+) -> np.ndarray:
+    """Score packed uint32 universes without unpacking them.
+
+    Equivalent to benchmark_scores(unpack_codes(codes)) but only touches
+    the scenario cells, which keeps search over the 4^16 space cheap.
+    """
+    lut = points_vector(points)
+    words = np.asarray(codes, dtype=np.uint32)
+    scores = np.zeros(words.shape, dtype=np.int64)
+    for a, b in cases:
+        scores += lut[cell_values(words, STATE_INDEX[a], STATE_INDEX[b])]
+    return scores
+
+
+def benchmark_details(
+    universe: QLFUniverse,
+    cases: Sequence[Tuple[str, str]] = BENCHMARK_CASES,
+) -> str:
+    """Human-readable scenario outcomes, e.g. "C+C=T | N+T=C"."""
+    details: List[str] = [f"{a}+{b}={universe.op(a, b)}" for a, b in cases]
+    return " | ".join(details)
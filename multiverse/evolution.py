@@ -0,0 +1,430 @@
+# multiverse/evolution.py
+"""
+Evolution Driver — operator mutation and fitness-proportionate selection (preprint §6).
+
+One generation:
+
+1. Evaluate every universe on a fixed set of seeded input streams:
+   benchmark score, mean consistency lifetime and ELO (duel = lifetime).
+   Fitness R is the weighted sum of the per-generation z-scores.
+2. Keep the elite unchanged, draw parents with P(U_i) = e^{R_i/T} / Σ_j e^{R_j/T}
+   and mutate them:
+   - local mutation: one random cell (p_local)
+   - row/column mutation: one random row or column (p_row)
+   - structural repair (QECF): no F→T resurrection, no authority
+     downgrade of protected cells, withdrawal of excess C cells to N
+
+Lifetime evaluation runs in worker processes. The input streams are
+placed once in shared memory, so only the population tables travel to
+the workers. Each evaluated generation is checkpointed atomically to
+disk together with the RNG state, so an interrupted run resumes exactly
+where it stopped. Results do not depend on the worker count.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from multiverse.benchmark import benchmark_scores
+from multiverse.lifetime import InputEnvironment, consistency_lifetimes
+from multiverse.tournament import EloTournament
+from multiverse.universe import STATE_INDEX, C, F, N, T, parametric_universes, stack_tables
+
+# Preprint §4.3 example authority weights
+AUTHORITY: Dict[str, float] = {"T": 1.0, "C": 0.7, "N": 0.4, "F": 0.2}
+
+CHECKPOINT_PREFIX = "generation_"
+
+# ============================================================
+# Mutation Operators
+# ============================================================
+
+
+def local_mutation(tables: np.ndarray, rng: np.random.Generator, p: float) -> np.ndarray:
+    """M_xy ← random state for one random cell, applied with probability p per universe."""
+    out = np.array(tables, dtype=np.int8).reshape(-1, 16)
+    hit = np.flatnonzero(rng.random(len(out)) < p)
+    cells = rng.integers(0, 16, size=len(hit))
+    out[hit, cells] = rng.integers(0, 4, size=len(hit), dtype=np.int8)
+    return out.reshape(-1, 4, 4)
+
+
+def row_column_mutation(tables: np.ndarray, rng: np.random.Generator, p: float) -> np.ndarray:
+    """M_x* (or M_*x) ← random states, applied with probability p per universe."""
+    out = np.array(tables, dtype=np.int8).reshape(-1, 4, 4)
+    hit = np.flatnonzero(rng.random(len(out)) < p)
+    lines = rng.integers(0, 4, size=len(hit))
+    is_row = rng.random(len(hit)) < 0.5
+    values = rng.integers(0, 4, size=(len(hit), 4), dtype=np.int8)
+    rows, cols = hit[is_row], hit[~is_row]
+    out[rows, lines[is_row], :] = values[is_row]
+    out[cols, :, lines[~is_row]] = values[~is_row]
+    return out
+
+
+@dataclass(frozen=True)
+class StructuralRules:
+    """
+    QECF constraints enforced on every mutated child (preprint §6.3).
+
+    - irreversible: a cell holding F may not mutate to T
+    - protect: cells whose operands both have authority >= protect may
+      not be overwritten by a lower-authority result
+    - max_contradictions: C cells beyond this count withdraw to N
+    """
+
+    authority: Tuple[Tuple[str, float], ...] = tuple(AUTHORITY.items())
+    protect: float = 0.7
+    irreversible: bool = True
+    max_contradictions: int = 6
+
+    def authority_vector(self) -> np.ndarray:
+        """Authority per state code."""
+        weights = np.zeros(4, dtype=np.float64)
+        for state, value in self.authority:
+            weights[STATE_INDEX[state]] = value
+        return weights
+
+    def apply(self, parents: np.ndarray, children: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Repair children (U, 4, 4) against their parents."""
+        old = np.asarray(parents, dtype=np.int8)
+        new = np.array(children, dtype=np.int8)
+        weights = self.authority_vector()
+
+        # Irreversibility: no F → T resurrection
+        if self.irreversible:
+            revert = (old == F) & (new == T)
+            new[revert] = F
+
+        # Asymmetric authority: protected cells keep their authority level
+        cell_authority = np.minimum(weights[:, None], weights[None, :])
+        protected = cell_authority >= self.protect
+        downgrade = protected & (weights[new] < weights[old])
+        new[downgrade] = old[downgrade]
+
+        # Withdrawal: thin out C-dominant tables towards max_contradictions
+        flat = new.reshape(-1, 16)
+        contradictions = np.count_nonzero(flat == C, axis=1)
+        excess = np.maximum(contradictions - self.max_contradictions, 0)
+        if excess.any():
+            share = np.divide(excess, contradictions, out=np.zeros(len(flat)), where=contradictions > 0)
+            withdraw = (flat == C) & (rng.random(flat.shape) < share[:, None])
+            flat[withdraw] = N
+        return flat.reshape(-1, 4, 4)
+
+
+def mutate(
+    tables: np.ndarray,
+    rng: np.random.Generator,
+    p_local: float = 0.5,
+    p_row: float = 0.1,
+    rules: Optional[StructuralRules] = None,
+) -> np.ndarray:
+    """Local + row/column mutation followed by structural repair."""
+    parents = np.asarray(tables, dtype=np.int8).reshape(-1, 4, 4)
+    children = row_column_mutation(local_mutation(parents, rng, p_local), rng, p_row)
+    return (rules or StructuralRules()).apply(parents, children, rng)
+
+
+# ============================================================
+# Selection
+# ============================================================
+
+
+def selection_probabilities(fitness: np.ndarray, temperature: float) -> np.ndarray:
+    """P(U_i) = e^{R_i/T} / Σ_j e^{R_j/T} (computed stably)."""
+    if temperature <= 0:
+        raise ValueError(f"temperature must be > 0, got {temperature}")
+    logits = np.asarray(fitness, dtype=np.float64) / temperature
+    weights = np.exp(logits - logits.max())
+    return weights / weights.sum()
+
+
+def select_parents(fitness: np.ndarray, temperature: float, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Draw n parent indices with fitness-proportionate (softmax) selection."""
+    probs = selection_probabilities(fitness, temperature)
+    return rng.choice(len(probs), size=n, p=probs)
+
+
+# ============================================================
+# Fitness Evaluation
+# ============================================================
+
+
+@dataclass(frozen=True)
+class FitnessWeights:
+    """Weights of the z-scored fitness components."""
+
+    benchmark: float = 1.0
+    lifetime: float = 1.0
+    elo: float = 1.0
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+@dataclass(frozen=True)
+class _StreamHandle:
+    """Location of the shared input streams."""
+
+    name: str
+    shape: Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class _LifetimeTask:
+    tables: np.ndarray
+    streams: _StreamHandle
+    window: int
+    threshold: float
+
+
+def _mean_lifetimes(task: _LifetimeTask) -> np.ndarray:
+    """Mean lifetime of a population slice on the shared streams (process-pool entry point)."""
+    shm = shared_memory.SharedMemory(name=task.streams.name)
+    try:
+        streams = np.ndarray(task.streams.shape, dtype=np.int8, buffer=shm.buf)
+        lifetimes = consistency_lifetimes(task.tables, streams, task.window, task.threshold)
+        return lifetimes.mean(axis=1)
+    finally:
+        shm.close()
+
+
+# ============================================================
+# Evolution Driver
+# ============================================================
+
+
+@dataclass(frozen=True)
+class EvolutionConfig:
+    """Parameters of an evolutionary run (stored in every checkpoint)."""
+
+    population: int = 256
+    elite: int = 8
+    temperature: float = 1.0
+    p_local: float = 0.5
+    p_row: float = 0.1
+    n_streams: int = 4096
+    length: int = 128
+    window: int = 8
+    threshold: float = 1.5
+    environment: InputEnvironment = field(default_factory=InputEnvironment)
+    rules: StructuralRules = field(default_factory=StructuralRules)
+    weights: FitnessWeights = field(default_factory=FitnessWeights)
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.elite < self.population:
+            raise ValueError(f"elite must be in [0, population), got {self.elite}")
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> "EvolutionConfig":
+        raw = json.loads(text)
+        raw["environment"] = InputEnvironment(**raw["environment"])
+        rules = raw["rules"]
+        rules["authority"] = tuple(tuple(item) for item in rules["authority"])
+        raw["rules"] = StructuralRules(**rules)
+        raw["weights"] = FitnessWeights(**raw["weights"])
+        return cls(**raw)
+
+
+@dataclass(frozen=True)
+class Generation:
+    """An evaluated population."""
+
+    index: int
+    tables: np.ndarray  # int8 (P, 4, 4)
+    scores: np.ndarray  # benchmark score
+    lifetimes: np.ndarray  # mean consistency lifetime
+    ratings: np.ndarray  # ELO after this generation's tournament
+    fitness: np.ndarray  # weighted z-score sum
+
+    def best(self) -> int:
+        """Index of the fittest universe (ties by lowest index)."""
+        return int(np.lexsort((np.arange(len(self.fitness)), -self.fitness))[0])
+
+
+class Evolution:
+    """
+    Resumable evolutionary search over QLF operator tables.
+
+    Example:
+        >>> evo = Evolution(EvolutionConfig(population=128), workers=4, checkpoint_dir="runs/evo")
+        >>> final = evo.run(generations=50)
+        >>> evo = Evolution.resume("runs/evo", workers=4)  # continue later
+    """
+
+    def __init__(
+        self,
+        config: Optional[EvolutionConfig] = None,
+        workers: int = 1,
+        checkpoint_dir: Union[str, Path, None] = None,
+        initial: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Args:
+            config: Run parameters (default EvolutionConfig())
+            workers: Worker processes for lifetime evaluation (1 = inline)
+            checkpoint_dir: Directory for per-generation checkpoints (None = no checkpoints)
+            initial: Optional starting tables; default tiles and mutates the
+                     eight parametric universes
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        self.config = config or EvolutionConfig()
+        self.workers = workers
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir is not None else None
+        self.rng = np.random.default_rng(self.config.seed)
+        self.current: Optional[Generation] = None
+        self._initial = initial
+
+        # The evaluation streams are fixed for the whole run (derived from the seed)
+        stream_rng = np.random.default_rng(np.random.SeedSequence(self.config.seed).spawn(1)[0])
+        self.streams = self.config.environment.sample(stream_rng, self.config.n_streams, self.config.length)
+
+    # ------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------
+
+    @classmethod
+    def resume(cls, checkpoint_dir: Union[str, Path], workers: int = 1) -> "Evolution":
+        """Restore the latest checkpoint in checkpoint_dir.
+
+        Raises:
+            FileNotFoundError: If the directory holds no checkpoint
+        """
+        path = latest_checkpoint(checkpoint_dir)
+        if path is None:
+            raise FileNotFoundError(f"No checkpoint found in {checkpoint_dir}")
+        with np.load(path) as data:
+            config = EvolutionConfig.from_json(str(data["config"]))
+            evolution = cls(config, workers=workers, checkpoint_dir=checkpoint_dir)
+            evolution.current = Generation(
+                index=int(data["index"]),
+                tables=data["tables"],
+                scores=data["scores"],
+                lifetimes=data["lifetimes"],
+                ratings=data["ratings"],
+                fitness=data["fitness"],
+            )
+            evolution.rng.bit_generator.state = json.loads(str(data["rng_state"]))
+        return evolution
+
+    def _save(self, generation: Generation) -> None:
+        if self.checkpoint_dir is None:
+            return
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self.checkpoint_dir / f"{CHECKPOINT_PREFIX}{generation.index:06d}.npz"
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            index=generation.index,
+            tables=generation.tables,
+            scores=generation.scores,
+            lifetimes=generation.lifetimes,
+            ratings=generation.ratings,
+            fitness=generation.fitness,
+            config=self.config.to_json(),
+            rng_state=json.dumps(self.rng.bit_generator.state),
+        )
+        os.replace(tmp, path)  # atomic: a crash never leaves a half-written checkpoint
+
+    # ------------------------------------------------------------
+    # Evolution Loop
+    # ------------------------------------------------------------
+
+    def run(self, generations: int) -> Generation:
+        """Evolve until `generations` generations have been evaluated in total."""
+        shm = None
+        pool = None
+        try:
+            if self.workers > 1:
+                shm = shared_memory.SharedMemory(create=True, size=self.streams.nbytes)
+                np.ndarray(self.streams.shape, dtype=np.int8, buffer=shm.buf)[:] = self.streams
+                pool = ProcessPoolExecutor(max_workers=self.workers)
+            while self.current is None or self.current.index + 1 < generations:
+                self.current = self._step(pool, shm)
+                self._save(self.current)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        assert self.current is not None
+        return self.current
+
+    def _step(self, pool: Optional[ProcessPoolExecutor], shm: Optional[shared_memory.SharedMemory]) -> Generation:
+        cfg = self.config
+        if self.current is None:
+            tables, ratings, index = self._seed_population(), np.full(cfg.population, 1000.0), 0
+        else:
+            tables, ratings = self._breed(self.current)
+            index = self.current.index + 1
+        return self._evaluate(index, tables, ratings, pool, shm)
+
+    def _seed_population(self) -> np.ndarray:
+        if self._initial is not None:
+            base = np.asarray(self._initial, dtype=np.int8).reshape(-1, 4, 4)
+        else:
+            base = stack_tables(parametric_universes())
+        tiled = base[np.arange(self.config.population) % len(base)]
+        mutated = mutate(tiled[len(base) :], self.rng, self.config.p_local, self.config.p_row, self.config.rules)
+        return np.concatenate([tiled[: len(base)], mutated])[: self.config.population]
+
+    def _breed(self, generation: Generation) -> Tuple[np.ndarray, np.ndarray]:
+        cfg = self.config
+        order = np.lexsort((np.arange(len(generation.fitness)), -generation.fitness))
+        elite = order[: cfg.elite]
+        parents = select_parents(generation.fitness, cfg.temperature, cfg.population - cfg.elite, self.rng)
+        children = mutate(generation.tables[parents], self.rng, cfg.p_local, cfg.p_row, cfg.rules)
+        tables = np.concatenate([generation.tables[elite], children])
+        ratings = np.concatenate([generation.ratings[elite], generation.ratings[parents]])  # children inherit
+        return tables, ratings
+
+    def _evaluate(
+        self,
+        index: int,
+        tables: np.ndarray,
+        ratings: np.ndarray,
+        pool: Optional[ProcessPoolExecutor],
+        shm: Optional[shared_memory.SharedMemory],
+    ) -> Generation:
+        cfg = self.config
+        scores = benchmark_scores(tables).astype(np.float64)
+
+        if pool is None or shm is None:
+            lifetimes = consistency_lifetimes(tables, self.streams, cfg.window, cfg.threshold).mean(axis=1)
+        else:
+            handle = _StreamHandle(name=shm.name, shape=self.streams.shape)
+            slices = np.array_split(np.arange(len(tables)), self.workers)
+            tasks = [_LifetimeTask(tables[s], handle, cfg.window, cfg.threshold) for s in slices if len(s)]
+            lifetimes = np.concatenate(list(pool.map(_mean_lifetimes, tasks)))
+
+        # §5.3: universes duel on the same streams by consistency lifetime
+        tournament = EloTournament(weights=(1.0,), seed=cfg.seed + index)
+        elo = tournament.play(tables, ratings=ratings, features=lifetimes[:, None]).ratings
+
+        w = cfg.weights
+        fitness = w.benchmark * _zscore(scores) + w.lifetime * _zscore(lifetimes) + w.elo * _zscore(elo)
+        return Generation(index, tables, scores, lifetimes, elo, fitness)
+
+
+def latest_checkpoint(checkpoint_dir: Union[str, Path]) -> Optional[Path]:
+    """Most recent generation checkpoint in a directory, if any."""
+    paths: List[Path] = sorted(Path(checkpoint_dir).glob(f"{CHECKPOINT_PREFIX}[0-9]*[0-9].npz"))
+    return paths[-1] if paths else None
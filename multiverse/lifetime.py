@@ -0,0 +1,361 @@
+# multiverse/lifetime.py
+"""
+Consistency Lifetime Benchmark (preprint §5.1–5.2).
+
+Every universe starts at s_0 = T and folds a random input stream
+x_t ~ D(p_n, p_c, p_a):
+
+    s_{t+1} = M_U(s_t, x_t)
+
+It collapses at the first step where the entropy of its last k states
+exceeds θ_collapse (the window is pre-filled with s_0, so every step is
+checked). The consistency lifetime τ_U is the number of steps survived
+(τ_U = L when the stream ends first).
+
+Implementation notes:
+- Universes × streams advance together; the Python loop only runs over
+  stream length, in blocks of m steps.
+- A block is one gather: a per-universe LUT maps (last state, m packed
+  inputs) → m packed output states.
+- The recent states are kept as a base-4 window key (2 bits per state).
+  Appending a block is a shift/or/mask, and a precomputed LUT over the
+  key maps to the number of steps survived within the block, so entropy
+  is never recomputed at run time.
+- Streams are generated per chunk from spawned SeedSequences and only
+  (U, L+1) lifetime histograms are kept, so memory is bounded by
+  chunk_size regardless of how many streams are played. Chunks are
+  independent and can run in a process pool; results do not depend on
+  the worker count.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from multiverse.universe import C, F, N, T
+
+# ============================================================
+# Input Environment
+# ============================================================
+
+
+@dataclass(frozen=True)
+class InputEnvironment:
+    """
+    Input distribution D(p_n, p_c, p_a).
+
+    Each step is adversarial (F) with p_adversarial, contradictory (C)
+    with p_conflict, noise (N) with p_noise and a clean signal (T)
+    otherwise.
+    """
+
+    p_noise: float = 0.2
+    p_conflict: float = 0.1
+    p_adversarial: float = 0.05
+
+    def __post_init__(self) -> None:
+        probs = (self.p_noise, self.p_conflict, self.p_adversarial)
+        if any(p < 0 for p in probs) or sum(probs) > 1:
+            raise ValueError(f"Invalid input probabilities {probs}")
+
+    def probabilities(self) -> np.ndarray:
+        """Probability per state code (T, F, N, C)."""
+        probs = np.zeros(4, dtype=np.float64)
+        probs[F] = self.p_adversarial
+        probs[C] = self.p_conflict
+        probs[N] = self.p_noise
+        probs[T] = 1.0 - probs.sum()
+        return probs
+
+    def sample(self, rng: np.random.Generator, n: int, length: int) -> np.ndarray:
+        """Draw n input streams of the given length as int8 state codes (n, length)."""
+        cumulative = np.cumsum(self.probabilities())[:-1]
+        draws = rng.random((n, length), dtype=np.float32)
+        return np.searchsorted(cumulative, draws, side="right").astype(np.int8)
+
+
+# ============================================================
+# Collapse Criterion
+# ============================================================
+
+
+def window_entropy(counts: np.ndarray) -> np.ndarray:
+    """Shannon entropy (bits) of state counts (..., 4) within a window."""
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum(axis=-1, keepdims=True)
+    p = np.divide(counts, total, out=np.zeros_like(counts), where=total > 0)
+    terms = np.where(p > 0, -p * np.log2(np.where(p > 0, p, 1.0)), 0.0)
+    return terms.sum(axis=-1)
+
+
+# Window key LUTs are kept at or below 4^10 entries
+MAX_KEY_STATES = 10
+
+
+def block_steps(window: int) -> int:
+    """Steps folded per gather for a window size (bounded by the LUT size)."""
+    return max(1, min(4, MAX_KEY_STATES + 1 - window))
+
+
+@lru_cache(maxsize=8)
+def survival_table(window: int, threshold: float, block: int) -> np.ndarray:
+    """LUT: window key → steps survived within a block of appended states.
+
+    The key packs the last window + block - 1 states, most recent in the
+    lowest 2 bits. Step i of the block (1..block) is checked on the k
+    states ending at its own output; the value is the number of leading
+    steps whose window entropy stays at or below the threshold.
+    """
+    span = window + block - 1
+    codes = np.arange(4**span, dtype=np.int64)
+    digits = ((codes[:, None] >> (2 * np.arange(span))) & 3).astype(np.int8)  # digit 0 = most recent
+
+    # Entropy contribution of a state seen c times in the window
+    share = np.arange(1, window + 1) / window
+    terms = np.concatenate(([0.0], -share * np.log2(share)))
+
+    steps = np.full(len(codes), block, dtype=np.int8)
+    for i in range(block, 0, -1):
+        states = digits[:, block - i : block - i + window]
+        entropy = sum(terms[np.count_nonzero(states == s, axis=1)] for s in range(4))
+        steps[entropy > threshold + 1e-12] = i - 1
+    steps.setflags(write=False)
+    return steps
+
+
+def block_transitions(tables: np.ndarray, block: int) -> np.ndarray:
+    """Per-universe LUT (U, 4, 4^block): (state, packed inputs) → packed outputs.
+
+    Inputs and outputs pack the first step in the highest bits, so the
+    last output state sits in the lowest 2 bits.
+    """
+    stack = np.asarray(tables, dtype=np.int8).reshape(-1, 16).astype(np.intp)
+    n_universes = len(stack)
+    packed = np.arange(4**block, dtype=np.intp)
+    state = np.broadcast_to(np.arange(4, dtype=np.intp)[None, :, None], (n_universes, 4, 4**block))
+    rows = np.arange(n_universes, dtype=np.intp)[:, None, None]
+    out = np.zeros(state.shape, dtype=np.intp)
+    for i in range(1, block + 1):
+        x = (packed >> (2 * (block - i))) & 3
+        state = stack[rows, state * 4 + x]
+        out = (out << 2) | state
+    return out
+
+
+# ============================================================
+# Lifetime Kernel
+# ============================================================
+
+
+def consistency_lifetimes(
+    tables: np.ndarray,
+    sequences: np.ndarray,
+    window: int = 8,
+    threshold: float = 1.5,
+    initial: int = T,
+) -> np.ndarray:
+    """Lifetime of every universe on every input stream.
+
+    Args:
+        tables: Stack of operator tables (U, 4, 4)
+        sequences: Input streams as state codes (B, L)
+        window: Number of most recent states k in the entropy window
+        threshold: Collapse threshold θ on the window entropy (bits)
+        initial: Starting state s_0 (also pre-fills the window)
+
+    Returns:
+        int32 array (U, B) of steps survived, in [0, L]
+
+    Raises:
+        ValueError: If window is outside [1, MAX_KEY_STATES]
+    """
+    if not 1 <= window <= MAX_KEY_STATES:
+        raise ValueError(f"window must be in [1, {MAX_KEY_STATES}], got {window}")
+    seqs = np.atleast_2d(np.asarray(sequences, dtype=np.int8))
+    batch, length = seqs.shape
+    block = block_steps(window)
+    n_blocks = -(-length // block)
+
+    # Pack inputs block-wise; padding steps are clipped from the lifetime below
+    padded = np.zeros((batch, n_blocks * block), dtype=np.intp)
+    padded[:, :length] = seqs
+    shifts = 2 * np.arange(block - 1, -1, -1)
+    inputs = (padded.reshape(batch, n_blocks, block) << shifts).sum(axis=2).T.copy()
+
+    transitions = block_transitions(tables, block)
+    n_universes = transitions.shape[0]
+    transitions = transitions.ravel()
+    base = (np.arange(n_universes, dtype=np.intp) * 4 ** (block + 1))[:, None]
+    steps = survival_table(window, threshold, block)
+
+    span = window + block - 1
+    mask = np.intp(4**span - 1)
+    filled = sum(initial << (2 * i) for i in range(span))
+    key = np.full((n_universes, batch), filled, dtype=np.intp)
+    alive = np.ones((n_universes, batch), dtype=np.int8)
+    lifetime = np.zeros((n_universes, batch), dtype=np.int32)
+
+    shift = 2 * block
+    for j in range(n_blocks):
+        index = (key & 3) << shift
+        index += base
+        index += inputs[j]
+        key <<= shift
+        key |= transitions[index]
+        key &= mask
+        survived = steps[key] * alive
+        lifetime += survived
+        alive &= survived == block
+        if not alive.any():
+            break
+    return np.minimum(lifetime, length)
+
+
+# ============================================================
+# Streamed Benchmark
+# ============================================================
+
+
+@dataclass(frozen=True)
+class LifetimeReport:
+    """Lifetime distribution per universe accumulated over all streams."""
+
+    histogram: np.ndarray  # int64 (U, L+1): histogram[u, τ] = streams with lifetime τ
+
+    @property
+    def n_sequences(self) -> int:
+        return int(self.histogram[0].sum()) if len(self.histogram) else 0
+
+    @property
+    def length(self) -> int:
+        return self.histogram.shape[1] - 1
+
+    def mean(self) -> np.ndarray:
+        """Mean lifetime per universe."""
+        steps = np.arange(self.length + 1, dtype=np.float64)
+        return (self.histogram @ steps) / max(self.n_sequences, 1)
+
+    def survival_rate(self) -> np.ndarray:
+        """Fraction of streams survived to the end."""
+        return self.histogram[:, -1] / max(self.n_sequences, 1)
+
+    def survival_curve(self) -> np.ndarray:
+        """P(τ >= t) for t = 0..L, shape (U, L+1)."""
+        tail = np.cumsum(self.histogram[:, ::-1], axis=1)[:, ::-1]
+        return tail / max(self.n_sequences, 1)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Smallest lifetime τ with P(lifetime <= τ) >= q, per universe."""
+        cdf = np.cumsum(self.histogram, axis=1)
+        return np.argmax(cdf >= q * self.n_sequences, axis=1)
+
+    def ranking(self) -> np.ndarray:
+        """Universe indices by mean lifetime (desc), ties by index."""
+        mean = self.mean()
+        return np.lexsort((np.arange(len(mean)), -mean))
+
+    def merge(self, other: "LifetimeReport") -> "LifetimeReport":
+        return LifetimeReport(histogram=self.histogram + other.histogram)
+
+
+@dataclass(frozen=True)
+class _LifetimeTask:
+    tables: np.ndarray
+    environment: InputEnvironment
+    length: int
+    window: int
+    threshold: float
+    size: int
+    seed: np.random.SeedSequence
+
+
+def _run_chunk(task: _LifetimeTask) -> np.ndarray:
+    """Generate one chunk of streams and histogram the lifetimes (process-pool entry point)."""
+    rng = np.random.default_rng(task.seed)
+    streams = task.environment.sample(rng, task.size, task.length)
+    lifetimes = consistency_lifetimes(task.tables, streams, task.window, task.threshold)
+    n_universes = lifetimes.shape[0]
+    offsets = (np.arange(n_universes, dtype=np.int64) * (task.length + 1))[:, None]
+    counts = np.bincount((offsets + lifetimes).ravel(), minlength=n_universes * (task.length + 1))
+    return counts.reshape(n_universes, task.length + 1).astype(np.int64)
+
+
+class LifetimeBenchmark:
+    """
+    Seeded consistency-lifetime benchmark over random input streams.
+
+    Example:
+        >>> bench = LifetimeBenchmark(length=128)
+        >>> report = bench.run(stack_tables(parametric_universes()), n_sequences=1_000_000)
+        >>> report.mean()
+    """
+
+    def __init__(
+        self,
+        environment: Optional[InputEnvironment] = None,
+        length: int = 128,
+        window: int = 8,
+        threshold: float = 1.5,
+        workers: int = 1,
+        chunk_size: int = 1 << 12,
+    ) -> None:
+        """
+        Args:
+            environment: Input distribution (default InputEnvironment())
+            length: Stream length L
+            window: Entropy window k
+            threshold: Collapse threshold θ (bits, max 2.0)
+            workers: Worker processes (1 = run inline)
+            chunk_size: Streams generated per chunk (bounds memory)
+        """
+        if length < 1:
+            raise ValueError(f"length must be >= 1, got {length}")
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        self.environment = environment or InputEnvironment()
+        self.length = length
+        self.window = window
+        self.threshold = threshold
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def stream(self, tables: np.ndarray, n_sequences: int, seed: int = 0) -> Iterator[LifetimeReport]:
+        """Yield the report accumulated so far after every chunk."""
+        stack = np.asarray(tables, dtype=np.int8).reshape(-1, 4, 4)
+        tasks = self._tasks(stack, n_sequences, seed)
+        report = LifetimeReport(histogram=np.zeros((len(stack), self.length + 1), dtype=np.int64))
+        if self.workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                report = report.merge(LifetimeReport(histogram=_run_chunk(task)))
+                yield report
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for histogram in pool.map(_run_chunk, tasks):
+                report = report.merge(LifetimeReport(histogram=histogram))
+                yield report
+
+    def run(self, tables: np.ndarray, n_sequences: int, seed: int = 0) -> LifetimeReport:
+        """Play n_sequences seeded streams and return the lifetime distribution."""
+        stack = np.asarray(tables, dtype=np.int8).reshape(-1, 4, 4)
+        report = LifetimeReport(histogram=np.zeros((len(stack), self.length + 1), dtype=np.int64))
+        for report in self.stream(stack, n_sequences, seed):
+            pass
+        return report
+
+    def _tasks(self, stack: np.ndarray, n_sequences: int, seed: int) -> List[_LifetimeTask]:
+        sizes: List[Tuple[int, int]] = [
+            (i, min(self.chunk_size, n_sequences - start))
+            for i, start in enumerate(range(0, n_sequences, self.chunk_size))
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        return [
+            _LifetimeTask(stack, self.environment, self.length, self.window, self.threshold, size, seeds[i])
+            for i, size in sizes
+        ]
@@ -0,0 +1,345 @@
+# multiverse/search.py
+"""
+Universe Search — enumeration and sampling over the 4^16 operator space.
+
+Candidates are packed uint32 words (2 bits per cell, see universe.py).
+Structural constraints are applied in two stages:
+
+1. Cell constraints (identity, absorption, forbidden results) shrink the
+   search space itself: each cell only ranges over its allowed results,
+   and candidates are decoded from a mixed-radix index. Pinning k cells
+   removes a factor of 4^k before anything is generated.
+2. Relational constraints (e.g. commutativity) are vectorized masks on
+   the packed words, applied cheapest-first with survivors compacted
+   after every mask.
+
+Survivors are scored on the legacy benchmark scenarios straight from the
+packed words. Chunks are independent, so a process pool scales the scan
+across cores; results are identical for any worker count.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from multiverse.benchmark import BENCHMARK_CASES, OUTCOME_POINTS, packed_benchmark_scores
+from multiverse.store import write_catalog
+from multiverse.universe import CELL_SHIFTS, STATE_INDEX, STATES, QLFUniverse, cell_values
+
+# ============================================================
+# Structural Constraints
+# ============================================================
+
+
+@dataclass(frozen=True)
+class CellConstraint:
+    """Restrict a ⊕ b to a set of allowed results."""
+
+    a: str
+    b: str
+    allowed: Tuple[str, ...]
+
+    def __post_init__(self) -> None:
+        if not self.allowed:
+            raise ValueError(f"Constraint on {self.a}⊕{self.b} allows no result")
+        for s in (self.a, self.b, *self.allowed):
+            if s not in STATE_INDEX:
+                raise KeyError(f"Unknown state '{s}'")
+
+    @property
+    def cell(self) -> Tuple[int, int]:
+        return STATE_INDEX[self.a], STATE_INDEX[self.b]
+
+    def mask(self, codes: np.ndarray) -> np.ndarray:
+        """Return True where the packed universe satisfies the constraint."""
+        lut = np.zeros(4, dtype=bool)
+        lut[[STATE_INDEX[s] for s in self.allowed]] = True
+        return lut[cell_values(codes, *self.cell)]
+
+
+@dataclass(frozen=True)
+class Commutative:
+    """Require a ⊕ b == b ⊕ a for every pair of states."""
+
+    def mask(self, codes: np.ndarray) -> np.ndarray:
+        words = np.asarray(codes, dtype=np.uint32)
+        keep = np.ones(words.shape, dtype=bool)
+        for a in range(4):
+            for b in range(a + 1, 4):
+                keep &= cell_values(words, a, b) == cell_values(words, b, a)
+        return keep
+
+
+Constraint = Union[CellConstraint, Commutative]
+
+
+def identity(state: str) -> CellConstraint:
+    """Idempotence of a state, e.g. identity("T") enforces T⊕T = T."""
+    return CellConstraint(state, state, (state,))
+
+
+def absorbing(state: str, results: Sequence[str] | None = None) -> List[CellConstraint]:
+    """Row and column of state collapse into results (default: the state itself).
+
+    absorbing("F") enforces F⊕x = x⊕F = F. absorbing("F", ("F", "N")) also
+    admits the soft-convert universes where noise decays to N.
+    """
+    allowed = tuple(results) if results is not None else (state,)
+    constraints = [CellConstraint(state, s, allowed) for s in STATES]
+    constraints += [CellConstraint(s, state, allowed) for s in STATES if s != state]
+    return constraints
+
+
+def forbid(a: str, b: str, result: str) -> CellConstraint:
+    """Forbid one result for a ⊕ b, e.g. forbid("F", "T", "T") (no F→T)."""
+    return CellConstraint(a, b, tuple(s for s in STATES if s != result))
+
+
+# Identity T⊕T = T and N⊕N = N, F absorption (purge or soft-convert),
+# no F→T resurrection, and order-independent operators.
+DEFAULT_CONSTRAINTS: Tuple[Constraint, ...] = (
+    identity("T"),
+    identity("N"),
+    *absorbing("F", ("F", "N")),
+    forbid("F", "T", "T"),
+    Commutative(),
+)
+
+
+# ============================================================
+# Constrained Search Space
+# ============================================================
+
+
+@dataclass(frozen=True)
+class SearchSpace:
+    """
+    Mixed-radix product space of allowed results per cell.
+
+    allowed[k] lists the permitted state codes of cell k (row-major).
+    Index i decodes to one packed universe; size = Π len(allowed[k]).
+    """
+
+    allowed: Tuple[Tuple[int, ...], ...]
+
+    @classmethod
+    def from_constraints(cls, constraints: Sequence[Constraint]) -> "SearchSpace":
+        allowed = [set(range(4)) for _ in range(16)]
+        for constraint in constraints:
+            if isinstance(constraint, CellConstraint):
+                a, b = constraint.cell
+                allowed[4 * a + b] &= {STATE_INDEX[s] for s in constraint.allowed}
+        if any(not cell for cell in allowed):
+            raise ValueError("Constraints are contradictory: a cell has no allowed result")
+        return cls(allowed=tuple(tuple(sorted(cell)) for cell in allowed))
+
+    @property
+    def size(self) -> int:
+        return int(np.prod([len(cell) for cell in self.allowed], dtype=np.uint64))
+
+    def decode(self, indices: np.ndarray) -> np.ndarray:
+        """Decode mixed-radix indices in [0, size) into packed uint32 words."""
+        # size <= 4^16 = 2^32, so every index fits a uint32 digit register
+        rest = np.asarray(indices, dtype=np.uint64).astype(np.uint32)
+        codes = np.zeros(rest.shape, dtype=np.uint32)
+        shifts = CELL_SHIFTS.ravel()
+        for k, cell in enumerate(self.allowed):
+            radix = len(cell)
+            if radix == 1:
+                codes |= np.uint32(cell[0]) << shifts[k]
+                continue
+            if radix & (radix - 1) == 0:
+                # Power-of-two radix: mask and shift instead of integer divide
+                digit = rest & np.uint32(radix - 1)
+                rest >>= np.uint32(radix.bit_length() - 1)
+            else:
+                digit = rest % np.uint32(radix)
+                rest //= np.uint32(radix)
+            if cell != tuple(range(radix)):
+                digit = np.asarray(cell, dtype=np.uint32)[digit]
+            digit <<= shifts[k]
+            codes |= digit
+        return codes
+
+
+# ============================================================
+# Search Results
+# ============================================================
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """Top-k survivors (best first) plus pruning statistics."""
+
+    codes: np.ndarray  # uint32 packed universes
+    scores: np.ndarray  # int64 benchmark scores
+    candidates: int  # candidates generated from the constrained space
+    survivors: int  # candidates passing all masks
+
+    def universes(self) -> List[QLFUniverse]:
+        return [
+            QLFUniverse.from_code(int(code), params={"score": int(score)})
+            for code, score in zip(self.codes, self.scores)
+        ]
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write the survivors to a universe catalog (see multiverse/store.py)."""
+        return write_catalog(
+            path,
+            self.codes,
+            params={i: {"score": int(score)} for i, score in enumerate(self.scores)},
+            meta={"candidates": self.candidates, "survivors": self.survivors},
+        )
+
+
+def _top_k(codes: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Deterministic top-k: highest score first, ties broken by lowest code."""
+    if len(codes) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        cutoff = scores[keep].min()
+        tied = np.flatnonzero(scores >= cutoff)
+        codes, scores = codes[tied], scores[tied]
+    order = np.lexsort((codes, -scores))[:k]
+    return codes[order], scores[order]
+
+
+@dataclass(frozen=True)
+class _ChunkTask:
+    space: SearchSpace
+    masks: Tuple[Constraint, ...]
+    cases: Tuple[Tuple[str, str], ...]
+    points: Tuple[Tuple[str, int], ...]
+    top_k: int
+    start: int = 0
+    stop: int = 0
+    sample_size: int = 0
+    seed: Optional[np.random.SeedSequence] = None
+
+
+def _run_chunk(task: _ChunkTask) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """Generate, prune and score one chunk (process-pool entry point)."""
+    if task.seed is not None:
+        rng = np.random.default_rng(task.seed)
+        indices = rng.integers(0, task.space.size, size=task.sample_size, dtype=np.uint64)
+    else:
+        indices = np.arange(task.start, task.stop, dtype=np.uint64)
+
+    codes = task.space.decode(indices)
+    candidates = len(codes)
+    for constraint in task.masks:
+        codes = codes[constraint.mask(codes)]
+        if not len(codes):
+            break
+
+    scores = packed_benchmark_scores(codes, task.cases, dict(task.points))
+    best_codes, best_scores = _top_k(codes, scores, task.top_k)
+    return best_codes, best_scores, candidates, len(codes)
+
+
+# ============================================================
+# Search Engine
+# ============================================================
+
+
+class UniverseSearch:
+    """
+    Exhaustive or sampled search over constrained QLF operator tables.
+
+    Example:
+        >>> search = UniverseSearch(workers=4)
+        >>> result = search.enumerate(top_k=10)
+        >>> best = result.universes()[0]
+    """
+
+    def __init__(
+        self,
+        constraints: Sequence[Constraint] = DEFAULT_CONSTRAINTS,
+        cases: Sequence[Tuple[str, str]] = BENCHMARK_CASES,
+        points: Dict[str, int] = OUTCOME_POINTS,
+        workers: int = 1,
+        chunk_size: int = 1 << 20,
+    ) -> None:
+        """
+        Args:
+            constraints: Structural constraints; cell constraints shape the
+                         space, the rest are applied as masks in order
+            cases: Benchmark scenarios used to score survivors
+            points: Points per outcome state
+            workers: Worker processes (1 = run inline)
+            chunk_size: Candidates generated per chunk (bounds memory)
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        self.constraints = tuple(constraints)
+        self.space = SearchSpace.from_constraints(self.constraints)
+        self.masks = tuple(c for c in self.constraints if not isinstance(c, CellConstraint))
+        self.cases = tuple(cases)
+        self.points = tuple(points.items())
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def prune(self, codes: np.ndarray) -> np.ndarray:
+        """Filter arbitrary packed universes through every constraint."""
+        survivors = np.asarray(codes, dtype=np.uint32)
+        for constraint in self.constraints:
+            survivors = survivors[constraint.mask(survivors)]
+        return survivors
+
+    def score(self, codes: np.ndarray) -> np.ndarray:
+        """Benchmark scores for packed universes."""
+        return packed_benchmark_scores(codes, self.cases, dict(self.points))
+
+    def enumerate(self, top_k: int = 100) -> SearchResult:
+        """Scan the whole constrained space and keep the top_k universes."""
+        size = self.space.size
+        tasks = [
+            self._task(top_k, start=start, stop=min(start + self.chunk_size, size))
+            for start in range(0, size, self.chunk_size)
+        ]
+        return self._run(tasks, top_k)
+
+    def sample(self, n: int, seed: int = 0, top_k: int = 100) -> SearchResult:
+        """Draw n uniform candidates from the constrained space (seeded)."""
+        n_chunks = max(1, -(-n // self.chunk_size))
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        tasks = [
+            self._task(top_k, sample_size=min(self.chunk_size, n - i * self.chunk_size), seed=s)
+            for i, s in enumerate(seeds)
+        ]
+        return self._run(tasks, top_k)
+
+    def _task(self, top_k: int, **kwargs) -> _ChunkTask:
+        return _ChunkTask(
+            space=self.space,
+            masks=self.masks,
+            cases=self.cases,
+            points=self.points,
+            top_k=top_k,
+            **kwargs,
+        )
+
+    def _run(self, tasks: List[_ChunkTask], top_k: int) -> SearchResult:
+        if top_k < 1:
+            raise ValueError(f"top_k must be >= 1, got {top_k}")
+        if self.workers == 1 or len(tasks) == 1:
+            outputs = [_run_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                outputs = list(pool.map(_run_chunk, tasks))
+
+        codes = np.concatenate([o[0] for o in outputs]) if outputs else np.empty(0, dtype=np.uint32)
+        scores = np.concatenate([o[1] for o in outputs]) if outputs else np.empty(0, dtype=np.int64)
+        best_codes, best_scores = _top_k(codes, scores, top_k)
+        return SearchResult(
+            codes=best_codes,
+            scores=best_scores,
+            candidates=sum(o[2] for o in outputs),
+            survivors=sum(o[3] for o in outputs),
+        )
@@ -0,0 +1,502 @@
+# multiverse/store.py
+"""
+Universe Catalog — single-file binary store for QLF populations.
+
+Layout (little-endian):
+
+    [0:8]    magic b"QLFCAT02"
+    [8:16]   uint64 length of the JSON directory
+    [16:...] JSON directory: record count, catalog meta, param field
+             schema and section descriptors (offset, length, dtype)
+    ...      column sections, each aligned to 64 bytes:
+             code (uint32 packed tables), hash (uint64), parent (int64),
+             generation (int32), elo (float64 latest rating),
+             history_offsets (int64, n+1) + history (float64) for ELO
+             history in CSR form, bucket_start (int64) + bucket_order
+             (int64) for the hash index,
+             param.<j>.present (uint8) + param.<j>.values per param key
+             (int64 / float64 / uint8, or CSR utf-8 bytes with
+             param.<j>.offsets for strings and non-scalar JSON),
+             name_index / name_offsets / name_bytes / name_hash plus a
+             name_bucket_start / name_bucket_order index for labels
+
+Columns are opened with np.memmap, so a catalog with millions of
+universes opens in O(1) and pages in only what the tools touch: the
+directory holds catalog-level metadata only, never per-record values.
+Lookup by hash (or name hash) is O(1) expected: the low bits of the hash
+select a bucket, and the bucket lists the (few) record indices sharing it.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+import hashlib
+import json
+import numbers
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from multiverse.universe import QLFUniverse, universe_hash, unpack_codes
+
+MAGIC = b"QLFCAT02"
+ALIGNMENT = 64
+HASH_CHUNK = 1 << 20
+
+COLUMN_DTYPES: Dict[str, str] = {
+    "code": "<u4",
+    "hash": "<u8",
+    "parent": "<i8",
+    "generation": "<i4",
+    "elo": "<f8",
+    "history_offsets": "<i8",
+    "history": "<f8",
+    "bucket_start": "<i8",
+    "bucket_order": "<i8",
+    "name_index": "<i8",
+    "name_offsets": "<i8",
+    "name_bytes": "|u1",
+    "name_hash": "<u8",
+    "name_bucket_start": "<i8",
+    "name_bucket_order": "<i8",
+}
+
+PARAM_DTYPES: Dict[str, str] = {"bool": "|u1", "int": "<i8", "float": "<f8", "str": "|u1", "json": "|u1"}
+INT64_RANGE = (-(1 << 63), 1 << 63)
+
+PathLike = Union[str, Path]
+
+# ============================================================
+# Hashing & Index
+# ============================================================
+
+
+def packed_hashes(codes: np.ndarray) -> np.ndarray:
+    """universe_hash() of packed universes, unpacked in bounded chunks."""
+    words = np.asarray(codes, dtype=np.uint32).ravel()
+    out = np.empty(len(words), dtype=np.uint64)
+    for start in range(0, len(words), HASH_CHUNK):
+        stop = start + HASH_CHUNK
+        out[start:stop] = universe_hash(unpack_codes(words[start:stop]))
+    return out
+
+
+def _bucket_count(n: int) -> int:
+    return 1 << max(int(n - 1).bit_length(), 0) if n > 1 else 1
+
+
+def build_hash_index(hashes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Bucketed index: bucket = hash & (buckets - 1), CSR over record indices."""
+    keys = np.asarray(hashes, dtype=np.uint64)
+    mask = np.uint64(_bucket_count(len(keys)) - 1)
+    buckets = (keys & mask).astype(np.int64)
+    order = np.argsort(buckets, kind="stable").astype(np.int64)
+    start = np.searchsorted(buckets[order], np.arange(int(mask) + 2)).astype(np.int64)
+    return {"bucket_start": start, "bucket_order": order}
+
+
+def name_hash(name: str) -> int:
+    """Stable 64-bit hash of a record label."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+def probe(keys: np.ndarray, stored: np.ndarray, start: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Record index per key in a bucketed index over stored (-1 when absent)."""
+    found = np.full(len(keys), -1, dtype=np.int64)
+    if not len(stored):
+        return found
+    bucket = (keys & np.uint64(len(start) - 2)).astype(np.int64)
+    pos = start[bucket].copy()
+    end = start[bucket + 1]
+    pending = np.flatnonzero(pos < end)
+    # Buckets hold ~1 record on average; loop over the (short) longest chain
+    while len(pending):
+        candidates = order[pos[pending]]
+        hit = stored[candidates] == keys[pending]
+        found[pending[hit]] = candidates[hit]
+        pos[pending] += 1
+        pending = pending[~hit & (pos[pending] < end[pending])]
+    return found
+
+
+# ============================================================
+# Writer
+# ============================================================
+
+
+def write_catalog(
+    path: PathLike,
+    codes: np.ndarray,
+    *,
+    parents: Optional[np.ndarray] = None,
+    generations: Optional[np.ndarray] = None,
+    elo_history: Optional[Sequence[Sequence[float]]] = None,
+    params: Optional[Mapping[int, Dict[str, Any]]] = None,
+    names: Optional[Mapping[int, str]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Write a catalog file atomically.
+
+    Args:
+        path: Target file
+        codes: Packed uint32 universes (N,)
+        parents: Parent record index per universe (-1 = root)
+        generations: Generation per universe (default 0)
+        elo_history: Ratings over time per universe (latest last)
+        params: Sparse per-record parameters {index: {...}} (JSON-serializable)
+        names: Sparse record labels {index: "u6"} for UniverseLoader.load(id=...)
+        meta: Catalog-level metadata (JSON-serializable)
+
+    Returns:
+        Path of the written catalog
+    """
+    words = np.ascontiguousarray(codes, dtype=np.uint32).ravel()
+    n = len(words)
+    hashes = packed_hashes(words)
+    if elo_history is None:
+        lengths = np.zeros(n, dtype=np.int64)
+        flat = np.empty(0, dtype=np.float64)
+    else:
+        if len(elo_history) != n:
+            raise ValueError(f"elo_history has {len(elo_history)} entries for {n} universes")
+        lengths = np.fromiter((len(h) for h in elo_history), dtype=np.int64, count=n)
+        flat = np.fromiter((r for h in elo_history for r in h), dtype=np.float64, count=int(lengths.sum()))
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    latest = np.full(n, np.nan)
+    latest[lengths > 0] = flat[offsets[1:][lengths > 0] - 1]
+
+    columns: Dict[str, np.ndarray] = {
+        "code": words,
+        "hash": hashes,
+        "parent": _column(parents, n, -1, "parents"),
+        "generation": _column(generations, n, 0, "generations"),
+        "elo": latest,
+        "history_offsets": offsets,
+        "history": flat,
+        **build_hash_index(hashes),
+        **_name_columns(names or {}, n),
+    }
+    fields, param_columns = _param_columns(params or {}, n)
+    columns.update(param_columns)
+    dtypes = {name: COLUMN_DTYPES.get(name) or columns[name].dtype.str for name in columns}
+
+    directory: Dict[str, Any] = {"count": n, "meta": meta or {}, "fields": fields, "sections": {}}
+    # Offsets depend on the directory size: reserve room for their digits, then pad the JSON
+    sizes = {name: columns[name].astype(dtypes[name], copy=False).nbytes for name in columns}
+    for name in columns:
+        directory["sections"][name] = {"offset": 0, "length": len(columns[name]), "dtype": dtypes[name]}
+    header_len = len(json.dumps(directory)) + 16 * len(columns) * 2
+    cursor = _align(16 + header_len)
+    for name in columns:
+        directory["sections"][name]["offset"] = cursor
+        cursor = _align(cursor + sizes[name])
+    header = json.dumps(directory).encode()
+    header += b" " * (header_len - len(header))
+
+    target = Path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name in columns:
+            fh.seek(directory["sections"][name]["offset"])
+            fh.write(columns[name].astype(dtypes[name], copy=False).tobytes())
+        fh.truncate(cursor)
+    os.replace(tmp, target)
+    return target
+
+
+def _strings(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR utf-8 encoding: (offsets (k+1,), bytes)."""
+    encoded = [t.encode() for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _check_indices(indices: np.ndarray, n: int, label: str) -> None:
+    bad = indices[(indices < 0) | (indices >= n)]
+    if len(bad):
+        raise ValueError(f"{label} index {int(bad[0])} out of range [0, {n})")
+
+
+def _name_columns(names: Mapping[int, str], n: int) -> Dict[str, np.ndarray]:
+    """Labels sorted by record index, plus a hash index over the labels."""
+    index = np.array(sorted(int(i) for i in names), dtype=np.int64)
+    _check_indices(index, n, "names")
+    labels = [names[int(i)] for i in index]
+    if len(set(labels)) != len(labels):
+        raise ValueError("names must be unique")
+    offsets, blob = _strings(labels)
+    hashes = np.fromiter((name_hash(label) for label in labels), dtype=np.uint64, count=len(labels))
+    buckets = build_hash_index(hashes)
+    return {
+        "name_index": index,
+        "name_offsets": offsets,
+        "name_bytes": blob,
+        "name_hash": hashes,
+        "name_bucket_start": buckets["bucket_start"],
+        "name_bucket_order": buckets["bucket_order"],
+    }
+
+
+def _param_kind(values: Sequence[Any]) -> str:
+    if all(isinstance(v, (bool, np.bool_)) for v in values):
+        return "bool"
+    if all(isinstance(v, numbers.Integral) and not isinstance(v, bool) for v in values):
+        return "int" if all(INT64_RANGE[0] <= int(v) < INT64_RANGE[1] for v in values) else "json"
+    if all(isinstance(v, numbers.Real) and not isinstance(v, (bool, np.bool_)) for v in values):
+        return "float"
+    return "str" if all(isinstance(v, str) for v in values) else "json"
+
+
+def _param_columns(params: Mapping[int, Dict[str, Any]], n: int) -> Tuple[List[Dict[str, str]], Dict[str, np.ndarray]]:
+    """One present mask and one value column (or CSR text) per param key."""
+    _check_indices(np.array([int(i) for i in params], dtype=np.int64), n, "params")
+    keys = list(dict.fromkeys(key for p in params.values() for key in p))
+    fields: List[Dict[str, str]] = []
+    columns: Dict[str, np.ndarray] = {}
+    for j, key in enumerate(keys):
+        rows = [int(i) for i, p in params.items() if key in p]
+        values = [params[i][key] for i in rows]
+        kind = _param_kind(values)
+        present = np.zeros(n, dtype=np.uint8)
+        present[rows] = 1
+        prefix = f"param.{j}"
+        columns[f"{prefix}.present"] = present
+        if kind in ("str", "json"):
+            texts = [""] * n
+            for i, v in zip(rows, values):
+                texts[i] = v if kind == "str" else json.dumps(v)
+            columns[f"{prefix}.offsets"], columns[f"{prefix}.values"] = _strings(texts)
+        else:
+            column = np.zeros(n, dtype=PARAM_DTYPES[kind])
+            column[rows] = values
+            columns[f"{prefix}.values"] = column
+        fields.append({"key": key, "kind": kind})
+    return fields, columns
+
+
+def _column(values: Optional[np.ndarray], n: int, default: int, label: str) -> np.ndarray:
+    if values is None:
+        return np.full(n, default, dtype=np.int64)
+    arr = np.asarray(values).ravel()
+    if len(arr) != n:
+        raise ValueError(f"{label} has {len(arr)} entries for {n} universes")
+    return arr
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+# ============================================================
+# Reader
+# ============================================================
+
+
+class UniverseCatalog:
+    """
+    Memory-mapped view of a catalog file.
+
+    Example:
+        >>> catalog = UniverseCatalog("population.qlfc")
+        >>> result = EloTournament().play(catalog.tables())
+        >>> catalog.index_of(catalog.hashes[42]) == 42
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        """
+        Raises:
+            ValueError: If the file is not a universe catalog
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a universe catalog")
+            (header_len,) = struct.unpack("<Q", fh.read(8))
+            directory = json.loads(fh.read(header_len))
+        self.meta: Dict[str, Any] = directory["meta"]
+        self.fields: List[Dict[str, str]] = directory["fields"]
+        self._count = int(directory["count"])
+        self._columns = {name: self._map(spec) for name, spec in directory["sections"].items()}
+        self._names: Optional[Dict[str, int]] = None
+
+    def _map(self, spec: Dict[str, Any]) -> np.ndarray:
+        if spec["length"] == 0:
+            return np.empty(0, dtype=spec["dtype"])
+        return np.memmap(self.path, dtype=spec["dtype"], mode="r", offset=spec["offset"], shape=(spec["length"],))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, (int, np.integer, str)) and self.index_of(key) >= 0
+
+    # ------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Packed uint32 universes (memory-mapped)."""
+        return self._columns["code"]
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._columns["hash"]
+
+    @property
+    def parents(self) -> np.ndarray:
+        return self._columns["parent"]
+
+    @property
+    def generations(self) -> np.ndarray:
+        return self._columns["generation"]
+
+    @property
+    def elo(self) -> np.ndarray:
+        """Latest ELO rating per universe (NaN without history)."""
+        return self._columns["elo"]
+
+    def tables(self, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Unpacked (N, 4, 4) tables for all or selected records."""
+        codes = self.codes if indices is None else self.codes[np.asarray(indices)]
+        return unpack_codes(np.asarray(codes))
+
+    def elo_history(self, index: int) -> np.ndarray:
+        offsets = self._columns["history_offsets"]
+        return np.array(self._columns["history"][offsets[index] : offsets[index + 1]])
+
+    def params(self, index: int) -> Dict[str, Any]:
+        """Stored params of one record, decoded from the param columns."""
+        i = int(index)
+        out: Dict[str, Any] = {}
+        for j, field in enumerate(self.fields):
+            prefix = f"param.{j}"
+            if not self._columns[f"{prefix}.present"][i]:
+                continue
+            values = self._columns[f"{prefix}.values"]
+            kind = field["kind"]
+            if kind in ("str", "json"):
+                offsets = self._columns[f"{prefix}.offsets"]
+                text = bytes(values[offsets[i] : offsets[i + 1]]).decode()
+                out[field["key"]] = text if kind == "str" else json.loads(text)
+            else:
+                out[field["key"]] = {"bool": bool, "int": int, "float": float}[kind](values[i])
+        return out
+
+    def name(self, index: int) -> Optional[str]:
+        """Label of one record, None when unnamed."""
+        labelled = self._columns["name_index"]
+        k = int(np.searchsorted(labelled, int(index)))
+        if k == len(labelled) or labelled[k] != int(index):
+            return None
+        return self._label(k)
+
+    @property
+    def names(self) -> Dict[str, int]:
+        """Label → record index for every named record (decoded on first access)."""
+        if self._names is None:
+            labelled = self._columns["name_index"]
+            self._names = {self._label(k): int(labelled[k]) for k in range(len(labelled))}
+        return self._names
+
+    def _label(self, k: int) -> str:
+        offsets = self._columns["name_offsets"]
+        return bytes(self._columns["name_bytes"][offsets[k] : offsets[k + 1]]).decode()
+
+    def lineage(self, index: int) -> List[int]:
+        """Record indices from this universe back to its root."""
+        chain = [int(index)]
+        while self.parents[chain[-1]] >= 0 and len(chain) <= self._count:
+            chain.append(int(self.parents[chain[-1]]))
+        return chain
+
+    # ------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """Record index per hash (-1 when absent), vectorized."""
+        keys = np.atleast_1d(np.asarray(hashes, dtype=np.uint64))
+        return probe(keys, self.hashes, self._columns["bucket_start"], self._columns["bucket_order"])
+
+    def index_of(self, key: Union[int, np.integer, str]) -> int:
+        """Record index for a hash (int or 16-hex string), -1 when absent or not a 64-bit hash."""
+        try:
+            value = int(key, 16) if isinstance(key, str) else int(key)
+        except ValueError:
+            return -1
+        if not 0 <= value < 1 << 64:
+            return -1
+        return int(self.lookup(np.array([value], dtype=np.uint64))[0])
+
+    def index_of_name(self, name: str) -> int:
+        """Record index for a label, -1 when absent."""
+        keys = np.array([name_hash(name)], dtype=np.uint64)
+        k = int(
+            probe(
+                keys, self._columns["name_hash"], self._columns["name_bucket_start"], self._columns["name_bucket_order"]
+            )[0]
+        )
+        if k < 0 or self._label(k) != name:
+            return -1
+        return int(self._columns["name_index"][k])
+
+    def universe(self, index: int) -> QLFUniverse:
+        """Materialize one record with hash, lineage and latest ELO in params."""
+        i = int(index)
+        if not 0 <= i < self._count:
+            raise IndexError(f"Catalog index {i} out of range [0, {self._count})")
+        params = {
+            **self.params(i),
+            "index": i,
+            "hash": f"{int(self.hashes[i]):016x}",
+            "parent": int(self.parents[i]),
+            "generation": int(self.generations[i]),
+            "elo": float(self.elo[i]),
+        }
+        return QLFUniverse.from_code(int(self.codes[i]), params=params)
+
+
+# ============================================================
+# Loader (MULTIVERSE_LOGIC_FRAMEWORK §5)
+# ============================================================
+
+
+class UniverseLoader:
+    """
+    Resolve universes from a catalog by name, hash or record index.
+
+    Example:
+        >>> loader = UniverseLoader("QLF_Universes.qlfc")
+        >>> u6 = loader.load(id="u6")
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.catalog = UniverseCatalog(path)
+
+    def load(self, id: Union[int, str]) -> QLFUniverse:
+        """Load one universe.
+
+        Args:
+            id: Catalog name (e.g. "u6"), 16-hex hash, or record index
+
+        Raises:
+            KeyError: If no universe matches
+        """
+        if isinstance(id, str):
+            index = self.catalog.index_of_name(id)
+            if index < 0:
+                index = self.catalog.index_of(id)
+        else:
+            index = int(id) if 0 <= int(id) < len(self.catalog) else -1
+        if index < 0:
+            raise KeyError(f"Universe '{id}' not found in {self.catalog.path}")
+        return self.catalog.universe(index)
+
+    def load_all(self) -> List[QLFUniverse]:
+        """Materialize every record (use catalog.tables() for large populations)."""
+        return [self.catalog.universe(i) for i in range(len(self.catalog))]
@@ -0,0 +1,342 @@
+# multiverse/tournament.py
+"""
+ELO Tournament Engine for QLF universes.
+
+Each universe is reduced once to a feature vector (by default its state
+histogram: counts of T/F/N/C cells). A duel compares feature vectors
+component-wise, so match results for any set of pairs are one matrix
+operation instead of per-cell DataFrame lookups:
+
+    S_ij = Σ_k w_k · ½(1 + sign(f_ik − f_jk)) / Σ_k w_k
+
+With the default weights only the T count matters, which reproduces the
+legacy eval_duel. Because S_ij is a weighted sum of per-feature
+comparisons, all-pairs points (Copeland score) are computed per feature
+by sorting in O(U log U) instead of materializing the U × U matrix.
+
+ELO is played in rounds: every universe plays at most one match per
+round and both sides are updated together, so a round is one vectorized
+step. Schedules are derived from the seed and therefore reproducible.
+Large populations are sharded into divisions that play their round
+robins in a process pool, followed by seeded cross-division rounds.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Legacy eval_duel: only the number of T cells counts
+DUEL_WEIGHTS: Tuple[float, float, float, float] = (1.0, 0.0, 0.0, 0.0)
+
+# ============================================================
+# Features & Match Scoring
+# ============================================================
+
+
+def universe_features(tables: np.ndarray) -> np.ndarray:
+    """State histogram per universe.
+
+    Args:
+        tables: Stack of operator tables (U, 4, 4)
+
+    Returns:
+        float64 array (U, 4) with counts of T, F, N, C cells
+    """
+    cells = np.asarray(tables, dtype=np.int8).reshape(-1, 16)
+    counts = np.zeros((cells.shape[0], 4), dtype=np.float64)
+    for state in range(4):
+        counts[:, state] = np.count_nonzero(cells == state, axis=1)
+    return counts
+
+
+def _normalized(weights: Sequence[float]) -> np.ndarray:
+    w = np.asarray(weights, dtype=np.float64)
+    if w.ndim != 1 or np.any(w < 0) or w.sum() <= 0:
+        raise ValueError("Duel weights must be non-negative with a positive sum")
+    return w / w.sum()
+
+
+def match_results(
+    features_a: np.ndarray,
+    features_b: np.ndarray,
+    weights: Sequence[float] = DUEL_WEIGHTS,
+) -> np.ndarray:
+    """Score S of a against b in [0, 1] (1 win, 0.5 draw, 0 loss).
+
+    Args:
+        features_a: Feature vectors (..., K)
+        features_b: Feature vectors broadcastable against features_a
+        weights: K non-negative feature weights
+
+    Returns:
+        float64 array with the broadcast shape of the inputs minus K
+    """
+    wins = 0.5 * (1.0 + np.sign(np.asarray(features_a) - np.asarray(features_b)))
+    return wins @ _normalized(weights)
+
+
+def pair_points(features: np.ndarray, weights: Sequence[float] = DUEL_WEIGHTS) -> np.ndarray:
+    """Total score of every universe against every other universe.
+
+    Equals Σ_{j≠i} S_ij without building the U × U matrix: for each
+    feature, wins and draws follow from the rank of f_ik in the sorted
+    column (O(U log U) per feature).
+    """
+    feats = np.atleast_2d(np.asarray(features, dtype=np.float64))
+    w = _normalized(weights)
+    points = np.zeros(feats.shape[0], dtype=np.float64)
+    for k in np.flatnonzero(w):
+        column = feats[:, k]
+        ordered = np.sort(column)
+        below = np.searchsorted(ordered, column, side="left")
+        ties = np.searchsorted(ordered, column, side="right") - below - 1  # exclude self
+        points += w[k] * (below + 0.5 * ties)
+    return points
+
+
+# ============================================================
+# ELO Math
+# ============================================================
+
+
+def elo_expected(rating_a: np.ndarray, rating_b: np.ndarray) -> np.ndarray:
+    """Expected score E_a = 1 / (1 + 10^((R_b - R_a) / 400))."""
+    return 1.0 / (1.0 + 10.0 ** ((np.asarray(rating_b) - np.asarray(rating_a)) / 400.0))
+
+
+def elo_update(rating_a: np.ndarray, rating_b: np.ndarray, result: np.ndarray, k: float = 32.0) -> np.ndarray:
+    """New rating of a after scoring result against b: R_a + K (S - E_a)."""
+    return np.asarray(rating_a) + k * (np.asarray(result) - elo_expected(rating_a, rating_b))
+
+
+# ============================================================
+# Schedules
+# ============================================================
+
+
+def round_robin_schedule(n: int, seed: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Circle-method round robin: every pair meets exactly once.
+
+    Players are shuffled once with the seed; odd populations get a bye.
+
+    Yields:
+        (home, away) index arrays for each of the n - 1 (or n) rounds
+    """
+    order = np.random.default_rng(seed).permutation(n)
+    yield from _circle_rounds(order[None, :])
+
+
+def _circle_rounds(orders: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Circle-method rounds for several groups at once.
+
+    Args:
+        orders: (G, S) player indices per group, -1 marks an empty seat
+
+    Yields:
+        Flattened (home, away) arrays covering every group's round
+    """
+    if orders.shape[1] % 2:
+        orders = np.pad(orders, ((0, 0), (0, 1)), constant_values=-1)  # bye
+    size = orders.shape[1]
+    half = size // 2
+    seats = np.arange(size)
+    for _ in range(size - 1):
+        home, away = orders[:, seats[:half]], orders[:, seats[half:][::-1]]
+        played = (home >= 0) & (away >= 0)
+        yield home[played], away[played]
+        seats = np.concatenate(([seats[0]], [seats[-1]], seats[1:-1]))
+
+
+def random_pairing_schedule(n: int, rounds: int, seed: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Random pairings per round (Swiss-style sampling across a population)."""
+    rng = np.random.default_rng(seed)
+    half = n // 2
+    for _ in range(rounds):
+        order = rng.permutation(n)
+        yield order[:half], order[half : 2 * half]
+
+
+def play_rounds(
+    features: np.ndarray,
+    ratings: np.ndarray,
+    schedule: Iterator[Tuple[np.ndarray, np.ndarray]],
+    weights: Sequence[float] = DUEL_WEIGHTS,
+    k: float = 32.0,
+) -> Tuple[np.ndarray, int]:
+    """Apply ELO updates for every round of a schedule.
+
+    Returns:
+        (new ratings, number of matches played)
+    """
+    current = np.array(ratings, dtype=np.float64)
+    matches = 0
+    for home, away in schedule:
+        result = match_results(features[home], features[away], weights)
+        r_home, r_away = current[home], current[away]
+        current[home] = elo_update(r_home, r_away, result, k)
+        current[away] = elo_update(r_away, r_home, 1.0 - result, k)
+        matches += len(home)
+    return current, matches
+
+
+@dataclass(frozen=True)
+class _DivisionTask:
+    features: np.ndarray  # (M, K) features of the members
+    ratings: np.ndarray  # (M,) starting ratings of the members
+    orders: np.ndarray  # (D, S) local member indices per division, -1 padded
+    weights: Tuple[float, ...]
+    k: float
+    cycles: int
+
+
+def _play_divisions(task: _DivisionTask) -> Tuple[np.ndarray, int]:
+    """Round robins of a batch of divisions, played side by side (process-pool entry point)."""
+    current, matches = task.ratings, 0
+    for _ in range(task.cycles):
+        current, played = play_rounds(task.features, current, _circle_rounds(task.orders), task.weights, task.k)
+        matches += played
+    return current, matches
+
+
+# ============================================================
+# Tournament
+# ============================================================
+
+
+@dataclass(frozen=True)
+class TournamentResult:
+    """Final ratings and all-pairs points per universe."""
+
+    ratings: np.ndarray  # float64 (U,)
+    points: np.ndarray  # float64 (U,) total score vs every other universe
+    matches: int
+
+    def ranking(self) -> np.ndarray:
+        """Universe indices ordered by rating (desc), ties by index."""
+        return np.lexsort((np.arange(len(self.ratings)), -self.ratings))
+
+
+class EloTournament:
+    """
+    Vectorized, reproducible ELO tournament over a stack of universes.
+
+    Populations up to division_size play a full round robin. Larger
+    populations are split (seeded) into divisions that each play a round
+    robin in a worker process, then cross_rounds random-pairing rounds
+    over the whole population mix the divisions. Results do not depend
+    on the worker count.
+
+    Example:
+        >>> tournament = EloTournament(seed=7)
+        >>> result = tournament.play(stack_tables(parametric_universes()))
+        >>> champion = result.ranking()[0]
+    """
+
+    def __init__(
+        self,
+        k: float = 32.0,
+        initial_rating: float = 1000.0,
+        weights: Sequence[float] = DUEL_WEIGHTS,
+        seed: int = 0,
+        workers: int = 1,
+        division_size: int = 1024,
+        cross_rounds: int = 32,
+    ) -> None:
+        """
+        Args:
+            k: ELO K-factor
+            initial_rating: Starting rating for every universe
+            weights: Feature weights forming the duel (default: T count only)
+            seed: Schedule seed (same seed → same matches → same ratings)
+            workers: Worker processes for division round robins
+            division_size: Maximum universes per division
+            cross_rounds: Random-pairing rounds across divisions
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if division_size < 2:
+            raise ValueError(f"division_size must be >= 2, got {division_size}")
+        _normalized(weights)
+        self.k = k
+        self.initial_rating = initial_rating
+        self.weights = tuple(weights)
+        self.seed = seed
+        self.workers = workers
+        self.division_size = division_size
+        self.cross_rounds = cross_rounds
+
+    def play(
+        self,
+        tables: np.ndarray,
+        cycles: int = 1,
+        ratings: Optional[np.ndarray] = None,
+        features: Optional[np.ndarray] = None,
+    ) -> TournamentResult:
+        """Run the tournament.
+
+        Args:
+            tables: Stack of operator tables (U, 4, 4)
+            cycles: Round robins to play per division
+            ratings: Optional starting ratings (e.g. previous generation)
+            features: Optional precomputed (U, K) features; defaults to the
+                      state histogram of each table
+
+        Returns:
+            TournamentResult with ratings and all-pairs points
+        """
+        feats = universe_features(tables) if features is None else np.asarray(features, dtype=np.float64)
+        n = len(feats)
+        if ratings is None:
+            start = np.full(n, self.initial_rating, dtype=np.float64)
+        else:
+            start = np.array(ratings, dtype=np.float64)
+
+        # Zero-weight features never decide a duel: drop them from the match loop
+        active = np.flatnonzero(self.weights)
+        duel_feats, duel_weights = feats[:, active], tuple(self.weights[i] for i in active)
+
+        divisions = self._divisions(n)
+        batches = np.array_split(np.arange(len(divisions)), min(self.workers, len(divisions)))
+        width = max(len(d) for d in divisions)
+        tasks, members = [], []
+        for batch in batches:
+            idx = np.concatenate([divisions[d] for d in batch])
+            orders = np.full((len(batch), width), -1, dtype=np.int64)
+            offset = 0
+            for row, d in enumerate(batch):
+                size = len(divisions[d])
+                orders[row, :size] = offset + np.random.default_rng([self.seed, int(d)]).permutation(size)
+                offset += size
+            members.append(idx)
+            tasks.append(_DivisionTask(duel_feats[idx], start[idx], orders, duel_weights, self.k, cycles))
+
+        if len(tasks) == 1:
+            outputs = [_play_divisions(tasks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                outputs = list(pool.map(_play_divisions, tasks))
+
+        current = start.copy()
+        matches = 0
+        for idx, (batch_ratings, played) in zip(members, outputs):
+            current[idx] = batch_ratings
+            matches += played
+
+        if len(divisions) > 1:
+            schedule = random_pairing_schedule(n, self.cross_rounds, seed=self.seed)
+            current, played = play_rounds(duel_feats, current, schedule, duel_weights, self.k)
+            matches += played
+
+        points = pair_points(feats, self.weights)
+        return TournamentResult(ratings=current, points=points, matches=matches)
+
+    def _divisions(self, n: int) -> List[np.ndarray]:
+        if n <= self.division_size:
+            return [np.arange(n)]
+        order = np.random.default_rng(self.seed).permutation(n)
+        n_divisions = -(-n // self.division_size)
+        return [np.sort(part) for part in np.array_split(order, n_divisions)]
@@ -0,0 +1,353 @@
+# multiverse/universe.py
+"""
+QLF Universe Engine — compiled 4×4 operator tables.
+
+A universe U is defined by its operator table M_U(i, j) = i ⊕_U j over the
+quaternary truth set {T, F, N, C}. Tables are held as (4, 4) int8 arrays so
+that lookups, sequence composition and batch evaluation are plain NumPy
+fancy indexing instead of per-cell DataFrame access.
+
+State encoding (fixed, matches the legacy CSV row/column order):
+    T = 0, F = 1, N = 2, C = 3
+
+Packed encoding: 2 bits per cell, cell (a, b) at bit offset 2 * (4a + b),
+so a whole table fits one uint32 word and the full operator space is
+exactly the 4^16 = 2^32 range of that word.
+
+Sandbox layer: research tooling only, no capital authority.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# State Encoding
+# ============================================================
+
+STATES: Tuple[str, ...] = ("T", "F", "N", "C")
+STATE_INDEX: Dict[str, int] = {s: i for i, s in enumerate(STATES)}
+
+T, F, N, C = 0, 1, 2, 3
+
+# Parameter switches of the legacy generator (QEFC/QLF_MULTIVERSE.py)
+QLF_OPTIONS: Dict[str, Tuple[str, str]] = {
+    "Q1": ("Stable", "Collapse"),
+    "Q2": ("Passive", "Catalyst"),
+    "Q3": ("Hard-Purge", "Soft-Convert"),
+}
+
+# Bit offset of every cell in the packed uint32 encoding (row-major)
+CELL_SHIFTS: np.ndarray = (2 * np.arange(16, dtype=np.uint32)).reshape(4, 4)
+
+# 64-bit FNV-1a constants (stable across processes and platforms)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+StateInput = Union[str, Sequence[str], Sequence[int], np.ndarray]
+
+
+def encode_states(states: StateInput) -> np.ndarray:
+    """Encode a state sequence to an int8 array.
+
+    Args:
+        states: String such as "TFNC", sequence of state symbols, or an
+                integer array already in {0, 1, 2, 3}
+
+    Returns:
+        int8 array of state codes with the same shape as the input
+
+    Raises:
+        KeyError: If a symbol is not one of T/F/N/C
+        ValueError: If an integer code is outside [0, 3]
+    """
+    if isinstance(states, str):
+        return np.fromiter((STATE_INDEX[s] for s in states), dtype=np.int8, count=len(states))
+
+    arr = np.asarray(states)
+    if arr.dtype.kind in ("U", "S", "O"):
+        lookup = np.vectorize(lambda s: STATE_INDEX[str(s).strip()], otypes=[np.int8])
+        return lookup(arr) if arr.size else arr.astype(np.int8)
+
+    codes = arr.astype(np.int8, copy=False)
+    if codes.size and (codes.min() < 0 or codes.max() > 3):
+        raise ValueError("State codes must be in [0, 3]")
+    return codes
+
+
+def decode_states(codes: Iterable[int]) -> List[str]:
+    """Decode integer state codes back to T/F/N/C symbols."""
+    return [STATES[int(c)] for c in np.asarray(codes).ravel()]
+
+
+# ============================================================
+# Vectorized Table Operations
+# ============================================================
+
+
+def universe_hash(tables: np.ndarray) -> np.ndarray:
+    """Stable 64-bit FNV-1a hash of one or many operator tables.
+
+    Args:
+        tables: Array of shape (..., 4, 4) with state codes
+
+    Returns:
+        uint64 array of shape (...) — one hash per table
+    """
+    arr = np.asarray(tables)
+    cells = arr.reshape(-1, 16).astype(np.uint64)
+    h = np.full(cells.shape[0], _FNV_OFFSET, dtype=np.uint64)
+    for k in range(16):
+        h ^= cells[:, k]
+        h *= _FNV_PRIME
+    return h.reshape(arr.shape[:-2])
+
+
+def pack_tables(tables: np.ndarray) -> np.ndarray:
+    """Pack operator tables into uint32 words (2 bits per cell).
+
+    Args:
+        tables: Array of shape (..., 4, 4) with state codes
+
+    Returns:
+        uint32 array of shape (...)
+    """
+    arr = np.asarray(tables)
+    cells = arr.reshape(-1, 16).astype(np.uint32)
+    codes = np.bitwise_or.reduce(cells << CELL_SHIFTS.ravel(), axis=1)
+    return codes.astype(np.uint32).reshape(arr.shape[:-2])
+
+
+def unpack_codes(codes: Union[int, np.ndarray]) -> np.ndarray:
+    """Unpack uint32 words into operator tables.
+
+    Returns:
+        int8 array of shape (..., 4, 4)
+    """
+    words = np.asarray(codes, dtype=np.uint32)
+    cells = (words[..., np.newaxis] >> CELL_SHIFTS.ravel()) & np.uint32(3)
+    return cells.astype(np.int8).reshape(words.shape + (4, 4))
+
+
+def cell_values(codes: np.ndarray, a: int, b: int) -> np.ndarray:
+    """Read cell a ⊕ b straight from packed words without unpacking."""
+    return (np.asarray(codes, dtype=np.uint32) >> CELL_SHIFTS[a, b]) & np.uint32(3)
+
+
+def evaluate_pairs(tables: np.ndarray, a: StateInput, b: StateInput) -> np.ndarray:
+    """Batch-evaluate a ⊕ b for millions of pairs.
+
+    Args:
+        tables: Single table (4, 4) or stack (U, 4, 4)
+        a: Left operands, shape (P,)
+        b: Right operands, shape (P,)
+
+    Returns:
+        int8 array of shape (P,) for a single table, (U, P) for a stack
+    """
+    stack = np.asarray(tables, dtype=np.int8)
+    left = encode_states(a).astype(np.intp)
+    right = encode_states(b).astype(np.intp)
+    if stack.ndim == 2:
+        return stack[left, right]
+    return stack[:, left, right]
+
+
+def fold_many(
+    tables: np.ndarray,
+    sequences: StateInput,
+    initial: Union[int, np.ndarray, None] = None,
+) -> np.ndarray:
+    """Left-fold every table over every state sequence.
+
+    s_0 = initial (or x_0), s_{t+1} = M_U(s_t, x_t)
+
+    The loop runs over sequence length only; universes and sequences are
+    advanced together with one fancy-indexing gather per step.
+
+    Args:
+        tables: Stack of tables (U, 4, 4)
+        sequences: State sequences (B, L) or a single sequence (L,)
+        initial: Optional starting state; if None the first element of
+                 each sequence seeds the fold
+
+    Returns:
+        int8 array of final states with shape (U, B)
+    """
+    stack = np.asarray(tables, dtype=np.int8)
+    seqs = np.atleast_2d(encode_states(sequences)).astype(np.intp)
+    n_universes = stack.shape[0]
+    batch, length = seqs.shape
+
+    flat = stack.reshape(n_universes, 16).astype(np.intp)
+    if initial is None:
+        if length == 0:
+            raise ValueError("Cannot fold empty sequences without an initial state")
+        state = np.broadcast_to(seqs[:, 0], (n_universes, batch)).copy()
+        start = 1
+    else:
+        state = np.broadcast_to(np.asarray(initial, dtype=np.intp), (n_universes, batch)).copy()
+        start = 0
+
+    for t in range(start, length):
+        state = np.take_along_axis(flat, state * 4 + seqs[:, t], axis=1)
+
+    return state.astype(np.int8)
+
+
+# ============================================================
+# Universe Domain Object
+# ============================================================
+
+
+@dataclass(frozen=True, eq=False)
+class QLFUniverse:
+    """
+    Immutable QLF universe: one compiled 4×4 operator table.
+
+    table[a, b] holds the code of a ⊕ b. The array is copied and marked
+    read-only on construction, so instances are safe to share.
+    """
+
+    table: np.ndarray
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        table = np.array(self.table, dtype=np.int8)
+        if table.shape != (4, 4):
+            raise ValueError(f"Operator table must have shape (4, 4), got {table.shape}")
+        if table.min() < 0 or table.max() > 3:
+            raise ValueError("Operator table cells must be state codes in [0, 3]")
+        table.setflags(write=False)
+        object.__setattr__(self, "table", table)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QLFUniverse):
+            return NotImplemented
+        return bool(np.array_equal(self.table, other.table))
+
+    def __hash__(self) -> int:
+        return int(universe_hash(self.table))
+
+    @property
+    def code(self) -> int:
+        """Packed uint32 encoding of the table; see pack_tables()."""
+        return int(pack_tables(self.table))
+
+    @classmethod
+    def from_code(cls, code: int, params: Dict[str, Any] | None = None) -> "QLFUniverse":
+        """Build a universe from its packed uint32 encoding."""
+        return cls(table=unpack_codes(code), params=dict(params or {}))
+
+    @property
+    def hash(self) -> str:
+        """Stable hex digest identifying this operator table."""
+        return f"{int(universe_hash(self.table)):016x}"
+
+    def op(self, a: str, b: str) -> str:
+        """Return a ⊕ b for a single pair of state symbols."""
+        return STATES[self.table[STATE_INDEX[a], STATE_INDEX[b]]]
+
+    def evaluate(self, a: StateInput, b: StateInput) -> np.ndarray:
+        """Batch-evaluate a ⊕ b; see evaluate_pairs()."""
+        return evaluate_pairs(self.table, a, b)
+
+    def compose(self, sequences: StateInput, initial: Union[int, np.ndarray, None] = None) -> np.ndarray:
+        """Left-fold this universe over one or many state sequences.
+
+        Returns:
+            int8 array of shape (B,) with the final state per sequence
+        """
+        return fold_many(self.table[np.newaxis], sequences, initial=initial)[0]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Render the table as a labelled DataFrame (legacy CSV layout)."""
+        labels = list(STATES)
+        return pd.DataFrame(
+            np.asarray(STATES, dtype=object)[self.table],
+            index=labels,
+            columns=labels,
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, params: Dict[str, Any] | None = None) -> "QLFUniverse":
+        """Build a universe from a labelled 4×4 DataFrame of state symbols.
+
+        Raises:
+            ValueError: If the frame is not 4×4
+            KeyError: If a label or cell is not one of T/F/N/C
+        """
+        if df.shape != (4, 4):
+            raise ValueError(f"Universe frame must be 4x4, got {df.shape}")
+        index = [str(label).strip() for label in df.index]
+        columns = [str(label).strip() for label in df.columns]
+        ordered = df.set_axis(index, axis=0).set_axis(columns, axis=1).loc[list(STATES), list(STATES)]
+        return cls(table=encode_states(ordered.to_numpy()), params=dict(params or {}))
+
+
+def read_universe_csv(path: Union[str, Path]) -> QLFUniverse:
+    """Load a legacy QLF_Universe_*.csv file."""
+    df = pd.read_csv(path, index_col=0)
+    return QLFUniverse.from_frame(df, params={"source": Path(path).name})
+
+
+def stack_tables(universes: Iterable[QLFUniverse]) -> np.ndarray:
+    """Stack universe tables into a contiguous (U, 4, 4) int8 array."""
+    tables = [u.table for u in universes]
+    if not tables:
+        return np.empty((0, 4, 4), dtype=np.int8)
+    return np.stack(tables).astype(np.int8, copy=False)
+
+
+# ============================================================
+# Parametric Generator (Q1 / Q2 / Q3 switches)
+# ============================================================
+
+
+def generate_qlf_table(q1_collapse: bool, q2_catalyst: bool, q3_soft_convert: bool) -> QLFUniverse:
+    """Compile the parametric universe for one Q1/Q2/Q3 switch setting.
+
+    Rules (unchanged from the legacy generator):
+        - Identity: T⊕T = T, N⊕N = N
+        - Q1: C⊕C collapses to T, otherwise stays C
+        - Q3: F row/column soft-converts to N, otherwise hard-purges to F
+        - Q2: catalyst N turns T⊕N into C and C⊕N into T; passive N is neutral
+        - Tension: T⊕C = C⊕T = C
+    """
+    table = np.zeros((4, 4), dtype=np.int8)
+
+    table[T, T] = T
+    table[N, N] = N
+    table[C, C] = T if q1_collapse else C
+
+    f_res = N if q3_soft_convert else F
+    table[F, :] = f_res
+    table[:, F] = f_res
+
+    if q2_catalyst:
+        table[T, N] = table[N, T] = C
+        table[N, C] = table[C, N] = T
+    else:
+        table[T, N] = table[N, T] = T
+        table[N, C] = table[C, N] = C
+
+    table[T, C] = table[C, T] = C
+
+    params = {
+        "Q1": QLF_OPTIONS["Q1"][int(q1_collapse)],
+        "Q2": QLF_OPTIONS["Q2"][int(q2_catalyst)],
+        "Q3": QLF_OPTIONS["Q3"][int(q3_soft_convert)],
+    }
+    return QLFUniverse(table=table, params=params)
+
+
+def parametric_universes() -> List[QLFUniverse]:
+    """Return the 8 Q1/Q2/Q3 universes in legacy file order (Universe 1..8)."""
+    return [
+        generate_qlf_table(q1 == "Collapse", q2 == "Catalyst", q3 == "Soft-Convert")
+        for q1, q2, q3 in itertools.product(*QLF_OPTIONS.values())
+    ]
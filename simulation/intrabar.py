@@ -0,0 +1,143 @@
+# simulation/intrabar.py
+"""
+Intrabar Path Resolution — Lower-Timeframe Fill Ordering
+
+A bar that crosses both a stop and a limit (a position's SL and TP) does
+not say which came first. With lower-timeframe data loaded (M1 inside
+H1) the order is read from the child bars; without it a configurable
+OHLC heuristic decides.
+
+The child range of every parent bar is precomputed once by binary search
+over the child timestamps:
+
+    start[i] = first child with time ≥ parent_time[i]
+    end[i]   = first child with time ≥ min(parent_time[i + 1], parent_time[i] + period)
+
+Capping at the bar's own period keeps a bar from absorbing the children
+of a missing next bar (a gap in the parent data). Looking up a bar's
+children is O(log P) by timestamp and the path is built from a
+contiguous slice, with no scan of the child frame per bar.
+Each child bar contributes open → extreme → extreme → close, ordered by
+the same heuristic (rarely ambiguous at M1).
+
+OHLC heuristics (which extreme is visited first):
+
+    BAR_DIRECTION    up bar (close ≥ open) visits the low first, down bar the high
+    NEAREST_EXTREME  the extreme closer to the open first
+    HIGH_FIRST       always the high first
+    LOW_FIRST        always the low first
+
+Doctrine constraints:
+- Child bars only order events inside the parent; fills never look past it
+- Missing child data degrades to the heuristic, never to a skipped bar
+"""
+
+from datetime import datetime
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+
+PathHeuristic = Literal["BAR_DIRECTION", "NEAREST_EXTREME", "HIGH_FIRST", "LOW_FIRST"]
+PATH_HEURISTICS = ("BAR_DIRECTION", "NEAREST_EXTREME", "HIGH_FIRST", "LOW_FIRST")
+
+# ============================================================
+# OHLC PATHS
+# ============================================================
+
+
+def high_first(
+    open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, heuristic: PathHeuristic
+) -> np.ndarray:
+    """Per bar: True if the heuristic visits the high before the low."""
+    if heuristic == "BAR_DIRECTION":
+        return close < open_
+    if heuristic == "NEAREST_EXTREME":
+        return high - open_ < open_ - low
+    if heuristic == "HIGH_FIRST":
+        return np.ones(np.shape(open_), dtype=bool)
+    if heuristic == "LOW_FIRST":
+        return np.zeros(np.shape(open_), dtype=bool)
+    raise ValueError(f"heuristic must be one of {PATH_HEURISTICS}, got {heuristic!r}")
+
+
+def ohlc_path(ohlc: np.ndarray, heuristic: PathHeuristic = "BAR_DIRECTION") -> np.ndarray:
+    """Price path of consecutive bars: (m, 4) open/high/low/close rows → (4m,) points."""
+    ohlc = np.asarray(ohlc, dtype=np.float64).reshape(-1, 4)
+    open_, high, low, close = ohlc.T
+    first = high_first(open_, high, low, close, heuristic)
+    return np.column_stack((open_, np.where(first, high, low), np.where(first, low, high), close)).ravel()
+
+
+# ============================================================
+# CHILD-BAR INDEX
+# ============================================================
+
+
+def _ns(times: Sequence[datetime] | np.ndarray) -> np.ndarray:
+    return np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+
+
+class IntrabarIndex:
+    """
+    Child-bar ranges of every parent bar of one symbol.
+
+    Example:
+        >>> index = IntrabarIndex(h1["timestamp"], m1["timestamp"], m1[["open", "high", "low", "close"]])
+        >>> index.children_at(bar_time)          # (m, 4) M1 rows inside the H1 bar, maybe empty
+    """
+
+    def __init__(
+        self,
+        parent_times: Sequence[datetime] | np.ndarray,
+        child_times: Sequence[datetime] | np.ndarray,
+        child_ohlc: np.ndarray,
+        period: Optional[np.timedelta64] = None,
+    ) -> None:
+        """
+        Args:
+            parent_times: Sorted parent bar open times
+            child_times: Sorted child bar open times
+            child_ohlc: (children, 4) open/high/low/close rows
+            period: Parent bar length (default: smallest parent spacing, as gaps only widen it); no range
+                    extends past parent_time + period
+
+        Raises:
+            ValueError: On unsorted times or mismatched child rows
+        """
+        parents, children = _ns(parent_times), _ns(child_times)
+        ohlc = np.asarray(child_ohlc, dtype=np.float64)
+        if ohlc.shape != (len(children), 4):
+            raise ValueError(f"expected ({len(children)}, 4) child OHLC rows, got shape {ohlc.shape}")
+        if np.any(np.diff(parents) <= 0) or np.any(np.diff(children) < 0):
+            raise ValueError("parent and child times must be sorted (parents strictly)")
+        if period is not None:
+            length = int(np.timedelta64(period, "ns").astype(np.int64))
+        elif len(parents) > 1:
+            length = int(np.diff(parents).min())
+        else:
+            length = 0
+        closes = np.append(parents[1:], np.iinfo(np.int64).max) if len(parents) else parents
+        if length > 0:
+            closes = np.minimum(closes, parents + length)
+        self.parent_times = parents
+        self.start = np.searchsorted(children, parents, side="left")
+        self.end = np.searchsorted(children, closes, side="left")
+        self.ohlc = ohlc
+
+    def __len__(self) -> int:
+        return len(self.parent_times)
+
+    def locate(self, timestamp: datetime | np.datetime64) -> Optional[int]:
+        """Parent bar index opening exactly at timestamp, or None."""
+        t = int(np.asarray(timestamp, dtype="datetime64[ns]").astype(np.int64))
+        i = int(np.searchsorted(self.parent_times, t))
+        return i if i < len(self.parent_times) and self.parent_times[i] == t else None
+
+    def children(self, i: int) -> np.ndarray:
+        """(m, 4) child OHLC rows of parent bar i (a view; m may be 0)."""
+        return self.ohlc[self.start[i] : self.end[i]]
+
+    def children_at(self, timestamp: datetime | np.datetime64) -> np.ndarray:
+        """Child rows of the parent bar opening at timestamp (empty if unknown)."""
+        i = self.locate(timestamp)
+        return self.ohlc[:0] if i is None else self.children(i)
@@ -0,0 +1,318 @@
+# simulation/order_matcher.py
+"""
+Pending Order Matcher — Virtual Broker Fill Rules (README §12.1)
+
+Resting orders are indexed per symbol by the side of the price they wait
+on, each side a binary heap keyed by trigger price:
+
+    below   BUY LIMIT, SELL STOP     max-heap   triggers when price falls to p
+    above   SELL LIMIT, BUY STOP     min-heap   triggers when price rises to p
+
+A bar is replayed as a price path: open → first extreme → second extreme
+→ close under the matcher's OHLC heuristic, or the concatenated paths of
+its lower-timeframe child bars when they are known (simulation/intrabar.py),
+so a bar reaching both a stop-loss and a take-profit fills the one its
+children reached first. Every leg a → b only looks at the heap on its side and pops
+while the top has been crossed, so a bar costs O(k log n) for k triggered
+orders out of n resting, plus O(1) when nothing crossed:
+
+    leg down to b   pop below while p ≥ b     fill at min(a, p)
+    leg up to b     pop above while p ≤ b     fill at max(a, p)
+
+Starting the leg at a makes gaps fill at the open, not at the stale
+trigger: limits get the price improvement, stops the adverse gap.
+
+Fill rules:
+- market → reference price ± slippage
+- limit  → resting until a later bar touches it (high/low cross)
+- stop   → trigger price ± slippage (gap-adjusted)
+
+Cancels are lazy: a cancelled id is dropped from the live table and its
+heap entry discarded when it surfaces; a heap is rebuilt once dead
+entries outnumber live ones.
+
+Doctrine constraints:
+- The matcher only fills; it never sizes, re-prices or drops an order
+- Orders placed during a bar are matched from the next bar on
+"""
+
+import heapq
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, List, Literal, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.types import ExecutedOrder, Symbol
+from simulation.intrabar import PATH_HEURISTICS, PathHeuristic, ohlc_path
+
+OrderKind = Literal["MARKET", "LIMIT", "STOP"]
+Side = Literal["BUY", "SELL"]
+
+# ============================================================
+# ORDERS
+# ============================================================
+
+
+@dataclass(frozen=True)
+class PendingOrder:
+    """One resting order.
+
+    Attributes:
+        order_id: Matcher-assigned id (also the time priority at equal prices)
+        symbol: Instrument
+        side: BUY or SELL
+        kind: LIMIT or STOP
+        quantity: Lots
+        price: Limit or trigger price
+        oco: Id of the order cancelled when this one fills (bracket sibling)
+    """
+
+    order_id: int
+    symbol: Symbol
+    side: Side
+    kind: OrderKind
+    quantity: float
+    price: float
+    oco: Optional[int] = None
+
+    @property
+    def below(self) -> bool:
+        """True if the order waits for price to fall to it (BUY LIMIT, SELL STOP)."""
+        return (self.side == "BUY") == (self.kind == "LIMIT")
+
+
+@dataclass(frozen=True)
+class MatchedOrder:
+    """A resting order and its fill."""
+
+    order: PendingOrder
+    execution: ExecutedOrder
+
+
+def order_kind(side: Side, entry_price: Optional[float], price: float) -> OrderKind:
+    """Order type implied by an entry price relative to the current price.
+
+    No entry (or entry at the price) is a market order; a BUY below / SELL
+    above the price is a limit, a BUY above / SELL below is a stop.
+    """
+    if entry_price is None or entry_price == price:
+        return "MARKET"
+    if (side == "BUY") == (entry_price < price):
+        return "LIMIT"
+    return "STOP"
+
+
+@dataclass
+class _Book:
+    """Heaps of one symbol: below holds (−price, id), above holds (price, id)."""
+
+    below: List[Tuple[float, int]] = field(default_factory=list)
+    above: List[Tuple[float, int]] = field(default_factory=list)
+    dead: int = 0
+
+
+# ============================================================
+# MATCHER
+# ============================================================
+
+
+class OrderMatcher:
+    """
+    Heap-indexed resting orders with bar-path matching.
+
+    Example:
+        >>> matcher = OrderMatcher(slippage={"XAUUSD": 0.05})
+        >>> sl = matcher.place("XAUUSD", "SELL", "STOP", 0.5, 2380.0)
+        >>> tp = matcher.place("XAUUSD", "SELL", "LIMIT", 0.5, 2440.0, oco=sl)
+        >>> for matched in matcher.match_bar("XAUUSD", o, h, l, c):
+        ...     book(matched.execution)
+    """
+
+    def __init__(
+        self,
+        slippage: Optional[Mapping[Symbol, float]] = None,
+        default_slippage: float = 0.0,
+        heuristic: PathHeuristic = "BAR_DIRECTION",
+    ) -> None:
+        """
+        Args:
+            slippage: Adverse slippage per market/stop fill in price units, per symbol
+            default_slippage: Slippage of symbols missing from slippage
+            heuristic: Which extreme a bar visits first when no child bars order it
+
+        Raises:
+            ValueError: On negative slippage or an unknown heuristic
+        """
+        if default_slippage < 0 or any(s < 0 for s in (slippage or {}).values()):
+            raise ValueError("slippage must be >= 0")
+        if heuristic not in PATH_HEURISTICS:
+            raise ValueError(f"heuristic must be one of {PATH_HEURISTICS}, got {heuristic!r}")
+        self.heuristic: PathHeuristic = heuristic
+        self.slippage: Dict[Symbol, float] = dict(slippage or {})
+        self.default_slippage = default_slippage
+        self.orders: Dict[int, PendingOrder] = {}
+        self._books: Dict[Symbol, _Book] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def pending(self, symbol: Optional[Symbol] = None) -> List[PendingOrder]:
+        """Live resting orders (of one symbol), in placement order."""
+        return [o for o in self.orders.values() if symbol is None or o.symbol == symbol]
+
+    def _slip(self, symbol: Symbol) -> float:
+        return self.slippage.get(symbol, self.default_slippage)
+
+    # ------------------------------------------------------------
+    # Order entry
+    # ------------------------------------------------------------
+
+    def market(
+        self, symbol: Symbol, side: Side, quantity: float, price: float, timestamp: Optional[datetime] = None
+    ) -> ExecutedOrder:
+        """Immediate fill at price plus adverse slippage."""
+        slip = self._slip(symbol)
+        return ExecutedOrder(
+            symbol=symbol,
+            side=side,
+            quantity=quantity,
+            fill_price=price + slip if side == "BUY" else price - slip,
+            slippage=slip,
+            timestamp=timestamp or datetime.utcnow(),
+        )
+
+    def place(
+        self, symbol: Symbol, side: Side, kind: OrderKind, quantity: float, price: float, oco: Optional[int] = None
+    ) -> int:
+        """Rest a LIMIT or STOP order; returns its id.
+
+        Args:
+            oco: Live order to link one-cancels-other with (both directions)
+
+        Raises:
+            ValueError: On a MARKET kind, a non-positive quantity or an unknown oco id
+        """
+        if kind not in ("LIMIT", "STOP"):
+            raise ValueError(f"only LIMIT and STOP orders rest, got {kind}")
+        if quantity <= 0:
+            raise ValueError(f"quantity must be > 0, got {quantity}")
+        if oco is not None and oco not in self.orders:
+            raise ValueError(f"oco order {oco} is not resting")
+        order_id = self._next_id
+        self._next_id += 1
+        order = PendingOrder(order_id, symbol, side, kind, quantity, price, oco)
+        self.orders[order_id] = order
+        if oco is not None:
+            self.orders[oco] = replace(self.orders[oco], oco=order_id)
+        book = self._books.setdefault(symbol, _Book())
+        if order.below:
+            heapq.heappush(book.below, (-price, order_id))
+        else:
+            heapq.heappush(book.above, (price, order_id))
+        return order_id
+
+    def cancel(self, order_id: int) -> bool:
+        """Cancel a resting order; False if it already filled or was cancelled."""
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        book = self._books[order.symbol]
+        book.dead += 1
+        if book.dead > len(book.below) + len(book.above) - book.dead:
+            # In place: a fill cancelling its OCO sibling may be popping from either heap
+            book.below[:] = [e for e in book.below if e[1] in self.orders]
+            book.above[:] = [e for e in book.above if e[1] in self.orders]
+            heapq.heapify(book.below)
+            heapq.heapify(book.above)
+            book.dead = 0
+        return True
+
+    def cancel_symbol(self, symbol: Symbol) -> int:
+        """Cancel every resting order of symbol; returns how many."""
+        ids = [o.order_id for o in self.pending(symbol)]
+        for order_id in ids:
+            del self.orders[order_id]
+        self._books.pop(symbol, None)
+        return len(ids)
+
+    # ------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------
+
+    def match_bar(
+        self,
+        symbol: Symbol,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        timestamp: Optional[datetime] = None,
+        children: Optional[np.ndarray] = None,
+    ) -> List[MatchedOrder]:
+        """Fill every resting order of symbol the bar crossed, in path order.
+
+        Args:
+            children: (m, 4) OHLC rows of the bar's lower-timeframe children
+                      (IntrabarIndex.children_at); empty or None falls back to the heuristic
+        """
+        if symbol not in self._books:
+            return []
+        if children is not None and len(children):
+            path = ohlc_path(children, self.heuristic)
+        else:
+            path = ohlc_path(np.array([open_, high, low, close]), self.heuristic)
+        return self.match_path(symbol, path.tolist(), timestamp)
+
+    def match_path(
+        self, symbol: Symbol, path: Sequence[float], timestamp: Optional[datetime] = None
+    ) -> List[MatchedOrder]:
+        """Fill every resting order of symbol crossed along the price path, in crossing order.
+
+        The first point is where trading resumes (the open): orders already
+        through it fill there.
+        """
+        book = self._books.get(symbol)
+        if book is None or not path:
+            return []
+        timestamp = timestamp or datetime.utcnow()
+        start = path[0]
+        matched = self._cross(book, start, start, True, timestamp)
+        matched += self._cross(book, start, start, False, timestamp)
+        for a, b in zip(path, path[1:]):
+            if b != a:
+                matched += self._cross(book, a, b, b < a, timestamp)
+        return matched
+
+    def _cross(self, book: _Book, a: float, b: float, down: bool, timestamp: datetime) -> List[MatchedOrder]:
+        """Pop the orders crossed by the leg a → b on one side of the book."""
+        heap = book.below if down else book.above
+        matched: List[MatchedOrder] = []
+        while heap and (-heap[0][0] >= b if down else heap[0][0] <= b):
+            _, order_id = heapq.heappop(heap)
+            order = self.orders.pop(order_id, None)
+            if order is None:
+                book.dead -= 1
+                continue
+            matched.append(MatchedOrder(order, self._execute(order, a, down, timestamp)))
+            if order.oco is not None:
+                self.cancel(order.oco)
+        return matched
+
+    def _execute(self, order: PendingOrder, a: float, down: bool, timestamp: datetime) -> ExecutedOrder:
+        touch = min(a, order.price) if down else max(a, order.price)
+        if order.kind == "LIMIT":
+            fill, slippage = touch, 0.0
+        else:
+            slip = self._slip(order.symbol)
+            fill = touch + slip if order.side == "BUY" else touch - slip
+            slippage = abs(fill - order.price)
+        return ExecutedOrder(
+            symbol=order.symbol,
+            side=order.side,
+            quantity=order.quantity,
+            fill_price=fill,
+            slippage=slippage,
+            timestamp=timestamp,
+        )
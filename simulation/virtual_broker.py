@@ -1,14 +1,22 @@
 """Virtual Broker implementation for lab execution simulation."""
 
-from typing import Dict, Literal
+from datetime import datetime
+from typing import Dict, List, Literal, Mapping, Optional
 
+from core.capital_guard import SharedCapitalState
+from core.margin_ledger import MarginLedger
+from core.scalper_budget import ScalperBudgetEngine
+from core.sovereign_allocator import PORTFOLIO_SYMBOL
 from core.types import (
     AllocationDecision,
     ExecutedOrder,
     ExecutionReport,
     MarketSnapshot,
+    OrderIntent,
     RiskVerdict,
 )
+from simulation.intrabar import IntrabarIndex
+from simulation.order_matcher import OrderMatcher, order_kind
 
 
 class VirtualBroker:
@@ -16,22 +24,61 @@ class VirtualBroker:
     Lab Execution Simulator.
 
     Responsibilities:
+    - Honor the out-of-band Capital Guard kill flag before anything else
     - Respect risk veto authority (execution guard)
-    - Handle kill-switch and flatten actions
-    - Simulate order fills at market price
+    - Handle kill-switch and flatten actions (a PORTFOLIO decision flattens every position)
+    - Simulate order fills at each order's own symbol price
+    - Rest limit/stop entries and SL/TP exits in the order matcher, when one is attached
     - Track positions (baseline: simple dict)
+    - Book every fill and close into the margin ledger, when one is attached
+    - Release a scalper's pending budget once its order fills, is refused or is cancelled
 
-    Baseline Assumptions:
+    Baseline Assumptions (no matcher):
     - 0 slippage
     - 0 commission
-    - Instant fills at snapshot.price
+    - Instant fills at the latest price of the order's symbol
+      (snapshot.price for snapshot.symbol, else the last update_price)
     """
 
-    def __init__(self) -> None:
-        """Initialize broker with empty position tracker."""
+    def __init__(
+        self,
+        ledger: Optional[MarginLedger] = None,
+        guard: Optional[SharedCapitalState] = None,
+        matcher: Optional[OrderMatcher] = None,
+        intrabar: Optional[Mapping[str, IntrabarIndex]] = None,
+        budget: Optional[ScalperBudgetEngine] = None,
+    ) -> None:
+        """Initialize broker with empty position tracker.
+
+        Args:
+            ledger: Optional live margin ledger (e.g. RiskEngine.new_ledger(registry))
+                    updated on every fill and close
+            guard: Optional Capital Guard state whose kill flag is read on every execute call
+            matcher: Optional order matcher; orders then follow the README §12.1 fill rules
+                     (market → slippage, limit → next bar touch, stop → trigger + slippage)
+                     and their stop_loss / take_profit rest as OCO exits once filled
+            intrabar: Optional lower-timeframe child-bar index per symbol
+                      (MultiTimeframeFeeder.intrabar_index) ordering fills inside a bar;
+                      bars without children fall back to the matcher's OHLC heuristic
+            budget: Optional scalper budget the risk engine books placements in; every
+                    approved order leaving the book calls on_order_done for its scalper slots
+        """
         # Simple position tracker: {symbol: quantity}
         # Positive = LONG, Negative = SHORT
         self.positions: Dict[str, float] = {}
+        self.ledger = ledger
+        self.guard = guard
+        self.matcher = matcher
+        self.intrabar: Dict[str, IntrabarIndex] = dict(intrabar or {})
+        self.budget = budget
+        # Latest price per symbol (execute snapshots, update_price, checked bars)
+        self.prices: Dict[str, float] = {}
+        # Resting entry orders by matcher id, to attach their SL/TP exits on fill
+        self._entries: Dict[int, OrderIntent] = {}
+
+    def update_price(self, symbol: str, price: float) -> None:
+        """Record the latest price of symbol (orchestrator loop, README §13)."""
+        self.prices[symbol] = price
 
     def execute(
         self,
@@ -43,24 +90,36 @@ class VirtualBroker:
         Execute (or reject) an allocation decision based on risk verdict.
 
         Algorithm:
+        0. Check the Capital Guard kill flag (absolute override: flatten every position)
         1. Check kill-switch first (highest priority)
         2. Check execution guard (verdict.approved)
-        3. Simulate fills at snapshot.price
+        3. Simulate fills, each order at its own symbol's latest price
         4. Update position tracker
 
         Args:
             verdict: Risk verdict (approved/rejected/kill-switch)
             decision: Allocation decision with orders
-            snapshot: Current market snapshot
+            snapshot: Current market snapshot; its price becomes snapshot.symbol's
+                      latest price (other legs of a PORTFOLIO batch use update_price)
 
         Returns:
             ExecutionReport with execution status and filled orders
         """
-        # Priority 1: Kill-switch handling (overrides everything)
+        self.update_price(snapshot.symbol, snapshot.price)
+
+        # Priority 0: Capital Guard kill flag (out-of-band, supersedes the loop): close everything
+        if self.guard is not None and self.guard.killed:
+            if verdict.approved and decision.action == "OPEN":
+                self._release(decision.orders)  # booked by the risk engine, never sent
+            return self._flatten_positions(
+                symbol=PORTFOLIO_SYMBOL,
+                reason=f"CAPITAL_GUARD: {self.guard.kill_reason}",
+            )
+
+        # Priority 1: Kill-switch handling (overrides everything in the loop)
         if verdict.kill_switch or decision.action == "FLATTEN":
             return self._flatten_positions(
                 symbol=decision.symbol,
-                snapshot=snapshot,
                 reason=verdict.reason if verdict.reason else "Kill-switch or FLATTEN action",
             )
 
@@ -78,31 +137,42 @@ class VirtualBroker:
     def _flatten_positions(
         self,
         symbol: str,
-        snapshot: MarketSnapshot,
         reason: str,
     ) -> ExecutionReport:
-        """Simulate flattening all positions at snapshot price."""
+        """Simulate flattening symbol's position (every position for PORTFOLIO) at the latest prices."""
         executed_orders = []
+        self._cancel_resting(symbol)
+        symbols = list(self.positions) if symbol == PORTFOLIO_SYMBOL else [symbol]
+        unpriced = []
 
-        # Check if we have an open position for this symbol
-        position_qty = self.positions.get(symbol, 0.0)
+        for held in symbols:
+            position_qty = self.positions.get(held, 0.0)
+            if position_qty == 0.0:
+                continue
+            price = self.prices.get(held)
+            if price is None:
+                unpriced.append(held)
+                continue
 
-        if position_qty != 0.0:
             # Close position: LONG → SELL, SHORT → BUY
             close_side: Literal["BUY", "SELL"] = "SELL" if position_qty > 0 else "BUY"
             flatten_order = ExecutedOrder(
-                symbol=symbol,
+                symbol=held,
                 side=close_side,
                 quantity=abs(position_qty),
-                fill_price=snapshot.price,
+                fill_price=price,
                 slippage=0.0,
                 commission=0.0,
             )
             executed_orders.append(flatten_order)
 
             # Update position tracker
-            self.positions[symbol] = 0.0
+            self.positions[held] = 0.0
+            if self.ledger is not None:
+                self.ledger.close(held, price)
 
+        if unpriced:
+            reason = f"{reason} (no price to close {', '.join(unpriced)})"
         return ExecutionReport(
             status="FLATTENED",
             reason=reason,
@@ -114,29 +184,162 @@ class VirtualBroker:
         decision: AllocationDecision,
         snapshot: MarketSnapshot,
     ) -> ExecutionReport:
-        """Simulate normal order fills at snapshot price (0 slippage baseline)."""
+        """Simulate normal order fills at each symbol's latest price (0 slippage baseline)."""
+        if self.matcher is not None:
+            return self._route_orders(decision, snapshot, self.matcher)
+
         executed_orders = []
+        unpriced = []
 
         for order in decision.orders:
+            price = self.prices.get(order.symbol)
+            if price is None:
+                unpriced.append(order.symbol)
+                continue
             executed = ExecutedOrder(
                 symbol=order.symbol,
                 side=order.side,
                 quantity=order.quantity,
-                fill_price=snapshot.price,
+                fill_price=price,
                 slippage=0.0,
                 commission=0.0,
             )
             executed_orders.append(executed)
+            self._book(executed)
+        self._release(decision.orders)
 
-            # Update position tracker
-            current_position = self.positions.get(order.symbol, 0.0)
-            if order.side == "BUY":
-                self.positions[order.symbol] = current_position + order.quantity
-            else:  # SELL
-                self.positions[order.symbol] = current_position - order.quantity
+        return self._fill_report(executed_orders, unpriced, "Orders filled at market price")
+
+    @staticmethod
+    def _fill_report(executed_orders: List[ExecutedOrder], unpriced: List[str], reason: str) -> ExecutionReport:
+        """EXECUTED, or PARTIAL / REJECTED when orders without a price for their symbol were refused."""
+        if not unpriced:
+            return ExecutionReport(status="EXECUTED", reason=reason, executed_orders=executed_orders)
+        refused = f"no price for {', '.join(unpriced)}"
+        if executed_orders:
+            return ExecutionReport(status="PARTIAL", reason=f"{reason}; {refused}", executed_orders=executed_orders)
+        return ExecutionReport(status="REJECTED", reason=f"Rejected: {refused}", executed_orders=[])
+
+    def _release(self, orders: List[OrderIntent]) -> None:
+        """Return the pending scalper budget of orders that left the book (filled, refused or cancelled)."""
+        if self.budget is None:
+            return
+        for order in orders:
+            for slot in self.budget.order_slots(order):
+                self.budget.on_order_done(slot)
+
+    def _book(self, executed: ExecutedOrder) -> None:
+        """Apply one fill to the position tracker and the margin ledger."""
+        current_position = self.positions.get(executed.symbol, 0.0)
+        signed_quantity = executed.quantity if executed.side == "BUY" else -executed.quantity
+        self.positions[executed.symbol] = current_position + signed_quantity
+        if self.ledger is not None:
+            self.ledger.apply_fill(executed.symbol, signed_quantity, executed.fill_price)
+
+    # ------------------------------------------------------------
+    # Order matcher (README §12.1 fill rules)
+    # ------------------------------------------------------------
+
+    def _route_orders(
+        self, decision: AllocationDecision, snapshot: MarketSnapshot, matcher: OrderMatcher
+    ) -> ExecutionReport:
+        """Fill market orders with slippage; rest limit and stop entries until a later bar reaches them.
+
+        Each order is classified and filled against its own symbol's latest price;
+        an order whose symbol has no price yet is refused.
+        """
+        executed_orders = []
+        unpriced = []
+        resting = 0
+        for order in decision.orders:
+            price = self.prices.get(order.symbol)
+            if price is None:
+                unpriced.append(order.symbol)
+                self._release([order])
+                continue
+            kind = order_kind(order.side, order.entry_price, price)
+            if kind == "MARKET" or order.entry_price is None:
+                executed = matcher.market(order.symbol, order.side, order.quantity, price, snapshot.timestamp)
+                executed_orders.append(executed)
+                self._book(executed)
+                self._release([order])
+                self._protect(order, matcher)
+            else:
+                order_id = matcher.place(order.symbol, order.side, kind, order.quantity, order.entry_price)
+                self._entries[order_id] = order
+                resting += 1
+
+        return self._fill_report(
+            executed_orders, unpriced, f"{len(executed_orders)} filled at market, {resting} resting"
+        )
+
+    def _protect(self, entry: OrderIntent, matcher: OrderMatcher) -> None:
+        """Rest the filled entry's stop_loss (STOP) and take_profit (LIMIT) exits as an OCO pair."""
+        side: Literal["BUY", "SELL"] = "SELL" if entry.side == "BUY" else "BUY"
+        stop_id = None
+        if entry.stop_loss is not None:
+            stop_id = matcher.place(entry.symbol, side, "STOP", entry.quantity, entry.stop_loss)
+        if entry.take_profit is not None:
+            matcher.place(entry.symbol, side, "LIMIT", entry.quantity, entry.take_profit, oco=stop_id)
+
+    def _cancel_resting(self, symbol: str) -> None:
+        """Cancel every resting entry and exit of symbol (of every symbol for PORTFOLIO)."""
+        if self.matcher is None:
+            return
+        if symbol == PORTFOLIO_SYMBOL:
+            for held in {o.symbol for o in self.matcher.pending()}:
+                self.matcher.cancel_symbol(held)
+            cancelled = list(self._entries.values())
+            self._entries.clear()
+        else:
+            self.matcher.cancel_symbol(symbol)
+            cancelled = [o for o in self._entries.values() if o.symbol == symbol]
+            self._entries = {i: o for i, o in self._entries.items() if o.symbol != symbol}
+        self._release(cancelled)
+
+    def check_orders(
+        self,
+        symbol: str,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        timestamp: Optional[datetime] = None,
+    ) -> ExecutionReport:
+        """
+        Match one new bar against the symbol's resting orders (orchestrator loop, README §13).
+
+        Only orders the bar crossed are touched, in the order the symbol's
+        child bars at timestamp reached them (OHLC heuristic without them).
+        A filled entry's SL/TP exits rest from the next bar on.
+
+        Returns:
+            ExecutionReport with the triggered fills in path order
+            (REJECTED, with every symbol's resting orders cancelled, while the Capital Guard kill flag is up)
+        """
+        if self.matcher is None:
+            return ExecutionReport(status="EXECUTED", reason="No order matcher attached", executed_orders=[])
+        if self.guard is not None and self.guard.killed:
+            self._cancel_resting(PORTFOLIO_SYMBOL)
+            return ExecutionReport(status="REJECTED", reason=f"CAPITAL_GUARD: {self.guard.kill_reason}")
+
+        self.update_price(symbol, close)
+        executed_orders: List[ExecutedOrder] = []
+        entries: List[OrderIntent] = []
+        index = self.intrabar.get(symbol)
+        children = index.children_at(timestamp) if index is not None and timestamp is not None else None
+        for matched in self.matcher.match_bar(symbol, open_, high, low, close, timestamp, children):
+            executed_orders.append(matched.execution)
+            self._book(matched.execution)
+            entry = self._entries.pop(matched.order.order_id, None)
+            if entry is not None:
+                entries.append(entry)
+        self._release(entries)
+        for entry in entries:
+            self._protect(entry, self.matcher)
 
         return ExecutionReport(
             status="EXECUTED",
-            reason="Orders filled at market price",
+            reason=f"{len(executed_orders)} resting orders triggered",
             executed_orders=executed_orders,
         )
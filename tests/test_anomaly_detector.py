@@ -0,0 +1,122 @@
+"""Tests for the streaming spread/slippage anomaly detectors."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.anomaly_detector import AnomalyPolicy, MarketAnomalyMonitor, StreamingAnomalyDetector
+from core.instrument_registry import InstrumentRegistry
+from core.types import ExecutedOrder, ExecutionReport, MarketSnapshot
+
+
+def quote(
+    symbol: str, spread: float | None = None, bid: float | None = None, ask: float | None = None
+) -> MarketSnapshot:
+    return MarketSnapshot(symbol=symbol, price=1.0, bid=bid, ask=ask, spread=spread, timestamp=datetime(2024, 1, 2))
+
+
+def fill(symbol: str, slippage: float) -> ExecutedOrder:
+    return ExecutedOrder(symbol=symbol, side="BUY", quantity=0.1, fill_price=1.0, slippage=slippage)
+
+
+class TestDetector:
+    @pytest.mark.parametrize("window", [3, 4, 9, 64])
+    def test_sorted_window_and_robust_stats_match_brute_force(self, window: int) -> None:
+        detector = StreamingAnomalyDetector(2, AnomalyPolicy(window=window, min_periods=2))
+        rng = np.random.default_rng(window)
+        history: list[float] = []
+        for t in range(200):
+            x = float(rng.integers(0, 12)) if t % 3 else float(rng.normal())  # ties and distinct values
+            detector.observe(1, x)
+            history.append(x)
+
+            recent = np.array(history[-window:])
+            np.testing.assert_array_equal(detector.sorted[1, : len(recent)], np.sort(recent))
+            median, mad = detector.robust_stats(1)
+            assert median == pytest.approx(np.median(recent))
+            assert mad == pytest.approx(np.median(np.abs(recent - np.median(recent))))
+        assert detector.count[0] == 0
+
+    def test_ewma_moments(self) -> None:
+        detector = StreamingAnomalyDetector(1, AnomalyPolicy(halflife=10.0))
+        values = np.random.default_rng(1).normal(2.0, 0.5, size=500)
+        for x in values:
+            detector.observe(0, float(x))
+
+        assert detector.mean[0] == pytest.approx(2.0, abs=0.2)
+        assert np.sqrt(detector.var[0]) == pytest.approx(0.5, rel=0.3)
+
+    def test_spike_flagged_and_scored_before_update(self) -> None:
+        detector = StreamingAnomalyDetector(1, AnomalyPolicy(min_periods=20))
+        rng = np.random.default_rng(4)
+        flags = [detector.observe(0, float(x)) for x in rng.normal(1.0, 0.05, size=100)]
+
+        assert not any(flags)
+        assert detector.observe(0, 3.0) is True
+        assert detector.flagged[0]
+        assert detector.observe(0, 1.0) is False
+        assert not detector.flagged[0]
+
+    def test_only_upper_tail_and_warmup(self) -> None:
+        detector = StreamingAnomalyDetector(1, AnomalyPolicy(min_periods=20))
+        for _ in range(19):
+            detector.observe(0, 1.0)
+        assert detector.observe(0, 50.0) is False  # still warming up
+
+        detector = StreamingAnomalyDetector(1, AnomalyPolicy(min_periods=20))
+        for x in np.random.default_rng(2).normal(1.0, 0.05, size=50):
+            detector.observe(0, float(x))
+        assert detector.observe(0, 0.0) is False  # a collapsing spread is not a risk
+
+    def test_constant_stream_uses_scale_floor(self) -> None:
+        detector = StreamingAnomalyDetector(1, AnomalyPolicy(min_periods=5, min_scale_frac=0.05))
+        for _ in range(30):
+            detector.observe(0, 0.0002)
+
+        assert detector.observe(0, 0.00021) is False
+        assert detector.observe(0, 0.0004) is True
+
+    def test_policy_validation(self) -> None:
+        with pytest.raises(ValueError, match="window"):
+            AnomalyPolicy(window=2)
+        with pytest.raises(ValueError, match="halflife"):
+            AnomalyPolicy(halflife=0.0)
+        with pytest.raises(ValueError, match="min_scale"):
+            AnomalyPolicy(min_scale_ticks=-1.0)
+        with pytest.raises(ValueError, match="scale floors"):
+            StreamingAnomalyDetector(2, min_scale=np.zeros(3))
+
+
+class TestMarketMonitor:
+    def test_spread_and_slippage_reasons_per_symbol(self) -> None:
+        monitor = MarketAnomalyMonitor(InstrumentRegistry().table, AnomalyPolicy(min_periods=5))
+        rng = np.random.default_rng(8)
+        for x in rng.normal(0.30, 0.01, size=40):
+            monitor.on_snapshot(quote("XAUUSD", spread=float(x)))
+            monitor.on_snapshot(quote("EURUSD", bid=1.1000, ask=1.1000 + float(x) / 1000))
+            monitor.on_fill(fill("US100", float(x) / 10))
+
+        assert monitor.on_snapshot(quote("XAUUSD", spread=2.5)) is True
+        monitor.on_report(ExecutionReport(status="EXECUTED", executed_orders=[fill("US100", -0.4)]))
+
+        assert monitor.reason("XAUUSD") == "SPREAD_ANOMALY"
+        assert monitor.reason("US100") == "SLIPPAGE_ANOMALY"
+        assert monitor.reason("EURUSD") is None
+
+    def test_zero_slippage_limit_fills_do_not_flag_ordinary_stops(self) -> None:
+        table = InstrumentRegistry().table
+        monitor = MarketAnomalyMonitor(table, slippage_policy=AnomalyPolicy(min_periods=5))
+        flags = []
+        for t in range(200):
+            flags.append(monitor.on_fill(fill("XAUUSD", 0.05 if t % 7 == 0 else 0.0)))  # stops among limits
+
+        assert not any(flags)
+        assert monitor.on_fill(fill("XAUUSD", 1.0)) is True
+        assert monitor.slippage.min_scale[table.ids["XAUUSD"]] == pytest.approx(2.0 * 0.01)
+
+    def test_snapshot_without_spread_is_ignored(self) -> None:
+        monitor = MarketAnomalyMonitor(InstrumentRegistry().table)
+
+        assert monitor.on_snapshot(quote("EURUSD")) is False
+        assert monitor.spread.count.sum() == 0
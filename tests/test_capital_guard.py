@@ -0,0 +1,155 @@
+"""Tests for the out-of-band Capital Guard."""
+
+import time
+from collections.abc import Iterator
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.capital_guard import CapitalGuard, CapitalGuardPolicy, SharedCapitalState, start_guard
+from core.types import AllocationDecision, MarketSnapshot, OrderIntent, RiskVerdict
+from simulation.virtual_broker import VirtualBroker
+
+DAY = 86_400.0
+MONDAY = 4 * DAY  # 1970-01-05
+
+
+@pytest.fixture()
+def state() -> Iterator[SharedCapitalState]:
+    state = SharedCapitalState(n_symbols=3)
+    yield state
+    state.close()
+
+
+def make_guard(state: SharedCapitalState, **policy: float) -> CapitalGuard:
+    return CapitalGuard(state, CapitalGuardPolicy(**policy))
+
+
+class TestSharedState:
+    def test_publish_read_roundtrip_across_attachments(self, state: SharedCapitalState) -> None:
+        state.publish(10_000.0, 9_900.0, MONDAY, [0.5, 0.0, -1.0])
+        reader = SharedCapitalState(name=state.name)
+
+        snapshot = reader.read()
+        reader.close()
+
+        assert snapshot is not None
+        assert snapshot.seq == 2
+        assert (snapshot.equity, snapshot.balance, snapshot.bar_time) == (10_000.0, 9_900.0, MONDAY)
+        np.testing.assert_array_equal(snapshot.positions, [0.5, 0.0, -1.0])
+
+    def test_read_during_write_retries_then_gives_up(self, state: SharedCapitalState) -> None:
+        state.publish(10_000.0, 10_000.0, MONDAY, [0.0, 0.0, 0.0])
+        state._ints[0] += 1  # writer stalled mid-update
+
+        assert state.read(retries=4) is None
+
+    def test_kill_flag_latches_first_reason(self, state: SharedCapitalState) -> None:
+        state.kill("DAILY_LOSS_CAP")
+        state.kill("MANUAL")
+
+        assert state.killed and state.kill_reason == "DAILY_LOSS_CAP"
+        state.clear_kill()
+        assert not state.killed
+
+
+class TestGuardChecks:
+    def test_daily_loss_cap_from_day_open(self, state: SharedCapitalState) -> None:
+        guard = make_guard(state, daily_loss_cap_pct=3.0)
+
+        state.publish(10_000.0, 10_000.0, MONDAY + 60, [0, 0, 0])
+        assert guard.check() is None
+        state.publish(9_750.0, 10_000.0, MONDAY + 3_600, [0, 0, 0])
+        assert guard.check() is None
+        state.publish(9_690.0, 10_000.0, MONDAY + 7_200, [0, 0, 0])
+
+        assert guard.check() == "DAILY_LOSS_CAP"
+        assert state.kill_reason == "DAILY_LOSS_CAP"
+
+    def test_weekly_cap_spans_days_and_resets_on_monday(self, state: SharedCapitalState) -> None:
+        guard = make_guard(state, daily_loss_cap_pct=3.0, weekly_loss_cap_pct=5.0)
+        equity = 10_000.0
+        for day in range(4):  # −2 % per day: each day within its cap
+            state.publish(equity, equity, MONDAY + day * DAY, [0, 0, 0])
+            assert guard.check() is None
+            equity *= 0.98
+            state.publish(equity, equity, MONDAY + day * DAY + 3_600, [0, 0, 0])
+            if guard.check():
+                break
+
+        assert state.kill_reason == "WEEKLY_LOSS_CAP"
+
+        state.clear_kill()
+        guard = make_guard(state, weekly_loss_cap_pct=5.0)
+        state.publish(equity, equity, MONDAY + 6 * DAY, [0, 0, 0])  # Sunday: same week, new anchor
+        assert guard.check() is None
+        state.publish(equity * 0.97, equity, MONDAY + 7 * DAY, [0, 0, 0])  # Monday opens a new week
+        assert guard.check() is None
+
+    def test_broker_anomalies(self, state: SharedCapitalState) -> None:
+        guard = make_guard(state, max_equity_jump_pct=20.0, daily_loss_cap_pct=50.0, weekly_loss_cap_pct=50.0)
+        state.publish(10_000.0, 10_000.0, MONDAY, [0, 0, 0])
+        guard.check()
+        state.publish(13_000.0, 10_000.0, MONDAY + 60, [0, 0, 0])
+
+        assert guard.check() == "EQUITY_ANOMALY"
+
+        state.clear_kill()
+        state.publish(13_000.0, 10_000.0, MONDAY + 120, [0, float("nan"), 0])
+        assert make_guard(state).check() == "POSITION_ANOMALY"
+
+    def test_stale_heartbeat_and_unchanged_seq(self, state: SharedCapitalState) -> None:
+        guard = make_guard(state, heartbeat_timeout_s=1.0, poll_interval_s=0.1)
+        state.publish(10_000.0, 10_000.0, MONDAY, [0, 0, 0])
+
+        assert guard.check(now=state.heartbeat + 0.5) is None
+        assert guard.check(now=state.heartbeat + 0.9) is None  # same seq: nothing re-evaluated
+        assert guard.check(now=state.heartbeat + 1.5) == "HEARTBEAT_STALE"
+
+    def test_policy_validation(self) -> None:
+        with pytest.raises(ValueError, match="daily_loss_cap_pct"):
+            CapitalGuardPolicy(daily_loss_cap_pct=0.0)
+        with pytest.raises(ValueError, match="poll_interval_s"):
+            CapitalGuardPolicy(heartbeat_timeout_s=0.1, poll_interval_s=0.5)
+
+
+def broker_round(broker: VirtualBroker) -> str:
+    order = OrderIntent(symbol="EURUSD", side="BUY", quantity=0.1, entry_price=1.2, stop_loss=1.19, risk_pct_used=1.0)
+    decision = AllocationDecision(
+        symbol="EURUSD",
+        action="OPEN",
+        proposed_risk_pct=1.0,
+        risk_after_QEFC=1.0,
+        portfolio_multiplier=1.0,
+        final_risk_pct=1.0,
+        orders=[order],
+    )
+    snapshot = MarketSnapshot(symbol="EURUSD", price=1.2, timestamp=datetime.utcnow())
+    return broker.execute(RiskVerdict(approved=True, reason="APPROVED"), decision, snapshot).status
+
+
+class TestOutOfBandProcess:
+    def test_hung_orchestrator_trips_kill_honored_by_broker(self, state: SharedCapitalState) -> None:
+        policy = CapitalGuardPolicy(heartbeat_timeout_s=0.3, poll_interval_s=0.01)
+        broker = VirtualBroker(guard=state)
+        process = start_guard(state.name, policy)
+        try:
+            for bar in range(5):  # healthy loop
+                state.publish(10_000.0, 10_000.0, MONDAY + 60 * bar, [0.1 * bar, 0, 0])
+                assert broker_round(broker) == "EXECUTED"
+                time.sleep(0.05)
+            assert not state.killed
+
+            deadline = time.monotonic() + 10.0  # orchestrator hangs in a slow agent
+            while not state.killed and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert state.kill_reason == "HEARTBEAT_STALE"
+            assert broker_round(broker) == "FLATTENED"
+            assert broker.positions["EURUSD"] == 0.0
+        finally:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        assert process.exitcode == 0
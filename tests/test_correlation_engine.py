@@ -0,0 +1,107 @@
+"""Tests for the streaming EW correlation engine (core/correlation_engine.py)."""
+
+import numpy as np
+import pytest
+
+from core.correlation_engine import (
+    CorrelationPolicy,
+    EWCorrelation,
+    average_correlation,
+    cluster_exposure_scale,
+    cluster_weight_scale,
+    correlation_clusters,
+    govern_weights,
+)
+
+
+def reference_cov(x: np.ndarray, alpha: float) -> np.ndarray:
+    mean, cov = x[0].copy(), np.zeros((x.shape[1], x.shape[1]))
+    for row in x:
+        delta = row - mean
+        mean = mean + alpha * delta
+        cov = (1.0 - alpha) * (cov + alpha * np.outer(delta, delta))
+    return cov
+
+
+class TestEWCorrelation:
+    def test_matches_reference_recursion(self) -> None:
+        x = np.random.default_rng(0).normal(size=(300, 5))
+        engine = EWCorrelation(halflife=15.0, names=list("abcde"))
+        for row in x:
+            engine.update_array(row)
+        assert np.allclose(engine.covariance(), reference_cov(x, engine.alpha))
+
+    def test_recovers_linear_dependence(self) -> None:
+        rng = np.random.default_rng(1)
+        engine = EWCorrelation(halflife=50.0)
+        for base in rng.normal(size=500):
+            engine.update({"a": base, "b": 2.0 * base, "c": -base, "d": rng.normal()})
+        corr = engine.correlation(["a", "b", "c", "d"])
+        assert corr[0, 1] == pytest.approx(1.0)
+        assert corr[0, 2] == pytest.approx(-1.0)
+        assert abs(corr[0, 3]) < 0.3
+
+    def test_missing_streams_keep_their_moments(self) -> None:
+        engine = EWCorrelation(halflife=10.0, min_periods=1)
+        engine.update({"a": 1.0, "b": 2.0})
+        engine.update({"a": 3.0, "b": 1.0})
+        before = engine.covariance()
+        engine.update({"a": 5.0, "b": float("nan")})
+        after = engine.covariance()
+        assert after[1, 1] == before[1, 1] and after[0, 1] == before[0, 1]
+        assert after[0, 0] != before[0, 0]
+
+    def test_streams_grow_on_first_sight(self) -> None:
+        engine = EWCorrelation(min_periods=1)
+        for i in range(20):
+            engine.update({f"s{j}": float((i * (j + 1)) % 7) for j in range(i % 12)})
+        assert len(engine) == 11 and "s10" in engine
+        assert engine.correlation().shape == (11, 11)
+
+    def test_unknown_and_young_pairs_read_uncorrelated(self) -> None:
+        engine = EWCorrelation(min_periods=5)
+        for v in (1.0, 2.0, 3.0):
+            engine.update({"a": v, "b": v})
+        corr = engine.correlation(["a", "b", "zz"])
+        assert np.array_equal(corr, np.eye(3))
+
+    def test_invalid_halflife_raises(self) -> None:
+        with pytest.raises(ValueError):
+            EWCorrelation(halflife=0.0)
+
+
+class TestPenalties:
+    def test_average_correlation_ignores_diagonal_and_hedges(self) -> None:
+        corr = np.array([[1.0, 0.8, -0.6], [0.8, 1.0, 0.2], [-0.6, 0.2, 1.0]])
+        assert np.allclose(average_correlation(corr), [0.1, 0.5, 0.0])
+
+    def test_clusters_are_connected_components(self) -> None:
+        corr = np.eye(5)
+        corr[0, 1] = corr[1, 0] = 0.9
+        corr[1, 3] = corr[3, 1] = 0.8
+        assert correlation_clusters(corr, 0.7).tolist() == [0, 0, 1, 0, 2]
+
+    def test_cluster_share_is_capped_and_total_kept(self) -> None:
+        weights = np.array([[0.5], [0.4], [0.1]])
+        labels = np.array([0, 0, 1])
+        governed = weights * cluster_weight_scale(weights, labels, cap=0.6)
+        assert governed[:2].sum() == pytest.approx(0.6)
+        assert governed.sum() == pytest.approx(1.0)
+        assert governed[0, 0] / governed[1, 0] == pytest.approx(0.5 / 0.4)
+
+    def test_infeasible_cap_shares_equally(self) -> None:
+        weights = np.array([[0.9], [0.1]])
+        scale = cluster_weight_scale(weights, np.array([0, 1]), cap=0.3)
+        assert np.allclose((weights * scale).ravel(), [0.5, 0.5])
+
+    def test_symbol_cluster_exposure_cap(self) -> None:
+        scale = cluster_exposure_scale(np.array([1.0, 0.5, -0.8]), np.array([0, 0, 1]), cap=1.0)
+        assert np.allclose(scale, [1 / 1.5, 1 / 1.5, 1.0])
+
+    def test_govern_weights_damps_crowded_agents(self) -> None:
+        corr = np.array([[1.0, 0.95, 0.0], [0.95, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        weights = np.ones((3, 1))
+        governed = govern_weights(weights, corr, CorrelationPolicy(agent_cluster_cap=0.5))
+        share = governed[:, 0] / governed.sum()
+        assert share[:2].sum() == pytest.approx(0.5)
+        assert share[2] == pytest.approx(0.5)
@@ -224,6 +224,24 @@ class TestMultiTimeframeFeeder:
         with pytest.raises(ValueError, match="not found in data sources"):
             MultiTimeframeFeeder({"M15": df}, primary_timeframe="H1")
 
+    def test_intrabar_index_ranges(self) -> None:
+        """Each H1 bar maps to the M15 bars inside it."""
+        df_m15 = create_sample_data("M15", "2024-01-01 09:00", 10, "15min")
+        df_h1 = create_sample_data("H1", "2024-01-01 09:00", 3, "1h")
+
+        feeder = MultiTimeframeFeeder({"H1": df_h1, "M15": df_m15})
+        index = feeder.intrabar_index("M15")
+
+        assert list(index.start) == [0, 4, 8]
+        assert list(index.end) == [4, 8, 10]
+        assert index.children_at(pd.Timestamp("2024-01-01 10:00"))[0, 0] == pytest.approx(df_m15.loc[4, "open"])
+
+    def test_intrabar_index_unknown_timeframe_raises_error(self) -> None:
+        df = create_sample_data("M15", "2024-01-01 09:00", 10, "15min")
+
+        with pytest.raises(ValueError):
+            MultiTimeframeFeeder({"M15": df}).intrabar_index("M1")
+
 
 class TestShadowLayerFeatures:
     """Test suite for Shadow Layer feature integration."""
@@ -0,0 +1,101 @@
+"""Tests for counter-based stochastic exploration (core/exploration.py)."""
+
+import numpy as np
+import pytest
+
+from core.exploration import ExplorationPolicy, StochasticExplorer, philox4x64
+
+AGENTS = [f"agent{i}" for i in range(6)]
+SYMBOLS = ["EURUSD", "GBPUSD", "XAUUSD"]
+
+
+def tie_matrix() -> tuple:
+    weights = np.array(
+        [
+            [0.50, 0.30, 0.80],
+            [0.51, 0.30, 0.20],
+            [0.49, 0.90, 0.79],
+            [0.10, 0.31, 0.81],
+            [0.50, 0.00, 0.40],
+            [0.90, 0.60, 0.05],
+        ]
+    )
+    direction = np.array(
+        [
+            [1, 1, -1],
+            [1, -1, -1],
+            [1, 1, -1],
+            [1, 1, -1],
+            [-1, 0, 1],
+            [1, -1, 1],
+        ],
+        dtype=float,
+    )
+    return weights, direction
+
+
+class TestCounterRNG:
+    def test_matches_numpy_philox(self) -> None:
+        for key in ([1, 2], [2**63 + 5, 12345]):
+            for counter in ([0, 0, 0, 0], [7, 2**64 - 1, 3, 9]):
+                expected = np.random.Philox(
+                    counter=np.array(counter, dtype=np.uint64), key=np.array(key, dtype=np.uint64)
+                ).random_raw(4)
+                bumped = np.array(counter, dtype=np.uint64)
+                bumped[0] += np.uint64(1)  # NumPy increments before generating
+                words = philox4x64(bumped[:, None], np.array(key, dtype=np.uint64))
+                assert np.array_equal(words[:, 0], expected)
+
+    def test_draws_depend_only_on_coordinates(self) -> None:
+        explorer = StochasticExplorer(ExplorationPolicy(seed=42))
+        full = explorer.uniforms(AGENTS, SYMBOLS, bar_index=17)
+        # A shard holding a subset, in another order, in a fresh process-like instance
+        shard = StochasticExplorer(ExplorationPolicy(seed=42)).uniforms(AGENTS[3:][::-1], SYMBOLS[::-1], 17)
+        assert np.array_equal(shard, full[3:][::-1, ::-1])
+        assert np.all((full >= 0.0) & (full < 1.0))
+
+    def test_bar_and_seed_change_draws(self) -> None:
+        explorer = StochasticExplorer(ExplorationPolicy(seed=1))
+        base = explorer.uniforms(AGENTS, SYMBOLS, 5)
+        assert not np.array_equal(base, explorer.uniforms(AGENTS, SYMBOLS, 6))
+        assert not np.array_equal(base, StochasticExplorer(ExplorationPolicy(seed=2)).uniforms(AGENTS, SYMBOLS, 5))
+
+
+class TestPerturbation:
+    def test_only_near_ties_move_within_amplitude(self) -> None:
+        weights, direction = tie_matrix()
+        out = StochasticExplorer().perturb(AGENTS, SYMBOLS, weights, direction, bar_index=3)
+        ratio = np.divide(out, weights, out=np.ones_like(out), where=weights > 0)
+        assert np.all(np.abs(ratio - 1.0) <= 0.10 + 1e-12)
+        # agent3 on EURUSD (0.10) and agent5 (0.90) have no near-tie partner
+        assert out[3, 0] == weights[3, 0] and out[5, 0] == weights[5, 0]
+        # agent4 on EURUSD is SHORT and ties nobody in its own direction
+        assert out[4, 0] == weights[4, 0]
+        assert not np.array_equal(out[:3, 0], weights[:3, 0])
+
+    def test_exposure_and_direction_preserved(self) -> None:
+        weights, direction = tie_matrix()
+        for bar in range(50):
+            out = StochasticExplorer(ExplorationPolicy(seed=bar)).perturb(AGENTS, SYMBOLS, weights, direction, bar)
+            assert np.allclose(out.sum(axis=0), weights.sum(axis=0))
+            assert np.allclose((out * direction).sum(axis=0), (weights * direction).sum(axis=0))
+            assert np.all(out >= 0.0)
+
+    def test_separate_tie_clusters_keep_their_own_sums(self) -> None:
+        weights = np.array([[0.20], [0.21], [0.80], [0.81]])
+        direction = np.ones_like(weights)
+        for bar in range(50):
+            out = StochasticExplorer(ExplorationPolicy(seed=bar)).perturb(
+                AGENTS[:4], ["EURUSD"], weights, direction, bar
+            )
+            assert np.isclose(out[:2].sum(), 0.41)
+            assert np.isclose(out[2:].sum(), 1.61)
+
+    def test_activation_threshold_and_strict_mode(self) -> None:
+        assert StochasticExplorer(ExplorationPolicy(uncertainty_threshold=0.5)).active(0.7)
+        assert not StochasticExplorer(ExplorationPolicy(uncertainty_threshold=0.5)).active(0.4)
+        assert not StochasticExplorer(ExplorationPolicy(enabled=False)).active(1.0)
+
+    def test_amplitude_above_doctrine_cap_raises(self) -> None:
+        with pytest.raises(ValueError):
+            ExplorationPolicy(amplitude=0.2)
@@ -1,8 +1,23 @@
 """Tests for InstrumentRegistry and InstrumentSpec."""
 
+from pathlib import Path
+
+import numpy as np
 import pytest
 
-from core.instrument_registry import InstrumentRegistry, InstrumentSpec
+from core.instrument_registry import (
+    CACHE_MAGIC,
+    InstrumentRegistry,
+    InstrumentSpec,
+    read_registry_cache,
+    write_registry_cache,
+)
+
+EURUSD_YAML = (
+    "instruments:\n"
+    "  EURUSD: {{symbol: EURUSD, tick_size: 0.00001, point_value: 10.0, contract_size: 100000,\n"
+    "           min_lot: 0.01, max_lot: {max_lot}, lot_step: 0.01}}\n"
+)
 
 
 class TestInstrumentRegistryLoading:
@@ -190,6 +205,198 @@ class TestCalcLotFromRisk:
         assert "INVALID_SYMBOL" in str(exc_info.value)
 
 
+class TestVectorizedLotSizing:
+    """Test calc_lots against the scalar sizing path."""
+
+    def test_symbol_ids_are_dense_in_load_order(self) -> None:
+        registry = InstrumentRegistry()
+        symbols = registry.list_symbols()
+        assert registry.symbol_ids(symbols).tolist() == list(range(len(symbols)))
+        with pytest.raises(KeyError):
+            registry.symbol_id("INVALID")
+
+    def test_matches_scalar_path(self) -> None:
+        registry = InstrumentRegistry()
+        symbols = registry.list_symbols()
+        rng = np.random.default_rng(7)
+        n = 2_000
+        ids = rng.integers(0, len(symbols), size=n)
+        risk = np.round(rng.uniform(1.0, 5_000.0, size=n), 2)
+        sl = np.round(rng.uniform(1.0, 3_000.0, size=n), 1)
+
+        lots = registry.calc_lots(risk, sl, ids)
+        expected = [registry.calc_lot_from_risk(r, d, symbols[i]) for r, d, i in zip(risk, sl, ids)]
+        assert lots.tolist() == expected
+
+    def test_step_multiples_do_not_drift_down(self) -> None:
+        """0.29 / 0.01 and 1.13 / 0.01 land one ulp short of the integer."""
+        registry = InstrumentRegistry()
+        spec = registry.get("EURUSD")
+        risk = np.array([0.07, 0.29, 1.13]) * spec.point_value * 10.0
+        ids = registry.symbol_ids(["EURUSD"] * 3)
+
+        lots = registry.calc_lots(risk, np.full(3, 10.0), ids)
+
+        assert lots.tolist() == [0.07, 0.29, 1.13]
+        assert registry.calc_lot_from_risk(float(risk[1]), 10.0, "EURUSD") == 0.29
+
+    def test_clamps_like_scalar_path(self) -> None:
+        registry = InstrumentRegistry()
+        spec = registry.get("XAUUSD")
+        ids = registry.symbol_ids(["XAUUSD", "XAUUSD"])
+
+        lots = registry.calc_lots(np.array([0.01, 1e9]), np.array([100.0, 1.0]), ids)
+
+        assert lots.tolist() == [spec.min_lot, spec.max_lot]
+
+    def test_invalid_inputs_raise(self) -> None:
+        registry = InstrumentRegistry()
+        ids = np.array([0, 1])
+        with pytest.raises(ValueError):
+            registry.calc_lots(np.array([100.0, 0.0]), np.array([10.0, 10.0]), ids)
+        with pytest.raises(ValueError):
+            registry.calc_lots(np.array([100.0, 100.0]), np.array([10.0, np.nan]), ids)
+        with pytest.raises(KeyError):
+            registry.calc_lots(np.array([100.0]), np.array([10.0]), np.array([len(registry.list_symbols())]))
+
+
+class TestInstrumentTable:
+    """Test the struct-of-arrays columns behind symbol IDs."""
+
+    def test_columns_match_specs_by_id(self) -> None:
+        registry = InstrumentRegistry()
+        table = registry.table
+        assert len(table) == len(registry.list_symbols())
+        for symbol in registry.list_symbols():
+            i, spec = registry.symbol_id(symbol), registry.get(symbol)
+            assert table.symbols[i] == symbol
+            for field in ("tick_size", "point_value", "contract_size", "min_lot", "max_lot", "lot_step"):
+                assert getattr(table, field)[i] == getattr(spec, field)
+            assert np.isnan(table.margin_rate[i]) and spec.margin_rate is None
+
+    def test_columns_are_read_only(self) -> None:
+        table = InstrumentRegistry().table
+        with pytest.raises(ValueError):
+            table.contract_size[0] = 1.0
+
+    def test_margin_rate_loaded_when_present(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(
+            "instruments:\n"
+            "  EURUSD: {symbol: EURUSD, tick_size: 0.00001, point_value: 10.0, contract_size: 100000,\n"
+            "           min_lot: 0.01, max_lot: 100.0, lot_step: 0.01, margin_rate: 0.0333}\n"
+        )
+        registry = InstrumentRegistry(str(config))
+        assert registry.get("EURUSD").margin_rate == 0.0333
+        assert registry.table.margin_rate[registry.symbol_id("EURUSD")] == 0.0333
+
+    def test_unknown_symbol_in_batch_raises_key_error(self) -> None:
+        with pytest.raises(KeyError, match="INVALID"):
+            InstrumentRegistry().symbol_ids(["EURUSD", "INVALID"])
+
+
+class TestCompiledCache:
+    """Test the binary registry cache keyed by the YAML hash."""
+
+    def test_cache_round_trips_registry(self, tmp_path: Path) -> None:
+        cache = tmp_path / "instruments.cache"
+        cold = InstrumentRegistry(cache_path=cache)
+        assert cache.read_bytes().startswith(CACHE_MAGIC)
+
+        warm = InstrumentRegistry(cache_path=cache)
+
+        assert warm.list_symbols() == cold.list_symbols()
+        assert np.array_equal(warm.table.fields, cold.table.fields, equal_nan=True)
+        assert np.array_equal(warm.table.grid, cold.table.grid)
+        for symbol in cold.list_symbols():
+            assert warm.get(symbol) == cold.get(symbol)
+            assert warm.calc_lot_from_risk(250.0, 37.0, symbol) == cold.calc_lot_from_risk(250.0, 37.0, symbol)
+
+    def test_cache_hit_skips_yaml_parsing(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = tmp_path / "instruments.cache"
+        InstrumentRegistry(cache_path=cache)
+
+        def fail(raw: bytes) -> None:
+            raise AssertionError("YAML parsed despite a valid cache")
+
+        monkeypatch.setattr(InstrumentRegistry, "_parse_yaml", staticmethod(fail))
+        assert InstrumentRegistry(cache_path=cache).get("XAUUSD").symbol == "XAUUSD"
+
+    def test_stale_cache_is_rebuilt(self, tmp_path: Path) -> None:
+        config, cache = tmp_path / "instruments.yaml", tmp_path / "instruments.cache"
+        config.write_text(EURUSD_YAML.format(max_lot=100.0))
+        InstrumentRegistry(str(config), cache_path=cache)
+        config.write_text(EURUSD_YAML.format(max_lot=50.0))
+
+        registry = InstrumentRegistry(str(config), cache_path=cache)
+
+        assert registry.get("EURUSD").max_lot == 50.0
+        assert read_registry_cache(cache, registry.source_hash) is not None
+
+    def test_corrupt_or_foreign_cache_is_a_miss(self, tmp_path: Path) -> None:
+        registry = InstrumentRegistry()
+        cache = write_registry_cache(tmp_path / "instruments.cache", registry.table, registry.source_hash)
+        assert read_registry_cache(cache, "0" * 64) is None
+        cache.write_bytes(cache.read_bytes()[:-8])
+        assert read_registry_cache(cache, registry.source_hash) is None
+        cache.write_text("instruments: {}")
+        assert read_registry_cache(cache, registry.source_hash) is None
+        assert InstrumentRegistry(cache_path=cache).get("EURUSD").lot_step == 0.01
+
+
+class TestHotReload:
+    """Test atomic version swaps and pinned snapshots."""
+
+    def test_reload_swaps_version_only_on_change(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(EURUSD_YAML.format(max_lot=100.0))
+        registry = InstrumentRegistry(str(config))
+
+        assert registry.reload() is False and registry.version == 0
+        config.write_text(EURUSD_YAML.format(max_lot=50.0))
+        assert registry.reload() is True
+
+        assert registry.version == 1
+        assert registry.get("EURUSD").max_lot == 50.0
+        assert registry.table.max_lot[registry.symbol_id("EURUSD")] == 50.0
+
+    def test_snapshot_stays_consistent_across_reload(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(EURUSD_YAML.format(max_lot=100.0))
+        registry = InstrumentRegistry(str(config))
+        pinned = registry.snapshot()
+
+        config.write_text(EURUSD_YAML.format(max_lot=50.0))
+        registry.reload()
+
+        assert pinned.version == 0
+        assert pinned.get("EURUSD").max_lot == 100.0
+        assert pinned.calc_lot_from_risk(1e9, 1.0, "EURUSD") == 100.0
+        assert registry.calc_lot_from_risk(1e9, 1.0, "EURUSD") == 50.0
+
+    def test_hot_reload_picks_up_changes_on_snapshot(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(EURUSD_YAML.format(max_lot=100.0))
+        registry = InstrumentRegistry(str(config), hot_reload=True)
+
+        config.write_text(EURUSD_YAML.format(max_lot=5.0) + "# resized\n")
+
+        assert registry.snapshot().get("EURUSD").max_lot == 5.0
+        assert registry.version == 1
+
+    def test_failed_reload_keeps_current_version(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(EURUSD_YAML.format(max_lot=100.0))
+        registry = InstrumentRegistry(str(config))
+
+        config.write_text("instruments:\n  EURUSD: {symbol: EURUSD}\n")
+        with pytest.raises(TypeError):
+            registry.reload()
+
+        assert registry.version == 0
+        assert registry.get("EURUSD").max_lot == 100.0
+
+
 class TestInstrumentSpecImmutability:
     """Test that InstrumentSpec is properly immutable."""
 
@@ -0,0 +1,84 @@
+"""Tests for lower-timeframe intrabar path resolution."""
+
+import numpy as np
+import pytest
+
+from simulation.intrabar import IntrabarIndex, ohlc_path
+
+T0 = np.datetime64("2024-01-01T09:00", "ns")
+MINUTE = np.timedelta64(1, "m")
+HOUR = np.timedelta64(1, "h")
+
+
+class TestOhlcPath:
+    def test_bar_direction(self) -> None:
+        up = ohlc_path(np.array([1.0, 3.0, 0.0, 2.0]))
+        down = ohlc_path(np.array([2.0, 3.0, 0.0, 1.0]))
+
+        assert list(up) == [1.0, 0.0, 3.0, 2.0]
+        assert list(down) == [2.0, 3.0, 0.0, 1.0]
+
+    def test_nearest_extreme_and_fixed_orders(self) -> None:
+        bar = np.array([2.5, 3.0, 0.0, 2.0])
+
+        assert list(ohlc_path(bar, "NEAREST_EXTREME")) == [2.5, 3.0, 0.0, 2.0]
+        assert list(ohlc_path(bar, "LOW_FIRST")) == [2.5, 0.0, 3.0, 2.0]
+        assert list(ohlc_path(bar, "HIGH_FIRST")) == [2.5, 3.0, 0.0, 2.0]
+
+    def test_concatenates_consecutive_bars(self) -> None:
+        path = ohlc_path(np.array([[1.0, 2.0, 0.5, 1.5], [1.5, 1.6, 1.0, 1.2]]))
+
+        assert list(path) == [1.0, 0.5, 2.0, 1.5, 1.5, 1.6, 1.0, 1.2]
+
+    def test_unknown_heuristic_raises(self) -> None:
+        with pytest.raises(ValueError):
+            ohlc_path(np.array([1.0, 2.0, 0.5, 1.5]), "RANDOM")  # type: ignore[arg-type]
+
+
+class TestIntrabarIndex:
+    def make_index(self, n_parents: int = 3, n_children: int = 150) -> IntrabarIndex:
+        parents = T0 + HOUR * np.arange(n_parents)
+        children = T0 + MINUTE * np.arange(n_children)
+        ohlc = np.column_stack([np.arange(n_children, dtype=float)] * 4)
+        return IntrabarIndex(parents, children, ohlc)
+
+    def test_child_ranges_per_parent(self) -> None:
+        index = self.make_index()
+
+        assert list(index.start) == [0, 60, 120]
+        assert list(index.end) == [60, 120, 150]
+        assert index.children(1)[0, 0] == 60.0
+
+    def test_last_parent_is_closed_by_its_period(self) -> None:
+        index = self.make_index(n_parents=2, n_children=200)
+
+        assert index.end[-1] == 120
+
+    def test_missing_parent_does_not_absorb_next_children(self) -> None:
+        parents = T0 + HOUR * np.array([0, 2, 3])  # the 10:00 bar is missing
+        children = T0 + np.timedelta64(15, "m") * np.arange(16)
+        index = IntrabarIndex(parents, children, np.ones((16, 4)))
+
+        assert [len(index.children(i)) for i in range(3)] == [4, 4, 4]
+        assert index.end[0] == 4
+
+    def test_children_at_timestamp(self) -> None:
+        index = self.make_index()
+
+        assert len(index.children_at(T0 + HOUR)) == 60
+        assert len(index.children_at(T0 + MINUTE)) == 0
+        assert index.locate(T0 + 2 * HOUR) == 2
+
+    def test_missing_children_give_empty_range(self) -> None:
+        parents = T0 + HOUR * np.arange(3)
+        children = T0 + 2 * HOUR + MINUTE * np.arange(5)
+        index = IntrabarIndex(parents, children, np.ones((5, 4)))
+
+        assert [len(index.children(i)) for i in range(3)] == [0, 0, 5]
+
+    def test_validates_inputs(self) -> None:
+        parents = T0 + HOUR * np.arange(2)
+        with pytest.raises(ValueError):
+            IntrabarIndex(parents, T0 + MINUTE * np.arange(3), np.ones((2, 4)))
+        with pytest.raises(ValueError):
+            IntrabarIndex(parents[::-1], T0 + MINUTE * np.arange(3), np.ones((3, 4)))
@@ -0,0 +1,114 @@
+"""Tests for the incremental margin and exposure ledger."""
+
+import numpy as np
+import pytest
+
+from core.instrument_registry import InstrumentRegistry, InstrumentSpec, InstrumentTable
+from core.margin_ledger import MarginLedger
+from core.risk_engine import RiskEngine
+
+
+@pytest.fixture()
+def ledger() -> MarginLedger:
+    return RiskEngine(default_leverage=50.0, instrument_leverage={"XAUUSD": 20.0}).new_ledger(InstrumentRegistry())
+
+
+class TestBooking:
+    def test_open_and_add_accumulate_cost_basis(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 0.5, 1.10)
+        delta = ledger.apply_fill("EURUSD", 0.5, 1.20)
+
+        position, notional, margin = ledger.symbol_exposure("EURUSD")
+        assert position == pytest.approx(1.0)
+        assert notional == pytest.approx(0.5 * 100_000 * 1.10 + 0.5 * 100_000 * 1.20)
+        assert margin == pytest.approx(notional / 50.0)
+        assert delta == pytest.approx(0.5 * 100_000 * 1.20 / 50.0)
+        assert ledger.used_margin == pytest.approx(margin)
+
+    def test_reduce_releases_at_average_price(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 1.0, 1.10)
+        ledger.apply_fill("EURUSD", -0.25, 1.50)
+
+        position, notional, _ = ledger.symbol_exposure("EURUSD")
+        assert position == pytest.approx(0.75)
+        assert notional == pytest.approx(0.75 * 100_000 * 1.10)
+
+    def test_flip_reopens_remainder_at_fill_price(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 0.5, 1.10)
+        ledger.apply_fill("EURUSD", -0.8, 1.20)
+
+        position, notional, _ = ledger.symbol_exposure("EURUSD")
+        assert position == pytest.approx(-0.3)
+        assert notional == pytest.approx(-0.3 * 100_000 * 1.20)
+
+    def test_close_flattens_book_and_totals(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 0.5, 1.10)
+        ledger.apply_fill("XAUUSD", -0.2, 2000.0)
+
+        assert ledger.close("EURUSD", 1.15) == pytest.approx(0.5)
+        assert ledger.open_positions == 1
+        assert ledger.close("XAUUSD", 2010.0) == pytest.approx(-0.2)
+        assert ledger.close("XAUUSD", 2010.0) == 0.0
+
+        assert ledger.open_positions == 0
+        assert ledger.used_margin == 0.0
+        assert ledger.gross_notional == 0.0
+        assert ledger.currency_exposure() == {}
+
+    def test_unknown_symbol_raises(self, ledger: MarginLedger) -> None:
+        with pytest.raises(KeyError, match="NOPE"):
+            ledger.apply_fill("NOPE", 1.0, 1.0)
+
+
+class TestCurrencyExposure:
+    def test_pairs_book_base_long_and_quote_short(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 1.0, 1.10)
+        ledger.apply_fill("USDJPY", -0.5, 150.0)
+
+        exposure = ledger.currency_exposure()
+        assert exposure["EUR"] == pytest.approx(100_000)
+        assert exposure["USD"] == pytest.approx(-110_000 - 50_000)
+        assert exposure["JPY"] == pytest.approx(0.5 * 100_000 * 150.0)
+
+    def test_non_pair_symbol_requires_quote_currency(self) -> None:
+        spec = InstrumentSpec(
+            symbol="US100", tick_size=0.1, point_value=1.0, contract_size=1.0, min_lot=0.1, max_lot=50.0, lot_step=0.1
+        )
+        with pytest.raises(ValueError, match="quote_currency"):
+            InstrumentTable.from_specs([spec])
+
+
+class TestPreviewAndReconcile:
+    def test_preview_matches_booking_without_mutating(self, ledger: MarginLedger) -> None:
+        ledger.apply_fill("EURUSD", 0.5, 1.10)
+        fills = [("EURUSD", -0.8, 1.20), ("XAUUSD", 0.1, 2000.0), ("EURUSD", 0.1, 1.21)]
+        before = ledger.used_margin
+
+        preview = ledger.preview(fills)
+
+        assert ledger.used_margin == before
+        assert ledger.symbol_exposure("EURUSD")[0] == pytest.approx(0.5)
+        booked = sum(ledger.apply_fill(*fill) for fill in fills)
+        assert preview == pytest.approx(booked)
+        assert ledger.used_margin - before == pytest.approx(preview)
+
+    def test_running_totals_match_rows(self, ledger: MarginLedger) -> None:
+        rng = np.random.default_rng(7)
+        symbols = ledger.table.symbols
+        for _ in range(500):
+            symbol = symbols[int(rng.integers(len(symbols)))]
+            ledger.apply_fill(
+                symbol, float(rng.choice([-1, 1]) * rng.integers(1, 50) / 100), float(rng.uniform(1, 100))
+            )
+
+        used, gross = ledger.used_margin, ledger.gross_notional
+        assert abs(ledger.reconcile()) < 1e-6 * max(used, 1.0)
+        assert used == pytest.approx(float(ledger.margin.sum()))
+        assert gross == pytest.approx(float(np.abs(ledger.notional).sum()))
+
+    def test_leverage_must_match_table(self) -> None:
+        table = InstrumentRegistry().table
+        with pytest.raises(ValueError, match="leverage"):
+            MarginLedger(table, np.ones(len(table) + 1))
+        with pytest.raises(ValueError, match="leverage"):
+            MarginLedger(table, np.zeros(len(table)))
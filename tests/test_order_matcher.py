@@ -0,0 +1,192 @@
+"""Tests for the heap-indexed pending order matcher."""
+
+import numpy as np
+import pytest
+
+from simulation.order_matcher import OrderMatcher, order_kind
+
+
+class TestOrderKind:
+    def test_market_without_entry_or_at_price(self) -> None:
+        assert order_kind("BUY", None, 1.10) == "MARKET"
+        assert order_kind("SELL", 1.10, 1.10) == "MARKET"
+
+    def test_limit_and_stop_by_side(self) -> None:
+        assert order_kind("BUY", 1.09, 1.10) == "LIMIT"
+        assert order_kind("BUY", 1.11, 1.10) == "STOP"
+        assert order_kind("SELL", 1.11, 1.10) == "LIMIT"
+        assert order_kind("SELL", 1.09, 1.10) == "STOP"
+
+
+class TestPlacement:
+    def test_market_order_takes_adverse_slippage(self) -> None:
+        matcher = OrderMatcher(slippage={"XAUUSD": 0.2})
+
+        buy = matcher.market("XAUUSD", "BUY", 1.0, 2400.0)
+        sell = matcher.market("XAUUSD", "SELL", 1.0, 2400.0)
+
+        assert buy.fill_price == pytest.approx(2400.2)
+        assert sell.fill_price == pytest.approx(2399.8)
+        assert buy.slippage == pytest.approx(0.2)
+
+    def test_rejects_market_kind_and_bad_quantity(self) -> None:
+        matcher = OrderMatcher()
+
+        with pytest.raises(ValueError):
+            matcher.place("EURUSD", "BUY", "MARKET", 1.0, 1.10)
+        with pytest.raises(ValueError):
+            matcher.place("EURUSD", "BUY", "LIMIT", 0.0, 1.10)
+        with pytest.raises(ValueError):
+            matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.10, oco=99)
+
+    def test_rejects_negative_slippage(self) -> None:
+        with pytest.raises(ValueError):
+            OrderMatcher(default_slippage=-0.1)
+
+
+class TestMatching:
+    def test_untouched_orders_keep_resting(self) -> None:
+        matcher = OrderMatcher()
+        matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0950)
+        matcher.place("EURUSD", "BUY", "STOP", 1.0, 1.1050)
+
+        assert matcher.match_bar("EURUSD", 1.1000, 1.1040, 1.0960, 1.1010) == []
+        assert len(matcher) == 2
+
+    def test_only_crossed_orders_fill_best_price_first(self) -> None:
+        matcher = OrderMatcher()
+        ids = [matcher.place("EURUSD", "BUY", "LIMIT", 1.0, p) for p in (1.0990, 1.0970, 1.0950, 1.0930)]
+
+        matched = matcher.match_bar("EURUSD", 1.1000, 1.1010, 1.0960, 1.0980)
+
+        assert [m.order.order_id for m in matched] == ids[:2]
+        assert [m.execution.fill_price for m in matched] == pytest.approx([1.0990, 1.0970])
+        assert {o.order_id for o in matcher.pending()} == set(ids[2:])
+
+    def test_stop_fills_with_slippage(self) -> None:
+        matcher = OrderMatcher(default_slippage=0.0002)
+        matcher.place("EURUSD", "BUY", "STOP", 1.0, 1.1020)
+        matcher.place("EURUSD", "SELL", "STOP", 1.0, 1.0980)
+
+        matched = matcher.match_bar("EURUSD", 1.1000, 1.1030, 1.0970, 1.1010)
+
+        prices = {m.order.side: m.execution.fill_price for m in matched}
+        assert prices["BUY"] == pytest.approx(1.1022)
+        assert prices["SELL"] == pytest.approx(1.0978)
+
+    def test_gap_fills_at_open(self) -> None:
+        matcher = OrderMatcher()
+        matcher.place("EURUSD", "SELL", "STOP", 1.0, 1.0980)
+        matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0990)
+
+        matched = matcher.match_bar("EURUSD", 1.0950, 1.0960, 1.0940, 1.0955)
+
+        stop = next(m for m in matched if m.order.kind == "STOP")
+        limit = next(m for m in matched if m.order.kind == "LIMIT")
+        assert stop.execution.fill_price == pytest.approx(1.0950)
+        assert stop.execution.slippage == pytest.approx(0.0030)
+        assert limit.execution.fill_price == pytest.approx(1.0950)
+
+    def test_fills_follow_the_bar_path(self) -> None:
+        matcher = OrderMatcher()
+        tp = matcher.place("EURUSD", "SELL", "LIMIT", 1.0, 1.1020)
+        sl = matcher.place("EURUSD", "SELL", "STOP", 1.0, 1.0980)
+
+        # Down bar: open → high → low → close, so the high-side order fills first
+        matched = matcher.match_bar("EURUSD", 1.1000, 1.1030, 1.0970, 1.0990)
+
+        assert [m.order.order_id for m in matched] == [tp, sl]
+
+    def test_symbols_are_independent(self) -> None:
+        matcher = OrderMatcher()
+        matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0990)
+
+        assert matcher.match_bar("GBPUSD", 1.2700, 1.2710, 1.0000, 1.2705) == []
+        assert len(matcher) == 1
+
+
+class TestCancellation:
+    def test_oco_sibling_is_cancelled_on_fill(self) -> None:
+        matcher = OrderMatcher()
+        sl = matcher.place("XAUUSD", "SELL", "STOP", 0.5, 2380.0)
+        tp = matcher.place("XAUUSD", "SELL", "LIMIT", 0.5, 2440.0, oco=sl)
+
+        # Up bar: open → low → high → close; the stop is hit first
+        matched = matcher.match_bar("XAUUSD", 2400.0, 2450.0, 2370.0, 2420.0)
+
+        assert [m.order.order_id for m in matched] == [sl]
+        assert tp not in matcher.orders
+        assert len(matcher) == 0
+
+    def test_cancelled_order_never_fills(self) -> None:
+        matcher = OrderMatcher()
+        first = matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0990)
+        second = matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0980)
+
+        assert matcher.cancel(first)
+        assert not matcher.cancel(first)
+        matched = matcher.match_bar("EURUSD", 1.1000, 1.1010, 1.0970, 1.1000)
+
+        assert [m.order.order_id for m in matched] == [second]
+
+    def test_dead_entries_are_compacted(self) -> None:
+        matcher = OrderMatcher()
+        ids = [matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0 + i * 1e-4) for i in range(10)]
+        for order_id in ids[:8]:
+            matcher.cancel(order_id)
+
+        book = matcher._books["EURUSD"]
+        assert len(book.below) + len(book.above) - book.dead == 2
+        assert len(book.below) < 10
+
+    def test_cancel_symbol(self) -> None:
+        matcher = OrderMatcher()
+        matcher.place("EURUSD", "BUY", "LIMIT", 1.0, 1.0990)
+        matcher.place("EURUSD", "SELL", "LIMIT", 1.0, 1.1010)
+        matcher.place("GBPUSD", "BUY", "LIMIT", 1.0, 1.2690)
+
+        assert matcher.cancel_symbol("EURUSD") == 2
+        assert [o.symbol for o in matcher.pending()] == ["GBPUSD"]
+        assert matcher.match_bar("EURUSD", 1.1000, 1.1100, 1.0900, 1.1000) == []
+
+
+class TestIntrabarResolution:
+    """A bar reaching both SL and TP fills the one its child bars reached first."""
+
+    def bracket(self, matcher: OrderMatcher) -> tuple[int, int]:
+        sl = matcher.place("XAUUSD", "SELL", "STOP", 0.5, 2380.0)
+        tp = matcher.place("XAUUSD", "SELL", "LIMIT", 0.5, 2440.0, oco=sl)
+        return sl, tp
+
+    def test_children_override_the_heuristic(self) -> None:
+        matcher = OrderMatcher()
+        sl, tp = self.bracket(matcher)
+        # Up bar: the heuristic visits the low (SL) first, the children reach the TP first
+        children = np.array([[2400.0, 2445.0, 2398.0, 2430.0], [2430.0, 2432.0, 2370.0, 2420.0]])
+
+        matched = matcher.match_bar("XAUUSD", 2400.0, 2445.0, 2370.0, 2420.0, children=children)
+
+        assert [m.order.order_id for m in matched] == [tp]
+        assert sl not in matcher.orders
+
+    def test_empty_children_fall_back_to_heuristic(self) -> None:
+        matcher = OrderMatcher(heuristic="HIGH_FIRST")
+        _, tp = self.bracket(matcher)
+
+        matched = matcher.match_bar("XAUUSD", 2400.0, 2445.0, 2370.0, 2420.0, children=np.empty((0, 4)))
+
+        assert [m.order.order_id for m in matched] == [tp]
+
+    def test_configurable_heuristic(self) -> None:
+        # Down bar whose open sits next to the low
+        bar = ("XAUUSD", 2385.0, 2445.0, 2370.0, 2380.0)
+        by_direction, nearest = OrderMatcher(), OrderMatcher(heuristic="NEAREST_EXTREME")
+        _, tp = self.bracket(by_direction)
+        sl, _ = self.bracket(nearest)
+
+        assert [m.order.order_id for m in by_direction.match_bar(*bar)] == [tp]
+        assert [m.order.order_id for m in nearest.match_bar(*bar)] == [sl]
+
+    def test_rejects_unknown_heuristic(self) -> None:
+        with pytest.raises(ValueError):
+            OrderMatcher(heuristic="RANDOM")  # type: ignore[arg-type]
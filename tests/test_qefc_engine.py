@@ -137,6 +137,18 @@ class TestSignalFusion:
         assert decision.state == QEFCState.N
         assert decision.risk_factor == 0.0
 
+    def test_inactive_agents_are_ignored(self) -> None:
+        """Signals outside the active-agent mask do not reach fusion."""
+        engine = QEFCEngine(conflict_threshold=0.5)
+        signals = [
+            make_signal(intent="LONG", confidence=0.9, agent_name="trend"),
+            make_signal(intent="SHORT", confidence=0.9, agent_name="benched"),
+        ]
+
+        decision = engine.evaluate(signals, make_regime(), make_portfolio(), active={"trend"})
+
+        assert decision.state == QEFCState.T
+
     def test_empty_signals_returns_N(self) -> None:
         """No signals → N (wait)."""
         engine = QEFCEngine()
@@ -0,0 +1,132 @@
+"""Tests for the evolution driver (multiverse/evolution.py)."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from multiverse.evolution import (
+    Evolution,
+    EvolutionConfig,
+    StructuralRules,
+    latest_checkpoint,
+    local_mutation,
+    mutate,
+    row_column_mutation,
+    select_parents,
+    selection_probabilities,
+)
+from multiverse.universe import C, F, N, T, parametric_universes, stack_tables
+
+SMALL = EvolutionConfig(population=24, elite=2, n_streams=256, length=48)
+
+
+def population(n: int = 64) -> np.ndarray:
+    base = stack_tables(parametric_universes())
+    return base[np.arange(n) % len(base)]
+
+
+class TestMutations:
+    def test_local_mutation_changes_at_most_one_cell(self) -> None:
+        parents = population()
+        children = local_mutation(parents, np.random.default_rng(0), p=1.0)
+        changed = np.count_nonzero(children != parents, axis=(1, 2))
+        assert changed.max() <= 1
+        assert changed.sum() > 0
+
+    def test_row_column_mutation_touches_one_line(self) -> None:
+        parents = population()
+        children = row_column_mutation(parents, np.random.default_rng(1), p=1.0)
+        diff = children != parents
+        for d in diff:
+            rows, cols = np.nonzero(d)
+            assert len(set(rows)) <= 1 or len(set(cols)) <= 1
+
+    def test_zero_probability_is_identity(self) -> None:
+        parents = population()
+        assert np.array_equal(mutate(parents, np.random.default_rng(2), p_local=0.0, p_row=0.0), parents)
+
+    def test_irreversibility_blocks_f_to_t(self) -> None:
+        parents = np.full((1, 4, 4), F, dtype=np.int8)
+        children = np.full((1, 4, 4), T, dtype=np.int8)
+        repaired = StructuralRules(protect=2.0).apply(parents, children, np.random.default_rng(0))
+        assert np.all(repaired == F)
+
+    def test_protected_cells_keep_authority(self) -> None:
+        parents = np.full((1, 4, 4), T, dtype=np.int8)
+        children = np.full((1, 4, 4), N, dtype=np.int8)
+        repaired = StructuralRules().apply(parents, children, np.random.default_rng(0))
+        # T and C operands (authority >= 0.7) are protected, the rest may downgrade
+        assert repaired[0, T, T] == T and repaired[0, C, T] == T and repaired[0, C, C] == T
+        assert repaired[0, N, T] == N and repaired[0, F, F] == N
+
+    def test_withdrawal_thins_contradictions(self) -> None:
+        children = np.full((200, 4, 4), C, dtype=np.int8)
+        repaired = StructuralRules(max_contradictions=4).apply(children, children, np.random.default_rng(3))
+        counts = np.count_nonzero(repaired == C, axis=(1, 2))
+        assert abs(counts.mean() - 4) < 1.0
+        assert np.all((repaired == C) | (repaired == N))
+
+
+class TestSelection:
+    def test_softmax_probabilities(self) -> None:
+        probs = selection_probabilities(np.array([0.0, np.log(3.0)]), temperature=1.0)
+        assert np.allclose(probs, [0.25, 0.75])
+
+    def test_temperature_flattens_distribution(self) -> None:
+        fitness = np.array([0.0, 1.0, 2.0])
+        assert selection_probabilities(fitness, 100.0).std() < selection_probabilities(fitness, 0.5).std()
+
+    def test_large_fitness_is_stable(self) -> None:
+        probs = selection_probabilities(np.array([1e6, 1e6 - 1.0]), temperature=1.0)
+        assert np.isfinite(probs).all() and probs[0] > probs[1]
+
+    def test_select_parents_follows_probabilities(self) -> None:
+        parents = select_parents(np.array([0.0, np.log(3.0)]), 1.0, 20_000, np.random.default_rng(0))
+        assert abs(parents.mean() - 0.75) < 0.01
+
+    def test_invalid_temperature_raises(self) -> None:
+        with pytest.raises(ValueError):
+            selection_probabilities(np.zeros(3), 0.0)
+
+
+class TestEvolution:
+    def test_run_produces_generations(self) -> None:
+        final = Evolution(SMALL).run(generations=3)
+        assert final.index == 2
+        assert final.tables.shape == (24, 4, 4)
+        assert final.fitness.shape == final.ratings.shape == (24,)
+
+    def test_elite_survives(self) -> None:
+        evolution = Evolution(SMALL)
+        first = evolution.run(generations=1)
+        best = first.tables[first.best()]
+        second = evolution.run(generations=2)
+        assert np.array_equal(second.tables[0], best)
+
+    def test_workers_do_not_change_results(self) -> None:
+        inline = Evolution(SMALL).run(generations=3)
+        pooled = Evolution(SMALL, workers=2).run(generations=3)
+        assert np.array_equal(inline.tables, pooled.tables)
+        assert np.allclose(inline.fitness, pooled.fitness)
+
+    def test_resume_continues_identically(self, tmp_path: Path) -> None:
+        straight = Evolution(SMALL).run(generations=4)
+
+        Evolution(SMALL, checkpoint_dir=tmp_path).run(generations=2)
+        assert latest_checkpoint(tmp_path) == tmp_path / "generation_000001.npz"
+        resumed = Evolution.resume(tmp_path)
+        assert resumed.config == SMALL
+        final = resumed.run(generations=4)
+
+        assert np.array_equal(final.tables, straight.tables)
+        assert np.allclose(final.ratings, straight.ratings)
+        assert len(list(tmp_path.glob("*.npz"))) == 4
+
+    def test_resume_without_checkpoint_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(FileNotFoundError):
+            Evolution.resume(tmp_path)
+
+    def test_invalid_elite_raises(self) -> None:
+        with pytest.raises(ValueError):
+            EvolutionConfig(population=4, elite=4)
@@ -0,0 +1,98 @@
+"""Tests for the consistency-lifetime benchmark (multiverse/lifetime.py)."""
+
+from collections import Counter, deque
+
+import numpy as np
+import pytest
+
+from multiverse.lifetime import (
+    InputEnvironment,
+    LifetimeBenchmark,
+    LifetimeReport,
+    consistency_lifetimes,
+    window_entropy,
+)
+from multiverse.universe import C, F, N, T, parametric_universes, stack_tables, unpack_codes
+
+
+def reference_lifetime(table: np.ndarray, stream: np.ndarray, window: int, threshold: float) -> int:
+    """Step-by-step §5.2 definition with a window pre-filled with s_0 = T."""
+    recent = deque([T] * window, maxlen=window)
+    state = T
+    for t, x in enumerate(stream):
+        state = int(table[state, x])
+        recent.append(state)
+        counts = Counter(recent)
+        if window_entropy(np.array([counts[s] for s in range(4)])) > threshold + 1e-12:
+            return t
+    return len(stream)
+
+
+class TestInputEnvironment:
+    def test_probabilities_by_state(self) -> None:
+        probs = InputEnvironment(p_noise=0.2, p_conflict=0.1, p_adversarial=0.05).probabilities()
+        assert probs[T] == pytest.approx(0.65)
+        assert (probs[N], probs[C], probs[F]) == (0.2, 0.1, 0.05)
+
+    def test_sample_frequencies(self) -> None:
+        env = InputEnvironment(p_noise=0.3, p_conflict=0.2, p_adversarial=0.1)
+        streams = env.sample(np.random.default_rng(0), 2_000, 100)
+        freq = np.bincount(streams.ravel(), minlength=4) / streams.size
+        assert np.allclose(freq, env.probabilities(), atol=0.005)
+
+    def test_invalid_probabilities_raise(self) -> None:
+        with pytest.raises(ValueError):
+            InputEnvironment(p_noise=0.6, p_conflict=0.5)
+
+
+class TestLifetimeKernel:
+    def test_entropy_bounds(self) -> None:
+        assert window_entropy(np.array([8, 0, 0, 0])) == 0.0
+        assert window_entropy(np.array([2, 2, 2, 2])) == pytest.approx(2.0)
+
+    @pytest.mark.parametrize("window,threshold", [(1, 0.5), (4, 1.0), (8, 1.5), (10, 1.2)])
+    def test_matches_reference_fold(self, window: int, threshold: float) -> None:
+        rng = np.random.default_rng(window)
+        codes = rng.integers(0, 2**32, size=6, dtype=np.uint64).astype(np.uint32)
+        tables = np.concatenate([stack_tables(parametric_universes()), unpack_codes(codes)])
+        streams = InputEnvironment(0.3, 0.2, 0.1).sample(rng, 40, 37)
+
+        lifetimes = consistency_lifetimes(tables, streams, window, threshold)
+        expected = [[reference_lifetime(table, s, window, threshold) for s in streams] for table in tables]
+        assert np.array_equal(lifetimes, expected)
+
+    def test_constant_universe_never_collapses(self) -> None:
+        tables = np.full((1, 4, 4), T, dtype=np.int8)
+        streams = InputEnvironment(0.4, 0.3, 0.2).sample(np.random.default_rng(1), 10, 50)
+        assert np.all(consistency_lifetimes(tables, streams) == 50)
+
+    def test_window_out_of_range_raises(self) -> None:
+        with pytest.raises(ValueError):
+            consistency_lifetimes(np.zeros((1, 4, 4)), np.zeros((1, 5)), window=11)
+
+
+class TestLifetimeBenchmark:
+    def test_histogram_counts_every_stream(self) -> None:
+        report = LifetimeBenchmark(length=32, chunk_size=1_000).run(stack_tables(parametric_universes()), 2_500)
+        assert report.histogram.shape == (8, 33)
+        assert np.all(report.histogram.sum(axis=1) == 2_500)
+        assert report.n_sequences == 2_500
+
+    def test_reproducible_and_independent_of_workers(self) -> None:
+        tables = stack_tables(parametric_universes())
+        inline = LifetimeBenchmark(length=48, chunk_size=500).run(tables, 2_000, seed=3)
+        pooled = LifetimeBenchmark(length=48, chunk_size=500, workers=2).run(tables, 2_000, seed=3)
+        assert np.array_equal(inline.histogram, pooled.histogram)
+
+    def test_stream_yields_growing_reports(self) -> None:
+        bench = LifetimeBenchmark(length=16, chunk_size=100)
+        totals = [r.n_sequences for r in bench.stream(stack_tables(parametric_universes()), 350)]
+        assert totals == [100, 200, 300, 350]
+
+    def test_report_statistics(self) -> None:
+        report = LifetimeReport(histogram=np.array([[1, 0, 1, 2], [0, 0, 0, 4]]))
+        assert np.allclose(report.mean(), [2.0, 3.0])
+        assert np.allclose(report.survival_rate(), [0.5, 1.0])
+        assert np.array_equal(report.quantile(0.5), [2, 3])
+        assert np.allclose(report.survival_curve()[0], [1.0, 0.75, 0.75, 0.5])
+        assert list(report.ranking()) == [1, 0]
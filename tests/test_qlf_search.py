@@ -0,0 +1,153 @@
+"""Tests for packed universe encoding and constrained search (multiverse/search.py)."""
+
+from typing import Sequence
+
+import numpy as np
+import pytest
+
+from multiverse.benchmark import benchmark_scores, packed_benchmark_scores
+from multiverse.search import (
+    DEFAULT_CONSTRAINTS,
+    CellConstraint,
+    Commutative,
+    SearchSpace,
+    UniverseSearch,
+    absorbing,
+    forbid,
+    identity,
+)
+from multiverse.universe import (
+    C,
+    F,
+    N,
+    QLFUniverse,
+    T,
+    pack_tables,
+    parametric_universes,
+    stack_tables,
+    unpack_codes,
+)
+
+
+def random_codes(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 2**32, size=n, dtype=np.uint64).astype(np.uint32)
+
+
+class TestPackedEncoding:
+    def test_pack_unpack_round_trip(self) -> None:
+        codes = random_codes(5_000)
+        assert np.array_equal(pack_tables(unpack_codes(codes)), codes)
+
+    def test_cell_layout(self) -> None:
+        table = np.zeros((4, 4), dtype=np.int8)
+        table[N, C] = C
+        assert QLFUniverse(table=table).code == C << (2 * (4 * N + C))
+
+    def test_universe_from_code(self) -> None:
+        u = parametric_universes()[5]
+        assert QLFUniverse.from_code(u.code) == u
+
+    def test_packed_scores_match_table_scores(self) -> None:
+        codes = random_codes(2_000, seed=3)
+        assert np.array_equal(packed_benchmark_scores(codes), benchmark_scores(unpack_codes(codes)))
+
+
+class TestConstraints:
+    def test_cell_constraint_mask(self) -> None:
+        tables = unpack_codes(random_codes(1_000))
+        mask = identity("T").mask(pack_tables(tables))
+        assert np.array_equal(mask, tables[:, T, T] == T)
+
+    def test_commutative_mask(self) -> None:
+        tables = unpack_codes(random_codes(1_000))
+        tables[:10] = tables[:10] & np.triu(np.ones((4, 4), dtype=np.int8) * 3)
+        tables[:10] = np.maximum(tables[:10], np.swapaxes(tables[:10], 1, 2))
+        mask = Commutative().mask(pack_tables(tables))
+        expected = np.all(tables == np.swapaxes(tables, 1, 2), axis=(1, 2))
+        assert np.array_equal(mask, expected)
+        assert mask[:10].all()
+
+    def test_absorbing_covers_row_and_column(self) -> None:
+        constraints = absorbing("F")
+        assert len(constraints) == 7
+        assert {c.cell for c in constraints} == {(F, s) for s in range(4)} | {(s, F) for s in range(4)}
+
+    def test_forbid(self) -> None:
+        assert forbid("F", "T", "T").allowed == ("F", "N", "C")
+
+    def test_unknown_state_raises_key_error(self) -> None:
+        with pytest.raises(KeyError):
+            CellConstraint("T", "X", ("T",))
+
+    def test_parametric_universes_satisfy_defaults(self) -> None:
+        codes = pack_tables(stack_tables(parametric_universes()))
+        assert len(UniverseSearch().prune(codes)) == 8
+
+
+class TestSearchSpace:
+    def test_cell_constraints_shrink_space(self) -> None:
+        space = SearchSpace.from_constraints(DEFAULT_CONSTRAINTS)
+        # 2 pinned identity cells, 7 F cells with 2 options, 7 free cells
+        assert space.size == 4**7 * 2**7
+
+    def test_unconstrained_space_is_identity(self) -> None:
+        space = SearchSpace.from_constraints(())
+        assert space.size == 4**16
+        indices = np.arange(0, 4**16, 4_000_037, dtype=np.uint64)
+        assert np.array_equal(space.decode(indices), indices.astype(np.uint32))
+
+    def test_decode_respects_every_cell_constraint(self) -> None:
+        space = SearchSpace.from_constraints(DEFAULT_CONSTRAINTS)
+        codes = space.decode(np.arange(space.size, dtype=np.uint64))
+        assert len(np.unique(codes)) == space.size
+        for constraint in DEFAULT_CONSTRAINTS:
+            if isinstance(constraint, CellConstraint):
+                assert constraint.mask(codes).all()
+
+    def test_contradictory_constraints_raise(self) -> None:
+        with pytest.raises(ValueError):
+            SearchSpace.from_constraints((identity("T"), forbid("T", "T", "T")))
+
+
+class TestUniverseSearch:
+    def test_enumerate_matches_brute_force(self) -> None:
+        constraints: Sequence[CellConstraint | Commutative] = (
+            identity("T"),
+            identity("N"),
+            *absorbing("F"),
+            Commutative(),
+        )
+        result = UniverseSearch(constraints=constraints, chunk_size=7).enumerate(top_k=5)
+
+        space = SearchSpace.from_constraints(constraints)
+        codes = space.decode(np.arange(space.size, dtype=np.uint64))
+        codes = codes[Commutative().mask(codes)]
+        scores = packed_benchmark_scores(codes)
+        assert result.candidates == space.size
+        assert result.survivors == len(codes)
+        assert result.scores[0] == scores.max()
+        assert list(result.scores) == sorted(scores, reverse=True)[:5]
+
+    def test_default_search_finds_best_parametric_score(self) -> None:
+        result = UniverseSearch().enumerate(top_k=3)
+        assert result.scores[0] >= 34
+        assert all(len(UniverseSearch().prune(np.array([u.code], dtype=np.uint32))) == 1 for u in result.universes())
+
+    def test_results_independent_of_workers_and_chunking(self) -> None:
+        inline = UniverseSearch(chunk_size=1 << 18).enumerate(top_k=10)
+        pooled = UniverseSearch(workers=2, chunk_size=1 << 19).enumerate(top_k=10)
+        assert np.array_equal(inline.codes, pooled.codes)
+        assert np.array_equal(inline.scores, pooled.scores)
+
+    def test_sample_is_reproducible(self) -> None:
+        search = UniverseSearch(constraints=(), chunk_size=1 << 14)
+        first = search.sample(50_000, seed=42, top_k=5)
+        second = search.sample(50_000, seed=42, top_k=5)
+        assert first.candidates == 50_000
+        assert np.array_equal(first.codes, second.codes)
+
+    def test_invalid_arguments_raise(self) -> None:
+        with pytest.raises(ValueError):
+            UniverseSearch(workers=0)
+        with pytest.raises(ValueError):
+            UniverseSearch().enumerate(top_k=0)
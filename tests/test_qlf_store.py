@@ -0,0 +1,147 @@
+"""Tests for the binary universe catalog (multiverse/store.py)."""
+
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from multiverse.search import UniverseSearch
+from multiverse.store import UniverseCatalog, UniverseLoader, packed_hashes, write_catalog
+from multiverse.universe import pack_tables, parametric_universes, stack_tables, universe_hash, unpack_codes
+
+
+def unique_codes(n: int, seed: int = 0) -> np.ndarray:
+    codes = np.random.default_rng(seed).integers(0, 2**32, size=2 * n, dtype=np.uint64).astype(np.uint32)
+    return np.unique(codes)[:n]
+
+
+@pytest.fixture
+def parametric_catalog(tmp_path: Path) -> Path:
+    universes = parametric_universes()
+    return write_catalog(
+        tmp_path / "parametric.qlfc",
+        pack_tables(stack_tables(universes)),
+        parents=np.array([-1, 0, 1, -1, -1, -1, -1, 6]),
+        generations=np.array([0, 1, 2, 0, 0, 0, 0, 1]),
+        elo_history=[[1000.0, 1016.0], [], [990.5], [], [], [], [], [1000.0, 984.0, 1001.0]],
+        params={i: u.params for i, u in enumerate(universes)},
+        names={i: f"u{i + 1}" for i in range(len(universes))},
+        meta={"source": "test"},
+    )
+
+
+class TestCatalogRoundTrip:
+    def test_columns_round_trip(self, parametric_catalog: Path) -> None:
+        catalog = UniverseCatalog(parametric_catalog)
+        tables = stack_tables(parametric_universes())
+        assert len(catalog) == 8
+        assert np.array_equal(catalog.tables(), tables)
+        assert np.array_equal(catalog.hashes, universe_hash(tables))
+        assert catalog.meta == {"source": "test"}
+        assert isinstance(catalog.codes, np.memmap)
+
+    def test_elo_history_and_latest_rating(self, parametric_catalog: Path) -> None:
+        catalog = UniverseCatalog(parametric_catalog)
+        assert np.array_equal(catalog.elo_history(7), [1000.0, 984.0, 1001.0])
+        assert catalog.elo_history(1).size == 0
+        assert catalog.elo[0] == 1016.0 and np.isnan(catalog.elo[1])
+
+    def test_lineage(self, parametric_catalog: Path) -> None:
+        catalog = UniverseCatalog(parametric_catalog)
+        assert catalog.lineage(2) == [2, 1, 0]
+        assert catalog.lineage(3) == [3]
+
+    def test_universe_carries_metadata(self, parametric_catalog: Path) -> None:
+        u = UniverseCatalog(parametric_catalog).universe(5)
+        expected = parametric_universes()[5]
+        assert u == expected
+        assert u.params["Q1"] == expected.params["Q1"]
+        assert u.params["hash"] == expected.hash
+
+    def test_params_and_names_round_trip(self, tmp_path: Path) -> None:
+        params = {0: {"score": 7, "rate": 0.5, "live": True, "tag": "a", "lags": [1, 2]}, 2: {"score": -3, "tag": "é"}}
+        catalog = UniverseCatalog(write_catalog(tmp_path / "p.qlfc", unique_codes(3), params=params, names={2: "c"}))
+        assert catalog.params(0) == params[0]
+        assert catalog.params(1) == {}
+        assert catalog.params(2) == params[2]
+        assert catalog.names == {"c": 2}
+        assert catalog.name(2) == "c" and catalog.name(0) is None
+        assert catalog.index_of_name("c") == 2 and catalog.index_of_name("d") == -1
+
+    def test_header_size_independent_of_record_count(self, tmp_path: Path) -> None:
+        def header_len(n: int) -> int:
+            path = write_catalog(
+                tmp_path / f"{n}.qlfc",
+                unique_codes(n),
+                params={i: {"score": i, "label": f"Q{i}"} for i in range(n)},
+                names={i: f"u{i}" for i in range(n)},
+            )
+            with open(path, "rb") as fh:
+                fh.seek(8)
+                return struct.unpack("<Q", fh.read(8))[0]
+
+        assert header_len(20_000) - header_len(10) < 128
+
+    def test_empty_catalog(self, tmp_path: Path) -> None:
+        catalog = UniverseCatalog(write_catalog(tmp_path / "empty.qlfc", np.empty(0, dtype=np.uint32)))
+        assert len(catalog) == 0
+        assert catalog.lookup(np.array([1], dtype=np.uint64))[0] == -1
+
+    def test_rejects_foreign_files(self, tmp_path: Path) -> None:
+        path = tmp_path / "universe.csv"
+        path.write_text("T,F,N,C\n")
+        with pytest.raises(ValueError):
+            UniverseCatalog(path)
+
+    def test_mismatched_columns_raise(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            write_catalog(tmp_path / "bad.qlfc", unique_codes(4), parents=np.zeros(3))
+
+
+class TestHashLookup:
+    def test_every_record_found_by_hash(self, tmp_path: Path) -> None:
+        codes = unique_codes(50_000)
+        catalog = UniverseCatalog(write_catalog(tmp_path / "pop.qlfc", codes))
+        assert np.array_equal(catalog.lookup(catalog.hashes), np.arange(len(codes)))
+
+    def test_missing_hashes_return_minus_one(self, tmp_path: Path) -> None:
+        codes = unique_codes(1_000)
+        catalog = UniverseCatalog(write_catalog(tmp_path / "pop.qlfc", codes[:500]))
+        assert np.all(catalog.lookup(packed_hashes(codes[500:])) == -1)
+
+    def test_index_of_accepts_hex(self, parametric_catalog: Path) -> None:
+        catalog = UniverseCatalog(parametric_catalog)
+        assert catalog.index_of(parametric_universes()[3].hash) == 3
+        assert parametric_universes()[3].hash in catalog
+
+    def test_keys_wider_than_64_bits_are_absent(self, parametric_catalog: Path) -> None:
+        catalog = UniverseCatalog(parametric_catalog)
+        assert catalog.index_of("1" * 17) == -1
+        assert catalog.index_of(-1) == -1
+        assert "f" * 17 not in catalog
+
+    def test_packed_hashes_match_table_hash(self) -> None:
+        codes = unique_codes(100)
+        assert np.array_equal(packed_hashes(codes), universe_hash(unpack_codes(codes)))
+
+
+class TestUniverseLoader:
+    def test_load_by_name_hash_and_index(self, parametric_catalog: Path) -> None:
+        loader = UniverseLoader(parametric_catalog)
+        u6 = parametric_universes()[5]
+        assert loader.load(id="u6") == u6
+        assert loader.load(id=u6.hash) == u6
+        assert loader.load(id=5) == u6
+
+    def test_unknown_id_raises(self, parametric_catalog: Path) -> None:
+        loader = UniverseLoader(parametric_catalog)
+        for missing in ("u99", "not-a-hash", "1" * 17, 8):
+            with pytest.raises(KeyError):
+                loader.load(id=missing)
+
+    def test_search_results_save_to_catalog(self, tmp_path: Path) -> None:
+        result = UniverseSearch().enumerate(top_k=5)
+        catalog = UniverseCatalog(result.save(tmp_path / "top.qlfc"))
+        assert np.array_equal(catalog.codes, result.codes)
+        assert catalog.params(0)["score"] == int(result.scores[0])
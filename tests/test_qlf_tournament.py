@@ -0,0 +1,108 @@
+"""Tests for the vectorized ELO tournament (multiverse/tournament.py)."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from multiverse.tournament import (
+    EloTournament,
+    elo_update,
+    match_results,
+    pair_points,
+    random_pairing_schedule,
+    round_robin_schedule,
+    universe_features,
+)
+from multiverse.universe import T, parametric_universes, stack_tables, unpack_codes
+
+
+def random_tables(n: int, seed: int = 0) -> np.ndarray:
+    codes = np.random.default_rng(seed).integers(0, 2**32, size=n, dtype=np.uint64).astype(np.uint32)
+    return unpack_codes(codes)
+
+
+class TestScoring:
+    def test_features_are_state_histograms(self) -> None:
+        tables = stack_tables(parametric_universes())
+        features = universe_features(tables)
+        assert np.all(features.sum(axis=1) == 16)
+        assert np.array_equal(features[:, T], np.count_nonzero(tables == T, axis=(1, 2)))
+
+    def test_default_duel_matches_legacy_t_count(self) -> None:
+        features = universe_features(stack_tables(parametric_universes()))
+        for i, j in itertools.permutations(range(len(features)), 2):
+            t_i, t_j = features[i, T], features[j, T]
+            legacy = 1 if t_i > t_j else 0 if t_i < t_j else 0.5
+            assert match_results(features[i], features[j]) == legacy
+
+    def test_pair_points_match_brute_force_matrix(self) -> None:
+        features = universe_features(random_tables(300))
+        weights = (0.5, 0.2, 0.0, 0.3)
+        matrix = match_results(features[:, None, :], features[None, :, :], weights)
+        np.fill_diagonal(matrix, 0.0)
+        assert np.allclose(pair_points(features, weights), matrix.sum(axis=1))
+
+    def test_invalid_weights_raise(self) -> None:
+        with pytest.raises(ValueError):
+            EloTournament(weights=(0.0, 0.0, 0.0, 0.0))
+
+    def test_elo_update_is_zero_sum(self) -> None:
+        a, b = np.array([1000.0, 1200.0]), np.array([1100.0, 900.0])
+        result = np.array([1.0, 0.5])
+        gain = elo_update(a, b, result) - a
+        loss = elo_update(b, a, 1.0 - result) - b
+        assert np.allclose(gain + loss, 0.0)
+
+
+class TestSchedules:
+    @pytest.mark.parametrize("n", [7, 8])
+    def test_round_robin_meets_every_pair_once(self, n: int) -> None:
+        seen = []
+        for home, away in round_robin_schedule(n, seed=3):
+            players = np.concatenate([home, away])
+            assert len(np.unique(players)) == len(players)
+            seen += [tuple(sorted(p)) for p in zip(home.tolist(), away.tolist())]
+        assert sorted(seen) == list(itertools.combinations(range(n), 2))
+
+    def test_random_pairing_is_reproducible(self) -> None:
+        first = [np.concatenate(r) for r in random_pairing_schedule(11, 4, seed=9)]
+        second = [np.concatenate(r) for r in random_pairing_schedule(11, 4, seed=9)]
+        assert all(np.array_equal(x, y) for x, y in zip(first, second))
+        assert all(len(np.unique(x)) == 10 for x in first)
+
+
+class TestEloTournament:
+    def test_parametric_ranking_follows_t_count(self) -> None:
+        tables = stack_tables(parametric_universes())
+        result = EloTournament().play(tables, cycles=2)
+        t_counts = np.count_nonzero(tables == T, axis=(1, 2))
+        assert result.matches == 2 * 28
+        assert t_counts[result.ranking()[0]] == t_counts.max()
+        assert np.isclose(result.ratings.mean(), 1000.0)
+
+    def test_same_seed_same_ratings(self) -> None:
+        tables = random_tables(40, seed=1)
+        first = EloTournament(seed=5).play(tables)
+        second = EloTournament(seed=5).play(tables)
+        assert np.array_equal(first.ratings, second.ratings)
+
+    def test_divisions_independent_of_workers(self) -> None:
+        tables = random_tables(500, seed=2)
+        inline = EloTournament(division_size=128, cross_rounds=8).play(tables)
+        pooled = EloTournament(division_size=128, cross_rounds=8, workers=2).play(tables)
+        assert np.array_equal(inline.ratings, pooled.ratings)
+        assert inline.matches == pooled.matches
+
+    def test_ratings_track_all_pairs_points(self) -> None:
+        tables = random_tables(2_000, seed=4)
+        result = EloTournament(division_size=256, cross_rounds=16).play(tables)
+        correlation = np.corrcoef(result.ratings, result.points)[0, 1]
+        assert correlation > 0.8
+
+    def test_custom_features_and_starting_ratings(self) -> None:
+        features = np.array([[3.0], [1.0], [2.0]])
+        start = np.array([1000.0, 1500.0, 1000.0])
+        result = EloTournament(weights=(1.0,)).play(np.empty((3, 4, 4)), ratings=start, features=features)
+        assert np.array_equal(result.points, [2.0, 0.0, 1.0])
+        assert result.ratings[1] < 1500.0
@@ -0,0 +1,150 @@
+"""Tests for the compiled QLF universe engine (multiverse/universe.py)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from multiverse.benchmark import benchmark_details, benchmark_scores
+from multiverse.universe import (
+    STATES,
+    C,
+    F,
+    N,
+    QLFUniverse,
+    T,
+    decode_states,
+    encode_states,
+    evaluate_pairs,
+    fold_many,
+    generate_qlf_table,
+    parametric_universes,
+    read_universe_csv,
+    stack_tables,
+    universe_hash,
+)
+
+
+def reference_fold(universe: QLFUniverse, sequence: str) -> str:
+    state = sequence[0]
+    for x in sequence[1:]:
+        state = universe.op(state, x)
+    return state
+
+
+class TestStateEncoding:
+    def test_encoding_matches_legacy_order(self) -> None:
+        assert STATES == ("T", "F", "N", "C")
+        assert (T, F, N, C) == (0, 1, 2, 3)
+
+    def test_round_trip(self) -> None:
+        codes = encode_states("TFNCCT")
+        assert codes.dtype == np.int8
+        assert decode_states(codes) == list("TFNCCT")
+
+    def test_invalid_symbol_raises_key_error(self) -> None:
+        with pytest.raises(KeyError):
+            encode_states("TX")
+
+    def test_invalid_code_raises_value_error(self) -> None:
+        with pytest.raises(ValueError):
+            encode_states(np.array([0, 4]))
+
+
+class TestParametricUniverses:
+    def test_eight_universes_in_legacy_order(self) -> None:
+        universes = parametric_universes()
+        assert len(universes) == 8
+        assert universes[0].params == {"Q1": "Stable", "Q2": "Passive", "Q3": "Hard-Purge"}
+        assert universes[-1].params == {"Q1": "Collapse", "Q2": "Catalyst", "Q3": "Soft-Convert"}
+
+    def test_generator_rules(self) -> None:
+        u = generate_qlf_table(q1_collapse=True, q2_catalyst=True, q3_soft_convert=False)
+        assert u.op("T", "T") == "T"
+        assert u.op("N", "N") == "N"
+        assert u.op("C", "C") == "T"
+        assert u.op("T", "N") == "C"
+        assert u.op("C", "N") == "T"
+        assert u.op("T", "C") == "C"
+        assert all(u.op("F", s) == "F" and u.op(s, "F") == "F" for s in STATES)
+
+    def test_benchmark_scores_match_preprint(self) -> None:
+        scores = benchmark_scores(stack_tables(parametric_universes()))
+        assert scores.tolist() == [3, 27, -4, 20, 10, 34, 3, 27]
+
+    def test_benchmark_details(self) -> None:
+        u6 = parametric_universes()[5]
+        assert benchmark_details(u6) == "C+C=T | N+T=T | F+T=N | F+C=N"
+
+
+class TestUniverseObject:
+    def test_table_is_read_only(self) -> None:
+        u = parametric_universes()[0]
+        with pytest.raises(ValueError):
+            u.table[0, 0] = C
+
+    def test_rejects_bad_shape(self) -> None:
+        with pytest.raises(ValueError):
+            QLFUniverse(table=np.zeros((3, 4), dtype=np.int8))
+
+    def test_hash_is_stable_and_distinct(self) -> None:
+        universes = parametric_universes()
+        hashes = [u.hash for u in universes]
+        assert len(set(hashes)) == 8
+        assert all(len(h) == 16 for h in hashes)
+        rebuilt = QLFUniverse(table=universes[3].table.copy())
+        assert rebuilt.hash == universes[3].hash
+        assert rebuilt == universes[3]
+
+    def test_vectorized_hash_matches_scalar(self) -> None:
+        universes = parametric_universes()
+        hashes = universe_hash(stack_tables(universes))
+        assert [f"{int(h):016x}" for h in hashes] == [u.hash for u in universes]
+
+    def test_csv_round_trip(self, tmp_path) -> None:
+        u = parametric_universes()[5]
+        path = tmp_path / "QLF_Universe_6.csv"
+        u.to_frame().to_csv(path)
+        assert read_universe_csv(path) == u
+
+    def test_from_frame_strips_whitespace(self) -> None:
+        u = parametric_universes()[1]
+        df = u.to_frame().map(lambda x: f" {x} ")
+        assert QLFUniverse.from_frame(df) == u
+
+    def test_from_frame_rejects_bad_shape(self) -> None:
+        with pytest.raises(ValueError):
+            QLFUniverse.from_frame(pd.DataFrame([["T"]]))
+
+
+class TestVectorizedEvaluation:
+    def test_evaluate_pairs_matches_scalar_lookup(self) -> None:
+        u = parametric_universes()[6]
+        rng = np.random.default_rng(7)
+        a = rng.integers(0, 4, size=10_000)
+        b = rng.integers(0, 4, size=10_000)
+        result = u.evaluate(a, b)
+        expected = [STATES.index(u.op(STATES[i], STATES[j])) for i, j in zip(a[:200], b[:200])]
+        assert result[:200].tolist() == expected
+
+    def test_evaluate_pairs_on_stack(self) -> None:
+        tables = stack_tables(parametric_universes())
+        result = evaluate_pairs(tables, "CC", "CN")
+        assert result.shape == (8, 2)
+        assert decode_states(result[:, 0]) == [parametric_universes()[i].op("C", "C") for i in range(8)]
+
+    def test_compose_matches_reference_fold(self) -> None:
+        rng = np.random.default_rng(11)
+        for u in parametric_universes():
+            sequences = ["".join(rng.choice(list(STATES), size=25)) for _ in range(20)]
+            result = u.compose(np.stack([encode_states(s) for s in sequences]))
+            assert decode_states(result) == [reference_fold(u, s) for s in sequences]
+
+    def test_fold_many_with_initial_state(self) -> None:
+        universes = parametric_universes()
+        result = fold_many(stack_tables(universes), "CC", initial=T)
+        expected = [reference_fold(u, "TCC") for u in universes]
+        assert decode_states(result[:, 0]) == expected
+
+    def test_fold_empty_sequence_requires_initial(self) -> None:
+        with pytest.raises(ValueError):
+            fold_many(stack_tables(parametric_universes()), np.empty((1, 0), dtype=np.int8))
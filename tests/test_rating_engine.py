@@ -0,0 +1,201 @@
+"""Tests for the streaming Dual Rating Engine (core/rating_engine.py)."""
+
+import math
+
+import numpy as np
+import pytest
+
+from core.rating_engine import ActiveAgentSelector, DualRatingEngine, QuantileSketch, RatingConfig, Welford
+from core.types import AgentSignal, MarketSnapshot
+
+
+def batch_metrics(pnls: np.ndarray, capital: float = 10_000.0) -> dict:
+    """Full-history reference for E and F."""
+    equity = capital + np.concatenate([[0.0], np.cumsum(pnls)])
+    wins, losses = pnls[pnls > 0], -pnls[pnls < 0]
+    win_rate = len(wins) / len(pnls)
+    quality = win_rate * wins.mean()
+    expectancy = quality / (quality + (1 - win_rate) * losses.mean())
+
+    peak = np.maximum.accumulate(equity)
+    mdd = (1 - equity / peak).max()
+    legs, start = [], None
+    for prev, cur in zip(equity[:-1], equity[1:]):
+        if cur >= prev and start is None:
+            start = prev
+        elif cur < prev and start is not None:
+            legs.append(prev - start)
+            start = None
+    if start is not None:
+        legs.append(equity[-1] - start)
+    avg_runup = np.mean(legs) / peak[-1]
+    return {"E": expectancy, "F": mdd / (mdd + avg_runup)}
+
+
+class TestAccumulators:
+    def test_welford_matches_numpy(self) -> None:
+        x = np.random.default_rng(0).normal(3.0, 2.0, 1000)
+        acc = Welford()
+        for v in x:
+            acc.add(float(v))
+        assert acc.mean == pytest.approx(x.mean())
+        assert acc.std == pytest.approx(x.std(ddof=1))
+
+    def test_sketch_quantiles_have_relative_accuracy(self) -> None:
+        x = np.random.default_rng(1).standard_t(3, 20_000) * 0.01
+        sketch = QuantileSketch(accuracy=0.01)
+        for v in x:
+            sketch.add(float(v))
+        for q in (0.01, 0.05, 0.5, 0.95):
+            exact = np.quantile(x, q, method="lower")
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_sketch_cvar_matches_sorted_tail(self) -> None:
+        x = np.random.default_rng(2).normal(0.001, 0.02, 10_000)
+        sketch = QuantileSketch(accuracy=0.005)
+        for v in x:
+            sketch.add(float(v))
+        exact = np.sort(x)[:500].mean()
+        assert sketch.lower_tail_mean(0.05) == pytest.approx(exact, rel=0.01)
+
+    def test_sketch_bucket_count_is_bounded(self) -> None:
+        sketch = QuantileSketch(accuracy=0.001, max_buckets=64)
+        for v in np.geomspace(1e-9, 1.0, 5_000):
+            sketch.add(-float(v))
+        assert len(sketch._negative) == 64
+        assert sketch.quantile(0.0) == pytest.approx(-1.0, rel=0.002)
+
+
+class TestDualRating:
+    def test_streaming_metrics_match_batch_reference(self) -> None:
+        pnls = np.random.default_rng(3).normal(20.0, 150.0, 400)
+        engine = DualRatingEngine()
+        for pnl in pnls:
+            snap = engine.record("trend", float(pnl))
+        expected = batch_metrics(pnls)
+        assert snap.E == pytest.approx(expected["E"])
+        assert snap.F == pytest.approx(expected["F"])
+        assert snap.n_trades == 400
+
+    def test_rating_formulas(self) -> None:
+        engine = DualRatingEngine(RatingConfig(divergence_k=2.0))
+        for pnl in np.random.default_rng(4).normal(30.0, 100.0, 200):
+            snap = engine.record("trend", float(pnl))
+        factors = (snap.E, 1 - snap.F, 1 - snap.T, snap.R, snap.S)
+        assert snap.r_mul == pytest.approx(math.prod(factors))
+        assert snap.r_add == pytest.approx(sum(factors) / 5)
+        assert snap.divergence == pytest.approx(abs(snap.r_mul - snap.r_add))
+        assert snap.r_final == pytest.approx((snap.r_mul + snap.r_add) / 2 * math.exp(-2.0 * snap.divergence))
+        assert engine.r_final("trend") == snap.r_final
+        assert engine.ratings() == {"trend": snap.r_final}
+
+    def test_losing_agent_has_full_tail_penalty(self) -> None:
+        engine = DualRatingEngine()
+        for pnl in (-50.0, 20.0, -40.0, 10.0):
+            snap = engine.record("meanrev", pnl)
+        assert snap.T == 1.0 and snap.r_mul == 0.0
+
+    def test_regime_robustness_penalises_sharpe_spread(self) -> None:
+        rng = np.random.default_rng(5)
+        config = RatingConfig(min_regime_samples=30)
+        steady, fragile = DualRatingEngine(config), DualRatingEngine(config)
+        for _ in range(100):
+            for regime in ("trend", "range"):
+                steady.record("a", float(rng.normal(20.0, 100.0)), regime)
+            fragile.record("a", float(rng.normal(60.0, 100.0)), "trend")
+            fragile.record("a", float(rng.normal(-20.0, 100.0)), "range")
+        assert steady.snapshot("a").R > fragile.snapshot("a").R
+        assert DualRatingEngine(config).snapshot("a").R == config.unknown_robustness
+
+    def test_dead_agent_is_frozen(self) -> None:
+        engine = DualRatingEngine(RatingConfig(initial_capital=100.0))
+        engine.record("gambler", 50.0)
+        dead = engine.record("gambler", -150.0)
+        assert dead.S == 0.0 and dead.r_mul == 0.0
+        assert not engine.is_alive("gambler")
+        assert engine.record("gambler", 1_000.0) == dead
+
+    def test_invalid_weights_raise(self) -> None:
+        with pytest.raises(ValueError):
+            RatingConfig(weights=(0.5, 0.5, 0.5, 0.0, 0.0))
+
+
+class TestActiveAgentSelector:
+    agents = [f"a{i}" for i in range(12)]
+
+    def test_certainty_concentrates_on_top_rated(self) -> None:
+        ratings = np.array([0.9, 0.05, 0.8, 0.01, 0.02, 0.03, 0.01, 0.02, 0.04, 0.01, 0.02, 0.03])
+        chosen = ActiveAgentSelector().select(self.agents, ratings, np.zeros(12), regime_confidence=1.0)
+        assert chosen.k == 2
+        assert chosen.active == ["a0", "a2"]
+
+    def test_uncertainty_diversifies_up_to_ceiling(self) -> None:
+        ratings = np.full(12, 0.5)
+        chosen = ActiveAgentSelector().select(self.agents, ratings, np.ones(12), regime_confidence=0.0)
+        assert chosen.uncertainty == pytest.approx(1.0)
+        assert chosen.k == 8
+
+    def test_mask_matches_full_sort(self) -> None:
+        rng = np.random.default_rng(6)
+        for _ in range(50):
+            ratings = rng.random(12)
+            chosen = ActiveAgentSelector().select(self.agents, ratings, rng.random(12), float(rng.random()))
+            expected = np.argsort(-ratings)[: chosen.k]
+            assert set(np.flatnonzero(chosen.mask)) == set(expected)
+            assert 2 <= chosen.k <= 8
+
+    def test_small_roster_is_fully_active(self) -> None:
+        chosen = ActiveAgentSelector(min_active=2).select(["a", "b"], np.array([0.1, 0.9]), np.zeros(2), 1.0)
+        assert chosen.mask.all()
+
+    def test_only_active_agents_are_analyzed(self) -> None:
+        calls = []
+
+        class Agent:
+            def __init__(self, name: str) -> None:
+                self.name = name
+
+            def analyze(self, snapshot: MarketSnapshot) -> list:
+                calls.append(self.name)
+                return [
+                    AgentSignal(
+                        agent_name=self.name,
+                        symbol=snapshot.symbol,
+                        intent="LONG",
+                        confidence=0.5,
+                        invalidation_price=1.0,
+                    )
+                ]
+
+        engine = DualRatingEngine()
+        for name, pnl in (("good", 100.0), ("good", -20.0), ("ok", 50.0), ("ok", -40.0), ("bad", -50.0)):
+            engine.record(name, pnl)
+        chosen = ActiveAgentSelector(min_active=2, max_active=2).select_from(engine, ["good", "ok", "bad"], 0.9)
+        signals = chosen.analyze(
+            {n: Agent(n) for n in ("good", "ok", "bad")}, MarketSnapshot(symbol="EURUSD", price=1.1)
+        )
+        assert sorted(calls) == ["good", "ok"]
+        assert "bad" not in chosen and "good" in chosen
+        assert [s.agent_name for s in chosen.filter(signals)] == [s.agent_name for s in signals]
+
+    def test_dead_agents_are_never_selected(self) -> None:
+        ratings = np.array([0.9, 0.8, 0.1, 0.05])
+        alive = np.array([False, True, True, True])
+        chosen = ActiveAgentSelector(min_active=2, max_active=2).select(
+            ["dead", "b", "c", "d"], ratings, np.zeros(4), 1.0, alive
+        )
+        assert chosen.active == ["b", "c"]
+
+    def test_select_from_masks_dead_agents(self) -> None:
+        engine = DualRatingEngine(RatingConfig(initial_capital=100.0))
+        engine.record("gambler", 50.0)
+        engine.record("gambler", -150.0)
+        engine.record("good", 10.0)
+        assert engine.r_final("gambler") > 0.0 and not engine.is_alive("gambler")
+
+        chosen = ActiveAgentSelector(min_active=3, max_active=3).select_from(engine, ["gambler", "good", "new"], 1.0)
+        assert chosen.active == ["good", "new"]
+
+    def test_invalid_bounds_raise(self) -> None:
+        with pytest.raises(ValueError):
+            ActiveAgentSelector(min_active=5, max_active=3)
@@ -1,14 +1,29 @@
 """Tests for RiskEngine veto behavior and authority constraints."""
 
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Literal
 
+import numpy as np
 import pytest
 
-from core.instrument_registry import InstrumentSpec
+from core.anomaly_detector import AnomalyPolicy, MarketAnomalyMonitor
+from core.instrument_registry import InstrumentRegistry, InstrumentSpec
 from core.risk_engine import RiskEngine
-from core.types import AllocationDecision, OrderIntent, PortfolioState
+from core.scalper_budget import ScalperBudgetEngine, ScalperBudgetPolicy, epoch_ms
+from core.sovereign_allocator import SovereignAllocator
+from core.stress_engine import StressGrid, StressScenario
+from core.types import (
+    AgentSignal,
+    AllocationDecision,
+    MarketSnapshot,
+    OrderIntent,
+    PortfolioState,
+    QEFCDecision,
+    QEFCState,
+)
+from core.var_engine import VaREngine, VaRPolicy
 
 
 @dataclass
@@ -194,3 +209,347 @@ class TestEdgeCases:
 
         assert verdict.approved is False
         assert verdict.kill_switch is True
+
+
+class TestRegistryMarginPath:
+    def orders(self) -> list[OrderIntent]:
+        return [
+            OrderIntent(symbol="EURUSD", side="BUY", quantity=0.5, entry_price=1.2, stop_loss=1.19, risk_pct_used=1.0),
+            OrderIntent(
+                symbol="XAUUSD", side="SELL", quantity=0.2, entry_price=2000.0, stop_loss=2010.0, risk_pct_used=1.0
+            ),
+            OrderIntent(
+                symbol="EURUSD", side="SELL", quantity=0.1, entry_price=None, stop_loss=1.21, risk_pct_used=1.0
+            ),
+        ]
+
+    def test_id_indexed_margin_matches_per_order_specs(self) -> None:
+        registry = InstrumentRegistry()
+        engine = RiskEngine(default_leverage=50.0, instrument_leverage={"XAUUSD": 20.0})
+        decision = replace(make_decision(), orders=self.orders())
+
+        margin = engine._required_margin(decision=decision, registry=registry)
+
+        expected = 0.5 * 100_000 * 1.2 / 50.0 + 0.2 * 100 * 2000.0 / 20.0
+        assert margin == pytest.approx(expected)
+
+    def test_spec_margin_rate_sets_leverage(self, tmp_path: Path) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(
+            "instruments:\n"
+            "  EURUSD: {symbol: EURUSD, tick_size: 0.00001, point_value: 10.0, contract_size: 100000,\n"
+            "           min_lot: 0.01, max_lot: 100.0, lot_step: 0.01, margin_rate: 0.05}\n"
+        )
+        engine = RiskEngine(default_leverage=100.0)
+
+        margin = engine._required_margin(decision=make_decision(quantity=1.0), registry=InstrumentRegistry(str(config)))
+
+        assert margin == pytest.approx(1.0 * 100_000 * 1.20 * 0.05)
+
+
+class TestLedgerMarginPath:
+    def test_free_margin_comes_from_ledger(self) -> None:
+        registry = InstrumentRegistry()
+        engine = RiskEngine(default_leverage=50.0)
+        ledger = engine.new_ledger(registry)
+        ledger.apply_fill("EURUSD", 3.0, 1.20)  # 7,200 margin against 10,000 equity
+
+        verdict = engine.veto(
+            decision=make_decision(quantity=1.5),
+            portfolio=make_portfolio(margin_used_pct=0.0),
+            registry=registry,
+            ledger=ledger,
+        )
+
+        assert verdict.approved is False
+        assert verdict.reason is not None
+        assert "free margin 2800.00" in verdict.reason
+
+    def test_reducing_order_approved_when_margin_tight(self) -> None:
+        registry = InstrumentRegistry()
+        engine = RiskEngine(default_leverage=50.0)
+        ledger = engine.new_ledger(registry)
+        ledger.apply_fill("EURUSD", 4.0, 1.20)  # 9,600 margin against 10,000 equity
+
+        verdict = engine.veto(
+            decision=make_decision(side="SELL", quantity=2.0),
+            portfolio=make_portfolio(),
+            registry=registry,
+            ledger=ledger,
+        )
+
+        assert verdict.approved is True
+        assert ledger.symbol_exposure("EURUSD")[0] == pytest.approx(4.0)
+
+
+def symbol_decision(
+    symbol: str,
+    quantity: float,
+    price: float,
+    *,
+    risk: float = 1.0,
+    action: Literal["OPEN", "CLOSE"] = "OPEN",
+    side: Literal["BUY", "SELL"] = "BUY",
+) -> AllocationDecision:
+    base = make_decision(quantity=quantity, side=side)
+    order = replace(base.orders[0], symbol=symbol, entry_price=price)
+    return replace(base, symbol=symbol, action=action, final_risk_pct=risk, orders=[order])
+
+
+class TestBatchVeto:
+    engine = RiskEngine(default_leverage=50.0, instrument_leverage={"XAUUSD": 20.0})
+
+    def decisions(self) -> list[AllocationDecision]:
+        return [
+            symbol_decision("EURUSD", 1.0, 1.20, risk=1.0),  # 2,400 margin
+            symbol_decision("GBPUSD", 1.0, 1.30, risk=2.0),  # 2,600 margin
+            symbol_decision("XAUUSD", 0.2, 2000.0, risk=0.5),  # 2,000 margin
+        ]
+
+    def approved(self, decisions: list[AllocationDecision], portfolio: PortfolioState) -> dict[str, bool]:
+        verdicts = self.engine.veto_batch(decisions, portfolio=portfolio, registry=InstrumentRegistry())
+        assert len(verdicts) == len(decisions)
+        return {d.symbol: v.approved for d, v in zip(decisions, verdicts)}
+
+    def test_cumulative_margin_in_priority_order(self) -> None:
+        approved = self.approved(self.decisions(), portfolio=make_portfolio(margin_used_pct=50.0))
+
+        assert approved == {"EURUSD": True, "GBPUSD": True, "XAUUSD": False}
+
+    def test_verdicts_independent_of_input_order(self) -> None:
+        portfolio = make_portfolio(margin_used_pct=50.0)
+        expected = self.approved(self.decisions(), portfolio=portfolio)
+
+        assert self.approved(self.decisions()[::-1], portfolio=portfolio) == expected
+        assert self.approved(self.decisions()[1:] + self.decisions()[:1], portfolio=portfolio) == expected
+
+    def test_rejection_does_not_block_smaller_decisions(self) -> None:
+        decisions = [
+            symbol_decision("USDJPY", 0.1, 150.0, risk=2.0),  # 30,000 margin
+            symbol_decision("XAUUSD", 0.2, 2000.0, risk=0.5),  # 2,000 margin
+            symbol_decision("AUDUSD", 0.5, 0.65, risk=0.1),  # 650 margin
+        ]
+
+        approved = self.approved(decisions, portfolio=make_portfolio(margin_used_pct=90.0))
+
+        assert approved == {"USDJPY": False, "XAUUSD": False, "AUDUSD": True}
+
+    def test_risk_reducing_actions_admitted_first(self) -> None:
+        closing = symbol_decision("USDCHF", 1.0, 0.90, risk=0.0, action="CLOSE", side="SELL")  # 1,800 margin
+
+        approved = self.approved([*self.decisions(), closing], portfolio=make_portfolio(margin_used_pct=50.0))
+
+        assert approved == {"EURUSD": False, "GBPUSD": True, "XAUUSD": False, "USDCHF": True}
+
+    def test_rejections_carry_hold_decisions(self) -> None:
+        verdicts = self.engine.veto_batch(
+            self.decisions(), portfolio=make_portfolio(margin_used_pct=50.0), registry=InstrumentRegistry()
+        )
+
+        rejected = verdicts[2]
+        assert rejected.modified_decision is not None
+        assert rejected.modified_decision.action == "HOLD"
+        assert rejected.modified_decision.orders == []
+        assert rejected.reason is not None
+        assert "free margin 0.00" in rejected.reason
+
+    def test_drawdown_flattens_every_decision(self) -> None:
+        verdicts = self.engine.veto_batch(
+            self.decisions(), portfolio=make_portfolio(drawdown_pct=15.0), registry=InstrumentRegistry()
+        )
+
+        assert all(v.kill_switch and not v.approved for v in verdicts)
+
+    def test_gross_notional_cap(self) -> None:
+        engine = RiskEngine(default_leverage=50.0, instrument_leverage={"XAUUSD": 20.0}, max_gross_leverage=26.0)
+
+        verdicts = engine.veto_batch(self.decisions(), portfolio=make_portfolio(), registry=InstrumentRegistry())
+
+        # GBPUSD 130,000 then EURUSD 120,000 fill the 260,000 cap; XAUUSD's 40,000 does not fit
+        assert [v.approved for v in verdicts] == [True, True, False]
+        reason = verdicts[2].reason
+        assert reason is not None
+        assert "Gross notional 290000.00 exceeds cap 260000.00" in reason
+
+    def test_ledger_stages_admitted_orders(self) -> None:
+        registry = InstrumentRegistry()
+        ledger = self.engine.new_ledger(registry)
+        ledger.apply_fill("EURUSD", 2.0, 1.20)  # 4,800 margin against 10,000 equity
+        decisions = [
+            symbol_decision("EURUSD", 1.0, 1.20, risk=2.0),
+            symbol_decision("EURUSD", 1.0, 1.20, risk=1.0),
+            symbol_decision("EURUSD", 2.0, 1.20, risk=0.0, action="CLOSE", side="SELL"),
+        ]
+
+        verdicts = self.engine.veto_batch(decisions, portfolio=make_portfolio(), registry=registry, ledger=ledger)
+
+        # The close releases nothing up front; each 2,400 add is checked against the book after the close
+        assert [v.approved for v in verdicts] == [True, True, True]
+        assert ledger.symbol_exposure("EURUSD")[0] == pytest.approx(2.0)
+
+        ledger.apply_fill("EURUSD", 1.0, 1.20)
+        verdicts = self.engine.veto_batch(decisions[:2], portfolio=make_portfolio(), registry=registry, ledger=ledger)
+
+        assert [v.approved for v in verdicts] == [True, False]
+
+
+class TestCVaRVeto:
+    def engine_and_var(self) -> tuple[RiskEngine, VaREngine]:
+        registry = InstrumentRegistry()
+        var = VaREngine(registry.table, VaRPolicy(window=100, alpha=0.05, min_periods=20))
+        rng = np.random.default_rng(2)
+        for _ in range(100):
+            var.update(rng.normal(0.0, 0.01, size=len(registry.table)))
+        return RiskEngine(default_leverage=1000.0, max_cvar_pct=20.0), var
+
+    def test_order_lifting_cvar_over_cap_vetoed(self) -> None:
+        engine, var = self.engine_and_var()
+
+        small = engine.veto(make_decision(quantity=0.5), make_portfolio(), InstrumentRegistry(), var=var)
+        large = engine.veto(make_decision(quantity=20.0), make_portfolio(), InstrumentRegistry(), var=var)
+
+        assert small.approved is True
+        assert large.approved is False
+        assert large.reason is not None
+        assert "CVaR" in large.reason and "exceeds cap 2000.00" in large.reason
+
+    def test_risk_reducing_order_passes_above_cap(self) -> None:
+        engine, var = self.engine_and_var()
+        registry = InstrumentRegistry()
+        ledger = RiskEngine(default_leverage=1000.0).new_ledger(registry)
+        ledger.apply_fill("EURUSD", 20.0, 1.20)
+
+        verdict = engine.veto(
+            make_decision(side="SELL", quantity=5.0), make_portfolio(), registry, ledger=ledger, var=var
+        )
+
+        assert var.tail()[1] > 2000.0
+        assert verdict.approved is True
+
+    def test_jpy_quoted_order_valued_in_account_currency(self) -> None:
+        engine, var = self.engine_and_var()
+
+        verdict = engine.veto(symbol_decision("USDJPY", 0.5, 150.0), make_portfolio(), InstrumentRegistry(), var=var)
+
+        assert var.rates.of("JPY") == pytest.approx(1 / 150.0)
+        assert var.exposure_delta([("USDJPY", 0.5, 150.0)]) == {var.table.ids["USDJPY"]: pytest.approx(50_000.0)}
+        assert verdict.approved is True  # ~1,000 USD CVaR; as JPY notional it read ~150,000
+
+
+class TestStressVeto:
+    def test_breaching_scenario_vetoed_with_name(self) -> None:
+        registry = InstrumentRegistry()
+        stress = StressGrid(registry.table, [StressScenario("XAU_DOWN_3", {"XAUUSD": -0.03})])
+        engine = RiskEngine(default_leverage=50.0, instrument_leverage={"XAUUSD": 20.0}, max_stress_loss_pct=10.0)
+        decision = symbol_decision("XAUUSD", 0.1, 2000.0)
+
+        small = engine.veto(decision, make_portfolio(), registry, stress=stress)  # 600 loss
+        large = engine.veto(symbol_decision("XAUUSD", 0.5, 2000.0), make_portfolio(), registry, stress=stress)
+
+        assert small.approved is True
+        assert large.approved is False
+        assert large.reason == "VETO: Stress scenario XAU_DOWN_3 loss 3000.00 exceeds cap 1000.00"
+
+    def test_open_book_synced_from_ledger(self) -> None:
+        registry = InstrumentRegistry()
+        stress = StressGrid(registry.table, [StressScenario("XAU_DOWN_3", {"XAUUSD": -0.03})])
+        engine = RiskEngine(default_leverage=50.0, max_stress_loss_pct=5.0)
+        ledger = engine.new_ledger(registry)
+        ledger.apply_fill("XAUUSD", 0.1, 2000.0)  # 600 loss already over the cap
+
+        adding = engine.veto(symbol_decision("XAUUSD", 0.01, 2000.0), make_portfolio(), registry, ledger, stress=stress)
+        hedging = engine.veto(
+            symbol_decision("XAUUSD", 0.05, 2000.0, side="SELL"), make_portfolio(), registry, ledger, stress=stress
+        )
+
+        assert adding.approved is False
+        assert hedging.approved is True
+
+    def test_fx_dollar_shock_vetoed(self) -> None:
+        registry = InstrumentRegistry()
+        stress = StressGrid(registry.table, [StressScenario("USD_UP_2", {"USD": 0.02})])
+        engine = RiskEngine(default_leverage=100.0, max_stress_loss_pct=10.0)
+
+        small = engine.veto(symbol_decision("EURUSD", 0.1, 1.085), make_portfolio(), registry, stress=stress)
+        large = engine.veto(symbol_decision("EURUSD", 1.0, 1.085), make_portfolio(), registry, stress=stress)
+
+        assert small.approved is True
+        assert large.approved is False
+        assert large.reason == "VETO: Stress scenario USD_UP_2 loss 2127.45 exceeds cap 1000.00"
+
+
+class TestAnomalyVeto:
+    def monitor(self) -> MarketAnomalyMonitor:
+        monitor = MarketAnomalyMonitor(InstrumentRegistry().table, AnomalyPolicy(min_periods=5))
+        for x in np.random.default_rng(6).normal(0.0002, 0.00001, size=30):
+            monitor.on_snapshot(MarketSnapshot(symbol="EURUSD", price=1.2, spread=float(x)))
+        monitor.on_snapshot(MarketSnapshot(symbol="EURUSD", price=1.2, spread=0.0030))
+        return monitor
+
+    def test_open_vetoed_on_spread_anomaly(self) -> None:
+        verdict = RiskEngine().veto(make_decision(), make_portfolio(), InstrumentRegistry(), anomalies=self.monitor())
+
+        assert verdict.approved is False
+        assert verdict.reason == "VETO: SPREAD_ANOMALY on EURUSD"
+
+    def test_close_passes_during_anomaly(self) -> None:
+        closing = symbol_decision("EURUSD", 0.5, 1.2, action="CLOSE", side="SELL")
+
+        verdict = RiskEngine().veto(closing, make_portfolio(), InstrumentRegistry(), anomalies=self.monitor())
+
+        assert verdict.approved is True
+
+
+class TestScalperBudgetVeto:
+    BAR = datetime(2024, 3, 5, 14)
+
+    def allocate(self, bar: datetime = BAR) -> AllocationDecision:
+        """Scalper OPEN decision straight from the allocator (timestamp not set by hand)."""
+        signal = AgentSignal(
+            agent_name="scalper_xau",
+            symbol="XAUUSD",
+            intent="LONG",
+            confidence=0.8,
+            invalidation_price=1990.0,
+            proposed_risk_pct=0.5,
+            timestamp=bar,
+        )
+        qefc = QEFCDecision(state=QEFCState.T, risk_factor=1.0, reason_codes=["test"], cooldown_bars=0, timestamp=bar)
+        snapshot = MarketSnapshot(symbol="XAUUSD", price=2000.0, timestamp=bar)
+        return SovereignAllocator().allocate(qefc, [signal], snapshot, make_portfolio(), InstrumentRegistry())
+
+    def test_daily_loss_cap_binds_on_bar_time(self) -> None:
+        budget = ScalperBudgetEngine(ScalperBudgetPolicy(daily_loss_cap=50.0))
+        budget.on_trade_closed(budget.slot("scalper_xau", "XAUUSD"), pnl=-60.0, now_ms=epoch_ms(self.BAR) - 3_600_000)
+        engine, registry = RiskEngine(), InstrumentRegistry()
+
+        same_day = engine.veto(self.allocate(), make_portfolio(), registry, budget=budget)
+        next_day = engine.veto(self.allocate(self.BAR + timedelta(days=1)), make_portfolio(), registry, budget=budget)
+
+        assert same_day.approved is False
+        assert same_day.reason == "VETO: DAILY_LOSS_CAP for scalper_xau on XAUUSD"
+        assert next_day.approved is True
+
+    def test_batch_charges_earlier_admissions(self) -> None:
+        budget = ScalperBudgetEngine(ScalperBudgetPolicy(pending_cap=1))
+        slot = budget.slot("scalper_xau", "XAUUSD")
+
+        verdicts = RiskEngine().veto_batch(
+            [self.allocate(), self.allocate()], make_portfolio(), InstrumentRegistry(), budget=budget
+        )
+
+        assert sorted(v.approved for v in verdicts) == [False, True]
+        assert {v.reason for v in verdicts} == {"APPROVED", "VETO: PENDING_CAP for scalper_xau on XAUUSD"}
+        assert budget.pending[slot] == 1
+
+    def test_unregistered_agents_and_closes_pass(self) -> None:
+        budget = ScalperBudgetEngine()
+        budget.kill("scalper_xau")
+        engine, registry = RiskEngine(), InstrumentRegistry()
+
+        closing = engine.veto(replace(self.allocate(), action="CLOSE"), make_portfolio(), registry, budget=budget)
+        other = engine.veto(symbol_decision("XAUUSD", 0.01, 2000.0), make_portfolio(), registry, budget=budget)
+        killed = engine.veto(self.allocate(), make_portfolio(), registry, budget=budget)
+
+        assert closing.approved is True and other.approved is True
+        assert killed.reason == "VETO: SCALPER_KILLED for scalper_xau on XAUUSD"
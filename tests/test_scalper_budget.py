@@ -0,0 +1,132 @@
+"""Tests for the Scalper Budget Engine."""
+
+from typing import Any
+
+import pytest
+
+from core.scalper_budget import DAY_MS, HOUR_MS, ScalperBudgetEngine, ScalperBudgetPolicy
+
+T0 = 1_700_000_000_000  # tick time in ms
+
+
+def engine(**overrides: Any) -> ScalperBudgetEngine:
+    """Engine with only the overridden limits binding."""
+    policy: dict[str, Any] = {"burst": 1000.0, "refill_per_sec": 1000.0, "pending_cap": 1000, "hourly_trade_cap": 1000}
+    return ScalperBudgetEngine(ScalperBudgetPolicy(**{**policy, **overrides}))
+
+
+class TestCaps:
+    def test_hourly_trade_cap_is_a_rolling_window(self) -> None:
+        budget = engine(hourly_trade_cap=3)
+        slot = budget.slot("scalper", "XAUUSD")
+        times = [T0, T0 + 10 * 60_000, T0 + 20 * 60_000]
+        for t in times:
+            assert budget.try_place(slot, t) is None
+
+        assert budget.try_place(slot, T0 + HOUR_MS - 1) == "HOURLY_TRADE_CAP"
+        assert budget.try_place(slot, T0 + HOUR_MS) is None  # first placement left the window
+        assert budget.try_place(slot, T0 + HOUR_MS + 1) == "HOURLY_TRADE_CAP"
+
+    def test_pending_cap_released_by_order_done(self) -> None:
+        budget = engine(pending_cap=2)
+        slot = budget.slot("scalper", "EURUSD")
+        budget.try_place(slot, T0)
+        budget.try_place(slot, T0 + 1)
+
+        assert budget.try_place(slot, T0 + 2) == "PENDING_CAP"
+        budget.on_order_done(slot)
+        assert budget.try_place(slot, T0 + 3) is None
+        for _ in range(5):
+            budget.on_order_done(slot)
+        assert budget.pending[slot] == 0
+
+    def test_cooldown_after_loss_only(self) -> None:
+        budget = engine(cooldown_ms=60_000)
+        slot = budget.slot("scalper", "EURUSD")
+
+        budget.on_trade_closed(slot, pnl=5.0, now_ms=T0)
+        assert budget.check(slot, T0 + 1) is None
+        budget.on_trade_closed(slot, pnl=-1.0, now_ms=T0 + 10)
+        assert budget.check(slot, T0 + 60_009) == "LOSS_COOLDOWN"
+        assert budget.check(slot, T0 + 60_010) is None
+
+    def test_daily_loss_cap_resets_next_utc_day(self) -> None:
+        budget = engine(daily_loss_cap=50.0, cooldown_ms=0)
+        slot = budget.slot("scalper", "XAUUSD")
+        budget.on_trade_closed(slot, pnl=-30.0, now_ms=T0)
+        assert budget.check(slot, T0 + 1) is None
+        budget.on_trade_closed(slot, pnl=-20.0, now_ms=T0 + 2)
+
+        assert budget.check(slot, T0 + 3) == "DAILY_LOSS_CAP"
+        next_day = (T0 // DAY_MS + 1) * DAY_MS
+        assert budget.check(slot, next_day - 1) == "DAILY_LOSS_CAP"
+        assert budget.check(slot, next_day) is None
+
+    def test_token_bucket_throttles_bursts(self) -> None:
+        budget = engine(burst=2.0, refill_per_sec=1.0)
+        slot = budget.slot("scalper", "US100")
+
+        assert budget.try_place(slot, T0) is None
+        assert budget.try_place(slot, T0) is None
+        assert budget.try_place(slot, T0 + 999) == "THROTTLED"
+        assert budget.try_place(slot, T0 + 1000) is None
+        assert budget.check(slot, T0 + 1000) == "THROTTLED"
+        assert budget.check(slot, T0 + 60_000) is None
+
+    def test_check_does_not_consume_budget(self) -> None:
+        budget = engine(burst=1.0, refill_per_sec=0.001)
+        slot = budget.slot("scalper", "US100")
+        for _ in range(10):
+            assert budget.check(slot, T0) is None
+        assert budget.try_place(slot, T0) is None
+        assert budget.check(slot, T0) == "THROTTLED"
+
+
+class TestSlotsAndKill:
+    def test_pairs_are_independent_and_slots_survive_growth(self) -> None:
+        budget = ScalperBudgetEngine(ScalperBudgetPolicy(pending_cap=1), capacity=1)
+        first = budget.slot("a", "XAUUSD")
+        budget.try_place(first, T0)
+        slots = [budget.slot(f"agent{i}", "EURUSD") for i in range(40)]
+
+        assert budget.slot("a", "XAUUSD") == first
+        assert budget.check(first, T0 + 1) == "PENDING_CAP"
+        assert all(budget.check(s, T0 + 1) is None for s in slots)
+        assert len(budget) == 41
+
+    def test_risk_kill_per_pair_and_per_agent(self) -> None:
+        budget = engine()
+        xau, eur = budget.slot("scalper", "XAUUSD"), budget.slot("scalper", "EURUSD")
+        other = budget.slot("other", "XAUUSD")
+
+        budget.kill("scalper", "XAUUSD")
+        assert (budget.check(xau, T0), budget.check(eur, T0)) == ("SCALPER_KILLED", None)
+
+        budget.kill("scalper")
+        assert budget.check(eur, T0) == "SCALPER_KILLED"
+        assert budget.check(budget.slot("scalper", "US100"), T0) == "SCALPER_KILLED"  # new pairs too
+        assert budget.check(other, T0) is None
+
+        budget.revive("scalper")
+        assert budget.check(xau, T0) is None
+
+    def test_replay_is_deterministic(self) -> None:
+        def run() -> list[str | None]:
+            budget = ScalperBudgetEngine(ScalperBudgetPolicy(hourly_trade_cap=5, pending_cap=2, cooldown_ms=30_000))
+            out = []
+            for k in range(400):
+                slot = budget.slot(f"s{k % 3}", "XAUUSD")
+                t = T0 + k * 7_919
+                out.append(budget.try_place(slot, t))
+                if k % 2:
+                    budget.on_order_done(slot)
+                    budget.on_trade_closed(slot, pnl=(-1.0) ** k * (k % 7), now_ms=t)
+            return out
+
+        assert run() == run()
+
+    def test_policy_validation(self) -> None:
+        with pytest.raises(ValueError, match="daily_loss_cap"):
+            ScalperBudgetPolicy(daily_loss_cap=0.0)
+        with pytest.raises(ValueError, match="burst"):
+            ScalperBudgetPolicy(burst=0.5)
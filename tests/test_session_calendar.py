@@ -0,0 +1,195 @@
+"""Tests for compiled session schedules (core/session_calendar.py)."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from core.instrument_registry import InstrumentRegistry
+from core.session_calendar import SESSION_LABELS, SessionSchedule
+
+# Week of Mon 2026-10-19 (no holidays)
+MONDAY = datetime(2026, 10, 19)
+
+TEMPLATE: Dict[str, Any] = {
+    "spike_sessions": ["NY_OPEN"],
+    "sessions": [
+        {"session": "ASIA", "start": "00:00", "end": "07:00"},
+        {"session": "LONDON", "start": "07:00", "end": "13:30"},
+        {"session": "NY_OPEN", "start": "13:30", "end": "16:00"},
+        {"session": "NY_MID", "start": "16:00", "end": "21:00"},
+    ],
+    "holidays": [{"date": "2026-12-25"}, {"date": "2026-12-24", "close": "18:00"}],
+}
+
+
+@pytest.fixture
+def schedule() -> SessionSchedule:
+    return SessionSchedule.from_config("TEST", TEMPLATE)
+
+
+class TestSessionState:
+    def test_labels_follow_windows(self, schedule: SessionSchedule) -> None:
+        assert schedule.state_at(MONDAY + timedelta(hours=3)).session == "ASIA"
+        assert schedule.state_at(MONDAY + timedelta(hours=10)).session == "LONDON"
+        assert schedule.state_at(MONDAY + timedelta(hours=14)).session == "NY_OPEN"
+        assert schedule.state_at(MONDAY + timedelta(hours=22)).session == "CLOSED"
+        assert not schedule.state_at(MONDAY + timedelta(days=5, hours=10)).is_open  # Saturday
+
+    def test_open_spike_and_proximity(self, schedule: SessionSchedule) -> None:
+        state = schedule.state_at(MONDAY + timedelta(hours=13, minutes=35))
+        assert state.minutes_since_open == 5
+        assert state.minutes_to_close == 145
+        assert state.flags == ("OPEN_SPIKE_RISK",)
+        assert schedule.state_at(MONDAY + timedelta(hours=13, minutes=45)).flags == ()
+
+    def test_gap_risk_after_closure_and_close_proximity(self, schedule: SessionSchedule) -> None:
+        reopen = schedule.state_at(MONDAY + timedelta(days=1, minutes=2))
+        assert reopen.session == "ASIA" and reopen.flags == ("GAP_RISK",)
+        closing = schedule.state_at(MONDAY + timedelta(hours=20, minutes=50))
+        assert closing.minutes_to_close == 10 and closing.flags == ("CLOSE_PROXIMITY",)
+
+    def test_monday_open_counts_from_friday_close(self, schedule: SessionSchedule) -> None:
+        state = schedule.state_at(MONDAY - timedelta(minutes=1))
+        assert state.session == "CLOSED"
+        assert state.minutes_since_open == 2 * 1440 + 3 * 60 - 1
+        assert state.minutes_to_close == 1
+
+    def test_aware_timestamps_are_converted_to_utc(self, schedule: SessionSchedule) -> None:
+        tz = timezone(timedelta(hours=7))
+        aware = (MONDAY + timedelta(hours=14)).replace(tzinfo=timezone.utc).astimezone(tz)
+        assert schedule.state_at(aware) == schedule.state_at(MONDAY + timedelta(hours=14))
+
+
+class TestHolidays:
+    def test_full_closure(self, schedule: SessionSchedule) -> None:
+        assert schedule.state_at(datetime(2026, 12, 25, 10)).session == "CLOSED"
+        assert schedule.state_at(datetime(2026, 12, 18, 10)).session == "LONDON"  # same weekday, normal
+
+    def test_early_close_moves_close_proximity(self, schedule: SessionSchedule) -> None:
+        state = schedule.state_at(datetime(2026, 12, 24, 17, 50))
+        assert state.session == "NY_MID"
+        assert state.minutes_to_close == 10
+        assert state.flags == ("CLOSE_PROXIMITY",)
+        assert schedule.state_at(datetime(2026, 12, 24, 18, 30)).session == "CLOSED"
+
+    def test_closure_stretches_proximity_beyond_the_holiday(self, schedule: SessionSchedule) -> None:
+        # Closed from Thu 24th 18:00 (early close) through the weekend to Mon 28th 00:00
+        state = schedule.state_at(datetime(2026, 12, 27, 23, 59))
+        assert state.session == "CLOSED"
+        assert state.minutes_since_open == 3 * 1440 + 6 * 60 - 1
+        assert schedule.state_at(datetime(2026, 12, 24, 23, 0)).minutes_to_close == 3 * 1440 + 60
+        assert schedule.state_at(datetime(2026, 12, 28, 0, 5)).flags == ("GAP_RISK",)
+
+
+class TestVectorizedColumns:
+    def test_labels_match_scalar_lookup(self, schedule: SessionSchedule) -> None:
+        timeline = np.arange(
+            np.datetime64("2026-12-14T00:00"), np.datetime64("2027-01-04T00:00"), np.timedelta64(7, "m")
+        )
+        columns = schedule.columns(timeline)
+        labels = schedule.labels(timeline)
+        for i in range(0, len(timeline), 97):
+            state = schedule.state_at(timeline[i].astype(datetime))
+            assert labels[i] == state.session == SESSION_LABELS[columns["code"][i]]
+            assert columns["since_open"][i] == state.minutes_since_open
+            assert columns["to_close"][i] == state.minutes_to_close
+
+    def test_matches_compiling_the_whole_timeline(self, schedule: SessionSchedule) -> None:
+        """Week arrays + holiday overrides equal a direct compile of a contiguous calendar."""
+        first = (date(2026, 11, 1) - date(1970, 1, 1)).days
+        days = 100
+        reference = schedule._compile(schedule._timeline(first - 14, first + days + 14))
+        timeline = (np.arange(days * 1440) + first * 1440).astype("datetime64[m]")
+        columns = schedule.columns(timeline)
+        for name, expected in zip(("code", "since_open", "to_close", "flags"), reference):
+            assert np.array_equal(columns[name], expected[14 * 1440 : (14 + days) * 1440]), name
+
+    def test_local_template_matches_scalar_lookup_across_dst(self) -> None:
+        schedule = SessionSchedule.from_config("NY", {**TEMPLATE, "timezone": "America/New_York"})
+        timeline = np.arange(np.datetime64("2026-03-06T00:00"), np.datetime64("2026-03-11T00:00"), 11)
+        codes = schedule.columns(timeline)["code"]
+        for i in range(0, len(timeline), 13):
+            assert SESSION_LABELS[codes[i]] == schedule.state_at(timeline[i].astype(datetime)).session
+        assert schedule.state_at(datetime(2026, 3, 6, 18, 31)).session == "NY_OPEN"  # 13:31 EST
+        assert schedule.state_at(datetime(2026, 3, 9, 17, 31)).session == "NY_OPEN"  # 13:31 EDT
+
+    def test_compiled_arrays_round_trip(self, schedule: SessionSchedule) -> None:
+        rebuilt = SessionSchedule.from_config("TEST", TEMPLATE, schedule.arrays())
+        when = datetime(2026, 12, 24, 17, 50)
+        assert rebuilt.state_at(when) == schedule.state_at(when)
+        assert rebuilt.holidays == {date(2026, 12, 25): None, date(2026, 12, 24): 1080}
+
+
+class TestValidation:
+    def test_unknown_label_raises(self) -> None:
+        with pytest.raises(ValueError):
+            SessionSchedule.from_config("BAD", {"sessions": [{"session": "TOKYO", "start": "00:00", "end": "01:00"}]})
+
+    def test_unquoted_time_raises(self) -> None:
+        with pytest.raises(ValueError):
+            SessionSchedule.from_config("BAD", {"sessions": [{"session": "ASIA", "start": 0, "end": "01:00"}]})
+
+    def test_unknown_timezone_raises(self) -> None:
+        with pytest.raises(ValueError, match="timezone"):
+            SessionSchedule.from_config("BAD", {**TEMPLATE, "timezone": "Mars/Olympus"})
+
+    def test_inverted_window_raises(self) -> None:
+        with pytest.raises(ValueError):
+            SessionSchedule.from_config("BAD", {"sessions": [{"session": "ASIA", "start": "05:00", "end": "01:00"}]})
+
+
+class TestRegistrySessions:
+    def test_every_instrument_has_a_schedule(self) -> None:
+        registry = InstrumentRegistry()
+        for symbol in registry.list_symbols():
+            assert isinstance(registry.session_schedule(symbol), SessionSchedule)
+
+    def test_asset_classes_follow_their_templates(self) -> None:
+        registry = InstrumentRegistry()
+        saturday = datetime(2026, 10, 24, 12)
+        assert registry.session_state("BTCUSD", saturday).session == "NY_OPEN"
+        assert registry.session_state("EURUSD", saturday).session == "CLOSED"
+        nasdaq_open = registry.session_state("US100", datetime(2026, 10, 19, 13, 31))
+        assert nasdaq_open.session == "NY_OPEN" and "OPEN_SPIKE_RISK" in nasdaq_open.flags
+
+    def test_us_index_open_follows_new_york_dst(self) -> None:
+        registry = InstrumentRegistry()
+        summer, winter = datetime(2026, 7, 14, 13, 31), datetime(2026, 1, 13, 14, 31)  # 09:31 EDT / EST
+        for when in (summer, winter):
+            state = registry.session_state("US100", when)
+            assert state.session == "NY_OPEN" and "OPEN_SPIKE_RISK" in state.flags
+        assert registry.session_state("US100", datetime(2026, 1, 13, 13, 31)).session == "LONDON"
+
+    def test_backtest_years_have_holidays(self) -> None:
+        registry = InstrumentRegistry()
+        assert registry.session_state("US100", datetime(2024, 11, 28, 15)).session == "CLOSED"  # Thanksgiving
+        assert registry.session_state("GER30", datetime(2025, 4, 18, 10)).session == "CLOSED"  # Good Friday
+
+    def test_session_labels_over_timeline(self) -> None:
+        registry = InstrumentRegistry()
+        timeline = np.array(["2026-10-19T03:00", "2026-10-19T08:00", "2026-10-24T08:00"], dtype="datetime64[m]")
+        assert registry.session_labels("EURUSD", timeline).tolist() == ["ASIA", "LONDON", "CLOSED"]
+
+    def test_unknown_symbol_raises_key_error(self) -> None:
+        with pytest.raises(KeyError):
+            InstrumentRegistry().session_state("INVALID", MONDAY)
+
+    def test_cached_schedules_match_compiled(self, tmp_path: Any) -> None:
+        cache = tmp_path / "instruments.cache"
+        cold, warm = InstrumentRegistry(cache_path=cache), InstrumentRegistry(cache_path=cache)
+        timeline = np.arange(np.datetime64("2026-11-20T00:00"), np.datetime64("2027-01-05T00:00"), 13)
+        for symbol in ("EURUSD", "US100", "GER30", "BTCUSD"):
+            a, b = cold.session_schedule(symbol).columns(timeline), warm.session_schedule(symbol).columns(timeline)
+            assert all(np.array_equal(a[key], b[key]) for key in a)
+
+    def test_undefined_template_raises(self, tmp_path: Any) -> None:
+        config = tmp_path / "instruments.yaml"
+        config.write_text(
+            "instruments:\n"
+            "  EURUSD: {symbol: EURUSD, tick_size: 0.00001, point_value: 10.0, contract_size: 100000,\n"
+            "           min_lot: 0.01, max_lot: 100.0, lot_step: 0.01, sessions: MISSING}\n"
+        )
+        with pytest.raises(ValueError):
+            InstrumentRegistry(str(config))
@@ -1,14 +1,23 @@
 """Tests for HCAP-01 SovereignAllocator risk-to-lot traceability."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Literal
 
+import numpy as np
 import pytest
 
-from core.sovereign_allocator import SovereignAllocator
+from core.correlation_engine import CorrelationPolicy
+from core.exploration import StochasticExplorer
+from core.sovereign_allocator import (
+    DiversificationOptimizer,
+    SovereignAllocator,
+    aggregate_signals,
+    project_capped_simplex,
+)
 from core.types import (
     AgentSignal,
+    AllocationDecision,
     MarketSnapshot,
     PortfolioState,
     QEFCDecision,
@@ -159,6 +168,22 @@ class TestTraceFields:
         assert decision.orders[0].quantity == pytest.approx(1.23)
         assert decision.orders[0].metadata["allocated_lot_size"] == pytest.approx(1.23)
 
+    def test_decision_stamped_with_bar_time(self) -> None:
+        bar = datetime(2024, 3, 5, 14)
+        snapshot = MarketSnapshot(symbol="EURUSD", price=1.2000, timestamp=bar)
+
+        decision = SovereignAllocator().allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[make_signal()],
+            snapshot=snapshot,
+            portfolio=make_portfolio(),
+            registry=StubRegistry(),  # type: ignore[arg-type]
+        )
+        hold = SovereignAllocator().allocate(make_qefc(risk_factor=1.0), [], snapshot, make_portfolio(), StubRegistry())  # type: ignore[arg-type]
+
+        assert decision.timestamp == bar
+        assert hold.timestamp == bar
+
 
 class TestDirectionPreservation:
     def test_long_maps_to_buy(self) -> None:
@@ -269,3 +294,356 @@ class TestAdditionalRejections:
 
         assert decision.action == "HOLD"
         assert decision.orders == []
+
+
+@dataclass
+class RecordingRegistry:
+    """Stub returning risk-proportional lots and recording every sizing call."""
+
+    lots_per_usd: float = 0.01
+    calls: list = field(default_factory=list)
+
+    def calc_lot_from_risk(self, risk_amount_usd: float, sl_distance_points: float, symbol: str) -> float:
+        self.calls.append((symbol, risk_amount_usd, sl_distance_points))
+        return round(risk_amount_usd * self.lots_per_usd, 2)
+
+
+def agent_signal(
+    agent: str,
+    symbol: str,
+    intent: Literal["LONG", "SHORT", "NEUTRAL"],
+    confidence: float,
+    stop: float | None,
+    risk: float | None = 2.0,
+) -> AgentSignal:
+    return AgentSignal(
+        agent_name=agent,
+        symbol=symbol,
+        intent=intent,
+        confidence=confidence,
+        invalidation_price=stop,
+        proposed_risk_pct=risk,
+    )
+
+
+class TestSignalAggregation:
+    def test_net_exposure_weighted_by_confidence_and_rating(self) -> None:
+        plan = aggregate_signals(
+            [
+                agent_signal("trend", "EURUSD", "LONG", 0.8, 1.19),
+                agent_signal("meanrev", "EURUSD", "SHORT", 0.5, 1.21),
+                agent_signal("orb", "EURUSD", "NEUTRAL", 0.5, None),
+            ],
+            ratings={"trend": 1.0, "meanrev": 0.4, "orb": 0.4},
+        )
+        # (0.8 - 0.2) / (0.8 + 0.2 + 0.2)
+        assert plan.net_exposure[0] == pytest.approx(0.5)
+        assert plan.contributors(0) == ["trend"]
+
+    def test_widest_stop_and_weighted_proposal_of_agreeing_agents(self) -> None:
+        plan = aggregate_signals(
+            [
+                agent_signal("trend", "EURUSD", "LONG", 0.6, 1.19, risk=2.0),
+                agent_signal("ict", "EURUSD", "LONG", 0.2, 1.18, risk=1.0),
+                agent_signal("meanrev", "EURUSD", "SHORT", 0.2, 1.25, risk=5.0),
+            ]
+        )
+        assert plan.stop_price[0] == pytest.approx(1.18)
+        assert plan.proposed_risk_pct[0] == pytest.approx((0.6 * 2.0 + 0.2 * 1.0) / 0.8)
+
+    def test_symbols_aggregate_independently(self) -> None:
+        plan = aggregate_signals(
+            [
+                agent_signal("trend", "EURUSD", "LONG", 0.9, 1.19),
+                agent_signal("trend", "XAUUSD", "SHORT", 0.7, 1960.0),
+                agent_signal("orb", "XAUUSD", "SHORT", 0.3, 1955.0),
+            ]
+        )
+        assert plan.symbols == ["EURUSD", "XAUUSD"]
+        assert plan.net_exposure.tolist() == pytest.approx([1.0, -1.0])
+        assert plan.stop_price[1] == pytest.approx(1960.0)
+        assert plan.weights.shape == (2, 2)
+
+
+class TestPortfolioAllocation:
+    def test_batch_emits_one_order_per_symbol(self) -> None:
+        allocator = SovereignAllocator()
+        registry = RecordingRegistry()
+        decision = allocator.allocate(
+            qefc_decision=make_qefc(risk_factor=0.5),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.9, 1.19),
+                agent_signal("trend", "XAUUSD", "SHORT", 0.8, 1960.0),
+                agent_signal("ict", "XAUUSD", "SHORT", 0.4, 1958.0),
+            ],
+            snapshot=make_snapshot(price=1.20),
+            snapshots={"XAUUSD": MarketSnapshot(symbol="XAUUSD", price=1950.0)},
+            portfolio=make_portfolio(equity=10_000.0),
+            registry=registry,  # type: ignore[arg-type]
+        )
+
+        assert decision.symbol == "PORTFOLIO"
+        assert decision.action == "OPEN"
+        assert [(o.symbol, o.side) for o in decision.orders] == [("EURUSD", "BUY"), ("XAUUSD", "SELL")]
+        assert decision.orders[1].stop_loss == pytest.approx(1960.0)
+        assert decision.orders[1].metadata["contributing_agents"] == ["trend", "ict"]
+        assert decision.final_risk_pct == pytest.approx(sum(o.risk_pct_used for o in decision.orders))
+        assert [c[0] for c in registry.calls] == ["EURUSD", "XAUUSD"]
+
+    def test_partial_agreement_scales_risk_through_multiplier(self) -> None:
+        allocator = SovereignAllocator()
+        registry = RecordingRegistry()
+        decision = allocator.allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.75, 1.19),
+                agent_signal("meanrev", "EURUSD", "SHORT", 0.25, 1.21),
+            ],
+            snapshot=make_snapshot(price=1.20),
+            portfolio=make_portfolio(equity=10_000.0),
+            registry=registry,  # type: ignore[arg-type]
+        )
+
+        assert decision.action == "OPEN"
+        assert decision.portfolio_multiplier == pytest.approx(0.5)
+        assert decision.final_risk_pct == pytest.approx(decision.risk_after_QEFC * decision.portfolio_multiplier)
+        assert registry.calls[0][1] == pytest.approx(100.0)
+
+    def test_opposing_signals_cancel_to_hold(self) -> None:
+        decision = SovereignAllocator().allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+                agent_signal("meanrev", "EURUSD", "SHORT", 0.5, 1.21),
+            ],
+            snapshot=make_snapshot(),
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+        )
+        assert decision.action == "HOLD"
+        assert decision.orders == []
+
+    def test_zero_rating_silences_agent(self) -> None:
+        decision = SovereignAllocator().allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+                agent_signal("dead", "EURUSD", "SHORT", 1.0, 1.21),
+            ],
+            snapshot=make_snapshot(),
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+            ratings={"dead": 0.0},
+        )
+        assert decision.orders[0].side == "BUY"
+        assert decision.portfolio_multiplier == pytest.approx(1.0)
+
+    def test_symbol_without_snapshot_is_rejected_in_batch(self) -> None:
+        decision = SovereignAllocator().allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.9, 1.19),
+                agent_signal("trend", "GBPUSD", "LONG", 0.9, 1.25),
+            ],
+            snapshot=make_snapshot(price=1.20),
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+        )
+        assert decision.action == "OPEN"
+        assert [o.symbol for o in decision.orders] == ["EURUSD"]
+        assert decision.notes is not None
+        assert "GBPUSD REJECT: no market snapshot" in decision.notes
+
+
+class TestCorrelationGovernance:
+    def warmed_allocator(self, bars: int = 40) -> SovereignAllocator:
+        """Allocator whose 'trend' and 'clone' agents always agree and 'meanrev' opposes."""
+        allocator = SovereignAllocator(correlation=CorrelationPolicy(halflife=10.0, min_periods=5))
+        rng = np.random.default_rng(0)
+        for _ in range(bars):
+            allocator.allocate(
+                qefc_decision=make_qefc(risk_factor=1.0),
+                signals=[
+                    agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+                    agent_signal("clone", "EURUSD", "LONG", 0.5, 1.19),
+                    agent_signal("meanrev", "EURUSD", "SHORT", 0.5, 1.21),
+                    agent_signal("trend", "GBPUSD", "LONG", 0.5, 1.25),
+                ],
+                snapshot=make_snapshot(price=1.20),
+                portfolio=make_portfolio(),
+                registry=RecordingRegistry(),  # type: ignore[arg-type]
+            )
+            move = rng.normal(scale=1e-3)
+            allocator.observe_returns({"EURUSD": move, "GBPUSD": move + rng.normal(scale=1e-5)})
+        return allocator
+
+    def test_observe_returns_tracks_agent_and_symbol_correlation(self) -> None:
+        allocator = self.warmed_allocator()
+        assert allocator.agent_correlation is not None and allocator.symbol_correlation is not None
+        agents = allocator.agent_correlation.correlation(["trend", "clone", "meanrev"])
+        assert agents[0, 1] > 0.99 and agents[0, 2] < -0.9
+        assert allocator.symbol_correlation.correlation(["EURUSD", "GBPUSD"])[0, 1] > 0.99
+
+    def test_cluster_cap_limits_crowded_agents(self) -> None:
+        allocator = self.warmed_allocator()
+        signals = [
+            agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+            agent_signal("clone", "EURUSD", "LONG", 0.5, 1.19),
+            agent_signal("meanrev", "EURUSD", "SHORT", 0.5, 1.21),
+        ]
+        ungoverned = aggregate_signals(signals)
+        governed = aggregate_signals(signals, correlation=allocator.agent_correlation, policy=allocator.correlation)
+        assert ungoverned.net_exposure[0] == pytest.approx(1 / 3)
+        # trend + clone form one cluster capped at half the weight, meanrev holds the rest
+        assert governed.net_exposure[0] == pytest.approx(0.0, abs=1e-9)
+
+    def test_correlated_symbols_share_exposure_ceiling(self) -> None:
+        allocator = self.warmed_allocator()
+        decision = allocator.allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.9, 1.19),
+                agent_signal("trend", "GBPUSD", "LONG", 0.9, 1.25),
+            ],
+            snapshot=make_snapshot(price=1.20),
+            snapshots={"GBPUSD": MarketSnapshot(symbol="GBPUSD", price=1.26)},
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+        )
+        assert [o.symbol for o in decision.orders] == ["EURUSD", "GBPUSD"]
+        assert decision.portfolio_multiplier == pytest.approx(0.5)
+
+    def test_without_policy_allocation_is_unchanged(self) -> None:
+        allocator = SovereignAllocator()
+        allocator.observe_returns({"EURUSD": 0.01})
+        assert allocator.agent_correlation is None
+
+
+def capped_simplex_reference(v: np.ndarray, cap: float) -> np.ndarray:
+    lo, hi = v.min() - cap, v.max()
+    for _ in range(200):
+        tau = 0.5 * (lo + hi)
+        lo, hi = (tau, hi) if np.clip(v - tau, 0.0, cap).sum() > 1.0 else (lo, tau)
+    return np.clip(v - 0.5 * (lo + hi), 0.0, cap)
+
+
+def random_problem(seed: int, agents: int = 8, symbols: int = 20) -> tuple:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(size=(250, agents)) * rng.uniform(0.5, 3.0, agents)
+    returns[:, 1] += returns[:, 0]
+    weights = rng.uniform(0.1, 1.0, (agents, symbols)) * (rng.random((agents, symbols)) < 0.75)
+    total = weights.sum(axis=0)
+    return np.cov(returns.T), np.divide(weights, total, out=np.zeros_like(weights), where=total > 0), weights > 0
+
+
+class TestDiversificationOptimizer:
+    def test_projection_matches_bisection(self) -> None:
+        rng = np.random.default_rng(0)
+        v = rng.normal(size=(6, 30))
+        active = rng.random((6, 30)) < 0.8
+        active[:3] = True
+        projected = project_capped_simplex(v, active, np.full(30, 0.4))
+        for s in range(30):
+            expected = capped_simplex_reference(v[active[:, s], s], 0.4)
+            assert np.allclose(projected[active[:, s], s], expected, atol=1e-9)
+        assert np.all(projected[~active] == 0.0)
+
+    def test_identity_covariance_closed_form(self) -> None:
+        prior = np.array([[0.4], [0.3], [0.2], [0.1]])
+        shares = DiversificationOptimizer(cap=1.0, tracking=0.5).solve(np.eye(4), prior, prior > 0)
+        assert np.allclose(shares, (0.5 * prior + 0.25) / 1.5)
+
+    def test_no_history_keeps_capped_prior(self) -> None:
+        prior = np.array([[0.7], [0.2], [0.1]])
+        shares = DiversificationOptimizer(cap=0.5).solve(np.zeros((3, 3)), prior, prior > 0)
+        assert np.allclose(shares.ravel(), [0.5, 0.3, 0.2])
+
+    def test_active_set_matches_projected_gradient(self) -> None:
+        for seed in range(5):
+            covariance, prior, active = random_problem(seed)
+            optimizer = DiversificationOptimizer(cap=0.3)
+            shares = optimizer.solve(covariance, prior, active)
+            cap = np.maximum(0.3, 1.0 / np.maximum(active.sum(axis=0), 1))
+            scale = np.diagonal(covariance).mean()
+            hessian = 2.0 * (covariance / scale + 0.1 * np.eye(8))
+            reference = optimizer._projected_gradient(
+                hessian, 0.2 * prior, active, cap, project_capped_simplex(prior, active, cap), max_iter=100_000
+            )
+            assert np.allclose(shares, reference, atol=1e-6)
+            assert np.allclose(shares.sum(axis=0)[active.any(axis=0)], 1.0)
+            assert shares.min() >= 0.0 and np.all(shares <= cap + 1e-12)
+
+    def test_warm_start_settles_in_one_pass(self) -> None:
+        covariance, prior, active = random_problem(7)
+        optimizer = DiversificationOptimizer(cap=0.3)
+        shares = optimizer.solve(covariance, prior, active)
+        optimizer.solve(covariance, prior, active, x0=shares)
+        assert optimizer.iterations == 1
+
+    def test_allocator_diverts_weight_from_redundant_agents(self) -> None:
+        allocator = TestCorrelationGovernance().warmed_allocator()
+        allocator.diversifier = DiversificationOptimizer(cap=1.0)
+        allocator.correlation = CorrelationPolicy(soft_penalty=False, agent_cluster_cap=1.0)
+        signals = [
+            agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+            agent_signal("clone", "EURUSD", "LONG", 0.5, 1.19),
+            agent_signal("meanrev", "EURUSD", "SHORT", 0.5, 1.21),
+        ]
+        plan = aggregate_signals(
+            signals,
+            correlation=allocator.agent_correlation,
+            policy=allocator.correlation,
+            diversifier=allocator.diversifier,
+        )
+        # Long-only minimum variance loads the hedge (meanrev) against the cloned pair
+        assert plan.weights[2, 0] > plan.weights[0, 0] + plan.weights[1, 0] - 1e-9
+        assert plan.weights.sum() == pytest.approx(1.5)
+
+    def test_active_mask_drops_benched_agents(self) -> None:
+        decision = SovereignAllocator().allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=[
+                agent_signal("trend", "EURUSD", "LONG", 0.5, 1.19),
+                agent_signal("benched", "EURUSD", "SHORT", 0.5, 1.21),
+            ],
+            snapshot=make_snapshot(),
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+            active={"trend"},
+        )
+        assert decision.action == "OPEN"
+        assert decision.portfolio_multiplier == pytest.approx(1.0)
+
+
+class TestStochasticExploration:
+    signals = [
+        agent_signal("trend", "EURUSD", "LONG", 0.50, 1.19, risk=1.0),
+        agent_signal("ict", "EURUSD", "LONG", 0.51, 1.18, risk=3.0),
+        agent_signal("meanrev", "EURUSD", "SHORT", 0.20, 1.21),
+    ]
+
+    def allocate(self, allocator: SovereignAllocator, uncertainty: float, bar_index: int = 9) -> AllocationDecision:
+        return allocator.allocate(
+            qefc_decision=make_qefc(risk_factor=1.0),
+            signals=self.signals,
+            snapshot=make_snapshot(price=1.20),
+            portfolio=make_portfolio(),
+            registry=RecordingRegistry(),  # type: ignore[arg-type]
+            uncertainty=uncertainty,
+            bar_index=bar_index,
+        )
+
+    def test_exploration_keeps_exposure_and_is_reproducible(self) -> None:
+        calm = self.allocate(SovereignAllocator(explorer=StochasticExplorer()), uncertainty=0.1)
+        first = self.allocate(SovereignAllocator(explorer=StochasticExplorer()), uncertainty=0.9)
+        again = self.allocate(SovereignAllocator(explorer=StochasticExplorer()), uncertainty=0.9)
+        assert first.portfolio_multiplier == pytest.approx(calm.portfolio_multiplier)
+        assert first.orders[0].side == calm.orders[0].side == "BUY"
+        assert first.proposed_risk_pct != pytest.approx(calm.proposed_risk_pct)
+        assert first.proposed_risk_pct == again.proposed_risk_pct
+        assert first.orders[0].quantity == again.orders[0].quantity
+
+    def test_below_threshold_is_deterministic_baseline(self) -> None:
+        baseline = self.allocate(SovereignAllocator(), uncertainty=0.9)
+        calm = self.allocate(SovereignAllocator(explorer=StochasticExplorer()), uncertainty=0.1)
+        assert calm.proposed_risk_pct == baseline.proposed_risk_pct
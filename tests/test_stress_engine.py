@@ -0,0 +1,118 @@
+"""Tests for the stress scenario grid."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.instrument_registry import InstrumentRegistry, InstrumentTable
+from core.stress_engine import StressGrid, StressScenario, load_scenarios
+
+
+@pytest.fixture()
+def table() -> InstrumentTable:
+    return InstrumentRegistry().table
+
+
+def one_hot(table: InstrumentTable, symbol: str, value: float) -> np.ndarray:
+    exposure = np.zeros(len(table))
+    exposure[table.ids[symbol]] = value
+    return exposure
+
+
+class TestScenarioMatrix:
+    def test_symbol_and_currency_shocks(self, table: InstrumentTable) -> None:
+        grid = StressGrid(table, [StressScenario("XAU", {"XAUUSD": -0.03}), StressScenario("USD", {"USD": 0.02})])
+
+        xau, usd = grid.moves
+        assert xau[table.ids["XAUUSD"]] == pytest.approx(-0.03)
+        assert np.count_nonzero(xau) == 1
+        assert usd[table.ids["EURUSD"]] == pytest.approx(1 / 1.02 - 1)
+        assert usd[table.ids["USDJPY"]] == pytest.approx(0.02)
+        assert usd[table.ids["US100"]] == pytest.approx(1 / 1.02 - 1)
+        assert usd[table.ids["GER30"]] == 0.0
+
+    def test_unknown_target_and_invalid_shock_rejected(self, table: InstrumentTable) -> None:
+        with pytest.raises(ValueError, match="NOPE"):
+            StressGrid(table, [StressScenario("bad", {"NOPE": 0.01})])
+        with pytest.raises(ValueError, match="> -1"):
+            StressScenario("wipeout", {"US100": -1.0})
+        with pytest.raises(ValueError, match="at least one"):
+            StressGrid(table, [])
+        with pytest.raises(ValueError, match="account currency 'SGD'"):
+            StressGrid(table, [StressScenario("USD", {"USD": 0.02})], account_currency="SGD")
+
+    def test_yaml_grid_expands_cartesian_product(self, tmp_path: Path) -> None:
+        path = tmp_path / "stress.yaml"
+        path.write_text("scenarios:\n  GAP: {US100: -0.05}\ngrid:\n  XAUUSD: [-0.03, 0.0, 0.03]\n  USD: [-0.02, 0.0]\n")
+
+        scenarios = load_scenarios(path)
+
+        assert [s.name for s in scenarios][:3] == ["GAP", "GRID[XAUUSD-0.03,USD-0.02]", "GRID[XAUUSD-0.03]"]
+        assert len(scenarios) == 1 + 3 * 2 - 1
+
+    def test_shipped_config_loads(self, table: InstrumentTable) -> None:
+        grid = StressGrid.from_yaml("config/stress_scenarios.yaml", table)
+
+        assert len(grid) > 100
+        assert "US100_GAP_DOWN_5" in grid.names
+
+    def test_yaml_grid_reports_in_its_account_currency(self, table: InstrumentTable) -> None:
+        usd = StressGrid.from_yaml("config/stress_scenarios.yaml", table)
+        eur = StressGrid.from_yaml("config/stress_scenarios.yaml", table, account_currency="EUR")
+        eur.update_rates({"EURUSD": 1.25})
+        order = usd.exposure_delta([("US100", 1.0, 20_000.0)])
+
+        assert eur.worst(order)[0] == pytest.approx(usd.worst(order)[0] / 1.25)
+
+
+class TestPricing:
+    def test_pnl_values_notional(self, table: InstrumentTable) -> None:
+        grid = StressGrid(table, [StressScenario("XAU_DOWN", {"XAUUSD": -0.03})])
+        grid.set_exposure(one_hot(table, "XAUUSD", 2.0 * 100.0 * 2400.0))  # 2 lots of 100 oz at 2,400
+
+        loss, scenario = grid.worst()
+
+        assert scenario == "XAU_DOWN"
+        assert loss == pytest.approx(2.0 * 100.0 * 2400.0 * 0.03)
+
+    def test_fx_dollar_shock_in_account_currency(self, table: InstrumentTable) -> None:
+        grid = StressGrid(table, [StressScenario("USD_UP_2", {"USD": 0.02})])
+
+        loss, scenario = grid.worst(grid.exposure_delta([("EURUSD", 1.0, 1.085)]))
+
+        assert scenario == "USD_UP_2"
+        assert loss == pytest.approx(100_000 * 1.085 * (1 - 1 / 1.02))  # ≈ 2,127
+
+    def test_quote_currency_converted_at_pair_rate(self, table: InstrumentTable) -> None:
+        grid = StressGrid(table, [StressScenario("USD_DOWN_2", {"USD": -0.02})])
+        grid.update_rates({"USDJPY": 150.0, "XAUUSD": 2400.0})
+
+        loss, _ = grid.worst(grid.exposure_delta([("USDJPY", 1.0, 150.0)]))
+
+        assert grid.rates.of("JPY") == pytest.approx(1 / 150.0)
+        assert loss == pytest.approx(100_000 * 0.02)  # JPY 15M notional is USD 100k
+
+    def test_order_delta_matches_full_multiply(self, table: InstrumentTable) -> None:
+        grid = StressGrid.from_yaml("config/stress_scenarios.yaml", table)
+        rng = np.random.default_rng(9)
+        book = rng.normal(0.0, 1_000.0, size=len(table))
+        grid.set_exposure(book)
+        fills = [("XAUUSD", 0.5, 2400.0), ("US100", -1.0, 18_000.0), ("XAUUSD", -0.2, 2410.0)]
+
+        delta = grid.exposure_delta(fills)
+        full = book.copy()
+        for i, value in delta.items():
+            full[i] += value
+
+        np.testing.assert_allclose(grid.stressed(delta), grid.pnl(full))
+        np.testing.assert_array_equal(grid.exposure, book)
+
+    def test_hedge_reduces_worst_loss(self, table: InstrumentTable) -> None:
+        grid = StressGrid(table, [StressScenario("UP", {"XAUUSD": 0.03}), StressScenario("DOWN", {"XAUUSD": -0.03})])
+        grid.set_exposure(one_hot(table, "XAUUSD", 100.0 * 2400.0))  # 1 lot
+
+        hedged = grid.worst(grid.exposure_delta([("XAUUSD", -0.5, 2400.0)]))
+
+        assert hedged[0] < grid.worst()[0]
+        assert hedged[1] == "DOWN"
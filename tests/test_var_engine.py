@@ -0,0 +1,139 @@
+"""Tests for the streaming portfolio VaR/CVaR engine."""
+
+import math
+
+import numpy as np
+import pytest
+
+from core.currency_rates import CurrencyRates
+from core.instrument_registry import InstrumentRegistry, InstrumentTable
+from core.stress_engine import StressGrid, StressScenario
+from core.var_engine import VaREngine, VaRPolicy
+
+
+@pytest.fixture()
+def table() -> InstrumentTable:
+    return InstrumentRegistry().table
+
+
+def feed(engine: VaREngine, bars: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    history = rng.normal(0.0, 0.01, size=(bars, len(engine.table)))
+    for row in history:
+        engine.update(row)
+    return history
+
+
+def brute_force(history: np.ndarray, exposure: np.ndarray, alpha: float) -> tuple[float, float]:
+    pnl = np.sort(history @ exposure)
+    k = max(1, math.ceil(alpha * len(pnl)))
+    return -pnl[k - 1], -pnl[:k].mean()
+
+
+class TestPolicy:
+    def test_rejects_invalid_settings(self) -> None:
+        with pytest.raises(ValueError, match="alpha"):
+            VaRPolicy(alpha=1.0)
+        with pytest.raises(ValueError, match="min_periods"):
+            VaRPolicy(window=10, min_periods=20)
+        with pytest.raises(ValueError, match="method"):
+            VaRPolicy(method="monte_carlo")  # type: ignore[arg-type]
+
+
+class TestHistorical:
+    def test_matches_full_recompute_across_wraps_and_exposure_changes(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=60, alpha=0.05, min_periods=10))
+        rng = np.random.default_rng(11)
+        history = []
+        for bar in range(200):
+            row = rng.normal(0.0, 0.01, size=len(table))
+            engine.update(row)
+            history.append(row)
+            if bar % 7 == 0:
+                exposure = engine.exposure.copy()
+                exposure[rng.integers(len(table))] += rng.normal(0.0, 50_000.0)
+                engine.set_exposure(exposure)
+
+        expected = brute_force(np.array(history[-60:]), engine.exposure, 0.05)
+        assert engine.historical() == pytest.approx(expected)
+
+    def test_unquoted_symbols_count_as_flat(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=20, min_periods=5))
+        history = feed(engine, 20)
+        engine.update(np.full(len(table), np.nan))
+
+        exposure = np.full(len(table), 10_000.0)
+        engine.set_exposure(exposure)
+
+        expected = brute_force(np.vstack([history[1:], np.zeros(len(table))]), exposure, engine.policy.alpha)
+        assert engine.historical() == pytest.approx(expected)
+
+    def test_marginal_order_priced_without_mutation(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=100, alpha=0.05, min_periods=20))
+        history = feed(engine, 100)
+        eurusd = table.ids["EURUSD"]
+        engine.set_exposure(np.eye(len(table))[eurusd] * 120_000.0)
+        before = engine.historical()
+
+        delta = engine.exposure_delta([("EURUSD", -0.5, 1.20)])
+        after = engine.historical(delta)
+
+        assert delta == {eurusd: pytest.approx(-60_000.0)}
+        assert engine.historical() == before
+        assert after == pytest.approx(brute_force(history, np.eye(len(table))[eurusd] * 60_000.0, 0.05))
+        assert engine.marginal(delta)[1] < 0
+
+    def test_nan_before_min_periods(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=50, min_periods=30))
+        feed(engine, 29)
+
+        assert all(math.isnan(v) for v in engine.historical() + engine.parametric())
+
+
+class TestParametric:
+    def test_order_delta_matches_rebuilt_exposure(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=80, min_periods=20, method="parametric"))
+        feed(engine, 80)
+        rng = np.random.default_rng(5)
+        engine.set_exposure(rng.normal(0.0, 20_000.0, size=len(table)))
+        delta = {table.ids["XAUUSD"]: 30_000.0, table.ids["EURUSD"]: -15_000.0}
+
+        quick = engine.tail(delta)
+        exposure = engine.exposure.copy()
+        for i, value in delta.items():
+            exposure[i] += value
+        engine.set_exposure(exposure)
+
+        assert quick == pytest.approx(engine.parametric())
+
+    def test_normal_tail_scaling(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table, VaRPolicy(window=50, alpha=0.01, min_periods=10))
+        feed(engine, 50)
+        engine.set_exposure(np.eye(len(table))[0] * 1_000.0)
+
+        var, cvar = engine.parametric()
+        sigma = math.sqrt(engine._cov.covariance()[0, 0]) * 1_000.0
+
+        assert var == pytest.approx(2.3263 * sigma, rel=1e-4)
+        assert cvar == pytest.approx(2.6652 * sigma, rel=1e-4)
+
+
+class TestCurrencyConversion:
+    def test_quote_notional_converted_to_account_currency(self, table: InstrumentTable) -> None:
+        engine = VaREngine(table)
+        engine.rates.update({"USDJPY": 150.0, "EURUSD": 1.08})
+
+        delta = engine.exposure_delta([("USDJPY", 1.0, 150.0), ("GER30", 1.0, 18_000.0)])
+
+        assert delta[table.ids["USDJPY"]] == pytest.approx(100_000.0)  # JPY 15M
+        assert delta[table.ids["GER30"]] == pytest.approx(18_000.0 * 1.08)  # EUR-quoted
+
+    def test_rates_shared_with_stress_grid(self, table: InstrumentTable) -> None:
+        rates = CurrencyRates(table)
+        engine = VaREngine(table, rates=rates)
+        grid = StressGrid(table, [StressScenario("JPY_UP", {"USDJPY": -0.02})], rates=rates)
+        grid.set_exposure(np.eye(len(table))[table.ids["USDJPY"]] * 15_000_000.0)
+
+        engine.rates.update({"USDJPY": 150.0})
+
+        assert grid.worst()[0] == pytest.approx(2_000.0)
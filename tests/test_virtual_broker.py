@@ -1,16 +1,25 @@
 """Tests for VirtualBroker execution simulation."""
 
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from typing import Literal
 
+import numpy as np
 import pytest
 
+from core.capital_guard import SharedCapitalState
+from core.instrument_registry import InstrumentRegistry
+from core.risk_engine import RiskEngine
+from core.scalper_budget import ScalperBudgetEngine, ScalperBudgetPolicy
 from core.types import (
     AllocationDecision,
     MarketSnapshot,
     OrderIntent,
+    PortfolioState,
     RiskVerdict,
 )
+from simulation.intrabar import IntrabarIndex
+from simulation.order_matcher import OrderMatcher
 from simulation.virtual_broker import VirtualBroker
 
 
@@ -279,3 +288,245 @@ class TestPositionTracking:
         )
 
         assert broker.positions["EURUSD"] == pytest.approx(-0.4)
+
+
+def make_portfolio_decision(*legs: OrderIntent, action: Literal["OPEN", "FLATTEN"] = "OPEN") -> AllocationDecision:
+    """Helper to create a PORTFOLIO batch decision."""
+    return replace(make_decision(action=action), symbol="PORTFOLIO", orders=list(legs))
+
+
+class TestPortfolioBatch:
+    """Each leg of a PORTFOLIO batch is priced and flattened on its own symbol."""
+
+    def test_legs_fill_at_their_own_symbol_price(self) -> None:
+        broker = VirtualBroker()
+        broker.update_price("XAUUSD", 2400.0)
+        decision = make_portfolio_decision(
+            OrderIntent(symbol="EURUSD", side="BUY", quantity=0.5),
+            OrderIntent(symbol="XAUUSD", side="SELL", quantity=0.2),
+        )
+
+        report = broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        prices = {o.symbol: o.fill_price for o in report.executed_orders}
+        assert report.status == "EXECUTED"
+        assert prices == {"EURUSD": pytest.approx(1.20), "XAUUSD": pytest.approx(2400.0)}
+
+    def test_leg_without_price_is_refused(self) -> None:
+        broker = VirtualBroker()
+        decision = make_portfolio_decision(
+            OrderIntent(symbol="EURUSD", side="BUY", quantity=0.5),
+            OrderIntent(symbol="XAUUSD", side="SELL", quantity=0.2),
+        )
+
+        report = broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        assert report.status == "PARTIAL"
+        assert [o.symbol for o in report.executed_orders] == ["EURUSD"]
+        assert "XAUUSD" in (report.reason or "")
+        assert "XAUUSD" not in broker.positions
+
+    def test_portfolio_flatten_closes_every_position(self) -> None:
+        broker = VirtualBroker()
+        broker.positions.update({"EURUSD": 0.5, "XAUUSD": -0.2})
+        broker.update_price("XAUUSD", 2410.0)
+
+        report = broker.execute(make_verdict(), make_portfolio_decision(action="FLATTEN"), make_snapshot(price=1.21))
+
+        closes = {o.symbol: (o.side, o.fill_price) for o in report.executed_orders}
+        assert report.status == "FLATTENED"
+        assert closes == {"EURUSD": ("SELL", pytest.approx(1.21)), "XAUUSD": ("BUY", pytest.approx(2410.0))}
+        assert broker.positions == {"EURUSD": 0.0, "XAUUSD": 0.0}
+
+
+class TestCapitalGuardKill:
+    """A Capital Guard kill closes every position and cancels every resting order."""
+
+    def test_kill_flattens_every_symbol(self) -> None:
+        state = SharedCapitalState(n_symbols=2)
+        try:
+            matcher = OrderMatcher()
+            broker = VirtualBroker(guard=state, matcher=matcher)
+            broker.positions.update({"EURUSD": 0.5, "XAUUSD": -0.2})
+            broker.update_price("XAUUSD", 2400.0)
+            matcher.place("XAUUSD", "BUY", "STOP", 0.2, 2450.0)
+            state.kill("MANUAL")
+
+            report = broker.execute(make_verdict(), make_decision(), make_snapshot(price=1.20))
+
+            assert report.status == "FLATTENED"
+            assert {o.symbol for o in report.executed_orders} == {"EURUSD", "XAUUSD"}
+            assert broker.positions == {"EURUSD": 0.0, "XAUUSD": 0.0}
+            assert len(matcher) == 0
+        finally:
+            state.close()
+
+    def test_check_orders_cancels_every_symbol(self) -> None:
+        state = SharedCapitalState(n_symbols=2)
+        try:
+            matcher = OrderMatcher()
+            broker = VirtualBroker(guard=state, matcher=matcher)
+            matcher.place("EURUSD", "BUY", "LIMIT", 0.5, 1.19)
+            matcher.place("XAUUSD", "SELL", "LIMIT", 0.2, 2450.0)
+            state.kill("MANUAL")
+
+            report = broker.check_orders("EURUSD", 1.20, 1.21, 1.18, 1.20)
+
+            assert report.status == "REJECTED"
+            assert len(matcher) == 0
+        finally:
+            state.close()
+
+
+class TestMarginLedger:
+    def test_fills_and_flatten_are_booked(self) -> None:
+        ledger = RiskEngine(default_leverage=50.0).new_ledger(InstrumentRegistry())
+        broker = VirtualBroker(ledger=ledger)
+
+        broker.execute(make_verdict(), make_decision(side="BUY", quantity=0.5), make_snapshot(price=1.20))
+        broker.execute(make_verdict(), make_decision(side="SELL", quantity=0.2), make_snapshot(price=1.25))
+
+        assert ledger.symbol_exposure("EURUSD")[0] == pytest.approx(0.3)
+        assert ledger.used_margin == pytest.approx(0.3 * 100_000 * 1.20 / 50.0)
+
+        broker.execute(
+            make_verdict(approved=False, kill_switch=True),
+            make_decision(),
+            make_snapshot(price=1.21),
+        )
+
+        assert ledger.open_positions == 0
+        assert ledger.used_margin == 0.0
+
+
+class TestScalperBudget:
+    def scalper_decision(self, entry: float | None) -> AllocationDecision:
+        decision = make_decision()
+        order = replace(decision.orders[0], entry_price=entry, metadata={"contributing_agents": ["scalper_fx"]})
+        return replace(decision, orders=[order])
+
+    def test_pending_released_when_market_order_fills(self) -> None:
+        budget = ScalperBudgetEngine(ScalperBudgetPolicy(pending_cap=1))
+        slot = budget.slot("scalper_fx", "EURUSD")
+        engine, registry, broker = RiskEngine(), InstrumentRegistry(), VirtualBroker(budget=budget)
+        portfolio = PortfolioState(
+            equity=10_000.0, balance=10_000.0, drawdown_pct=0.0, open_positions=0, margin_used_pct=0.0
+        )
+
+        verdict = engine.veto(self.scalper_decision(1.20), portfolio, registry, budget=budget)
+        assert verdict.approved is True and budget.pending[slot] == 1
+
+        broker.execute(verdict, self.scalper_decision(1.20), make_snapshot(price=1.20))
+
+        assert budget.pending[slot] == 0
+
+    def test_pending_held_while_resting_and_released_on_cancel(self) -> None:
+        budget = ScalperBudgetEngine()
+        slot = budget.slot("scalper_fx", "EURUSD")
+        budget.try_place(slot, 0)  # booked by the risk veto
+        broker = VirtualBroker(matcher=OrderMatcher(), budget=budget)
+
+        broker.execute(make_verdict(), self.scalper_decision(1.19), make_snapshot(price=1.20))
+        assert budget.pending[slot] == 1
+
+        broker.execute(make_verdict(), make_decision(action="FLATTEN"), make_snapshot())
+
+        assert budget.pending[slot] == 0
+
+
+class TestOrderMatcher:
+    def make_order_decision(
+        self, *, entry: float | None, stop_loss: float | None = None, take_profit: float | None = None
+    ) -> AllocationDecision:
+        order = OrderIntent(
+            symbol="EURUSD",
+            side="BUY",
+            quantity=0.5,
+            entry_price=entry,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+        return replace(make_decision(), orders=[order])
+
+    def test_market_order_fills_with_slippage(self) -> None:
+        broker = VirtualBroker(matcher=OrderMatcher(default_slippage=0.0002))
+
+        report = broker.execute(make_verdict(), self.make_order_decision(entry=None), make_snapshot(price=1.20))
+
+        assert report.executed_orders[0].fill_price == pytest.approx(1.2002)
+        assert broker.positions["EURUSD"] == pytest.approx(0.5)
+
+    def test_limit_entry_rests_until_next_bar_touch(self) -> None:
+        broker = VirtualBroker(matcher=OrderMatcher())
+
+        report = broker.execute(make_verdict(), self.make_order_decision(entry=1.19), make_snapshot(price=1.20))
+        assert report.executed_orders == []
+        assert broker.positions.get("EURUSD", 0.0) == 0.0
+
+        assert broker.check_orders("EURUSD", 1.2000, 1.2050, 1.1950, 1.2010).executed_orders == []
+        report = broker.check_orders("EURUSD", 1.2010, 1.2020, 1.1880, 1.1950)
+
+        assert [o.fill_price for o in report.executed_orders] == pytest.approx([1.19])
+        assert broker.positions["EURUSD"] == pytest.approx(0.5)
+
+    def test_filled_entry_rests_oco_exits(self) -> None:
+        broker = VirtualBroker(matcher=OrderMatcher())
+        decision = self.make_order_decision(entry=None, stop_loss=1.19, take_profit=1.22)
+        broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        report = broker.check_orders("EURUSD", 1.2000, 1.2250, 1.1990, 1.2200)
+
+        assert [(o.side, o.fill_price) for o in report.executed_orders] == [("SELL", pytest.approx(1.22))]
+        assert broker.positions["EURUSD"] == pytest.approx(0.0)
+        assert broker.matcher is not None and len(broker.matcher) == 0
+
+    def test_orders_are_classified_on_their_own_symbol(self) -> None:
+        matcher = OrderMatcher(default_slippage=0.1)
+        broker = VirtualBroker(matcher=matcher)
+        broker.update_price("XAUUSD", 1950.0)
+        gold = OrderIntent(symbol="XAUUSD", side="SELL", quantity=0.2, entry_price=1950.0)
+        unquoted = OrderIntent(symbol="US100", side="BUY", quantity=1.0, entry_price=18000.0)
+        decision = replace(make_decision(), symbol="PORTFOLIO", orders=[gold, unquoted])
+
+        report = broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        assert report.status == "PARTIAL"
+        assert [(o.symbol, o.fill_price) for o in report.executed_orders] == [("XAUUSD", pytest.approx(1949.9))]
+        assert len(matcher) == 0
+        assert "US100" in (report.reason or "")
+
+    def test_flatten_cancels_resting_orders(self) -> None:
+        matcher = OrderMatcher()
+        broker = VirtualBroker(matcher=matcher)
+        broker.execute(make_verdict(), self.make_order_decision(entry=None, stop_loss=1.19), make_snapshot())
+
+        broker.execute(make_verdict(), make_decision(action="FLATTEN"), make_snapshot())
+
+        assert len(matcher) == 0
+        assert broker.check_orders("EURUSD", 1.20, 1.21, 1.10, 1.15).executed_orders == []
+
+    def test_intrabar_children_order_exits(self) -> None:
+        bar_time = datetime(2024, 1, 1, 9)
+        children = np.array([[1.2000, 1.2210, 1.1995, 1.2150], [1.2150, 1.2160, 1.1850, 1.2100]])
+        index = IntrabarIndex(
+            np.array([bar_time], dtype="datetime64[ns]"),
+            np.array([bar_time, bar_time + timedelta(minutes=1)], dtype="datetime64[ns]"),
+            children,
+        )
+        broker = VirtualBroker(matcher=OrderMatcher(), intrabar={"EURUSD": index})
+        decision = self.make_order_decision(entry=None, stop_loss=1.19, take_profit=1.22)
+        broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        # Up bar: the heuristic would visit the low (SL) first; the children reach the TP first
+        report = broker.check_orders("EURUSD", 1.2000, 1.2210, 1.1850, 1.2100, timestamp=bar_time)
+
+        assert [(o.side, o.fill_price) for o in report.executed_orders] == [("SELL", pytest.approx(1.22))]
+
+    def test_intrabar_falls_back_without_children(self) -> None:
+        broker = VirtualBroker(matcher=OrderMatcher(heuristic="LOW_FIRST"), intrabar={})
+        decision = self.make_order_decision(entry=None, stop_loss=1.19, take_profit=1.22)
+        broker.execute(make_verdict(), decision, make_snapshot(price=1.20))
+
+        report = broker.check_orders("EURUSD", 1.2000, 1.2210, 1.1850, 1.1900, timestamp=datetime(2024, 1, 1, 9))
+
+        assert [(o.side, o.fill_price) for o in report.executed_orders] == [("SELL", pytest.approx(1.19))]